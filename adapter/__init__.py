@@ -22,35 +22,26 @@
 
 使用方式：
 ```python
-from adapter import DataAdapter
-from adapter.transformers import FieldMapper, TypeConverter
+import asyncio
+from adapter.transformers import StockDataTransformer
 
-# 創建適配器
-adapter = DataAdapter(
-    transformers=[
-        FieldMapper({
-            'source_field': 'target_field',
-            'old_name': 'new_name'
-        }),
-        TypeConverter({
-            'field_name': 'int',
-            'date_field': 'datetime'
-        })
-    ]
-)
-
-# 轉換資料
-transformed_data = adapter.transform(source_data)
+# 將 CSV 行情轉換為 Chart.js JSON
+transformer = StockDataTransformer({
+    'input_dir': 'data/csv',
+    'output_dir': 'data/json'
+})
+results = asyncio.run(transformer.transform(None))
 ```
 """
 
-from adapter.core.adapter import DataAdapter
-from adapter.core.transformer import Transformer
-from adapter.transformers.field_mapper import FieldMapper
-from adapter.transformers.type_converter import TypeConverter
-from adapter.transformers.value_formatter import ValueFormatter
-from adapter.transformers.data_validator import DataValidator
-from adapter.transformers.data_cleaner import DataCleaner
+from adapter.core.base import BaseAdapter, BaseTransformer, BaseValidator
+from adapter.core.logger import LoggerManager
+from adapter.transformers import (
+    CSVTransformer,
+    ChartJSTransformer,
+    EnhancedChartJSTransformer,
+    StockDataTransformer
+)
 from adapter.core.exceptions import (
     AdapterError,
     TransformationError,
@@ -64,19 +55,20 @@ __license__ = 'MIT'
 
 __all__ = [
     # 核心類
-    'DataAdapter',
-    'Transformer',
+    'BaseAdapter',
+    'BaseTransformer',
+    'BaseValidator',
+    'LoggerManager',
     
     # 轉換器
-    'FieldMapper',
-    'TypeConverter',
-    'ValueFormatter',
-    'DataValidator',
-    'DataCleaner',
+    'CSVTransformer',
+    'ChartJSTransformer',
+    'EnhancedChartJSTransformer',
+    'StockDataTransformer',
     
     # 異常類
     'AdapterError',
     'TransformationError',
     'ValidationError',
     'ConfigurationError'
-] 
\ No newline at end of file
+]
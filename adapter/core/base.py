@@ -10,7 +10,7 @@ from typing import Any, Dict, List, Optional, Union, Type
 from datetime import datetime
 import json
 import asyncio
-from .logger import Logger
+from .logger import LoggerManager
 from .exceptions import (
     AdapterError, ValidationError, TransformationError, 
     ConnectionError, QueryError, SchemaError, MappingError,
@@ -20,7 +20,7 @@ from .exceptions import (
 class DatabaseConnection(ABC):
     """資料庫連接基礎類別"""
     
-    def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None):
+    def __init__(self, config: Dict[str, Any], logger: Optional[LoggerManager] = None):
         """
         初始化資料庫連接
         
@@ -29,7 +29,7 @@ class DatabaseConnection(ABC):
             logger: 日誌對象
         """
         self.config = config
-        self.logger = logger or Logger()
+        self.logger = logger or LoggerManager()
         self.connection = None
         self.transaction = None
         
@@ -141,7 +141,7 @@ class DatabaseConnection(ABC):
 class BaseValidator(ABC):
     """驗證器基礎類別"""
     
-    def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None):
+    def __init__(self, config: Dict[str, Any], logger: Optional[LoggerManager] = None):
         """
         初始化驗證器
         
@@ -150,7 +150,7 @@ class BaseValidator(ABC):
             logger: 日誌對象
         """
         self.config = config
-        self.logger = logger or Logger()
+        self.logger = logger or LoggerManager()
         
     @abstractmethod
     async def validate(self, data: Any) -> bool:
@@ -168,7 +168,7 @@ class BaseValidator(ABC):
 class BaseTransformer(ABC):
     """轉換器基礎類別"""
     
-    def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None):
+    def __init__(self, config: Dict[str, Any], logger: Optional[LoggerManager] = None):
         """
         初始化轉換器
         
@@ -177,7 +177,7 @@ class BaseTransformer(ABC):
             logger: 日誌對象
         """
         self.config = config
-        self.logger = logger or Logger()
+        self.logger = logger or LoggerManager()
         
     @abstractmethod
     async def transform(self, data: Any) -> Any:
@@ -195,7 +195,7 @@ class BaseTransformer(ABC):
 class BaseAdapter(ABC):
     """適配器基礎類別"""
     
-    def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None):
+    def __init__(self, config: Dict[str, Any], logger: Optional[LoggerManager] = None):
         """
         初始化適配器
         
@@ -204,7 +204,7 @@ class BaseAdapter(ABC):
             logger: 日誌對象
         """
         self.config = config
-        self.logger = logger or Logger()
+        self.logger = logger or LoggerManager()
         self.validators: List[BaseValidator] = []
         self.transformers: List[BaseTransformer] = []
         self.source_connection: Optional[DatabaseConnection] = None
@@ -243,7 +243,7 @@ class BaseAdapter(ABC):
                 if not await validator.validate(data):
                     return False
             except Exception as e:
-                self.logger.log_error(e, {"validator": validator.__class__.__name__, "data": data})
+                self.logger.log_error(e, validator=validator.__class__.__name__, data=data)
                 raise ValidationError(f"驗證失敗: {str(e)}")
         return True
         
@@ -262,7 +262,7 @@ class BaseAdapter(ABC):
             try:
                 result = await transformer.transform(result)
             except Exception as e:
-                self.logger.log_error(e, {"transformer": transformer.__class__.__name__, "data": data})
+                self.logger.log_error(e, transformer=transformer.__class__.__name__, data=data)
                 raise TransformationError(f"轉換失敗: {str(e)}")
         return result
         
@@ -60,6 +60,10 @@ class LoggerManager:
             
     def _setup_console_handler(self) -> None:
         """設置控制台處理器"""
+        # 同名日誌記錄器為全域共用，重複建立管理器時不再重複添加
+        for handler in self.logger.handlers:
+            if isinstance(handler, logging.StreamHandler) and getattr(handler, "stream", None) is sys.stdout:
+                return
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(self.level)
         console_handler.setFormatter(logging.Formatter(self.format))
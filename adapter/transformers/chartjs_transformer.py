@@ -114,11 +114,8 @@ class ChartJSTransformer(CSVTransformer):
                     color_idx = i % len(self.COLORS)
                     color = self.COLORS[color_idx]
                     
-                    # 檢查是否有 NaN 值
-                    data = df[col].tolist()
-                    if any(pd.isna(x) for x in data):
-                        # 填充 NaN 值
-                        data = [None if pd.isna(x) else x for x in data]
+                    # NaN 值轉為 None
+                    data = self.series_to_list(df[col])
                         
                     datasets.append({
                         "label": col,
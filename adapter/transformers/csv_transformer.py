@@ -8,6 +8,9 @@ CSV 到 JSON 轉換器
 
 import os
 import json
+import asyncio
+import hashlib
+import numpy as np
 import pandas as pd
 import glob
 import random
@@ -20,7 +23,51 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 from ..core.base import BaseTransformer
 from ..core.exceptions import TransformationError
-from ..core.logger import Logger
+from ..core.logger import LoggerManager
+
+
+# 增量轉換清單檔名，存放於輸出目錄（以點開頭，不會被 *.json 匹配）
+MANIFEST_FILENAME = ".transform_manifest.json"
+
+# 只影響挑選與排程、不影響輸出內容的配置鍵，不列入配置指紋
+RUNTIME_CONFIG_KEYS = frozenset({'input_dir', 'output_dir', 'limit', 'pattern', 'workers', 'incremental'})
+
+
+def _transform_in_subprocess(transformer_cls: type, config: Dict[str, Any], csv_path: str) -> Optional[str]:
+    """
+    在子行程中轉換單個 CSV 檔案
+
+    轉換器實例（含日誌對象）不一定可序列化，因此只傳遞類別與配置，
+    由子行程自行建立實例並執行 _transform_file。
+
+    Args:
+        transformer_cls: 轉換器類別
+        config: 轉換配置
+        csv_path: CSV 檔案路徑
+
+    Returns:
+        Optional[str]: 輸出的 JSON 檔案路徑，如果轉換失敗則返回 None
+    """
+    transformer = transformer_cls(config)
+    return asyncio.run(transformer._transform_file(csv_path))
+
+
+def file_digest(path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """
+    計算檔案內容的 SHA-256 雜湊值
+
+    Args:
+        path: 檔案路徑
+        chunk_size: 每次讀取的位元組數
+
+    Returns:
+        str: 十六進位雜湊字串
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 class CSVTransformer(BaseTransformer):
@@ -53,7 +100,7 @@ class CSVTransformer(BaseTransformer):
         'rgba(210, 199, 199, 0.8)'
     ]
     
-    def __init__(self, config: Dict[str, Any], logger: Optional[Logger] = None):
+    def __init__(self, config: Dict[str, Any], logger: Optional[LoggerManager] = None):
         """
         初始化轉換器
         
@@ -63,6 +110,8 @@ class CSVTransformer(BaseTransformer):
                 - output_dir: 輸出 JSON 檔案目錄
                 - limit: 限制處理檔案數量
                 - pattern: 檔案名稱匹配模式
+                - workers: 平行轉換的行程數，0 表示使用所有 CPU 核心，1 表示循序轉換
+                - incremental: 是否跳過輸出已是最新的檔案（預設為 True）
             logger: 日誌對象
         """
         super().__init__(config, logger)
@@ -72,6 +121,8 @@ class CSVTransformer(BaseTransformer):
         self.output_dir = Path(self.config.get('output_dir', ''))
         self.limit = self.config.get('limit', None)
         self.pattern = self.config.get('pattern', None)
+        self.workers = self.config.get('workers', 1)
+        self.incremental = self.config.get('incremental', True)
         
         # 確保輸出目錄存在
         os.makedirs(self.output_dir, exist_ok=True)
@@ -97,6 +148,10 @@ class CSVTransformer(BaseTransformer):
                 self.limit = data['limit']
             if 'pattern' in data:
                 self.pattern = data['pattern']
+            if 'workers' in data:
+                self.workers = data['workers']
+            if 'incremental' in data:
+                self.incremental = data['incremental']
         
         # 尋找所有 CSV 檔案
         csv_files = glob.glob(str(self.input_dir / "*.csv"))
@@ -126,33 +181,55 @@ class CSVTransformer(BaseTransformer):
             "total": len(csv_files),
             "successful": 0,
             "failed": 0,
+            "skipped": 0,
             "files": []
         }
         
+        # 增量模式：跳過輸出已是最新的檔案
+        manifest = self._load_manifest() if self.incremental else {}
+        pending = []
         for csv_file in csv_files:
-            try:
-                output_file = await self._transform_file(csv_file)
-                if output_file:
-                    results["successful"] += 1
-                    results["files"].append({
-                        "input": csv_file,
-                        "output": output_file,
-                        "status": "success"
-                    })
-                else:
-                    results["failed"] += 1
-                    results["files"].append({
-                        "input": csv_file,
-                        "status": "failed"
-                    })
-            except Exception as e:
-                self.logger.error(f"處理檔案 {csv_file} 時發生錯誤: {str(e)}")
-                results["failed"] += 1
+            if self.incremental and self._is_up_to_date(csv_file, manifest):
+                results["skipped"] += 1
                 results["files"].append({
                     "input": csv_file,
-                    "status": "failed",
-                    "error": str(e)
+                    "output": manifest[os.path.abspath(csv_file)]["output"],
+                    "status": "skipped"
                 })
+            else:
+                pending.append(csv_file)
+                
+        if results["skipped"]:
+            self.logger.info(f"跳過 {results['skipped']} 個輸出已是最新的檔案")
+        
+        workers = self._resolve_workers(len(pending))
+        if workers > 1:
+            outcomes = await self._transform_parallel(pending, workers)
+        else:
+            outcomes = await self._transform_serial(pending)
+            
+        for csv_file, output_file, error in outcomes:
+            if output_file:
+                results["successful"] += 1
+                results["files"].append({
+                    "input": csv_file,
+                    "output": output_file,
+                    "status": "success"
+                })
+                if self.incremental:
+                    self._record_manifest(manifest, csv_file, output_file)
+            else:
+                results["failed"] += 1
+                entry = {
+                    "input": csv_file,
+                    "status": "failed"
+                }
+                if error:
+                    entry["error"] = error
+                results["files"].append(entry)
+                
+        if self.incremental and (results["successful"] or results["skipped"]):
+            self._save_manifest(manifest)
                 
         results["success"] = results["failed"] == 0
         
@@ -160,6 +237,211 @@ class CSVTransformer(BaseTransformer):
         
         return results
         
+    def _resolve_workers(self, pending: int) -> int:
+        """
+        決定實際使用的行程數
+        
+        Args:
+            pending: 待轉換的檔案數量
+            
+        Returns:
+            int: 行程數，小於等於 1 時循序轉換
+        """
+        workers = self.workers
+        if workers is None or workers <= 0:
+            workers = os.cpu_count() or 1
+        return max(1, min(workers, pending))
+        
+    async def _transform_serial(self, csv_files: List[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        在目前行程中逐一轉換檔案
+        
+        Args:
+            csv_files: CSV 檔案路徑列表
+            
+        Returns:
+            List[Tuple[str, Optional[str], Optional[str]]]: (輸入路徑, 輸出路徑, 錯誤訊息) 列表
+        """
+        outcomes = []
+        for csv_file in csv_files:
+            try:
+                outcomes.append((csv_file, await self._transform_file(csv_file), None))
+            except Exception as e:
+                self.logger.error(f"處理檔案 {csv_file} 時發生錯誤: {str(e)}")
+                outcomes.append((csv_file, None, str(e)))
+        return outcomes
+        
+    async def _transform_parallel(self, csv_files: List[str], workers: int) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        使用行程池平行轉換檔案
+        
+        pandas 解析與 JSON 序列化皆受 GIL 限制，因此以多行程分散到所有核心；
+        若無法建立行程池則退回循序轉換。
+        
+        Args:
+            csv_files: CSV 檔案路徑列表
+            workers: 行程數
+            
+        Returns:
+            List[Tuple[str, Optional[str], Optional[str]]]: (輸入路徑, 輸出路徑, 錯誤訊息) 列表，順序與輸入相同
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        config = dict(self.config)
+        config.update({
+            'input_dir': str(self.input_dir),
+            'output_dir': str(self.output_dir),
+            'limit': self.limit,
+            'pattern': self.pattern,
+            'workers': 1
+        })
+        
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            self.logger.warning(f"無法建立行程池，改為循序轉換: {str(e)}")
+            return await self._transform_serial(csv_files)
+            
+        self.logger.info(f"使用 {workers} 個行程平行轉換 {len(csv_files)} 個檔案")
+        loop = asyncio.get_running_loop()
+        try:
+            futures = [
+                loop.run_in_executor(executor, _transform_in_subprocess, type(self), config, csv_file)
+                for csv_file in csv_files
+            ]
+            gathered = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            executor.shutdown(wait=True)
+            
+        outcomes = []
+        for csv_file, result in zip(csv_files, gathered):
+            if isinstance(result, BaseException):
+                self.logger.error(f"處理檔案 {csv_file} 時發生錯誤: {str(result)}")
+                outcomes.append((csv_file, None, str(result)))
+            else:
+                outcomes.append((csv_file, result, None))
+        return outcomes
+        
+    def config_fingerprint(self) -> str:
+        """
+        計算影響輸出內容的轉換配置指紋
+        
+        由轉換器類別與排除 RUNTIME_CONFIG_KEYS 後的配置組成，
+        轉換器或輸出相關配置改變時指紋即不同，既有輸出需重新轉換。
+        
+        Returns:
+            str: 十六進位雜湊字串
+        """
+        cls = type(self)
+        options = {k: v for k, v in self.config.items() if k not in RUNTIME_CONFIG_KEYS}
+        payload = json.dumps(
+            {"transformer": f"{cls.__module__}.{cls.__qualname__}", "config": options},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        
+    @property
+    def manifest_path(self) -> Path:
+        """增量轉換清單路徑"""
+        return self.output_dir / MANIFEST_FILENAME
+        
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        載入增量轉換清單
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: 以輸入檔案絕對路徑為鍵的清單
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"無法讀取轉換清單，將重新轉換所有檔案: {str(e)}")
+            return {}
+            
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """
+        原子性寫入增量轉換清單
+        
+        Args:
+            manifest: 轉換清單
+        """
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            self.logger.warning(f"無法寫入轉換清單: {str(e)}")
+            
+    def _record_manifest(self, manifest: Dict[str, Dict[str, Any]], csv_file: str, output_file: str) -> None:
+        """
+        記錄已轉換檔案的狀態
+        
+        Args:
+            manifest: 轉換清單
+            csv_file: CSV 檔案路徑
+            output_file: 輸出的 JSON 檔案路徑
+        """
+        try:
+            stat = os.stat(csv_file)
+            manifest[os.path.abspath(csv_file)] = {
+                "output": output_file,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": file_digest(csv_file),
+                "transformer": type(self).__name__,
+                "config": self.config_fingerprint()
+            }
+        except OSError as e:
+            self.logger.warning(f"無法記錄檔案 {csv_file} 的轉換狀態: {str(e)}")
+            
+    def _is_up_to_date(self, csv_file: str, manifest: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        檢查檔案的輸出是否已是最新
+        
+        輸出必須存在，且由同一種轉換器以相同配置指紋產生。輸出較輸入新且輸入的修改時間與大小
+        未變時直接視為最新；否則再比對內容雜湊，因此僅被觸碰或重新下載但內容
+        相同的檔案不會重新轉換。
+        
+        Args:
+            csv_file: CSV 檔案路徑
+            manifest: 轉換清單
+            
+        Returns:
+            bool: 是否可以跳過
+        """
+        key = os.path.abspath(csv_file)
+        entry = manifest.get(key)
+        if (not entry
+                or entry.get("transformer") != type(self).__name__
+                or entry.get("config") != self.config_fingerprint()):
+            return False
+            
+        try:
+            stat = os.stat(csv_file)
+            output_stat = os.stat(entry["output"])
+        except (OSError, KeyError, TypeError):
+            return False
+            
+        if (output_stat.st_mtime_ns >= stat.st_mtime_ns
+                and entry.get("mtime_ns") == stat.st_mtime_ns
+                and entry.get("size") == stat.st_size):
+            return True
+            
+        try:
+            if file_digest(csv_file) != entry.get("sha256"):
+                return False
+        except OSError:
+            return False
+            
+        entry["mtime_ns"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+        return True
+        
     async def _transform_file(self, csv_path: str) -> Optional[str]:
         """
         將單個 CSV 檔案轉換為 Chart.js 格式的 JSON 檔案
@@ -290,17 +572,52 @@ class CSVTransformer(BaseTransformer):
                 dates = df[date_column].astype(str).tolist()
         
         # 建立 OHLC 資料
-        for i, row in df.iterrows():
-            try:
-                data_point = {
-                    't': dates[i],
-                    'o': float(row[o_col]),
-                    'h': float(row[h_col]),
-                    'l': float(row[l_col]),
-                    'c': float(row[c_col])
-                }
-                ohlc_data.append(data_point)
-            except (ValueError, TypeError):
-                continue  # 跳過無效資料
+        ohlc_data = self.build_point_records(df, dates, {'o': o_col, 'h': h_col, 'l': l_col, 'c': c_col})
         
         return ohlc_data, dates
+        
+    @staticmethod
+    def build_point_records(df: pd.DataFrame, labels: List[str], columns: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        以欄位向量運算建立 Chart.js 時間點資料
+        
+        各欄位一次轉為數值，無法轉換或缺值的資料列整列跳過，
+        取代逐列 iterrows 與 float 轉型。
+        
+        Args:
+            df: pandas DataFrame
+            labels: 與資料列位置對應的時間標籤
+            columns: 輸出鍵到欄位名稱的對應，例如 {'o': 'Open', 'c': 'Close'}
+            
+        Returns:
+            List[Dict[str, Any]]: 形如 {'t': 標籤, 鍵: 數值} 的資料點列表
+        """
+        keys = list(columns)
+        rows = min(len(df), len(labels))
+        if not keys or rows == 0:
+            return []
+            
+        values = df.iloc[:rows][[columns[k] for k in keys]].apply(pd.to_numeric, errors='coerce')
+        matrix = values.to_numpy(dtype=float)
+        valid = np.isfinite(matrix).all(axis=1)
+        
+        stamps = [labels[i] for i in np.flatnonzero(valid)]
+        columns_data = [matrix[valid, j].tolist() for j in range(len(keys))]
+        fields = ['t'] + keys
+        
+        return [dict(zip(fields, point)) for point in zip(stamps, *columns_data)]
+        
+    @staticmethod
+    def series_to_list(series: pd.Series) -> List[Any]:
+        """
+        將欄位轉為可 JSON 序列化的列表，NaN 轉為 None
+        
+        Args:
+            series: pandas Series
+            
+        Returns:
+            List[Any]: 欄位值列表
+        """
+        if not series.hasnans:
+            return series.tolist()
+        return series.astype(object).where(series.notna(), None).tolist()
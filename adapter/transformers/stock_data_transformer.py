@@ -111,21 +111,12 @@ class StockDataTransformer(CSVTransformer):
             # 準備 Chart.js 資料
             if is_ohlc:
                 # 準備 OHLC 資料 (蠟燭圖)
-                ohlc_data = []
-                
-                for i, row in df.iterrows():
-                    try:
-                        data_point = {
-                            't': labels[i],
-                            'o': float(row[ohlc_cols["open"]]),
-                            'h': float(row[ohlc_cols["high"]]),
-                            'l': float(row[ohlc_cols["low"]]),
-                            'c': float(row[ohlc_cols["close"]])
-                        }
-                        ohlc_data.append(data_point)
-                    except (ValueError, TypeError, IndexError) as e:
-                        self.logger.debug(f"跳過無效資料點 {i}: {str(e)}")
-                        continue
+                ohlc_data = self.build_point_records(df, labels, {
+                    'o': ohlc_cols["open"],
+                    'h': ohlc_cols["high"],
+                    'l': ohlc_cols["low"],
+                    'c': ohlc_cols["close"]
+                })
                         
                 # 建立 candlestick 圖表資料
                 chart_data = {
@@ -160,15 +151,7 @@ class StockDataTransformer(CSVTransformer):
                 
                 # 考慮額外添加一個簡化的價格線
                 if "close" in ohlc_cols and ohlc_cols["close"] is not None:
-                    price_line_data = []
-                    for i, row in df.iterrows():
-                        try:
-                            price_line_data.append({
-                                't': labels[i],
-                                'y': float(row[ohlc_cols["close"]])
-                            })
-                        except (ValueError, TypeError, IndexError):
-                            continue
+                    price_line_data = self.build_point_records(df, labels, {'y': ohlc_cols["close"]})
                     
                     # 新增另一個 JSON 檔案，作為線圖呈現
                     price_output_path = os.path.join(self.output_dir, f"{file_name}_line.json")
@@ -219,11 +202,8 @@ class StockDataTransformer(CSVTransformer):
                         color_idx = i % len(self.COLORS)
                         color = self.COLORS[color_idx]
                         
-                        # 檢查是否有 NaN 值
-                        data = df[col].tolist()
-                        if any(pd.isna(x) for x in data):
-                            # 填充 NaN 值
-                            data = [None if pd.isna(x) else x for x in data]
+                        # NaN 值轉為 None
+                        data = self.series_to_list(df[col])
                             
                         datasets.append({
                             "label": col,
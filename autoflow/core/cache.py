@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+非同步 TTL 快取
+
+此模組提供帶過期時間的記憶體快取，並合併同一鍵的並行載入請求：
+同一時間對同一鍵的多個請求只會執行一次載入函數，其餘請求等待同一結果。
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class AsyncTTLCache:
+    """帶過期時間與並行請求合併的非同步快取"""
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 256):
+        """初始化快取
+
+        Args:
+            ttl: 快取項目存活秒數
+            max_size: 最大項目數，超過時淘汰最早過期的項目
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def get(self, key: Hashable) -> Any:
+        """取得未過期的快取值，不存在或已過期時返回 None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """寫入快取值"""
+        if key not in self._entries and len(self._entries) >= self.max_size:
+            self._evict()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """移除指定鍵的快取值"""
+        self._entries.pop(key, None)
+
+    def _evict(self) -> None:
+        """清除已過期項目；仍然已滿時淘汰最早過期的項目"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_size:
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """取得快取值，未命中時執行載入函數
+
+        同一鍵已有載入進行中時，等待該次載入的結果而不重複執行。
+        載入失敗時例外會傳遞給所有等待者，且不寫入快取。
+
+        Args:
+            key: 快取鍵
+            loader: 返回 awaitable 的載入函數
+
+        Returns:
+            Any: 快取值或載入結果
+        """
+        value = self.get(key)
+        if value is not None:
+            self._stats['hits'] += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats['coalesced'] += 1
+        else:
+            self._stats['misses'] += 1
+            # 載入在獨立任務中執行，任一等待者被取消都不會中斷共用的載入
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """執行載入並寫入快取"""
+        try:
+            value = await loader()
+            self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得命中、未命中與合併請求的次數"""
+        return dict(self._stats, size=len(self._entries), inflight=len(self._inflight))
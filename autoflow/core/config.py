@@ -32,6 +32,8 @@ class Config:
         
         # 股票配置
         self.default_stock_period = os.getenv('DEFAULT_STOCK_PERIOD', '1d')
+        self.stock_cache_ttl = float(os.getenv('STOCK_CACHE_TTL', '60'))
+        self.stock_fetch_workers = int(os.getenv('STOCK_FETCH_WORKERS', '4'))
     
     def _load_env(self) -> None:
         """載入環境變數"""
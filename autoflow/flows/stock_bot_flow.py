@@ -17,8 +17,12 @@ import yfinance as yf
 from datetime import datetime, timedelta
 import pandas as pd
 import os
+import time
 import asyncio
 import logging
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import sys
 from pathlib import Path
@@ -29,6 +33,8 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from autoflow.core.flow import Flow
+from autoflow.core.config import Config
+from autoflow.core.cache import AsyncTTLCache
 from autoflow.services.telegram import TelegramService
 from autoflow.services.supabase import SupabaseService
 from autoflow.services.web import WebService
@@ -53,6 +59,15 @@ logging.getLogger('autoflow.services.web').setLevel(logging.DEBUG)
 class StockBotFlow(Flow):
     """股票行情查詢機器人工作流程"""
     
+    # 查詢的歷史天數
+    HISTORY_DAYS = 7
+    # 每個階段保留最近多少次耗時用於統計
+    LATENCY_WINDOW = 200
+    # 行情以 (symbol, date) 批量 upsert 時的衝突欄位
+    STOCK_DATA_CONFLICT = 'symbol,date'
+    # PostgreSQL：ON CONFLICT 欄位沒有對應的唯一約束
+    MISSING_CONSTRAINT_CODE = '42P10'
+    
     def __init__(self):
         super().__init__()
         self.telegram = TelegramService()
@@ -60,6 +75,18 @@ class StockBotFlow(Flow):
         self.web = WebService()
         self.logger = logger
         
+        config = Config()
+        # 以 (股票代碼, 天數) 為鍵快取行情，並合併同一股票的並行請求
+        self.quote_cache = AsyncTTLCache(ttl=config.stock_cache_ttl)
+        # stock_data 表缺少 (symbol, date) 唯一約束時改用一般插入
+        self._stock_upsert = True
+        # yfinance 為同步 I/O，在執行緒池中執行以免阻塞事件循環
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.stock_fetch_workers,
+            thread_name_prefix='stock-fetch'
+        )
+        self._latencies: Dict[str, deque] = {}
+        
     async def start(self):
         """啟動工作流程"""
         try:
@@ -118,6 +145,7 @@ class StockBotFlow(Flow):
             await self.telegram.stop()
             await self.supabase.disconnect()
             await self.web.stop()
+            self._executor.shutdown(wait=False, cancel_futures=True)
             self.logger.info("所有服務已停止")
         except Exception as e:
             self.logger.error(f"停止服務時發生錯誤：{str(e)}")
@@ -151,30 +179,37 @@ class StockBotFlow(Flow):
                 return
                 
             try:
-                # 獲取股票數據
-                self.logger.info(f"正在獲取股票數據：{symbol}")
-                stock_data = await self._fetch_stock_data(symbol)
+                timings: Dict[str, float] = {}
                 
-                # 存儲數據
-                self.logger.info(f"正在存儲股票數據：{symbol}")
-                await self._store_data(symbol, stock_data)
+                # 獲取股票數據（快取未命中時下載並存儲）
+                self.logger.info(f"正在獲取股票數據：{symbol}")
+                with self._measure('quote', timings):
+                    stock_data = await self._get_stock_data(symbol)
                 
                 # 生成圖表
                 self.logger.info(f"正在生成圖表：{symbol}")
-                chart_url = await self._generate_chart(symbol)
+                with self._measure('chart', timings):
+                    chart_url = await self._generate_chart(symbol)
                 
                 # 準備回應消息
                 response = await self._prepare_response(symbol, stock_data, chart_url)
                 
                 # 發送結果
-                await self.telegram.send_message(
-                    chat_id=message['chat']['id'],
-                    text=response
-                )
+                with self._measure('send', timings):
+                    await self.telegram.send_message(
+                        chat_id=message['chat']['id'],
+                        text=response
+                    )
                 
                 # 記錄對話
                 self.logger.info(f"正在記錄對話：{symbol}")
-                await self._log_conversation(user['id'], symbol, response)
+                with self._measure('log', timings):
+                    await self._log_conversation(user['id'], symbol, response)
+                
+                self.logger.info(
+                    f"{symbol} 各階段耗時：" +
+                    ", ".join(f"{stage}={elapsed * 1000:.0f}ms" for stage, elapsed in timings.items())
+                )
                 
             except Exception as e:
                 error_message = f"處理請求時發生錯誤：{str(e)}"
@@ -282,14 +317,85 @@ class StockBotFlow(Flow):
             f"查看詳細圖表：{chart_url}"
         )
     
-    async def _fetch_stock_data(self, symbol: str) -> pd.DataFrame:
+    @contextmanager
+    def _measure(self, stage: str, timings: Optional[Dict[str, float]] = None):
+        """記錄一個階段的耗時
+        
+        Args:
+            stage: 階段名稱
+            timings: 本次請求的耗時字典，可選
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if timings is not None:
+                timings[stage] = elapsed
+            self._latencies.setdefault(stage, deque(maxlen=self.LATENCY_WINDOW)).append(elapsed)
+    
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """取得各階段最近的耗時統計（毫秒）
+        
+        Returns:
+            Dict[str, Dict[str, float]]: 各階段的次數、平均、P95 與最大耗時
+        """
+        stats = {}
+        for stage, samples in self._latencies.items():
+            ordered = sorted(samples)
+            stats[stage] = {
+                'count': len(ordered),
+                'avg_ms': sum(ordered) / len(ordered) * 1000,
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                'max_ms': ordered[-1] * 1000
+            }
+        return stats
+    
+    async def _get_stock_data(self, symbol: str, days: Optional[int] = None) -> pd.DataFrame:
+        """從快取獲取股票數據，未命中時下載並存儲
+        
+        同一股票的並行請求只會觸發一次下載與一次寫入。
+        
+        Args:
+            symbol: 股票代碼
+            days: 歷史天數
+            
+        Returns:
+            pd.DataFrame: 股票數據
+        """
+        days = days or self.HISTORY_DAYS
+        return await self.quote_cache.get_or_load(
+            (symbol, days),
+            lambda: self._load_stock_data(symbol, days)
+        )
+    
+    async def _load_stock_data(self, symbol: str, days: int) -> pd.DataFrame:
+        """下載並存儲股票數據"""
+        with self._measure('fetch'):
+            data = await self._fetch_stock_data(symbol, days)
+        if data.empty:
+            raise ValueError(f"找不到股票代碼 {symbol} 的行情數據")
+        
+        self.logger.info(f"正在存儲股票數據：{symbol}")
+        with self._measure('store'):
+            await self._store_data(symbol, data)
+        return data
+    
+    async def _fetch_stock_data(self, symbol: str, days: int = HISTORY_DAYS) -> pd.DataFrame:
         """獲取股票數據"""
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
+        start_date = end_date - timedelta(days=days)
         
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._download_history, symbol, start_date, end_date
+        )
+    
+    @staticmethod
+    def _download_history(symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """下載歷史數據（在執行緒池中執行）"""
         stock = yf.Ticker(symbol)
-        data = stock.history(start=start_date, end=end_date)
-        return data
+        return stock.history(start=start_date, end=end_date)
     
     async def _store_data(self, symbol: str, data: pd.DataFrame) -> None:
         """將股票數據存儲到 Supabase
@@ -303,37 +409,48 @@ class StockBotFlow(Flow):
                 self.logger.warning(f"沒有數據可存儲：{symbol}")
                 return
 
-            # 準備數據
-            records = []
-            for index, row in data.iterrows():
-                record = {
-                    'symbol': symbol,
-                    'date': index.strftime('%Y-%m-%d'),
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': int(row['Volume']),
-                    'timestamp': datetime.now().isoformat()
-                }
-                records.append(record)
+            # 準備數據（整欄轉換，不逐行迭代）
+            records = pd.DataFrame({
+                'symbol': symbol,
+                'date': data.index.strftime('%Y-%m-%d'),
+                'open': data['Open'].astype(float).to_numpy(),
+                'high': data['High'].astype(float).to_numpy(),
+                'low': data['Low'].astype(float).to_numpy(),
+                'close': data['Close'].astype(float).to_numpy(),
+                'volume': data['Volume'].astype('int64').to_numpy(),
+                'timestamp': datetime.now().isoformat()
+            }).to_dict('records')
             
             self.logger.info(f"準備存儲 {len(records)} 條記錄")
             
-            # 批量插入數據
-            for record in records:
+            # 一次批量寫入，同一股票同一日期的記錄以更新取代重複插入
+            if self._stock_upsert:
                 try:
-                    result = await self.supabase.create('stock_data', record)
-                    self.logger.debug(f"成功存儲記錄：{record['date']}")
+                    await self.supabase.upsert('stock_data', records, on_conflict=self.STOCK_DATA_CONFLICT)
+                    self.logger.info(f"已成功存儲 {symbol} 的股票數據")
+                    return
                 except Exception as e:
-                    self.logger.error(f"存儲記錄時發生錯誤：{str(e)}, 記錄：{record}")
-                    raise
+                    if not self._is_missing_constraint(e):
+                        raise
+                    self._stock_upsert = False
+                    self.logger.warning(
+                        "stock_data 表缺少 (symbol, date) 唯一約束，改用一般插入；"
+                        "請執行 alter table stock_data add constraint "
+                        "stock_data_symbol_date_key unique (symbol, date)"
+                    )
             
+            await self.supabase.create_many('stock_data', records)
             self.logger.info(f"已成功存儲 {symbol} 的股票數據")
             
         except Exception as e:
+            # 存儲失敗不影響回覆用戶的行情
             self.logger.error(f"存儲股票數據時發生錯誤：{str(e)}")
-            raise
+    
+    @classmethod
+    def _is_missing_constraint(cls, error: Exception) -> bool:
+        """判斷錯誤是否為 ON CONFLICT 欄位缺少唯一約束"""
+        code = getattr(error, 'code', None)
+        return code == cls.MISSING_CONSTRAINT_CODE or cls.MISSING_CONSTRAINT_CODE in str(error)
     
     async def _generate_chart(self, symbol: str) -> str:
         """生成圖表"""
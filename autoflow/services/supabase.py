@@ -7,6 +7,7 @@ Supabase 服務模組
 此模組提供與 Supabase 的互動功能
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from supabase import create_client, Client
@@ -180,6 +181,69 @@ class SupabaseService:
             self.logger.error(f"創建記錄時發生錯誤：{str(e)}, 表：{table}, 數據：{data}")
             raise
     
+    async def upsert(self, table: str, records: List[Dict[str, Any]],
+                     on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        """批量新增或更新記錄
+        
+        所有記錄在一次請求中送出；同步的 HTTP 呼叫在執行緒中執行，不阻塞事件循環。
+        
+        Args:
+            table: 表名
+            records: 要寫入的記錄列表
+            on_conflict: 衝突判定欄位（以逗號分隔），需對應表上的唯一約束
+            
+        Returns:
+            List[Dict[str, Any]]: 寫入後的記錄
+        """
+        try:
+            if not self.client:
+                raise RuntimeError("Supabase 服務尚未連接")
+            if not records:
+                return []
+            
+            self.logger.debug(f"正在向表 {table} 批量寫入 {len(records)} 條記錄")
+            
+            options = {'on_conflict': on_conflict} if on_conflict else {}
+            query = self.client.table(table).upsert(records, **options)
+            response = await asyncio.to_thread(query.execute)
+            
+            self.logger.debug(f"成功批量寫入 {len(response.data or [])} 條記錄到表 {table}")
+            return response.data or []
+            
+        except Exception as e:
+            self.logger.error(f"批量寫入記錄時發生錯誤：{str(e)}, 表：{table}, 記錄數：{len(records)}")
+            raise
+    
+    async def create_many(self, table: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量插入記錄
+        
+        所有記錄在一次請求中送出；同步的 HTTP 呼叫在執行緒中執行，不阻塞事件循環。
+        
+        Args:
+            table: 表名
+            records: 要插入的記錄列表
+            
+        Returns:
+            List[Dict[str, Any]]: 插入後的記錄
+        """
+        try:
+            if not self.client:
+                raise RuntimeError("Supabase 服務尚未連接")
+            if not records:
+                return []
+            
+            self.logger.debug(f"正在向表 {table} 批量插入 {len(records)} 條記錄")
+            
+            query = self.client.table(table).insert(records)
+            response = await asyncio.to_thread(query.execute)
+            
+            self.logger.debug(f"成功批量插入 {len(response.data or [])} 條記錄到表 {table}")
+            return response.data or []
+            
+        except Exception as e:
+            self.logger.error(f"批量插入記錄時發生錯誤：{str(e)}, 表：{table}, 記錄數：{len(records)}")
+            raise
+    
     async def update_user(self, telegram_id: int, **kwargs) -> Dict[str, Any]:
         """更新用戶信息
         
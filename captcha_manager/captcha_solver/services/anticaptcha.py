@@ -20,9 +20,22 @@ class AntiCaptchaService(BaseCaptchaService):
             **kwargs: 其他配置參數
         """
         super().__init__(api_key, **kwargs)
-        this.base_url = "https://api.anti-captcha.com"
-        this.max_retries = kwargs.get("max_retries", 30)
-        this.retry_delay = kwargs.get("retry_delay", 5)
+        self.base_url = "https://api.anti-captcha.com"
+        self.max_retries = kwargs.get("max_retries", 30)
+        self.retry_delay = kwargs.get("retry_delay", 5)
+
+    def create_async_client(self, **kwargs) -> "AsyncAntiCaptchaClient":
+        """
+        建立共用此 API 密鑰的非同步客戶端，多個驗證碼可集中輪詢而不佔用執行緒
+
+        Args:
+            **kwargs: 非同步客戶端設定，參見 AsyncCaptchaClient
+
+        Returns:
+            AsyncAntiCaptchaClient: 非同步客戶端
+        """
+        from .async_client import AsyncAntiCaptchaClient
+        return AsyncAntiCaptchaClient(self.api_key, **kwargs)
 
     def _send_request(self, method: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -35,8 +48,8 @@ class AntiCaptchaService(BaseCaptchaService):
         Returns:
             Dict[str, Any]: 響應數據
         """
-        url = f"{this.base_url}/{method}"
-        data["clientKey"] = this.api_key
+        url = f"{self.base_url}/{method}"
+        data["clientKey"] = self.api_key
         
         response = requests.post(url, json=data)
         response.raise_for_status()
@@ -61,8 +74,8 @@ class AntiCaptchaService(BaseCaptchaService):
             "taskId": task_id,
         }
         
-        for _ in range(this.max_retries):
-            response = this._send_request("getTaskResult", data)
+        for _ in range(self.max_retries):
+            response = self._send_request("getTaskResult", data)
             
             if not response["success"]:
                 return response
@@ -71,7 +84,7 @@ class AntiCaptchaService(BaseCaptchaService):
             if result.get("status") == "ready":
                 return {"success": True, "result": result.get("gRecaptchaResponse")}
             
-            time.sleep(this.retry_delay)
+            time.sleep(self.retry_delay)
         
         return {"success": False, "error": "Timeout waiting for result"}
 
@@ -104,11 +117,11 @@ class AntiCaptchaService(BaseCaptchaService):
             data["type"] = "RecaptchaV3TaskProxyless"
             data["pageAction"] = action
         
-        response = this._send_request("createTask", data)
+        response = self._send_request("createTask", data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["taskId"])
+        return self._get_result(response["taskId"])
 
     def solve_hcaptcha(
         self,
@@ -133,11 +146,11 @@ class AntiCaptchaService(BaseCaptchaService):
             "websiteKey": site_key,
         }
         
-        response = this._send_request("createTask", data)
+        response = self._send_request("createTask", data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["taskId"])
+        return self._get_result(response["taskId"])
 
     def solve_image_captcha(
         self,
@@ -162,11 +175,11 @@ class AntiCaptchaService(BaseCaptchaService):
             "body": image_data,
         }
         
-        response = this._send_request("createTask", data)
+        response = self._send_request("createTask", data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["taskId"])
+        return self._get_result(response["taskId"])
 
     def solve_slider_captcha(
         self,
@@ -192,8 +205,8 @@ class AntiCaptchaService(BaseCaptchaService):
             "textinstructions": "Slide the puzzle piece to the right position",
         }
         
-        response = this._send_request("createTask", data)
+        response = self._send_request("createTask", data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["taskId"]) 
\ No newline at end of file
+        return self._get_result(response["taskId"]) 
\ No newline at end of file
@@ -0,0 +1,431 @@
+import asyncio
+import base64
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+
+# 輪詢結果狀態
+READY = "ready"
+PENDING = "pending"
+FAILED = "failed"
+
+
+class CaptchaServiceError(Exception):
+    """驗證碼服務返回錯誤"""
+
+
+@dataclass
+class _PendingCaptcha:
+    """等待結果的驗證碼任務"""
+    captcha_id: Any
+    kind: str
+    future: asyncio.Future
+    submitted_at: float
+    deadline: float
+    next_poll: float
+    interval: float
+    polls: int = 0
+
+
+@dataclass
+class PollingConfig:
+    """輪詢設定"""
+    initial_delay: float = 5.0  # 提交後第一次查詢前的等待秒數（尚無統計時）
+    min_interval: float = 2.0  # 最短查詢間隔
+    max_interval: float = 15.0  # 最長查詢間隔
+    backoff: float = 1.5  # 每次未完成後間隔的放大倍數
+    timeout: float = 180.0  # 單一驗證碼的最長等待秒數
+    batch_size: int = 100  # 單次批次查詢的最多任務數
+    max_connections: int = 20  # 共用連線池大小
+    solve_time_alpha: float = 0.3  # 各類型解題時間 EWMA 的平滑係數
+    initial_delays: Dict[str, float] = field(default_factory=lambda: {
+        "recaptcha": 15.0,
+        "hcaptcha": 15.0,
+    })
+
+
+class AsyncCaptchaClient(ABC):
+    """非同步驗證碼服務客戶端
+
+    提交的驗證碼由單一輪詢任務集中查詢，所有請求共用一個連線池；
+    服務提供批次查詢時一次查詢多個任務，結果返回時完成對應的 Future。
+    查詢間隔依各類型的歷史解題時間與未完成次數自動調整。
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        config: Optional[PollingConfig] = None,
+        **kwargs
+    ):
+        """
+        初始化客戶端
+
+        Args:
+            api_key: API 密鑰
+            session: 共用的 aiohttp 會話，未指定時自動建立並在 close 時關閉
+            config: 輪詢設定
+            **kwargs: 覆寫 PollingConfig 的欄位
+        """
+        self.api_key = api_key
+        names = {f.name for f in fields(PollingConfig)}
+        self.config = replace(config or PollingConfig(), **{k: v for k, v in kwargs.items() if k in names})
+
+        self._session = session
+        self._owns_session = session is None
+        self._pending: Dict[Any, _PendingCaptcha] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._solve_times: Dict[str, float] = {}
+        self._stats = {"submitted": 0, "solved": 0, "failed": 0, "timeouts": 0, "poll_requests": 0}
+
+    async def __aenter__(self) -> "AsyncCaptchaClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """共用的 aiohttp 會話"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.config.max_connections)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._owns_session = True
+        return self._session
+
+    @abstractmethod
+    async def _submit(self, task: Dict[str, Any]) -> Any:
+        """
+        提交驗證碼任務
+
+        Args:
+            task: 服務所需的任務參數
+
+        Returns:
+            Any: 服務返回的任務 ID，失敗時拋出 CaptchaServiceError
+        """
+
+    @abstractmethod
+    async def _poll(self, captcha_ids: List[Any]) -> Dict[Any, Tuple[str, Any]]:
+        """
+        查詢多個任務的結果
+
+        Args:
+            captcha_ids: 任務 ID 列表
+
+        Returns:
+            Dict[Any, Tuple[str, Any]]: 任務 ID 對應 (READY, 答案)、(PENDING, None) 或 (FAILED, 錯誤訊息)
+        """
+
+    async def solve(self, task: Dict[str, Any], kind: str = "image") -> Dict[str, Any]:
+        """
+        提交驗證碼並等待結果
+
+        Args:
+            task: 服務所需的任務參數
+            kind: 驗證碼類型，用於決定第一次查詢的時間
+
+        Returns:
+            Dict[str, Any]: 解決結果
+        """
+        try:
+            captcha_id = await self._submit(task)
+        except (CaptchaServiceError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._stats["failed"] += 1
+            return {"success": False, "error": str(e) or type(e).__name__}
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        entry = _PendingCaptcha(
+            captcha_id=captcha_id,
+            kind=kind,
+            future=loop.create_future(),
+            submitted_at=now,
+            deadline=now + self.config.timeout,
+            next_poll=now + self._first_poll_delay(kind),
+            interval=self.config.min_interval
+        )
+        self._pending[captcha_id] = entry
+        self._stats["submitted"] += 1
+        self._ensure_poller()
+        self._wakeup.set()
+
+        try:
+            return await asyncio.shield(entry.future)
+        except asyncio.CancelledError:
+            self._pending.pop(captcha_id, None)
+            raise
+
+    async def solve_many(self, tasks: Iterable[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """
+        並行提交多個驗證碼並等待全部結果
+
+        Args:
+            tasks: (任務參數, 驗證碼類型) 的序列
+
+        Returns:
+            List[Dict[str, Any]]: 依輸入順序的解決結果
+        """
+        return await asyncio.gather(*(self.solve(task, kind) for task, kind in tasks))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得提交、解決、失敗、逾時與查詢請求次數，以及各類型的平均解題時間"""
+        return dict(self._stats, pending=len(self._pending), solve_times=dict(self._solve_times))
+
+    async def close(self) -> None:
+        """停止輪詢並關閉自行建立的會話，未完成的任務以失敗結束"""
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        for entry in list(self._pending.values()):
+            self._finish(entry, {"success": False, "error": "Client closed"})
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def _first_poll_delay(self, kind: str) -> float:
+        """第一次查詢的等待時間：有統計時略早於平均解題時間，否則使用預設值"""
+        average = self._solve_times.get(kind)
+        if average is not None:
+            return max(self.config.min_interval, average * 0.8)
+        return self.config.initial_delays.get(kind, self.config.initial_delay)
+
+    def _ensure_poller(self) -> None:
+        """啟動輪詢任務"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.ensure_future(self._poll_loop())
+
+    def _finish(self, entry: _PendingCaptcha, result: Dict[str, Any]) -> None:
+        """完成任務並移出等待列表"""
+        self._pending.pop(entry.captcha_id, None)
+        if not entry.future.done():
+            entry.future.set_result(result)
+
+    async def _poll_loop(self) -> None:
+        """輪詢主循環：查詢所有到期的任務，再等待到下一個任務到期"""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            now = loop.time()
+            for entry in [e for e in self._pending.values() if e.deadline <= now]:
+                self._stats["timeouts"] += 1
+                self._finish(entry, {"success": False, "error": "Timeout waiting for result"})
+
+            # 即將到期的任務提前一併查詢，讓批次查詢涵蓋更多任務
+            horizon = now + self.config.min_interval / 2
+            due = [e for e in self._pending.values() if e.next_poll <= horizon]
+            for start in range(0, len(due), self.config.batch_size):
+                await self._poll_batch(due[start:start + self.config.batch_size])
+
+            if not self._pending:
+                break
+            next_wake = min(min(e.next_poll, e.deadline) for e in self._pending.values())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0.0, next_wake - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_batch(self, batch: List[_PendingCaptcha]) -> None:
+        """查詢一批任務並處理結果"""
+        loop = asyncio.get_running_loop()
+        self._stats["poll_requests"] += 1
+        try:
+            results = await self._poll([entry.captcha_id for entry in batch])
+        except (CaptchaServiceError, aiohttp.ClientError, asyncio.TimeoutError):
+            # 網路或服務暫時錯誤，整批延後再查
+            results = {}
+
+        now = loop.time()
+        for entry in batch:
+            if entry.future.done():
+                self._pending.pop(entry.captcha_id, None)
+                continue
+            status, value = results.get(entry.captcha_id, (PENDING, None))
+            entry.polls += 1
+            if status == READY:
+                self._record_solve_time(entry.kind, now - entry.submitted_at)
+                self._stats["solved"] += 1
+                self._finish(entry, {"success": True, "result": value})
+            elif status == FAILED:
+                self._stats["failed"] += 1
+                self._finish(entry, {"success": False, "error": value})
+            else:
+                entry.next_poll = now + entry.interval
+                entry.interval = min(entry.interval * self.config.backoff, self.config.max_interval)
+
+    def _record_solve_time(self, kind: str, elapsed: float) -> None:
+        """以 EWMA 記錄各類型的解題時間"""
+        alpha = self.config.solve_time_alpha
+        previous = self._solve_times.get(kind)
+        self._solve_times[kind] = elapsed if previous is None else alpha * elapsed + (1 - alpha) * previous
+
+    @staticmethod
+    async def _read_image(image_path: str) -> str:
+        """讀取圖片並以 base64 編碼"""
+        def read() -> str:
+            with open(image_path, "rb") as f:
+                return base64.b64encode(f.read()).decode()
+        return await asyncio.to_thread(read)
+
+
+class AsyncTwoCaptchaClient(AsyncCaptchaClient):
+    """2captcha 非同步客戶端，使用 res.php 的 ids 參數批次查詢結果"""
+
+    def __init__(self, api_key: str, base_url: str = "https://2captcha.com", **kwargs):
+        """
+        初始化 2captcha 客戶端
+
+        Args:
+            api_key: 2captcha API 密鑰
+            base_url: API 網址
+            **kwargs: 其他設定，參見 AsyncCaptchaClient
+        """
+        super().__init__(api_key, **kwargs)
+        self.submit_url = f"{base_url.rstrip('/')}/in.php"
+        self.result_url = f"{base_url.rstrip('/')}/res.php"
+
+    async def _submit(self, task: Dict[str, Any]) -> Any:
+        data = dict(task, key=self.api_key, json=1)
+        async with self.session.post(self.submit_url, data=data) as response:
+            response.raise_for_status()
+            payload = await response.json(content_type=None)
+        if payload.get("status") != 1:
+            raise CaptchaServiceError(payload.get("request", "Unknown error"))
+        return str(payload["request"])
+
+    async def _poll(self, captcha_ids: List[Any]) -> Dict[Any, Tuple[str, Any]]:
+        params = {"key": self.api_key, "action": "get", "ids": ",".join(captcha_ids)}
+        async with self.session.get(self.result_url, params=params) as response:
+            response.raise_for_status()
+            text = await response.text()
+
+        answers = text.split("|")
+        if len(answers) != len(captcha_ids):
+            # 帳戶層級錯誤（例如 ERROR_WRONG_USER_KEY）只返回一個錯誤碼
+            if text.startswith("ERROR"):
+                return {captcha_id: (FAILED, text) for captcha_id in captcha_ids}
+            raise CaptchaServiceError(f"Unexpected batch response: {text[:200]}")
+
+        results = {}
+        for captcha_id, answer in zip(captcha_ids, answers):
+            if answer == "CAPCHA_NOT_READY":
+                results[captcha_id] = (PENDING, None)
+            elif answer.startswith("ERROR"):
+                results[captcha_id] = (FAILED, answer)
+            else:
+                results[captcha_id] = (READY, answer)
+        return results
+
+    async def solve_recaptcha(self, site_key: str, url: str, action: Optional[str] = None) -> Dict[str, Any]:
+        """解決 reCAPTCHA"""
+        task = {"method": "userrecaptcha", "googlekey": site_key, "pageurl": url}
+        if action:
+            task["action"] = action
+        return await self.solve(task, "recaptcha")
+
+    async def solve_hcaptcha(self, site_key: str, url: str) -> Dict[str, Any]:
+        """解決 hCaptcha"""
+        return await self.solve({"method": "hcaptcha", "sitekey": site_key, "pageurl": url}, "hcaptcha")
+
+    async def solve_image_captcha(self, image_path: str) -> Dict[str, Any]:
+        """解決圖片驗證碼"""
+        return await self.solve({"method": "base64", "body": await self._read_image(image_path)}, "image")
+
+    async def solve_slider_captcha(self, image_path: str) -> Dict[str, Any]:
+        """解決滑塊驗證碼"""
+        task = {
+            "method": "base64",
+            "body": await self._read_image(image_path),
+            "textinstructions": "Slide the puzzle piece to the right position",
+        }
+        return await self.solve(task, "slider")
+
+
+class AsyncAntiCaptchaClient(AsyncCaptchaClient):
+    """Anti-Captcha 非同步客戶端
+
+    Anti-Captcha 沒有批次查詢端點，到期的任務在共用連線池上並行查詢。
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://api.anti-captcha.com", **kwargs):
+        """
+        初始化 Anti-Captcha 客戶端
+
+        Args:
+            api_key: Anti-Captcha API 密鑰
+            base_url: API 網址
+            **kwargs: 其他設定，參見 AsyncCaptchaClient
+        """
+        super().__init__(api_key, **kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    async def _request(self, method: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """發送 API 請求，服務返回錯誤時拋出 CaptchaServiceError"""
+        payload = dict(data, clientKey=self.api_key)
+        async with self.session.post(f"{self.base_url}/{method}", json=payload) as response:
+            response.raise_for_status()
+            result = await response.json(content_type=None)
+        if result.get("errorId", 0) != 0:
+            raise CaptchaServiceError(result.get("errorCode") or result.get("errorDescription") or "Unknown error")
+        return result
+
+    async def _submit(self, task: Dict[str, Any]) -> Any:
+        result = await self._request("createTask", {"task": task})
+        return result["taskId"]
+
+    async def _poll(self, captcha_ids: List[Any]) -> Dict[Any, Tuple[str, Any]]:
+        responses = await asyncio.gather(
+            *(self._request("getTaskResult", {"taskId": captcha_id}) for captcha_id in captcha_ids),
+            return_exceptions=True
+        )
+
+        results = {}
+        for captcha_id, response in zip(captcha_ids, responses):
+            if isinstance(response, CaptchaServiceError):
+                results[captcha_id] = (FAILED, str(response))
+            elif isinstance(response, BaseException):
+                # 連線錯誤的任務保持等待，下次再查
+                results[captcha_id] = (PENDING, None)
+            elif response.get("status") == "ready":
+                solution = response.get("solution") or {}
+                answer = solution.get("gRecaptchaResponse") or solution.get("text") or solution
+                results[captcha_id] = (READY, answer)
+            else:
+                results[captcha_id] = (PENDING, None)
+        return results
+
+    async def solve_recaptcha(self, site_key: str, url: str, action: Optional[str] = None) -> Dict[str, Any]:
+        """解決 reCAPTCHA"""
+        task = {"type": "RecaptchaV2TaskProxyless", "websiteURL": url, "websiteKey": site_key}
+        if action:
+            task["type"] = "RecaptchaV3TaskProxyless"
+            task["pageAction"] = action
+        return await self.solve(task, "recaptcha")
+
+    async def solve_hcaptcha(self, site_key: str, url: str) -> Dict[str, Any]:
+        """解決 hCaptcha"""
+        task = {"type": "HCaptchaTaskProxyless", "websiteURL": url, "websiteKey": site_key}
+        return await self.solve(task, "hcaptcha")
+
+    async def solve_image_captcha(self, image_path: str) -> Dict[str, Any]:
+        """解決圖片驗證碼"""
+        return await self.solve({"type": "ImageToTextTask", "body": await self._read_image(image_path)}, "image")
+
+    async def solve_slider_captcha(self, image_path: str) -> Dict[str, Any]:
+        """解決滑塊驗證碼"""
+        task = {
+            "type": "ImageToTextTask",
+            "body": await self._read_image(image_path),
+            "comment": "Slide the puzzle piece to the right position",
+        }
+        return await self.solve(task, "slider")
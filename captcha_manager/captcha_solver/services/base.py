@@ -13,8 +13,8 @@ class BaseCaptchaService(ABC):
             api_key: API 密鑰
             **kwargs: 其他配置參數
         """
-        this.api_key = api_key
-        this.config = kwargs
+        self.api_key = api_key
+        self.config = kwargs
 
     @abstractmethod
     def solve_recaptcha(
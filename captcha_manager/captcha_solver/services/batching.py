@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+class MicroBatcher:
+    """模型推論的微批次伺服器
+
+    多個爬蟲執行緒同時提交的圖片張量會在佇列中合併，湊滿 max_batch_size
+    或等待超過 max_wait_ms 後，以單次前向傳播完成整批推論。
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        device: torch.device,
+        input_shape: Sequence[int] = (3, 224, 224),
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        latency_window: int = 1000,
+        name: str = "model"
+    ):
+        """
+        初始化微批次伺服器並啟動推論執行緒
+
+        Args:
+            model: 推論模型
+            device: 推論裝置
+            input_shape: 單張圖片的張量形狀
+            max_batch_size: 每批最多圖片數
+            max_wait_ms: 第一張圖片進入佇列後最多等待的毫秒數
+            latency_window: 保留最近多少筆延遲用於計算百分位數
+            name: 名稱，用於執行緒命名
+        """
+        self.model = model
+        self.device = device
+        self.input_shape = tuple(input_shape)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        # 預先配置批次輸入張量，GPU 上使用鎖頁記憶體加速傳輸
+        pin_memory = device.type == "cuda"
+        self._host_buffer = torch.empty(
+            (self.max_batch_size, *self.input_shape), dtype=torch.float32, pin_memory=pin_memory
+        )
+        self._device_buffer = (
+            torch.empty_like(self._host_buffer, device=device) if pin_memory else self._host_buffer
+        )
+
+        self._queue: "queue.Queue[Optional[Tuple[torch.Tensor, Future, float]]]" = queue.Queue()
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, name=f"{name}-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, tensor: torch.Tensor) -> Future:
+        """
+        提交單張圖片張量
+
+        Args:
+            tensor: 形狀為 input_shape 的張量
+
+        Returns:
+            Future: 結果為該圖片的模型輸出
+        """
+        if self._closed:
+            raise RuntimeError("推論伺服器已關閉")
+        if tuple(tensor.shape) != self.input_shape:
+            raise ValueError(f"張量形狀 {tuple(tensor.shape)} 與 {self.input_shape} 不符")
+        future: Future = Future()
+        self._queue.put((tensor, future, time.perf_counter()))
+        return future
+
+    def infer(self, tensor: torch.Tensor, timeout: Optional[float] = None) -> torch.Tensor:
+        """提交單張圖片張量並等待模型輸出"""
+        return self.submit(tensor).result(timeout)
+
+    def _collect(self, first: Tuple[torch.Tensor, Future, float]) -> list:
+        """從第一個請求開始收集一批請求，直到批次已滿或等待逾時"""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _serve(self) -> None:
+        """推論執行緒主循環"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = self._collect(item)
+            size = len(batch)
+
+            try:
+                for index, (tensor, _, _) in enumerate(batch):
+                    self._host_buffer[index].copy_(tensor)
+                inputs = self._device_buffer[:size]
+                if self._device_buffer is not self._host_buffer:
+                    inputs.copy_(self._host_buffer[:size], non_blocking=True)
+
+                with torch.inference_mode():
+                    outputs = self.model(inputs).cpu()
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            with self._stats_lock:
+                self._requests += size
+                self._batches += 1
+                self._latencies.extend(finished - submitted for _, _, submitted in batch)
+            for index, (_, future, _) in enumerate(batch):
+                future.set_result(outputs[index])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        取得推論統計
+
+        Returns:
+            Dict[str, Any]: 請求數、批次數、平均批次大小與延遲百分位數（毫秒）
+        """
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000.0
+            requests, batches = self._requests, self._batches
+
+        stats = {
+            "requests": requests,
+            "batches": batches,
+            "avg_batch_size": requests / batches if batches else 0.0,
+        }
+        for percentile in (50, 95, 99):
+            stats[f"p{percentile}_ms"] = (
+                float(np.percentile(latencies, percentile)) if latencies.size else 0.0
+            )
+        return stats
+
+    def close(self) -> None:
+        """停止推論執行緒，已提交的請求會先處理完畢"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
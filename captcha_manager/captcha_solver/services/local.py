@@ -1,6 +1,6 @@
 import base64
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 import cv2
 import numpy as np
@@ -10,6 +10,10 @@ import torch.nn as nn
 import torchvision.transforms as transforms
 
 from .base import BaseCaptchaService
+from .batching import MicroBatcher
+
+# 模型輸入尺寸
+INPUT_SHAPE = (3, 224, 224)
 
 
 class LocalCaptchaService(BaseCaptchaService):
@@ -24,20 +28,54 @@ class LocalCaptchaService(BaseCaptchaService):
             **kwargs: 其他配置參數
         """
         super().__init__(api_key, **kwargs)
-        this.models_dir = Path(kwargs.get("models_dir", "models"))
-        this.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        this._load_models()
+        self.models_dir = Path(kwargs.get("models_dir", "models"))
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # GPU 上等待湊批可攤提每次前向傳播的開銷；CPU 上等待只會拉長尾延遲，
+        # 因此預設不等待，只合併推論執行緒忙碌時已排隊的請求
+        on_gpu = self.device.type == "cuda"
+        self.batch_size = kwargs.get("batch_size", 16 if on_gpu else 8)
+        self.batch_timeout_ms = kwargs.get("batch_timeout_ms", 5.0 if on_gpu else 0.0)
+        self.enable_batching = kwargs.get("enable_batching", True)
+        self.warmup = kwargs.get("warmup", True)
+
+        # 預處理流程只建立一次
+        self._transform = transforms.Compose([
+            transforms.Resize(INPUT_SHAPE[1:]),
+            transforms.ToTensor(),
+            transforms.Normalize(mean=[0.485, 0.456, 0.406],
+                              std=[0.229, 0.224, 0.225])
+        ])
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self._load_models()
         
     def _load_models(self) -> None:
-        """載入機器學習模型"""
+        """載入機器學習模型，並為圖片模型啟動微批次推論"""
         # 載入 reCAPTCHA 分類模型
-        this.recaptcha_model = self._load_model("recaptcha_classifier")
+        self.recaptcha_model = self._load_model("recaptcha_classifier")
         
         # 載入圖片驗證碼識別模型
-        this.image_model = self._load_model("image_recognizer")
+        self.image_model = self._load_model("image_recognizer")
         
         # 載入滑塊驗證碼模型
-        this.slider_model = self._load_model("slider_detector")
+        self.slider_model = self._load_model("slider_detector")
+
+        for name in ("image_model", "slider_model"):
+            model = getattr(self, name)
+            if model is None:
+                continue
+            if self.warmup:
+                # 預熱一次前向傳播，避免第一個請求承擔初始化延遲
+                with torch.inference_mode():
+                    model(torch.zeros((1, *INPUT_SHAPE), device=self.device))
+            if self.enable_batching:
+                self._batchers[name] = MicroBatcher(
+                    model,
+                    self.device,
+                    input_shape=INPUT_SHAPE,
+                    max_batch_size=self.batch_size,
+                    max_wait_ms=self.batch_timeout_ms,
+                    name=name
+                )
         
     def _load_model(self, model_name: str) -> nn.Module:
         """
@@ -49,30 +87,61 @@ class LocalCaptchaService(BaseCaptchaService):
         Returns:
             nn.Module: 載入的模型
         """
-        model_path = this.models_dir / f"{model_name}.pth"
+        model_path = self.models_dir / f"{model_name}.pth"
         if not model_path.exists():
             return None
-        return torch.load(model_path, map_location=this.device)
+        # 模型檔為完整的 nn.Module，需關閉 weights_only
+        model = torch.load(model_path, map_location=self.device, weights_only=False)
+        model.eval()
+        return model
     
-    def _preprocess_image(self, image_path: str) -> torch.Tensor:
+    def _preprocess_image(self, image: Union[str, np.ndarray]) -> torch.Tensor:
         """
         預處理圖片
 
         Args:
-            image_path: 圖片路徑
+            image: 圖片路徑或 OpenCV (BGR) 圖片數組
 
         Returns:
-            torch.Tensor: 預處理後的圖片張量
+            torch.Tensor: 預處理後的單張圖片張量，形狀為 (3, 224, 224)
         """
-        transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                              std=[0.229, 0.224, 0.225])
-        ])
-        
-        image = Image.open(image_path).convert('RGB')
-        return transform(image).unsqueeze(0).to(this.device)
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        else:
+            image = Image.open(image).convert('RGB')
+        return self._transform(image)
+
+    def _infer(self, name: str, tensor: torch.Tensor) -> torch.Tensor:
+        """
+        執行單張圖片推論，啟用批次時經由微批次伺服器與其他請求合併
+
+        Args:
+            name: 模型屬性名稱
+            tensor: 預處理後的單張圖片張量
+
+        Returns:
+            torch.Tensor: 該圖片的模型輸出
+        """
+        batcher = self._batchers.get(name)
+        if batcher is not None:
+            return batcher.infer(tensor)
+        with torch.inference_mode():
+            return getattr(self, name)(tensor.unsqueeze(0).to(self.device))[0]
+
+    def get_inference_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        取得各模型的批次推論統計
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 請求數、批次數、平均批次大小與延遲百分位數（毫秒）
+        """
+        return {name: batcher.get_stats() for name, batcher in self._batchers.items()}
+
+    def close(self) -> None:
+        """停止微批次推論執行緒"""
+        for batcher in self._batchers.values():
+            batcher.close()
+        self._batchers.clear()
     
     def _detect_slider_position(self, image: np.ndarray) -> int:
         """
@@ -84,9 +153,9 @@ class LocalCaptchaService(BaseCaptchaService):
         Returns:
             int: 滑塊位置
         """
-        if this.slider_model is None:
+        if self.slider_model is None:
             # 使用傳統圖像處理方法
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             edges = cv2.Canny(gray, 100, 200)
             contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
@@ -98,9 +167,7 @@ class LocalCaptchaService(BaseCaptchaService):
             return 0
         
         # 使用機器學習模型
-        tensor = self._preprocess_image(image)
-        with torch.no_grad():
-            position = this.slider_model(tensor)
+        position = self._infer("slider_model", self._preprocess_image(image))
         return int(position.item())
     
     def solve_recaptcha(
@@ -122,7 +189,7 @@ class LocalCaptchaService(BaseCaptchaService):
         Returns:
             Dict[str, Any]: 解決結果
         """
-        if this.recaptcha_model is None:
+        if self.recaptcha_model is None:
             return {"success": False, "error": "reCAPTCHA 模型未載入"}
         
         # 使用機器學習模型分析頁面
@@ -133,7 +200,7 @@ class LocalCaptchaService(BaseCaptchaService):
         }
         
         with torch.no_grad():
-            result = this.recaptcha_model(torch.tensor(list(page_data.values())))
+            result = self.recaptcha_model(torch.tensor(list(page_data.values())))
         
         return {
             "success": True,
@@ -175,15 +242,14 @@ class LocalCaptchaService(BaseCaptchaService):
         Returns:
             Dict[str, Any]: 解決結果
         """
-        if this.image_model is None:
+        if self.image_model is None:
             return {"success": False, "error": "圖片驗證碼模型未載入"}
         
         # 預處理圖片
         image_tensor = self._preprocess_image(image_path)
         
         # 使用模型識別
-        with torch.no_grad():
-            result = this.image_model(image_tensor)
+        result = self._infer("image_model", image_tensor)
         
         return {
             "success": True,
@@ -205,8 +271,9 @@ class LocalCaptchaService(BaseCaptchaService):
         Returns:
             Dict[str, Any]: 解決結果
         """
-        # 讀取圖片
-        image = cv2.imread(image_path)
+        # 讀取圖片，只用傳統方法時直接以灰階解碼
+        flags = cv2.IMREAD_GRAYSCALE if self.slider_model is None else cv2.IMREAD_COLOR
+        image = cv2.imread(image_path, flags)
         if image is None:
             return {"success": False, "error": "無法讀取圖片"}
         
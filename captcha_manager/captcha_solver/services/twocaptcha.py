@@ -19,10 +19,23 @@ class TwoCaptchaService(BaseCaptchaService):
             **kwargs: 其他配置參數
         """
         super().__init__(api_key, **kwargs)
-        this.base_url = "https://2captcha.com/in.php"
-        this.result_url = "https://2captcha.com/res.php"
-        this.max_retries = kwargs.get("max_retries", 30)
-        this.retry_delay = kwargs.get("retry_delay", 5)
+        self.base_url = "https://2captcha.com/in.php"
+        self.result_url = "https://2captcha.com/res.php"
+        self.max_retries = kwargs.get("max_retries", 30)
+        self.retry_delay = kwargs.get("retry_delay", 5)
+
+    def create_async_client(self, **kwargs) -> "AsyncTwoCaptchaClient":
+        """
+        建立共用此 API 密鑰的非同步客戶端，多個驗證碼可集中輪詢而不佔用執行緒
+
+        Args:
+            **kwargs: 非同步客戶端設定，參見 AsyncCaptchaClient
+
+        Returns:
+            AsyncTwoCaptchaClient: 非同步客戶端
+        """
+        from .async_client import AsyncTwoCaptchaClient
+        return AsyncTwoCaptchaClient(self.api_key, **kwargs)
 
     def _send_request(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -34,7 +47,7 @@ class TwoCaptchaService(BaseCaptchaService):
         Returns:
             Dict[str, Any]: 響應數據
         """
-        response = requests.post(this.base_url, data=data)
+        response = requests.post(self.base_url, data=data)
         response.raise_for_status()
         
         if response.text.startswith("OK|"):
@@ -53,13 +66,13 @@ class TwoCaptchaService(BaseCaptchaService):
             Dict[str, Any]: 解決結果
         """
         data = {
-            "key": this.api_key,
+            "key": self.api_key,
             "action": "get",
             "id": captcha_id,
         }
         
-        for _ in range(this.max_retries):
-            response = requests.get(this.result_url, params=data)
+        for _ in range(self.max_retries):
+            response = requests.get(self.result_url, params=data)
             response.raise_for_status()
             
             if response.text.startswith("OK|"):
@@ -68,7 +81,7 @@ class TwoCaptchaService(BaseCaptchaService):
             if response.text != "CAPCHA_NOT_READY":
                 return {"success": False, "error": response.text}
             
-            time.sleep(this.retry_delay)
+            time.sleep(self.retry_delay)
         
         return {"success": False, "error": "Timeout waiting for result"}
 
@@ -92,7 +105,7 @@ class TwoCaptchaService(BaseCaptchaService):
             Dict[str, Any]: 解決結果
         """
         data = {
-            "key": this.api_key,
+            "key": self.api_key,
             "method": "userrecaptcha",
             "googlekey": site_key,
             "pageurl": url,
@@ -102,11 +115,11 @@ class TwoCaptchaService(BaseCaptchaService):
         if action:
             data["action"] = action
         
-        response = this._send_request(data)
+        response = self._send_request(data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["id"])
+        return self._get_result(response["id"])
 
     def solve_hcaptcha(
         self,
@@ -126,18 +139,18 @@ class TwoCaptchaService(BaseCaptchaService):
             Dict[str, Any]: 解決結果
         """
         data = {
-            "key": this.api_key,
+            "key": self.api_key,
             "method": "hcaptcha",
             "sitekey": site_key,
             "pageurl": url,
             "json": 1,
         }
         
-        response = this._send_request(data)
+        response = self._send_request(data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["id"])
+        return self._get_result(response["id"])
 
     def solve_image_captcha(
         self,
@@ -158,17 +171,17 @@ class TwoCaptchaService(BaseCaptchaService):
             image_data = base64.b64encode(f.read()).decode()
         
         data = {
-            "key": this.api_key,
+            "key": self.api_key,
             "method": "base64",
             "body": image_data,
             "json": 1,
         }
         
-        response = this._send_request(data)
+        response = self._send_request(data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["id"])
+        return self._get_result(response["id"])
 
     def solve_slider_captcha(
         self,
@@ -189,15 +202,15 @@ class TwoCaptchaService(BaseCaptchaService):
             image_data = base64.b64encode(f.read()).decode()
         
         data = {
-            "key": this.api_key,
+            "key": self.api_key,
             "method": "base64",
             "body": image_data,
             "json": 1,
             "textinstructions": "Slide the puzzle piece to the right position",
         }
         
-        response = this._send_request(data)
+        response = self._send_request(data)
         if not response["success"]:
             return response
         
-        return this._get_result(response["id"]) 
\ No newline at end of file
+        return self._get_result(response["id"]) 
\ No newline at end of file
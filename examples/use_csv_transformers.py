@@ -37,6 +37,8 @@ async def main():
     parser.add_argument('--output-dir', default=str(JSON_DIR), help='輸出 JSON 檔案目錄')
     parser.add_argument('--limit', type=int, help='限制處理檔案數量')
     parser.add_argument('--pattern', help='檔案名稱匹配模式')
+    parser.add_argument('--workers', type=int, default=0, help='平行轉換的行程數 (0 表示使用所有核心)')
+    parser.add_argument('--force', action='store_true', help='忽略增量清單，重新轉換所有檔案')
     
     args = parser.parse_args()
     
@@ -48,7 +50,9 @@ async def main():
         'input_dir': args.input_dir,
         'output_dir': args.output_dir,
         'limit': args.limit,
-        'pattern': args.pattern
+        'pattern': args.pattern,
+        'workers': args.workers,
+        'incremental': not args.force
     }
     
     # 選擇並初始化轉換器
@@ -66,7 +70,7 @@ async def main():
     results = await transformer.transform()
     
     # 輸出結果
-    logger.info(f"轉換完成: 成功 {results['successful']}/{results['total']} 個檔案")
+    logger.info(f"轉換完成: 成功 {results['successful']}/{results['total']} 個檔案，跳過 {results.get('skipped', 0)} 個")
     
 if __name__ == "__main__":
     asyncio.run(main())
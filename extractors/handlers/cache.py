@@ -11,16 +11,22 @@
 4. 緩存管理
 """
 
-from typing import Dict, List, Optional, Union, Any, Set, Callable, Type
+from typing import Dict, List, Optional, Union, Any, Set, Callable, Type, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
 import hashlib
 import json
+import logging
 import time
 import os
+import sys
+import queue
+import sqlite3
 from datetime import datetime, timedelta
 import pickle
 import threading
 from functools import wraps
+from selenium.webdriver.common.by import By
 
 from ..core.base import BaseExtractor
 from ..core.error import handle_extractor_error, ExtractorError
@@ -35,6 +41,15 @@ class CacheConfig:
     max_age: int = 3600  # 秒
     cleanup_interval: int = 300  # 秒
     
+    # 分層設置
+    max_memory_bytes: int = 64 * 1024 * 1024  # 內存層容量（位元組）
+    disk_cache: bool = True
+    disk_filename: str = "cache.sqlite3"
+    write_behind: bool = True  # 磁盤層異步寫入
+    write_queue_size: int = 1000
+    write_batch_size: int = 100
+    write_retry_interval: float = 1.0  # 寫入失敗後重試的間隔（秒）
+    
     # 緩存策略
     cache_results: bool = True
     cache_selectors: bool = True
@@ -57,6 +72,403 @@ class CacheConfig:
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
+class LRUMemoryCache:
+    """內存緩存層
+    
+    以 OrderedDict 維護 LRU 順序，讀寫與淘汰均為 O(1)，
+    同時按條目數與位元組數限制容量，並在讀取時檢查過期。
+    """
+    
+    def __init__(self, max_items: int, max_bytes: int, max_age: float):
+        """初始化內存緩存層
+        
+        Args:
+            max_items: 最大條目數
+            max_bytes: 最大位元組數
+            max_age: 過期時間（秒）
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.total_bytes = 0
+        self._items: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        
+    def __len__(self) -> int:
+        return len(self._items)
+        
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+        
+    def get(self, key: str, now: Optional[float] = None) -> Tuple[bool, Any]:
+        """讀取緩存
+        
+        Args:
+            key: 緩存鍵
+            now: 當前時間
+            
+        Returns:
+            Tuple[bool, Any]: (是否命中, 緩存數據)；過期條目會被移除
+        """
+        entry = self._items.get(key)
+        if entry is None:
+            return False, None
+            
+        timestamp, _, data = entry
+        if (now or time.time()) - timestamp > self.max_age:
+            self.pop(key)
+            return False, None
+            
+        self._items.move_to_end(key)
+        return True, data
+        
+    def set(self, key: str, data: Any, size: int, timestamp: Optional[float] = None) -> List[str]:
+        """寫入緩存
+        
+        Args:
+            key: 緩存鍵
+            data: 緩存數據
+            size: 數據大小（位元組）
+            timestamp: 寫入時間
+            
+        Returns:
+            List[str]: 因容量限制被淘汰的鍵
+        """
+        self.pop(key)
+        self._items[key] = (timestamp or time.time(), size, data)
+        self.total_bytes += size
+        
+        evicted = []
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_items or self.total_bytes > self.max_bytes
+        ):
+            old_key, (_, old_size, _) = self._items.popitem(last=False)
+            self.total_bytes -= old_size
+            evicted.append(old_key)
+        return evicted
+        
+    def pop(self, key: str) -> bool:
+        """移除緩存
+        
+        Args:
+            key: 緩存鍵
+            
+        Returns:
+            bool: 是否存在並已移除
+        """
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry[1]
+        return True
+        
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """清除過期條目
+        
+        LRU 順序中越靠前越久未被訪問，但訪問不會刷新寫入時間，
+        因此需要完整掃描；僅在定期清理時調用。
+        
+        Args:
+            now: 當前時間
+            
+        Returns:
+            int: 清除數量
+        """
+        now = now or time.time()
+        expired = [
+            key for key, (timestamp, _, _) in self._items.items()
+            if now - timestamp > self.max_age
+        ]
+        for key in expired:
+            self.pop(key)
+        return len(expired)
+        
+    def clear(self) -> None:
+        """清除所有條目"""
+        self._items.clear()
+        self.total_bytes = 0
+        
+    def timestamps(self) -> List[float]:
+        """獲取所有條目的寫入時間"""
+        return [timestamp for timestamp, _, _ in self._items.values()]
+
+class SQLiteDiskCache:
+    """磁盤緩存層
+    
+    所有條目存放在單個 SQLite 文件中，以主鍵索引查詢；
+    寫入可交由背景線程批量提交（write-behind），不阻塞調用方。
+    """
+    
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "key TEXT PRIMARY KEY, timestamp REAL NOT NULL, "
+        "size INTEGER NOT NULL, data BLOB NOT NULL)"
+    )
+    
+    def __init__(
+        self,
+        path: str,
+        max_age: float,
+        write_behind: bool = True,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        retry_interval: float = 1.0,
+        logger: Optional[logging.Logger] = None
+    ):
+        """初始化磁盤緩存層
+        
+        Args:
+            path: 數據庫文件路徑
+            max_age: 過期時間（秒）
+            write_behind: 是否異步寫入
+            queue_size: 寫入隊列大小
+            batch_size: 每批提交的最大條目數
+            retry_interval: 異步寫入失敗後重試的間隔（秒）
+            logger: 日誌記錄器
+        """
+        self.path = path
+        self.max_age = max_age
+        self.write_behind = write_behind
+        self.batch_size = max(1, batch_size)
+        self.retry_interval = retry_interval
+        self._logger = logger or logging.getLogger(__name__)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self._SCHEMA)
+        self._db_lock = threading.Lock()
+        
+        # 尚未落盤的寫入，供讀取時直接命中
+        self._pending: Dict[str, Optional[Tuple[float, int, bytes]]] = {}
+        self._pending_lock = threading.Lock()
+        # 提交失敗、等待重試的寫入（仍保留在 _pending 中供讀取）
+        self._failed: Dict[str, Optional[Tuple[float, int, bytes]]] = {}
+        self._write_errors = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, Optional[Tuple[float, int, bytes]]]]]" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        if write_behind:
+            self._worker = threading.Thread(target=self._write_loop, daemon=True)
+            self._worker.start()
+            
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Tuple[float, bytes]]:
+        """讀取緩存
+        
+        Args:
+            key: 緩存鍵
+            now: 當前時間
+            
+        Returns:
+            Optional[Tuple[float, bytes]]: (寫入時間, 序列化數據)，未命中或已過期時為 None
+        """
+        now = now or time.time()
+        with self._pending_lock:
+            if key in self._pending:
+                entry = self._pending[key]
+                if entry is None or now - entry[0] > self.max_age:
+                    return None
+                return entry[0], entry[2]
+                
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT timestamp, data FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if now - row[0] > self.max_age:
+            self.delete(key)
+            return None
+        return row[0], row[1]
+        
+    def set(self, key: str, payload: bytes, timestamp: Optional[float] = None) -> None:
+        """寫入緩存
+        
+        Args:
+            key: 緩存鍵
+            payload: 序列化數據
+            timestamp: 寫入時間
+        """
+        self._submit(key, (timestamp or time.time(), len(payload), payload))
+        
+    def delete(self, key: str) -> None:
+        """刪除緩存
+        
+        Args:
+            key: 緩存鍵
+        """
+        self._submit(key, None)
+        
+    def _submit(self, key: str, entry: Optional[Tuple[float, int, bytes]]) -> None:
+        """提交寫入操作，entry 為 None 表示刪除"""
+        if not self.write_behind:
+            self._apply([(key, entry)])
+            return
+            
+        with self._pending_lock:
+            self._pending[key] = entry
+        # 隊列已滿時阻塞，以背壓限制未落盤數據量
+        self._queue.put((key, entry))
+        
+    def _write_loop(self) -> None:
+        """背景寫入線程"""
+        while True:
+            try:
+                # 有待重試的寫入時定期喚醒，即使沒有新的寫入也會重試
+                item = self._queue.get(timeout=self.retry_interval if self._failed else None)
+            except queue.Empty:
+                self._commit([])
+                continue
+            if item is None:
+                self._queue.task_done()
+                break
+                
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                
+            try:
+                self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                    
+        if self._failed and not self._commit([]):
+            self._logger.error(f"關閉磁盤緩存時仍有 {len(self._failed)} 個條目寫入失敗，已放棄")
+            
+    def _commit(self, batch: List[Tuple[str, Optional[Tuple[float, int, bytes]]]]) -> bool:
+        """提交一批寫入，連同先前失敗的寫入一起重試
+        
+        失敗時記錄錯誤並保留條目，讀取仍從 _pending 命中，之後再重試。
+        
+        Args:
+            batch: 新的寫入
+            
+        Returns:
+            bool: 是否提交成功
+        """
+        with self._pending_lock:
+            # 已被更新的寫入取代的舊條目不再重試
+            retry = [
+                (key, entry) for key, entry in self._failed.items()
+                if self._pending.get(key, False) is entry
+            ]
+            self._failed.clear()
+        items = retry + batch
+        if not items:
+            return True
+            
+        try:
+            self._apply(items)
+        except sqlite3.Error as e:
+            with self._pending_lock:
+                self._write_errors += 1
+                for key, entry in items:
+                    if self._pending.get(key, False) is entry:
+                        self._failed[key] = entry
+                failed = len(self._failed)
+            self._logger.warning(
+                f"磁盤緩存寫入失敗，{failed} 個條目將於 {self.retry_interval} 秒後重試: {str(e)}"
+            )
+            return False
+            
+        with self._pending_lock:
+            for key, entry in items:
+                if self._pending.get(key, False) is entry:
+                    del self._pending[key]
+        return True
+                    
+    def _apply(self, batch: List[Tuple[str, Optional[Tuple[float, int, bytes]]]]) -> None:
+        """在單個事務中提交一批寫入"""
+        upserts = {}
+        deletes = set()
+        for key, entry in batch:
+            if entry is None:
+                upserts.pop(key, None)
+                deletes.add(key)
+            else:
+                deletes.discard(key)
+                upserts[key] = entry
+                
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                if deletes:
+                    self._conn.executemany(
+                        "DELETE FROM cache WHERE key = ?", [(key,) for key in deletes]
+                    )
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO cache (key, timestamp, size, data) VALUES (?, ?, ?, ?)",
+                        [(key, ts, size, data) for key, (ts, size, data) in upserts.items()]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+                
+    def flush(self) -> None:
+        """等待所有異步寫入處理完畢，提交失敗的條目仍待背景線程重試"""
+        if self.write_behind:
+            self._queue.join()
+            
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """清除過期條目
+        
+        Args:
+            now: 當前時間
+            
+        Returns:
+            int: 清除數量
+        """
+        self.flush()
+        cutoff = (now or time.time()) - self.max_age
+        with self._db_lock:
+            cursor = self._conn.execute("DELETE FROM cache WHERE timestamp < ?", (cutoff,))
+        return cursor.rowcount
+        
+    def clear(self) -> None:
+        """清除所有條目"""
+        self.flush()
+        with self._db_lock:
+            self._conn.execute("DELETE FROM cache")
+            
+    def stats(self) -> Tuple[int, int]:
+        """獲取條目數與總大小
+        
+        Returns:
+            Tuple[int, int]: (條目數, 總位元組數)
+        """
+        self.flush()
+        with self._db_lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        return count, total
+        
+    def write_stats(self) -> Dict[str, int]:
+        """獲取異步寫入狀態
+        
+        Returns:
+            Dict[str, int]: 寫入失敗次數與等待重試的條目數
+        """
+        with self._pending_lock:
+            return {"write_errors": self._write_errors, "failed_writes": len(self._failed)}
+            
+    def close(self) -> None:
+        """停止背景線程並關閉連接"""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        with self._db_lock:
+            self._conn.close()
+
 class CacheExtractor(BaseExtractor):
     """緩存提取器類別"""
     
@@ -68,10 +480,61 @@ class CacheExtractor(BaseExtractor):
             config: 緩存配置
         """
         super().__init__(driver)
+        self.driver = driver
         self.config = config or CacheConfig()
-        self._cache: Dict[str, Any] = {}
+        self._cache = LRUMemoryCache(
+            max_items=self.config.max_size,
+            max_bytes=self.config.max_memory_bytes,
+            max_age=self.config.max_age
+        )
+        self._disk: Optional[SQLiteDiskCache] = None
+        if self.config.disk_cache:
+            self._disk = SQLiteDiskCache(
+                os.path.join(self.config.cache_dir, self.config.disk_filename),
+                max_age=self.config.max_age,
+                write_behind=self.config.write_behind,
+                queue_size=self.config.write_queue_size,
+                batch_size=self.config.write_batch_size,
+                retry_interval=self.config.write_retry_interval,
+                logger=self.logger
+            )
         self._cache_lock = threading.Lock()
         self._last_cleanup = time.time()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+        
+    def _validate_config(self) -> bool:
+        """驗證配置
+        
+        Returns:
+            bool: 是否有效
+        """
+        return (
+            self.config.max_size > 0
+            and self.config.max_memory_bytes > 0
+            and self.config.max_age > 0
+        )
+        
+    def _setup(self) -> None:
+        """設置提取器環境"""
+        if not self.validate_config():
+            raise ExtractorError("緩存配置驗證失敗")
+            
+    def _cleanup(self) -> None:
+        """清理提取器環境，等待磁盤寫入完成"""
+        if self._disk is not None:
+            self._disk.flush()
+            
+    def _extract(self, *args: Any, **kwargs: Any) -> Any:
+        """緩存提取器不直接提取數據"""
+        raise ExtractorError("緩存提取器不支持直接提取，請使用緩存裝飾器")
         
     def _generate_cache_key(self, *args, **kwargs) -> str:
         """生成緩存鍵
@@ -109,21 +572,12 @@ class CacheExtractor(BaseExtractor):
         key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
         return key
         
-    def _get_cache_path(self, key: str) -> str:
-        """獲取緩存文件路徑
-        
-        Args:
-            key: 緩存鍵
-            
-        Returns:
-            str: 緩存文件路徑
-        """
-        return os.path.join(self.config.cache_dir, f"{key}.cache")
-        
     @handle_extractor_error()
     def get_cache(self, key: str) -> Optional[Any]:
         """獲取緩存
         
+        先查內存層，未命中時查磁盤層並回填內存層。
+        
         Args:
             key: 緩存鍵
             
@@ -133,36 +587,40 @@ class CacheExtractor(BaseExtractor):
         if not self.config.enabled:
             return None
             
+        now = time.time()
         with self._cache_lock:
-            # 檢查內存緩存
-            if key in self._cache:
-                cache_data = self._cache[key]
-                if time.time() - cache_data["timestamp"] <= self.config.max_age:
-                    return cache_data["data"]
-                else:
-                    del self._cache[key]
-                    
-            # 檢查文件緩存
-            cache_path = self._get_cache_path(key)
-            if os.path.exists(cache_path):
-                try:
-                    with open(cache_path, "rb") as f:
-                        cache_data = pickle.load(f)
-                    if time.time() - cache_data["timestamp"] <= self.config.max_age:
-                        self._cache[key] = cache_data
-                        return cache_data["data"]
-                    else:
-                        os.remove(cache_path)
-                except Exception:
-                    if os.path.exists(cache_path):
-                        os.remove(cache_path)
-                        
-        return None
+            hit, data = self._cache.get(key, now)
+            if hit:
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return data
+                
+        # 磁盤查詢與反序列化不持有內存層鎖
+        entry = self._disk.get(key, now) if self._disk is not None else None
+        if entry is not None:
+            try:
+                data = pickle.loads(entry[1])
+            except Exception:
+                self._disk.delete(key)
+                entry = None
+                
+        with self._cache_lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            self._stats["evictions"] += len(
+                self._cache.set(key, data, len(entry[1]), entry[0])
+            )
+        return data
         
     @handle_extractor_error()
     def set_cache(self, key: str, data: Any) -> None:
         """設置緩存
         
+        序列化與磁盤寫入在鎖外進行；啟用 write_behind 時磁盤寫入由背景線程批量提交。
+        
         Args:
             key: 緩存鍵
             data: 緩存數據
@@ -170,85 +628,76 @@ class CacheExtractor(BaseExtractor):
         if not self.config.enabled:
             return
             
+        timestamp = time.time()
+        try:
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            size = len(payload)
+        except Exception:
+            # 無法序列化的數據（如 WebElement）只保留在內存層
+            payload = None
+            size = sys.getsizeof(data)
+            
+        if timestamp - self._last_cleanup >= self.config.cleanup_interval:
+            self._cleanup_cache()
+            
         with self._cache_lock:
-            # 檢查緩存大小
-            if len(self._cache) >= self.config.max_size:
-                self._cleanup_cache()
+            self._stats["writes"] += 1
+            self._stats["evictions"] += len(self._cache.set(key, data, size, timestamp))
+            
+        if self._disk is not None:
+            if payload is not None:
+                self._disk.set(key, payload, timestamp)
+            else:
+                self._disk.delete(key)
                 
-            # 設置內存緩存
-            cache_data = {
-                "timestamp": time.time(),
-                "data": data
-            }
-            self._cache[key] = cache_data
+    def _invalidate(self, key: str) -> None:
+        """使指定緩存失效
+        
+        Args:
+            key: 緩存鍵
+        """
+        with self._cache_lock:
+            self._cache.pop(key)
+        if self._disk is not None:
+            self._disk.delete(key)
             
-            # 設置文件緩存
-            cache_path = self._get_cache_path(key)
-            try:
-                with open(cache_path, "wb") as f:
-                    pickle.dump(cache_data, f)
-            except Exception:
-                if os.path.exists(cache_path):
-                    os.remove(cache_path)
-                    
     @handle_extractor_error()
     def _cleanup_cache(self) -> None:
-        """清理緩存"""
-        current_time = time.time()
+        """清理過期緩存
         
-        # 定期清理
-        if current_time - self._last_cleanup >= self.config.cleanup_interval:
+        容量淘汰已由內存層在寫入時以 LRU 順序完成，此處僅定期清除過期條目。
+        """
+        current_time = time.time()
+        with self._cache_lock:
             self._last_cleanup = current_time
+            self._stats["expirations"] += self._cache.purge_expired(current_time)
             
-            # 清理內存緩存
-            expired_keys = [
-                key for key, data in self._cache.items()
-                if current_time - data["timestamp"] > self.config.max_age
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-                
-            # 清理文件緩存
-            for filename in os.listdir(self.config.cache_dir):
-                if filename.endswith(".cache"):
-                    file_path = os.path.join(self.config.cache_dir, filename)
-                    try:
-                        if current_time - os.path.getmtime(file_path) > self.config.max_age:
-                            os.remove(file_path)
-                    except Exception:
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                            
-        # 強制清理
-        if len(self._cache) >= self.config.max_size:
-            # 按時間排序
-            sorted_items = sorted(
-                self._cache.items(),
-                key=lambda x: x[1]["timestamp"]
-            )
+        if self._disk is not None:
+            expired = self._disk.purge_expired(current_time)
+            with self._cache_lock:
+                self._stats["expirations"] += expired
+            
+    @handle_extractor_error()
+    def flush(self) -> None:
+        """等待所有磁盤寫入完成"""
+        if self._disk is not None:
+            self._disk.flush()
+            
+    @handle_extractor_error()
+    def close(self) -> None:
+        """關閉磁盤緩存層"""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
             
-            # 刪除最舊的項目
-            items_to_remove = len(self._cache) - self.config.max_size + 1
-            for key, _ in sorted_items[:items_to_remove]:
-                del self._cache[key]
-                
     @handle_extractor_error()
     def clear_cache(self) -> None:
         """清除所有緩存"""
         with self._cache_lock:
-            # 清除內存緩存
             self._cache.clear()
+        if self._disk is not None:
+            self._disk.clear()
             
-            # 清除文件緩存
-            for filename in os.listdir(self.config.cache_dir):
-                if filename.endswith(".cache"):
-                    file_path = os.path.join(self.config.cache_dir, filename)
-                    try:
-                        os.remove(file_path)
-                    except Exception:
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                            
     @handle_extractor_error()
     def get_cache_stats(self) -> Dict[str, Any]:
         """獲取緩存統計信息
@@ -256,29 +705,31 @@ class CacheExtractor(BaseExtractor):
         Returns:
             Dict[str, Any]: 緩存統計信息
         """
-        stats = {
-            "memory_cache_size": len(self._cache),
-            "file_cache_size": len([
-                f for f in os.listdir(self.config.cache_dir)
-                if f.endswith(".cache")
-            ]),
-            "total_size": 0,
-            "oldest_item": None,
-            "newest_item": None
-        }
+        disk_count, disk_bytes = self._disk.stats() if self._disk is not None else (0, 0)
+        disk_writes = (
+            self._disk.write_stats() if self._disk is not None
+            else {"write_errors": 0, "failed_writes": 0}
+        )
+        
+        with self._cache_lock:
+            stats = {
+                "memory_cache_size": len(self._cache),
+                "memory_bytes": self._cache.total_bytes,
+                "file_cache_size": disk_count,
+                "total_size": disk_bytes,
+                "oldest_item": None,
+                "newest_item": None,
+                "disk_write_errors": disk_writes["write_errors"],
+                "disk_failed_writes": disk_writes["failed_writes"],
+                **self._stats
+            }
+            timestamps = self._cache.timestamps()
+            
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
         
-        # 計算文件大小
-        for filename in os.listdir(self.config.cache_dir):
-            if filename.endswith(".cache"):
-                file_path = os.path.join(self.config.cache_dir, filename)
-                try:
-                    stats["total_size"] += os.path.getsize(file_path)
-                except Exception:
-                    pass
-                    
         # 計算時間範圍
-        if self._cache:
-            timestamps = [data["timestamp"] for data in self._cache.values()]
+        if timestamps:
             stats["oldest_item"] = datetime.fromtimestamp(min(timestamps))
             stats["newest_item"] = datetime.fromtimestamp(max(timestamps))
             
@@ -335,12 +786,7 @@ class CacheExtractor(BaseExtractor):
                         return cached_result
                     except Exception:
                         # 選擇器無效，刪除緩存
-                        with self._cache_lock:
-                            if key in self._cache:
-                                del self._cache[key]
-                            cache_path = self._get_cache_path(key)
-                            if os.path.exists(cache_path):
-                                os.remove(cache_path)
+                        self._invalidate(key)
                                 
                 else:
                     return cached_result
@@ -376,12 +822,7 @@ class CacheExtractor(BaseExtractor):
                         return cached_result
                     except Exception:
                         # 元素無效，刪除緩存
-                        with self._cache_lock:
-                            if key in self._cache:
-                                del self._cache[key]
-                            cache_path = self._get_cache_path(key)
-                            if os.path.exists(cache_path):
-                                os.remove(cache_path)
+                        self._invalidate(key)
                                 
                 else:
                     return cached_result
@@ -13,8 +13,12 @@
 
 import logging
 import os
+import json
 import time
 import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Union, Tuple
 from dataclasses import dataclass
 from urllib.parse import urlparse
@@ -23,6 +27,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image
 from io import BytesIO
 
@@ -63,6 +68,114 @@ class ImageExtractorConfig(ExtractorConfig):
     retry_on_error: bool = True
     retry_count: int = 3
     retry_delay: float = 1.0
+    streaming: bool = True  # 並發流式下載
+    download_workers: int = 8
+    download_timeout: float = 30.0
+    chunk_size: int = 64 * 1024
+    index_file: str = ".image_index.json"  # 內容哈希索引，跨次提取去重
+
+# 圖片格式魔數，對應 PIL 的格式名稱
+_IMAGE_SIGNATURES: List[Tuple[bytes, str]] = [
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+    (b"\x00\x00\x01\x00", "ICO"),
+]
+
+_FORMAT_EXTENSIONS = {"JPEG": "jpg", "TIFF": "tif"}
+
+def sniff_image_format(header: bytes) -> Optional[str]:
+    """
+    根據文件頭魔數判斷圖片格式
+    
+    Args:
+        header: 文件開頭的位元組（至少 12 位元組）
+        
+    Returns:
+        Optional[str]: PIL 格式名稱，無法識別時為 None
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, image_format in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    return None
+
+class ImageHashIndex:
+    """圖片內容哈希索引
+    
+    記錄內容哈希到已保存文件路徑的映射，並持久化到下載目錄，
+    使相同內容的圖片跨次提取只保存一份。
+    """
+    
+    def __init__(self, path: str):
+        """
+        初始化索引
+        
+        Args:
+            path: 索引文件路徑
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, str] = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+                
+    def get(self, digest: str) -> Optional[str]:
+        """
+        查找已保存的文件
+        
+        Args:
+            digest: 內容哈希
+            
+        Returns:
+            Optional[str]: 文件路徑，不存在或文件已被刪除時為 None
+        """
+        with self._lock:
+            filepath = self._entries.get(digest)
+        if filepath and os.path.exists(filepath):
+            return filepath
+        return None
+        
+    def add(self, digest: str, filepath: str) -> str:
+        """
+        登記文件，若已有相同內容則返回既有路徑
+        
+        Args:
+            digest: 內容哈希
+            filepath: 文件路徑
+            
+        Returns:
+            str: 該內容對應的文件路徑
+        """
+        with self._lock:
+            existing = self._entries.get(digest)
+            if existing and existing != filepath and os.path.exists(existing):
+                return existing
+            self._entries[digest] = filepath
+            self._dirty = True
+            return filepath
+            
+    def save(self) -> None:
+        """原子寫入索引文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
 
 class ImageExtractor(BaseExtractor):
     """圖片提取器類別"""
@@ -83,6 +196,28 @@ class ImageExtractor(BaseExtractor):
         self.config = config if isinstance(config, ImageExtractorConfig) else ImageExtractorConfig(**(config or {}))
         if self.config.allowed_formats is None:
             self.config.allowed_formats = ["JPEG", "PNG", "GIF", "BMP", "WEBP"]
+        self._session: Optional[requests.Session] = None
+        self._index: Optional[ImageHashIndex] = None
+        
+    @property
+    def session(self) -> requests.Session:
+        """共用的下載 Session，連接池大小與下載並發數匹配"""
+        if self._session is None:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.config.download_workers,
+                pool_maxsize=self.config.download_workers
+            )
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+        
+    @property
+    def index(self) -> ImageHashIndex:
+        """下載目錄的內容哈希索引"""
+        if self._index is None:
+            self._index = ImageHashIndex(os.path.join(self.config.download_dir, self.config.index_file))
+        return self._index
             
     def _validate_config(self) -> bool:
         """
@@ -135,7 +270,11 @@ class ImageExtractor(BaseExtractor):
             
     def _cleanup(self) -> None:
         """清理提取器環境"""
-        pass
+        if self._index is not None:
+            self._index.save()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         
     @handle_extractor_error()
     def find_image_elements(self, driver: Any) -> List[Any]:
@@ -196,7 +335,7 @@ class ImageExtractor(BaseExtractor):
             Tuple[bytes, str]: 圖片數據和格式
         """
         try:
-            response = requests.get(url, stream=True)
+            response = self.session.get(url, timeout=self.config.download_timeout)
             response.raise_for_status()
             
             content = response.content
@@ -243,6 +382,155 @@ class ImageExtractor(BaseExtractor):
         except Exception as e:
             raise ExtractorError(f"保存圖片失敗: {str(e)}")
             
+    def _build_filename(self, digest: str, info: Dict[str, Any], image_format: str) -> str:
+        """
+        生成文件名
+        
+        Args:
+            digest: 內容哈希
+            info: 圖片信息
+            image_format: 圖片格式
+            
+        Returns:
+            str: 文件名
+        """
+        filename = digest
+        if info.get('alt'):
+            filename = f"{filename}_{info['alt'][:30]}"
+        elif info.get('title'):
+            filename = f"{filename}_{info['title'][:30]}"
+        extension = _FORMAT_EXTENSIONS.get(image_format, image_format.lower())
+        return f"{filename}.{extension}"
+        
+    def _stream_image(self, url: str, info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        流式下載並保存圖片
+        
+        分塊寫入臨時文件並增量計算哈希，格式由文件頭魔數判斷，不在內存中保留完整圖片。
+        
+        Args:
+            url: 圖片URL
+            info: 圖片信息
+            
+        Returns:
+            Dict[str, Any]: 更新後的圖片信息
+        """
+        digest = hashlib.md5()
+        size = 0
+        header = b""
+        fd, tmp_path = tempfile.mkstemp(dir=self.config.download_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                with self.session.get(url, stream=True, timeout=self.config.download_timeout) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=self.config.chunk_size):
+                        if not chunk:
+                            continue
+                        if len(header) < 16:
+                            header += chunk[:16 - len(header)]
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+                        
+            if not size:
+                raise ExtractorError("圖片數據為空")
+                
+            image_format = sniff_image_format(header)
+            if self.config.validate_format and image_format not in self.config.allowed_formats:
+                raise ExtractorError(f"不支持的圖片格式: {image_format}")
+                
+            content_hash = digest.hexdigest()
+            existing = self.index.get(content_hash)
+            if existing and not self.config.overwrite:
+                info.update({'format': image_format, 'filepath': existing, 'size': size, 'hash': content_hash})
+                return info
+                
+            if self.config.check_corruption:
+                with Image.open(tmp_path) as image:
+                    image.verify()
+                    
+            if self.config.validate_size:
+                # Image.open 只解析文件頭即可取得尺寸
+                with Image.open(tmp_path) as image:
+                    self._check_dimensions(*image.size)
+                    
+            if self.config.resize:
+                with open(tmp_path, "rb") as f:
+                    content = self._process_image(f.read())
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                image_format = self.config.format
+                size = len(content)
+                
+            filepath = os.path.join(
+                self.config.download_dir,
+                self._build_filename(content_hash, info, image_format or self.config.format)
+            )
+            written = self.config.overwrite or not os.path.exists(filepath)
+            if written:
+                os.replace(tmp_path, filepath)
+            registered = self.index.add(content_hash, filepath)
+            if registered != filepath:
+                # 並發下載的相同內容已由其他線程先登記，刪除本次寫入的重複文件
+                if written and os.path.exists(filepath):
+                    os.remove(filepath)
+                filepath = registered
+            
+            info.update({'format': image_format, 'filepath': filepath, 'size': size, 'hash': content_hash})
+            return info
+            
+        except ExtractorError:
+            raise
+        except Exception as e:
+            raise ExtractorError(f"下載圖片失敗: {str(e)}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+                
+    def _check_dimensions(self, width: int, height: int) -> None:
+        """
+        驗證圖片尺寸
+        
+        Args:
+            width: 寬度
+            height: 高度
+        """
+        if self.config.min_width and width < self.config.min_width:
+            raise ExtractorError(f"圖片寬度小於最小值 {self.config.min_width}")
+        if self.config.min_height and height < self.config.min_height:
+            raise ExtractorError(f"圖片高度小於最小值 {self.config.min_height}")
+        if self.config.max_width and width > self.config.max_width:
+            raise ExtractorError(f"圖片寬度超過最大值 {self.config.max_width}")
+        if self.config.max_height and height > self.config.max_height:
+            raise ExtractorError(f"圖片高度超過最大值 {self.config.max_height}")
+            
+    def download_images(self, infos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        並發下載圖片
+        
+        Args:
+            infos: 含 src 的圖片信息列表
+            
+        Returns:
+            List[Dict[str, Any]]: 成功下載的圖片信息，保持輸入順序
+        """
+        if self.config.create_dir and not os.path.exists(self.config.download_dir):
+            os.makedirs(self.config.download_dir)
+            
+        def fetch(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            try:
+                return self._stream_image(info['src'], info)
+            except Exception as e:
+                self.logger.warning(f"處理圖片失敗: {str(e)}")
+                return None
+                
+        workers = max(1, min(self.config.download_workers, len(infos)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return [info for info in executor.map(fetch, infos) if info is not None]
+        finally:
+            self.index.save()
+            
     def _process_image(self, content: bytes) -> bytes:
         """
         處理圖片
@@ -258,15 +546,7 @@ class ImageExtractor(BaseExtractor):
             
             # 驗證尺寸
             if self.config.validate_size:
-                width, height = image.size
-                if self.config.min_width and width < self.config.min_width:
-                    raise ExtractorError(f"圖片寬度小於最小值 {self.config.min_width}")
-                if self.config.min_height and height < self.config.min_height:
-                    raise ExtractorError(f"圖片高度小於最小值 {self.config.min_height}")
-                if self.config.max_width and width > self.config.max_width:
-                    raise ExtractorError(f"圖片寬度超過最大值 {self.config.max_width}")
-                if self.config.max_height and height > self.config.max_height:
-                    raise ExtractorError(f"圖片高度超過最大值 {self.config.max_height}")
+                self._check_dimensions(*image.size)
                     
             # 驗證格式
             if self.config.validate_format and image.format not in self.config.allowed_formats:
@@ -341,6 +621,17 @@ class ImageExtractor(BaseExtractor):
         if not elements:
             return []
             
+        if self.config.streaming:
+            infos = []
+            for element in elements:
+                try:
+                    info = self._get_image_info(element)
+                    if info.get('src'):
+                        infos.append(info)
+                except Exception as e:
+                    self.logger.warning(f"處理圖片失敗: {str(e)}")
+            return self.download_images(infos)
+            
         results = []
         for element in elements:
             try:
@@ -12,16 +12,20 @@
 """
 
 import logging
+import os
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional, Union, Pattern, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union, Pattern, Set
 from dataclasses import dataclass
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urlunparse, urljoin
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..core.base import BaseExtractor
 from ..core.types import ExtractorConfig, ExtractorResult
@@ -62,6 +66,152 @@ class LinkExtractorConfig(ExtractorConfig):
     retry_on_error: bool = True
     retry_count: int = 3
     retry_delay: float = 1.0
+    status_workers: int = 16  # 狀態檢查並發數
+    status_per_host: int = 4  # 單一主機並發上限
+    status_cache_ttl: float = 300.0  # 狀態緩存有效期（秒），跨提取保留
+
+class LinkStatusChecker:
+    """鏈接狀態檢查器
+    
+    以共用的 keep-alive Session 並發發送 HEAD 請求，限制單一主機並發數，
+    並以 TTL 緩存 URL 狀態碼，避免重複檢查。
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = 16,
+        per_host: int = 4,
+        cache_ttl: float = 300.0,
+        timeout: float = 10.0,
+        follow_redirects: bool = True,
+        session: Optional[requests.Session] = None
+    ):
+        """
+        初始化鏈接狀態檢查器
+        
+        Args:
+            max_workers: 最大並發數
+            per_host: 單一主機並發上限
+            cache_ttl: 狀態緩存有效期（秒）
+            timeout: 請求超時時間
+            follow_redirects: 是否跟隨重定向
+            session: 自訂 Session
+        """
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.follow_redirects = follow_redirects
+        self.session = session or self._create_session()
+        self._cache: Dict[str, tuple] = {}  # url -> (狀態碼, 檢查時間)
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        
+    def _create_session(self) -> requests.Session:
+        """創建連接池大小與並發數匹配的 Session"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+        
+    @staticmethod
+    def canonicalize(url: str) -> str:
+        """
+        規範化URL作為去重與緩存鍵
+        
+        Args:
+            url: URL
+            
+        Returns:
+            str: 協議與主機小寫、去除預設端口與片段後的URL
+        """
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc.lower()
+        if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+            netloc = netloc.rsplit(":", 1)[0]
+        return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, parsed.query, ""))
+        
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        """獲取主機並發限制"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+            
+    def _cached_status(self, url: str, now: float) -> Optional[int]:
+        """讀取未過期的緩存狀態"""
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            if now - entry[1] > self.cache_ttl:
+                del self._cache[url]
+                return None
+            return entry[0]
+            
+    def check(self, url: str) -> Optional[int]:
+        """
+        檢查單個URL狀態
+        
+        Args:
+            url: URL
+            
+        Returns:
+            Optional[int]: HTTP狀態碼，請求失敗時為 None
+        """
+        key = self.canonicalize(url)
+        status = self._cached_status(key, time.monotonic())
+        if status is not None:
+            return status
+            
+        try:
+            with self._host_limit(key):
+                response = self.session.head(
+                    key,
+                    allow_redirects=self.follow_redirects,
+                    timeout=self.timeout
+                )
+            status = response.status_code
+        except requests.RequestException:
+            return None
+            
+        with self._lock:
+            self._cache[key] = (status, time.monotonic())
+        return status
+        
+    def check_many(self, urls: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        並發檢查多個URL狀態
+        
+        URL 會先規範化並去重，每個唯一 URL 只發送一次請求。
+        
+        Args:
+            urls: URL 列表
+            
+        Returns:
+            Dict[str, Optional[int]]: 原始URL到狀態碼的映射
+        """
+        urls = list(urls)
+        unique = list(dict.fromkeys(self.canonicalize(url) for url in urls))
+        if not unique:
+            return {}
+            
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as executor:
+            statuses = dict(zip(unique, executor.map(self.check, unique)))
+            
+        return {url: statuses[self.canonicalize(url)] for url in urls}
+        
+    def clear_cache(self) -> None:
+        """清除狀態緩存"""
+        with self._lock:
+            self._cache.clear()
+            
+    def close(self) -> None:
+        """關閉 Session"""
+        self.session.close()
 
 class LinkExtractor(BaseExtractor):
     """鏈接提取器類別"""
@@ -88,6 +238,20 @@ class LinkExtractor(BaseExtractor):
             self.config.excluded_extensions = [".jpg", ".jpeg", ".png", ".gif", ".pdf", ".doc", ".docx", ".xls", ".xlsx"]
         if self.config.extract_attributes is None:
             self.config.extract_attributes = ["data-*", "aria-*"]
+        self._status_checker: Optional[LinkStatusChecker] = None
+        
+    @property
+    def status_checker(self) -> LinkStatusChecker:
+        """鏈接狀態檢查器，延遲創建並在多次提取間共用"""
+        if self._status_checker is None:
+            self._status_checker = LinkStatusChecker(
+                max_workers=self.config.status_workers,
+                per_host=self.config.status_per_host,
+                cache_ttl=self.config.status_cache_ttl,
+                timeout=self.config.timeout,
+                follow_redirects=self.config.follow_redirects
+            )
+        return self._status_checker
             
     def _validate_config(self) -> bool:
         """
@@ -122,7 +286,9 @@ class LinkExtractor(BaseExtractor):
             
     def _cleanup(self) -> None:
         """清理提取器環境"""
-        pass
+        if self._status_checker is not None:
+            self._status_checker.close()
+            self._status_checker = None
         
     @handle_extractor_error()
     def find_link_elements(self, driver: Any) -> List[Any]:
@@ -279,21 +445,18 @@ class LinkExtractor(BaseExtractor):
         Returns:
             int: HTTP狀態碼
         """
-        try:
-            response = requests.head(
-                url,
-                allow_redirects=self.config.follow_redirects,
-                timeout=self.config.timeout
-            )
-            return response.status_code
-        except Exception as e:
-            raise ExtractorError(f"檢查URL狀態失敗: {str(e)}")
-            
+        status = self.status_checker.check(url)
+        if status is None:
+            raise ExtractorError(f"檢查URL狀態失敗: {url}")
+        return status
+        
     @handle_extractor_error()
     def _extract(self, driver: Any) -> List[Dict[str, Any]]:
         """
         提取鏈接數據
         
+        先完成標準化、驗證與去重，再並發檢查所有唯一URL的狀態，結果保持元素順序。
+        
         Args:
             driver: WebDriver 實例
             
@@ -323,20 +486,12 @@ class LinkExtractor(BaseExtractor):
                 if self.config.validate_urls and not self._validate_url(url):
                     continue
                     
-                # 檢查URL狀態
-                if self.config.check_status:
-                    try:
-                        status = self._check_url_status(url)
-                        info['status'] = status
-                    except Exception as e:
-                        self.logger.warning(f"檢查URL狀態失敗: {str(e)}")
-                        continue
-                        
                 # 移除重複URL
                 if self.config.remove_duplicates:
-                    if url in seen_urls:
+                    key = LinkStatusChecker.canonicalize(url)
+                    if key in seen_urls:
                         continue
-                    seen_urls.add(url)
+                    seen_urls.add(key)
                     
                 # 更新信息
                 info['url'] = url
@@ -346,6 +501,19 @@ class LinkExtractor(BaseExtractor):
                 self.logger.warning(f"處理鏈接失敗: {str(e)}")
                 continue
                 
+        # 檢查URL狀態
+        if self.config.check_status and results:
+            statuses = self.status_checker.check_many(info['url'] for info in results)
+            checked = []
+            for info in results:
+                status = statuses.get(info['url'])
+                if status is None:
+                    self.logger.warning(f"檢查URL狀態失敗: {info['url']}")
+                    continue
+                info['status'] = status
+                checked.append(info)
+            results = checked
+            
         return results
         
     def extract(self, driver: Any) -> ExtractorResult:
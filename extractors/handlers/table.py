@@ -12,9 +12,11 @@
 """
 
 import logging
+import re
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
+from lxml import html as lxml_html
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -53,6 +55,77 @@ class TableExtractorConfig(ExtractorConfig):
     retry_on_error: bool = True
     retry_count: int = 3
     retry_delay: float = 1.0
+    extraction_mode: str = "element"  # element, script, html
+    expand_spans: bool = False  # 按 colspan/rowspan 展開單元格
+
+# 單次往返提取表頭與單元格，單元格以 [文本, colspan, rowspan, ...] 扁平打包；
+# 文本保持 innerText 原樣，空白由 strip_whitespace 統一處理
+_BULK_EXTRACT_SCRIPT = """
+var table = arguments[0], headerSel = arguments[1], rowSel = arguments[2], cellSel = arguments[3];
+var text = function(el) { return el.innerText || el.textContent || ''; };
+var headers = [], rows = [];
+if (headerSel) {
+    var hs = table.querySelectorAll(headerSel);
+    for (var i = 0; i < hs.length; i++) {
+        headers.push(text(hs[i]), hs[i].colSpan || 1, hs[i].rowSpan || 1);
+    }
+}
+var rs = table.querySelectorAll(rowSel);
+for (var r = 0; r < rs.length; r++) {
+    var cs = rs[r].querySelectorAll(cellSel), packed = [];
+    for (var c = 0; c < cs.length; c++) {
+        packed.push(text(cs[c]), cs[c].colSpan || 1, cs[c].rowSpan || 1);
+    }
+    rows.push(packed);
+}
+return [headers, rows];
+"""
+
+Cell = Tuple[str, int, int]
+
+def _parse_span(value: Any) -> int:
+    """
+    解析 colspan/rowspan，容忍不規範的標記（例如 "2;"）
+    
+    Args:
+        value: 屬性值
+        
+    Returns:
+        int: 跨度，無法解析時為 1
+    """
+    match = re.match(r"\s*(\d+)", str(value)) if value is not None else None
+    return max(int(match.group(1)), 1) if match else 1
+
+def _render_text(element: Any) -> str:
+    """
+    取得 lxml 元素的渲染文本：源碼中的連續空白合併為單一空格，<br> 轉為換行
+    
+    Args:
+        element: lxml 元素
+        
+    Returns:
+        str: 單元格文本，首尾空白保留給 strip_whitespace 處理
+    """
+    lines: List[List[str]] = [[]]
+    
+    def walk(node: Any) -> None:
+        if node.tag == "br":
+            lines.append([])
+        elif isinstance(node.tag, str) and node.text:
+            lines[-1].append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                lines[-1].append(child.tail)
+                
+    walk(element)
+    texts = [re.sub(r"\s+", " ", "".join(line)) for line in lines]
+    if len(texts) == 1:
+        return texts[0]
+    # 換行兩側的空白不屬於渲染文本
+    return "\n".join(
+        [texts[0].rstrip()] + [text.strip() for text in texts[1:-1]] + [texts[-1].lstrip()]
+    )
 
 class TableExtractor(BaseExtractor):
     """表格提取器類別"""
@@ -98,6 +171,9 @@ class TableExtractor(BaseExtractor):
             if self.config.header_case not in ["lower", "upper", "title", "none"]:
                 raise ExtractorError("無效的表頭大小寫設置")
                 
+            if self.config.extraction_mode not in ["element", "script", "html"]:
+                raise ExtractorError("無效的提取模式設置")
+                
             return True
             
         except Exception as e:
@@ -149,26 +225,36 @@ class TableExtractor(BaseExtractor):
             return []
             
         try:
-            headers = []
             header_elements = table.find_elements(By.CSS_SELECTOR, self.config.header_selector)
-            
-            for element in header_elements:
-                header = element.text.strip()
-                if self.config.strip_whitespace:
-                    header = header.strip()
-                    
-                if self.config.normalize_headers:
-                    header = self._normalize_header(header)
-                    
-                headers.append(header)
-                
-            return headers
+            return self._clean_headers([element.text.strip() for element in header_elements])
             
         except NoSuchElementException:
             if self.config.error_on_invalid:
                 raise ExtractorError("無法找到表頭元素")
             return []
             
+    def _clean_headers(self, texts: List[str]) -> List[str]:
+        """
+        清洗表頭文本
+        
+        Args:
+            texts: 原始表頭文本
+            
+        Returns:
+            List[str]: 表頭列表
+        """
+        headers = []
+        for header in texts:
+            if self.config.strip_whitespace:
+                header = header.strip()
+                
+            if self.config.normalize_headers:
+                header = self._normalize_header(header)
+                
+            headers.append(header)
+            
+        return headers
+        
     def _normalize_header(self, header: str) -> str:
         """
         標準化表頭
@@ -205,33 +291,172 @@ class TableExtractor(BaseExtractor):
             List[List[str]]: 表格數據
         """
         try:
-            rows = []
             row_elements = table.find_elements(By.CSS_SELECTOR, self.config.row_selector)
-            
-            for row_element in row_elements:
-                cells = row_element.find_elements(By.CSS_SELECTOR, self.config.cell_selector)
-                row_data = []
-                
-                for cell in cells:
-                    cell_text = cell.text
-                    if self.config.strip_whitespace:
-                        cell_text = cell_text.strip()
-                        
-                    if not cell_text and self.config.remove_empty_cells:
-                        continue
-                        
-                    row_data.append(cell_text)
-                    
-                if row_data or not self.config.remove_empty_rows:
-                    rows.append(row_data)
-                    
-            return rows
+            return self._clean_rows([
+                [cell.text for cell in row_element.find_elements(By.CSS_SELECTOR, self.config.cell_selector)]
+                for row_element in row_elements
+            ])
             
         except NoSuchElementException:
             if self.config.error_on_invalid:
                 raise ExtractorError("無法找到表格行元素")
             return []
             
+    def _clean_rows(self, raw_rows: List[List[str]]) -> List[List[str]]:
+        """
+        清洗表格行，各提取模式共用同一套空白與空單元格規則
+        
+        Args:
+            raw_rows: 原始單元格文本
+            
+        Returns:
+            List[List[str]]: 表格數據
+        """
+        rows = []
+        for raw_row in raw_rows:
+            row_data = []
+            
+            for cell_text in raw_row:
+                if self.config.strip_whitespace:
+                    cell_text = cell_text.strip()
+                    
+                if not cell_text and self.config.remove_empty_cells:
+                    continue
+                    
+                row_data.append(cell_text)
+                
+            if row_data or not self.config.remove_empty_rows:
+                rows.append(row_data)
+                
+        return rows
+        
+    def _flatten_cells(self, rows: List[List[Cell]]) -> List[List[str]]:
+        """
+        將帶跨度信息的單元格轉為文本矩陣
+        
+        Args:
+            rows: 每行的 (文本, colspan, rowspan) 列表
+            
+        Returns:
+            List[List[str]]: 單元格文本；啟用 expand_spans 時按跨度複製文本
+        """
+        if not self.config.expand_spans:
+            return [[text for text, _, _ in row] for row in rows]
+            
+        grid = []
+        carried: Dict[int, List[Any]] = {}  # 列索引 -> [文本, 剩餘行數]
+        
+        def take_carried(col: int, out: List[str]) -> int:
+            while col in carried:
+                out.append(carried[col][0])
+                carried[col][1] -= 1
+                if carried[col][1] <= 0:
+                    del carried[col]
+                col += 1
+            return col
+            
+        for row in rows:
+            out: List[str] = []
+            col = 0
+            for text, colspan, rowspan in row:
+                col = take_carried(col, out)
+                colspan, rowspan = _parse_span(colspan), _parse_span(rowspan)
+                for _ in range(colspan):
+                    out.append(text)
+                    if rowspan > 1:
+                        carried[col] = [text, rowspan - 1]
+                    col += 1
+                    
+            # 填充本行末尾仍被上方單元格佔用的列
+            while any(c >= col for c in carried):
+                if col in carried:
+                    col = take_carried(col, out)
+                else:
+                    out.append("")
+                    col += 1
+            grid.append(out)
+            
+        return grid
+        
+    @staticmethod
+    def _unpack_cells(packed: List[Any]) -> List[Cell]:
+        """
+        解包 [文本, colspan, rowspan, ...] 扁平數組
+        
+        Args:
+            packed: 扁平數組
+            
+        Returns:
+            List[Cell]: 單元格列表
+        """
+        return [
+            (packed[i] or "", packed[i + 1] or 1, packed[i + 2] or 1)
+            for i in range(0, len(packed), 3)
+        ]
+        
+    @handle_extractor_error(default_return=([], []))
+    def extract_table_bulk(self, driver: Any, table: Any) -> Tuple[List[str], List[List[str]]]:
+        """
+        以單次 execute_script 往返提取表頭與表格行
+        
+        Args:
+            driver: WebDriver 實例
+            table: 表格元素
+            
+        Returns:
+            Tuple[List[str], List[List[str]]]: 表頭列表與表格數據
+        """
+        header_selector = self.config.header_selector if self.config.include_header else ""
+        packed_headers, packed_rows = driver.execute_script(
+            _BULK_EXTRACT_SCRIPT,
+            table,
+            header_selector,
+            self.config.row_selector,
+            self.config.cell_selector
+        )
+        
+        headers = self._flatten_cells([self._unpack_cells(packed_headers)])[0] if packed_headers else []
+        rows = self._flatten_cells([self._unpack_cells(row) for row in packed_rows])
+        # 與 extract_headers 一致：表頭一律去除首尾空白，單元格依 strip_whitespace 處理
+        return self._clean_headers([header.strip() for header in headers]), self._clean_rows(rows)
+        
+    @handle_extractor_error(default_return=([], []))
+    def extract_from_html(self, page_source: str) -> Tuple[List[str], List[List[str]]]:
+        """
+        直接解析 HTML 源碼提取表格，不產生任何 WebDriver 調用
+        
+        源碼中的連續空白合併為單一空格，<br> 轉為換行，以接近瀏覽器渲染文本；
+        注意隱藏元素的文本也會被包含。
+        
+        Args:
+            page_source: 頁面 HTML
+            
+        Returns:
+            Tuple[List[str], List[List[str]]]: 表頭列表與表格數據
+        """
+        document = lxml_html.fromstring(page_source)
+        tables = document.cssselect(self.config.table_selector)
+        if not tables:
+            if self.config.error_on_invalid:
+                raise ExtractorError("無法找到表格元素")
+            return [], []
+            
+        table = tables[0]
+        
+        def to_cell(element: Any) -> Cell:
+            return _render_text(element), _parse_span(element.get("colspan")), _parse_span(element.get("rowspan"))
+            
+        headers = []
+        if self.config.include_header:
+            header_cells = [to_cell(element) for element in table.cssselect(self.config.header_selector)]
+            headers = self._flatten_cells([header_cells])[0] if header_cells else []
+            
+        rows = self._flatten_cells([
+            [to_cell(cell) for cell in row.cssselect(self.config.cell_selector)]
+            for row in table.cssselect(self.config.row_selector)
+        ])
+        return self._clean_headers([header.strip() for header in headers]), self._clean_rows(rows)
+        
     def _validate_structure(self, headers: List[str], rows: List[List[str]]) -> bool:
         """
         驗證表格結構
@@ -295,12 +520,18 @@ class TableExtractor(BaseExtractor):
         Returns:
             Dict[str, List[str]]: 表格數據
         """
-        table = self.find_table(driver)
-        if not table:
-            return {}
-            
-        headers = self.extract_headers(table)
-        rows = self.extract_rows(table)
+        if self.config.extraction_mode == "html":
+            headers, rows = self.extract_from_html(driver.page_source)
+        else:
+            table = self.find_table(driver)
+            if not table:
+                return {}
+                
+            if self.config.extraction_mode == "script":
+                headers, rows = self.extract_table_bulk(driver, table)
+            else:
+                headers = self.extract_headers(table)
+                rows = self.extract_rows(table)
         
         if self.config.validate_structure:
             self._validate_structure(headers, rows)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+緩存提取器測試模組
+
+提供緩存分層的單元測試，包括：
+1. 內存層 LRU 淘汰
+2. 內存層位元組限制
+3. 磁盤層異步寫入
+4. 寫入失敗重試
+5. 過期清理
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from ..handlers.cache import LRUMemoryCache, SQLiteDiskCache
+
+class TestLRUMemoryCache(unittest.TestCase):
+    """內存緩存層測試類別"""
+    
+    def test_evicts_least_recently_used(self):
+        """測試按 LRU 順序淘汰"""
+        cache = LRUMemoryCache(max_items=2, max_bytes=1000, max_age=60)
+        cache.set("a", 1, 1)
+        cache.set("b", 2, 1)
+        self.assertEqual(cache.get("a"), (True, 1))
+        
+        evicted = cache.set("c", 3, 1)
+        self.assertEqual(evicted, ["b"])
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        
+    def test_byte_limit(self):
+        """測試位元組容量限制"""
+        cache = LRUMemoryCache(max_items=10, max_bytes=100, max_age=60)
+        cache.set("a", 1, 40)
+        cache.set("b", 2, 40)
+        evicted = cache.set("c", 3, 40)
+        self.assertEqual(evicted, ["a"])
+        self.assertEqual(cache.total_bytes, 80)
+        
+    def test_expired_entry_is_miss(self):
+        """測試過期條目"""
+        cache = LRUMemoryCache(max_items=10, max_bytes=100, max_age=10)
+        cache.set("a", 1, 1, timestamp=100.0)
+        self.assertEqual(cache.get("a", now=105.0), (True, 1))
+        self.assertEqual(cache.get("a", now=111.0), (False, None))
+        self.assertEqual(len(cache), 0)
+        
+class TestSQLiteDiskCache(unittest.TestCase):
+    """磁盤緩存層測試類別"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cache_dir, "cache.sqlite3")
+        
+    def tearDown(self):
+        """清理測試環境"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        
+    def test_write_behind_read_your_writes(self):
+        """測試異步寫入未落盤時仍可讀取"""
+        cache = SQLiteDiskCache(self.path, max_age=60, write_behind=True)
+        try:
+            cache.set("a", b"payload")
+            self.assertEqual(cache.get("a")[1], b"payload")
+            
+            cache.flush()
+            self.assertEqual(cache.stats(), (1, len(b"payload")))
+            
+            cache.delete("a")
+            self.assertIsNone(cache.get("a"))
+        finally:
+            cache.close()
+            
+    def test_failed_write_is_retried(self):
+        """測試寫入失敗時記錄錯誤並保留條目，之後重試落盤"""
+        cache = SQLiteDiskCache(self.path, max_age=60, retry_interval=0.05)
+        apply = cache._apply
+        calls = []
+        
+        def flaky_apply(batch):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            apply(batch)
+            
+        cache._apply = flaky_apply
+        try:
+            with self.assertLogs("extractors.handlers.cache", level="WARNING"):
+                cache.set("a", b"1")
+                cache.flush()
+                deadline = time.time() + 2
+                while cache.write_stats()["failed_writes"] and time.time() < deadline:
+                    time.sleep(0.01)
+                    
+            self.assertEqual(cache.write_stats(), {"write_errors": 1, "failed_writes": 0})
+            self.assertEqual(cache.get("a")[1], b"1")
+            self.assertEqual(cache.stats(), (1, 1))
+            self.assertGreaterEqual(len(calls), 2)
+        finally:
+            cache.close()
+            
+    def test_failed_write_superseded_by_newer_write(self):
+        """測試失敗條目被新寫入取代時，只落盤新值"""
+        cache = SQLiteDiskCache(self.path, max_age=60, retry_interval=60)
+        apply = cache._apply
+        failures = [sqlite3.OperationalError("disk I/O error")]
+        
+        def flaky_apply(batch):
+            if failures:
+                raise failures.pop()
+            apply(batch)
+            
+        cache._apply = flaky_apply
+        try:
+            with self.assertLogs("extractors.handlers.cache", level="WARNING"):
+                cache.set("a", b"old")
+                cache.flush()
+            self.assertEqual(cache.get("a")[1], b"old")
+            
+            cache.set("a", b"new")
+            cache.flush()
+            self.assertEqual(cache.write_stats()["failed_writes"], 0)
+        finally:
+            cache.close()
+            
+        cache = SQLiteDiskCache(self.path, max_age=60)
+        try:
+            self.assertEqual(cache.get("a")[1], b"new")
+        finally:
+            cache.close()
+            
+    def test_persists_across_instances(self):
+        """測試跨實例持久化"""
+        cache = SQLiteDiskCache(self.path, max_age=60)
+        cache.set("a", b"1")
+        cache.close()
+        
+        cache = SQLiteDiskCache(self.path, max_age=60)
+        try:
+            self.assertEqual(cache.get("a")[1], b"1")
+        finally:
+            cache.close()
+            
+    def test_purge_expired(self):
+        """測試過期清理"""
+        cache = SQLiteDiskCache(self.path, max_age=10, write_behind=False)
+        try:
+            cache.set("old", b"1", timestamp=100.0)
+            cache.set("new", b"2", timestamp=200.0)
+            self.assertEqual(cache.purge_expired(now=205.0), 1)
+            self.assertEqual(cache.stats()[0], 1)
+        finally:
+            cache.close()
+            
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,9 @@
 
 import unittest
 import os
+import shutil
+import tempfile
+import threading
 from unittest.mock import Mock, patch, MagicMock
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -23,7 +26,7 @@ import requests
 from PIL import Image
 import io
 
-from ..handlers.image import ImageExtractor, ImageExtractorConfig
+from ..handlers.image import ImageExtractor, ImageExtractorConfig, ImageHashIndex, sniff_image_format
 from ..core.error import ExtractorError
 
 class TestImageExtractor(unittest.TestCase):
@@ -315,5 +318,99 @@ class TestImageExtractor(unittest.TestCase):
         self.assertIsNone(result.data)
         self.assertIsNotNone(result.error)
         
+class TestImageDownloadPipeline(unittest.TestCase):
+    """圖像下載管線測試類別"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.download_dir = tempfile.mkdtemp()
+        self.config = ImageExtractorConfig(
+            name="image",
+            description="圖像提取器",
+            download_dir=self.download_dir,
+            download_workers=2
+        )
+        self.extractor = ImageExtractor(config=self.config)
+        
+        image = Image.new("RGB", (20, 10), "red")
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        self.png = buffer.getvalue()
+        
+    def tearDown(self):
+        """清理測試環境"""
+        shutil.rmtree(self.download_dir, ignore_errors=True)
+        
+    def _mock_response(self, content):
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content.return_value = [content[:8], content[8:]]
+        return response
+        
+    def test_sniff_image_format(self):
+        """測試魔數格式判斷"""
+        self.assertEqual(sniff_image_format(self.png), "PNG")
+        self.assertEqual(sniff_image_format(b"\xff\xd8\xff\xe0\x00\x10JFIF"), "JPEG")
+        self.assertEqual(sniff_image_format(b"RIFF\x00\x00\x00\x00WEBPVP8 "), "WEBP")
+        self.assertIsNone(sniff_image_format(b"<html>"))
+        
+    def test_download_deduplicates_by_content(self):
+        """測試按內容哈希去重"""
+        session = Mock()
+        session.get.side_effect = lambda *args, **kwargs: self._mock_response(self.png)
+        self.extractor._session = session
+        
+        results = self.extractor.download_images([
+            {"src": "https://example.com/a.png"},
+            {"src": "https://example.com/b.png"}
+        ])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["filepath"], results[1]["filepath"])
+        self.assertEqual(results[0]["format"], "PNG")
+        self.assertEqual(results[0]["size"], len(self.png))
+        
+        files = [f for f in os.listdir(self.download_dir) if not f.startswith(".")]
+        self.assertEqual(len(files), 1)
+        
+        # 索引跨實例保留
+        index = ImageHashIndex(os.path.join(self.download_dir, self.config.index_file))
+        self.assertEqual(index.get(results[0]["hash"]), results[0]["filepath"])
+        
+    def test_concurrent_duplicates_keep_one_file(self):
+        """測試並發下載相同內容且文件名不同時，只保留先登記的文件"""
+        session = Mock()
+        session.get.side_effect = lambda *args, **kwargs: self._mock_response(self.png)
+        self.extractor._session = session
+        
+        # 兩個線程都在對方登記前查詢索引
+        barrier = threading.Barrier(2)
+        lookup = self.extractor.index.get
+        
+        def racing_get(digest):
+            result = lookup(digest)
+            barrier.wait(timeout=5)
+            return result
+            
+        self.extractor.index.get = racing_get
+        results = self.extractor.download_images([
+            {"src": "https://example.com/a.png", "alt": "first"},
+            {"src": "https://example.com/b.png", "alt": "second"}
+        ])
+        
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["filepath"], results[1]["filepath"])
+        files = [f for f in os.listdir(self.download_dir) if not f.startswith(".")]
+        self.assertEqual([os.path.join(self.download_dir, f) for f in files], [results[0]["filepath"]])
+        
+    def test_download_rejects_unknown_format(self):
+        """測試拒絕無法識別的格式"""
+        session = Mock()
+        session.get.return_value = self._mock_response(b"<html></html>")
+        self.extractor._session = session
+        
+        results = self.extractor.download_images([{"src": "https://example.com/a.png"}])
+        self.assertEqual(results, [])
+        self.assertEqual([f for f in os.listdir(self.download_dir) if f.endswith(".part")], [])
+        
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
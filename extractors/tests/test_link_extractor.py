@@ -19,7 +19,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import requests
 
-from ..handlers.link import LinkExtractor, LinkExtractorConfig
+from ..handlers.link import LinkExtractor, LinkExtractorConfig, LinkStatusChecker
 from ..core.error import ExtractorError
 
 class TestLinkExtractor(unittest.TestCase):
@@ -231,5 +231,48 @@ class TestLinkExtractor(unittest.TestCase):
         self.assertIsNone(result.data)
         self.assertIsNotNone(result.error)
         
+class TestLinkStatusChecker(unittest.TestCase):
+    """鏈接狀態檢查器測試類別"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.session = Mock()
+        self.session.head.return_value = Mock(status_code=200)
+        self.checker = LinkStatusChecker(max_workers=4, per_host=2, session=self.session)
+        
+    def test_canonicalize(self):
+        """測試URL規範化"""
+        self.assertEqual(
+            LinkStatusChecker.canonicalize("HTTPS://Example.com:443/a?b=1#top"),
+            "https://example.com/a?b=1"
+        )
+        self.assertEqual(LinkStatusChecker.canonicalize("http://example.com"), "http://example.com/")
+        
+    def test_check_many_deduplicates(self):
+        """測試去重後只請求一次並保持映射"""
+        urls = [
+            "https://example.com/a",
+            "https://EXAMPLE.com/a#x",
+            "https://example.com/b"
+        ]
+        statuses = self.checker.check_many(urls)
+        self.assertEqual(self.session.head.call_count, 2)
+        self.assertEqual(statuses, {url: 200 for url in urls})
+        
+    def test_cache_across_runs(self):
+        """測試跨次檢查的狀態緩存"""
+        self.checker.check_many(["https://example.com/a"])
+        self.checker.check_many(["https://example.com/a"])
+        self.assertEqual(self.session.head.call_count, 1)
+        
+        self.checker.cache_ttl = -1
+        self.checker.check_many(["https://example.com/a"])
+        self.assertEqual(self.session.head.call_count, 2)
+        
+    def test_request_failure(self):
+        """測試請求失敗"""
+        self.session.head.side_effect = requests.ConnectionError()
+        self.assertIsNone(self.checker.check("https://example.com/a"))
+        
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
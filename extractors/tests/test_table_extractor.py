@@ -238,5 +238,88 @@ class TestTableExtractor(unittest.TestCase):
         self.assertIsNone(result.data)
         self.assertIsNotNone(result.error)
         
+class TestTableBulkExtraction(unittest.TestCase):
+    """表格批量提取測試類別"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.config = TableExtractorConfig(
+            name="table",
+            description="表格提取器",
+            header_selector="thead th",
+            row_selector="tbody tr",
+            header_case="none",
+            validate_structure=False
+        )
+        self.extractor = TableExtractor(config=self.config)
+        self.driver = Mock()
+        
+    def test_extract_from_html(self):
+        """測試 HTML 解析提取"""
+        self.config.expand_spans = True
+        self.config.remove_empty_cells = False
+        page_source = """
+        <table>
+          <thead><tr><th colspan="2">Name</th><th>Age</th></tr></thead>
+          <tbody>
+            <tr><td rowspan="2">A</td><td> John </td><td>25</td></tr>
+            <tr><td>Jane</td><td></td></tr>
+          </tbody>
+        </table>
+        """
+        headers, rows = self.extractor.extract_from_html(page_source)
+        self.assertEqual(headers, ["Name", "Name", "Age"])
+        self.assertEqual(rows, [["A", "John", "25"], ["A", "Jane", ""]])
+        
+        # 不展開跨度時保持原始單元格
+        self.config.expand_spans = False
+        self.config.remove_empty_cells = True
+        headers, rows = self.extractor.extract_from_html(page_source)
+        self.assertEqual(headers, ["Name", "Age"])
+        self.assertEqual(rows, [["A", "John", "25"], ["Jane"]])
+        
+    def test_html_text_matches_element_text(self):
+        """測試 HTML 解析的換行、空白與跨度處理與逐元素提取一致"""
+        page_source = """
+        <table>
+          <thead><tr><th> Name </th><th>Note</th></tr></thead>
+          <tbody>
+            <tr><td colspan="2;">line1<br>line2</td></tr>
+            <tr><td>  a\n  b  </td><td rowspan="x"><span>c</span> <b>d</b></td></tr>
+          </tbody>
+        </table>
+        """
+        headers, rows = self.extractor.extract_from_html(page_source)
+        self.assertEqual(headers, ["Name", "Note"])
+        self.assertEqual(rows, [["line1\nline2"], ["a b", "c d"]])
+        
+        # 不去除空白時保留單元格首尾空白，與逐元素提取相同
+        self.config.strip_whitespace = False
+        self.config.expand_spans = True
+        headers, rows = self.extractor.extract_from_html(page_source)
+        self.assertEqual(headers, ["Name", "Note"])
+        self.assertEqual(rows, [["line1\nline2", "line1\nline2"], [" a b ", "c d"]])
+        
+    def test_extract_table_bulk_keeps_raw_text(self):
+        """測試腳本返回原始 innerText，空白依 strip_whitespace 處理"""
+        self.driver.execute_script.return_value = [["Header", 1, 1], [[" x ", 1, 1]]]
+        self.config.strip_whitespace = False
+        headers, rows = self.extractor.extract_table_bulk(self.driver, Mock())
+        self.assertNotIn(".trim()", self.driver.execute_script.call_args[0][0])
+        self.assertEqual(headers, ["Header"])
+        self.assertEqual(rows, [[" x "]])
+        
+    def test_extract_table_bulk(self):
+        """測試單次腳本往返提取"""
+        self.driver.execute_script.return_value = [
+            ["Header 0", 1, 1, "Header 1", 1, 1],
+            [["Cell 0-0", 1, 1, "Cell 0-1", 1, 1], ["Cell 1-0", 1, 1, "", 1, 1]]
+        ]
+        
+        headers, rows = self.extractor.extract_table_bulk(self.driver, Mock())
+        self.assertEqual(self.driver.execute_script.call_count, 1)
+        self.assertEqual(headers, ["Header_0", "Header_1"])
+        self.assertEqual(rows, [["Cell 0-0", "Cell 0-1"], ["Cell 1-0"]])
+        
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
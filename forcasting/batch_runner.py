@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+多股票批次訓練與回測
+
+將股票清單分派到行程池，每個股票在獨立行程中執行
+取數 → 特徵工程 → 訓練 → 評估 → 回測，單一股票失敗不影響其他股票，
+最後將所有股票的績效指標彙整成一張表。
+
+原始數據經由 OHLCVCache 快取為 Parquet，重跑時只下載缺少的日期區間；
+加上 --offline 只使用本地快取，加上 --synthetic 則完全使用合成數據。
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pandas as pd
+
+# 添加項目路徑
+sys.path.append(os.path.dirname(__file__))
+
+from config import BATCH_CONFIG, STOCK_CONFIG
+from data_cache import OHLCVCache, generate_synthetic_ohlcv
+
+# 彙整指標表的欄位順序
+METRIC_COLUMNS = [
+    'symbol', 'status', 'error', 'rows', 'train_rows', 'test_rows',
+    'accuracy', 'roc_auc',
+    'total_strategy_return', 'total_benchmark_return',
+    'annualized_strategy_return', 'annualized_benchmark_return',
+    'sharpe_ratio', 'max_drawdown', 'win_rate',
+    'next_prediction', 'next_probability', 'elapsed_seconds'
+]
+
+
+def _init_worker(model_threads):
+    """工作行程初始化：使用非互動繪圖後端並限制數值庫執行緒數"""
+    os.environ['MPLBACKEND'] = 'Agg'
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[name] = str(model_threads)
+
+
+def run_symbol(symbol, options):
+    """處理單一股票並返回指標列，任何錯誤都記錄在結果中而不向外拋出"""
+    started = time.time()
+    row = {'symbol': symbol, 'status': 'ok', 'error': None}
+
+    try:
+        # 延遲導入，讓主行程不必載入 LightGBM 與繪圖模組
+        from stock_predictor import StockPredictor
+
+        config = dict(
+            STOCK_CONFIG,
+            start_date=options['start_date'],
+            end_date=options['end_date'],
+            split_date=options['split_date']
+        )
+        cache = OHLCVCache(
+            options['cache_dir'],
+            offline=options['offline'],
+            synthetic_fallback=options['synthetic_fallback']
+        )
+        predictor = StockPredictor(config, data_cache=cache)
+
+        # 每個行程只用少量執行緒，由行程池提供並行度
+        lightgbm_params = dict(predictor.model_config['lightgbm_params'], n_jobs=options['model_threads'])
+        predictor.model_config = dict(predictor.model_config, lightgbm_params=lightgbm_params)
+
+        if options['synthetic']:
+            predictor.data = generate_synthetic_ohlcv(symbol, config['start_date'], config['end_date'])
+        else:
+            predictor.fetch_data(symbol)
+        row['rows'] = len(predictor.data)
+
+        predictor.engineer_features()
+        predictor.prepare_features()
+        X_train, X_test, y_train, y_test = predictor.split_data()
+        row['train_rows'] = len(X_train)
+        row['test_rows'] = len(X_test)
+        if X_train.empty or X_test.empty:
+            raise ValueError("訓練集或測試集為空，請檢查日期範圍與分割日期")
+
+        predictor.train_model(X_train, y_train, options['optimize_params'])
+        evaluation = predictor.evaluate_model(X_test, y_test, save_plots=False)
+        _, metrics = predictor.run_backtest(save_results=False, save_plots=False)
+        future = predictor.predict_future()[0]
+
+        if options['save_models']:
+            model_dir = Path(options['model_dir'])
+            model_dir.mkdir(parents=True, exist_ok=True)
+            predictor.save_model(
+                model_path=model_dir / f'{symbol}_model.pkl',
+                features_path=model_dir / f'{symbol}_features.pkl'
+            )
+
+        row.update({
+            'accuracy': evaluation['accuracy'],
+            'roc_auc': evaluation.get('roc_auc')
+        })
+        row.update({key: metrics.get(key) for key in METRIC_COLUMNS if key in metrics})
+        row['next_prediction'] = future['prediction']
+        row['next_probability'] = future['probability']
+
+    # stock_predictor 在缺少 LightGBM 時會呼叫 sys.exit，同樣視為該股票失敗
+    except (Exception, SystemExit) as e:
+        row['status'] = 'error'
+        row['error'] = f"{type(e).__name__}: {e}"
+        logging.getLogger('BatchRunner').debug(traceback.format_exc())
+
+    row['elapsed_seconds'] = round(time.time() - started, 3)
+    return row
+
+
+class BatchRunner:
+    """多股票批次執行器"""
+
+    def __init__(self, symbols, config=None, stock_config=None):
+        stock_config = dict(STOCK_CONFIG, **(stock_config or {}))
+        self.options = dict(BATCH_CONFIG, **(config or {}))
+        for key in ('start_date', 'end_date', 'split_date'):
+            self.options.setdefault(key, stock_config[key])
+
+        # 去除重複與空白，保留原順序
+        self.symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _max_workers(self):
+        """計算實際使用的行程數"""
+        workers = self.options['max_workers'] or os.cpu_count() or 1
+        return max(1, min(workers, len(self.symbols)))
+
+    def run(self):
+        """並行執行所有股票，寫出並返回彙整指標表"""
+        if not self.symbols:
+            raise ValueError("股票清單為空")
+
+        workers = self._max_workers()
+        self.logger.info(f"開始批次處理 {len(self.symbols)} 檔股票，使用 {workers} 個行程")
+        started = time.time()
+        rows = []
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.options['model_threads'],)
+        ) as executor:
+            futures = {executor.submit(run_symbol, symbol, self.options): symbol for symbol in self.symbols}
+            for done, future in enumerate(as_completed(futures), 1):
+                symbol = futures[future]
+                try:
+                    row = future.result()
+                except BrokenProcessPool as e:
+                    # 工作行程異常終止（例如記憶體不足），行程池內未完成的股票都會失敗
+                    row = {'symbol': symbol, 'status': 'crashed', 'error': f"BrokenProcessPool: {e}"}
+                rows.append(row)
+
+                if row['status'] == 'ok':
+                    self.logger.info(f"[{done}/{len(futures)}] {symbol} 完成 ({row['elapsed_seconds']:.1f}s)")
+                else:
+                    self.logger.warning(f"[{done}/{len(futures)}] {symbol} 失敗: {row['error']}")
+
+        table = pd.DataFrame(rows).reindex(columns=METRIC_COLUMNS)
+        table = table.sort_values('symbol').reset_index(drop=True)
+        self.save_metrics(table)
+
+        succeeded = int((table['status'] == 'ok').sum())
+        self.logger.info(
+            f"批次處理完成：成功 {succeeded}，失敗 {len(table) - succeeded}，"
+            f"耗時 {time.time() - started:.1f}s"
+        )
+        return table
+
+    def save_metrics(self, table):
+        """寫出彙整指標表，副檔名為 .parquet 時輸出 Parquet，否則輸出 CSV"""
+        path = Path(self.options['metrics_file'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == '.parquet':
+            table.to_parquet(path, index=False)
+        else:
+            table.to_csv(path, index=False)
+        self.logger.info(f"彙整指標已保存至 {path}")
+        return path
+
+
+def main():
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description='多股票批次訓練與回測')
+    parser.add_argument('symbols', nargs='*', help='股票代碼')
+    parser.add_argument('--symbols-file', help='股票清單檔案，每行一個代碼')
+    parser.add_argument('--workers', type=int, default=BATCH_CONFIG['max_workers'], help='行程數')
+    parser.add_argument('--start', default=STOCK_CONFIG['start_date'], help='開始日期')
+    parser.add_argument('--end', default=STOCK_CONFIG['end_date'], help='結束日期')
+    parser.add_argument('--split', default=STOCK_CONFIG['split_date'], help='訓練/測試分割日期')
+    parser.add_argument('--offline', action='store_true', help='只使用本地快取，不連網')
+    parser.add_argument('--synthetic', action='store_true', help='使用合成數據')
+    parser.add_argument('--optimize', action='store_true', help='進行超參數優化')
+    parser.add_argument('--save-models', action='store_true', help='保存每檔股票的模型')
+    parser.add_argument('--output', default=str(BATCH_CONFIG['metrics_file']), help='彙整指標輸出路徑')
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file, 'r', encoding='utf-8') as f:
+            symbols.extend(line.split('#')[0].strip() for line in f)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    runner = BatchRunner(symbols, config={
+        'max_workers': args.workers,
+        'start_date': args.start,
+        'end_date': args.end,
+        'split_date': args.split,
+        'offline': args.offline or BATCH_CONFIG['offline'],
+        'synthetic': args.synthetic or BATCH_CONFIG['synthetic'],
+        'optimize_params': args.optimize or BATCH_CONFIG['optimize_params'],
+        'save_models': args.save_models or BATCH_CONFIG['save_models'],
+        'metrics_file': args.output
+    })
+    table = runner.run()
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -72,6 +72,18 @@ FEATURE_CONFIG = {
     'sentiment_noise_std': 0.5
 }
 
+# 滾動前進回測配置
+WALK_FORWARD_CONFIG = {
+    'n_splits': 5,                # 折數
+    'test_size': 63,              # 每折測試行數（約一季交易日）
+    'max_train_size': None,       # None 為擴張視窗，設定後為固定長度的滾動視窗
+    'gap': 0,                     # 訓練集與測試集之間略過的行數
+    'n_jobs': -1,                 # 並行訓練的折數，-1 表示使用全部核心
+    'model_threads': 1,           # 每折 LightGBM 的執行緒數
+    'warm_start': False,          # 依序訓練，每折在前一折模型上追加樹
+    'warm_start_estimators': 50   # 熱啟動時每折追加的樹數
+}
+
 # 視覺化配置
 PLOT_CONFIG = {
     'figsize': (12, 8),
@@ -86,6 +98,8 @@ FILE_PATHS = {
     'features': DATA_DIRS['models'] / 'feature_names.pkl',
     'scaler': DATA_DIRS['models'] / 'feature_scaler.pkl',
     'backtest_results': DATA_DIRS['output'] / 'backtest_results.csv',
+    'walk_forward_results': DATA_DIRS['output'] / 'walk_forward_results.csv',
+    'walk_forward_metrics': DATA_DIRS['output'] / 'walk_forward_metrics.csv',
     'feature_importance': DATA_DIRS['output'] / 'feature_importance.csv',
     'predictions': DATA_DIRS['output'] / 'predictions.csv'
 }
@@ -104,3 +118,17 @@ RISK_CONFIG = {
     'take_profit': 0.10,       # 止盈比例
     'min_confidence': 0.6      # 最小信心度閾值
 }
+
+# 批次執行配置
+BATCH_CONFIG = {
+    'max_workers': None,               # 行程數，None 表示使用 CPU 核心數
+    'model_threads': 1,                # 每個行程的 LightGBM 執行緒數，避免超額訂閱
+    'cache_dir': DATA_DIRS['raw'] / 'ohlcv',
+    'offline': False,                  # 離線模式：只使用本地快取，不連網
+    'synthetic': False,                # 全部使用合成數據
+    'synthetic_fallback': True,        # 離線且無快取時改用合成數據
+    'optimize_params': False,
+    'save_models': False,
+    'model_dir': DATA_DIRS['models'] / 'batch',
+    'metrics_file': DATA_DIRS['output'] / 'batch_metrics.csv'
+}
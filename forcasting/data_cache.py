@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+OHLCV 本地快取模組
+
+以 Parquet 按股票代碼保存原始日線數據，並在旁邊的 JSON 記錄已涵蓋的日期區間。
+重跑時只下載快取尚未涵蓋的區間；離線模式只讀取快取，無快取時可改用合成數據。
+"""
+
+import os
+import re
+import json
+import zlib
+import logging
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def download_ohlcv(symbol, start_date, end_date):
+    """從 yfinance 下載 [start_date, end_date) 的日線數據"""
+    import yfinance as yf
+
+    data = yf.download(symbol, start=start_date, end=end_date, progress=False)
+    # 處理 yfinance 多層級欄位索引問題
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+    return data
+
+
+def generate_synthetic_ohlcv(symbol, start_date, end_date, seed=None):
+    """以幾何布朗運動生成可重現的合成日線數據（僅交易日）"""
+    dates = pd.bdate_range(start_date, end_date, inclusive='left', name='Date')
+    # 同一股票代碼在不同行程中產生相同序列
+    seed = zlib.crc32(symbol.encode('utf-8')) if seed is None else seed
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    open_ = close * np.exp(rng.normal(0, 0.005, n))
+    spread = np.abs(rng.normal(0, 0.01, n))
+
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread),
+        'Low': np.minimum(open_, close) * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 10_000_000, n)
+    }, index=dates)
+
+
+class OHLCVCache:
+    """OHLCV Parquet 快取，只增量下載缺少的日期區間"""
+
+    def __init__(self, cache_dir, offline=False, synthetic_fallback=False, downloader=None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+        self.synthetic_fallback = synthetic_fallback
+        self.downloader = downloader or download_ohlcv
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _paths(self, symbol):
+        """取得股票代碼對應的數據與涵蓋區間檔案路徑"""
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', symbol.upper())
+        return self.cache_dir / f'{name}.parquet', self.cache_dir / f'{name}.json'
+
+    def load(self, symbol):
+        """讀取快取數據與已涵蓋區間，無快取時返回 (None, None)"""
+        data_path, meta_path = self._paths(symbol)
+        if not data_path.exists() or not meta_path.exists():
+            return None, None
+
+        data = pd.read_parquet(data_path)
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return data, (pd.Timestamp(meta['start']), pd.Timestamp(meta['end']))
+
+    def save(self, symbol, data, coverage):
+        """以原子替換方式寫入快取數據與涵蓋區間"""
+        data_path, meta_path = self._paths(symbol)
+
+        tmp_path = data_path.with_name(data_path.name + '.tmp')
+        data.to_parquet(tmp_path)
+        os.replace(tmp_path, data_path)
+
+        tmp_path = meta_path.with_name(meta_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'symbol': symbol,
+                'start': coverage[0].strftime('%Y-%m-%d'),
+                'end': coverage[1].strftime('%Y-%m-%d'),
+                'rows': len(data),
+                'updated_at': datetime.now().isoformat(timespec='seconds')
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    @staticmethod
+    def missing_ranges(coverage, start, end):
+        """計算 [start, end) 中未涵蓋的區間；與已涵蓋區間相接，使涵蓋範圍保持連續"""
+        if coverage is None:
+            return [(start, end)] if start < end else []
+
+        covered_start, covered_end = coverage
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    @staticmethod
+    def _normalize(data):
+        """統一欄位與索引格式"""
+        data = data.copy()
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        data.index = index.rename('Date')
+        return data
+
+    def get(self, symbol, start_date, end_date):
+        """取得 [start_date, end_date) 的數據，只下載快取缺少的區間"""
+        start = pd.Timestamp(start_date)
+        requested_end = pd.Timestamp(end_date)
+        # 今日及以後的日線尚未收盤，不納入已涵蓋區間
+        end = min(requested_end, pd.Timestamp(date.today()))
+
+        cached, coverage = self.load(symbol)
+        missing = self.missing_ranges(coverage, start, end)
+
+        if missing and self.offline:
+            self.logger.warning(f"{symbol} 離線模式，快取缺少 {self._format_ranges(missing)}，僅使用已快取數據")
+            missing = []
+
+        frames = [cached] if cached is not None else []
+        new_start, new_end = coverage if coverage else (None, None)
+        for range_start, range_end in missing:
+            self.logger.info(f"{symbol} 下載缺少的區間 {self._format_ranges([(range_start, range_end)])}")
+            try:
+                part = self.downloader(symbol, range_start.strftime('%Y-%m-%d'), range_end.strftime('%Y-%m-%d'))
+            except Exception as e:
+                self.logger.warning(f"{symbol} 下載失敗，沿用快取數據: {e}")
+                continue
+            # 空結果可能是下載失敗，不標記為已涵蓋，下次重跑會再嘗試
+            if part is None or part.empty:
+                continue
+            frames.append(self._normalize(part))
+            new_start = range_start if new_start is None else min(new_start, range_start)
+            new_end = range_end if new_end is None else max(new_end, range_end)
+
+        if len(frames) > (1 if cached is not None else 0):
+            data = pd.concat(frames)
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            self.save(symbol, data, (new_start, new_end))
+        elif cached is not None:
+            data = cached
+        else:
+            data = None
+
+        if data is not None:
+            data = data[(data.index >= start) & (data.index < requested_end)].copy()
+
+        if data is None or data.empty:
+            if self.offline and self.synthetic_fallback:
+                self.logger.warning(f"{symbol} 無可用快取，改用合成數據")
+                return generate_synthetic_ohlcv(symbol, start, requested_end)
+            raise ValueError(f"無法獲取 {symbol} 的股票數據")
+
+        return data
+
+    @staticmethod
+    def _format_ranges(ranges):
+        """格式化日期區間供日誌輸出"""
+        return ', '.join(f"{s.strftime('%Y-%m-%d')}~{e.strftime('%Y-%m-%d')}" for s, e in ranges)
@@ -46,13 +46,23 @@ import matplotlib.pyplot as plt
 # 導入自定義模組
 from config import *
 from utils import FeatureEngineer, SentimentSimulator, ModelEvaluator, BacktestAnalyzer, create_target_variable, clean_data, split_time_series
+from data_cache import download_ohlcv
+
+
+def _fit_predict_fold(X, y, train_slice, test_slice, params):
+    """在單一折上訓練並預測測試區間（供 joblib 工作行程調用）"""
+    model = lgb.LGBMClassifier(**params)
+    model.fit(X[train_slice], y[train_slice])
+    return model.predict(X[test_slice]), model.predict_proba(X[test_slice])[:, 1]
 
 
 class StockPredictor:
     """股價預測器主類"""
     
-    def __init__(self, config=None):
+    def __init__(self, config=None, data_cache=None):
         self.config = config or STOCK_CONFIG
+        # 可選的 OHLCVCache，設定後 fetch_data 只下載快取缺少的區間
+        self.data_cache = data_cache
         self.model_config = MODEL_CONFIG
         self.technical_config = TECHNICAL_INDICATORS
         self.feature_config = FEATURE_CONFIG
@@ -96,16 +106,13 @@ class StockPredictor:
         self.logger.info(f"正在獲取 {symbol} 從 {start_date} 到 {end_date} 的數據...")
         
         try:
-            data = yf.download(symbol, start=start_date, end=end_date)
+            if self.data_cache is not None:
+                data = self.data_cache.get(symbol, start_date, end_date)
+            else:
+                data = download_ohlcv(symbol, start_date, end_date)
             if data.empty:
                 raise ValueError("無法獲取股票數據")
             
-            # 處理 yfinance 多層級欄位索引問題
-            if isinstance(data.columns, pd.MultiIndex):
-                # 展平多層級欄位索引，只保留主要欄位名稱
-                data.columns = [col[0] if isinstance(col, tuple) else col for col in data.columns]
-                self.logger.info("已處理多層級欄位索引")
-            
             self.data = data
             self.logger.info(f"成功獲取 {len(data)} 行數據")
             return data
@@ -218,10 +225,10 @@ class StockPredictor:
                 base_model, param_grid, cv=tscv, scoring='accuracy', n_jobs=-1
             )
             
-            # 為了節省時間，使用部分數據進行網格搜索
+            # 為了節省時間，使用最近的部分數據進行網格搜索，保持時間順序以配合 TimeSeriesSplit
             sample_size = min(2000, len(X_train))
-            X_sample = X_train.sample(n=sample_size, random_state=42)
-            y_sample = y_train.loc[X_sample.index]
+            X_sample = X_train.iloc[-sample_size:]
+            y_sample = y_train.iloc[-sample_size:]
             
             grid_search.fit(X_sample, y_sample)
             
@@ -281,7 +288,7 @@ class StockPredictor:
         
         return results
     
-    def run_backtest(self, split_date=None, save_results=True):
+    def run_backtest(self, split_date=None, save_results=True, save_plots=True):
         """運行回測"""
         if self.model is None:
             raise ValueError("請先訓練模型")
@@ -324,10 +331,11 @@ class StockPredictor:
         self.logger.info(f"勝率: {metrics['win_rate']:.4f}")
         
         # 繪製回測結果
-        self.backtest_analyzer.plot_backtest_results(
-            backtest_df, 
-            save_path=DATA_DIRS['output'] / 'backtest_results.png'
-        )
+        if save_plots:
+            self.backtest_analyzer.plot_backtest_results(
+                backtest_df, 
+                save_path=DATA_DIRS['output'] / 'backtest_results.png'
+            )
         
         # 保存結果
         if save_results:
@@ -339,6 +347,113 @@ class StockPredictor:
         
         return backtest_df, metrics
     
+    def run_walk_forward(self, save_results=True, **overrides):
+        """運行滾動前進（walk-forward）回測
+        
+        每一折以測試區間之前的數據重新訓練（max_train_size 為 None 時為擴張視窗），
+        在其後的 test_size 行上預測並以 BacktestAnalyzer 計算該折績效。
+        各折以 joblib 並行訓練，特徵矩陣只建立一次並以記憶體映射共享給工作行程；
+        warm_start=True 時改為依序訓練，每折以前一折模型為起點，只在新增的行上追加樹。
+        
+        返回 (各折指標 DataFrame, 全部測試區間拼接後的整體指標, 逐日回測結果)
+        """
+        if self.features is None:
+            raise ValueError("請先準備特徵")
+        
+        wf_config = dict(WALK_FORWARD_CONFIG, **overrides)
+        self.logger.info(f"開始滾動前進回測: {wf_config['n_splits']} 折，每折測試 {wf_config['test_size']} 行")
+        
+        # 所有折共用同一個連續矩陣，各折以切片（視圖）取得訓練與測試區間
+        X = self.features.to_numpy(dtype=np.float64)
+        y = self.target.to_numpy()
+        splitter = TimeSeriesSplit(
+            n_splits=wf_config['n_splits'],
+            test_size=wf_config['test_size'],
+            max_train_size=wf_config['max_train_size'],
+            gap=wf_config['gap']
+        )
+        folds = [
+            (slice(train[0], train[-1] + 1), slice(test[0], test[-1] + 1))
+            for train, test in splitter.split(X)
+        ]
+        
+        params = dict(self.model_config['lightgbm_params'], n_jobs=wf_config['model_threads'])
+        if wf_config['warm_start']:
+            outputs = self._walk_forward_warm_start(X, y, folds, params, wf_config['warm_start_estimators'])
+        else:
+            # 超過 max_nbytes 的陣列由 joblib 轉為唯讀記憶體映射，工作行程不另行複製
+            outputs = joblib.Parallel(n_jobs=wf_config['n_jobs'], max_nbytes='1M', mmap_mode='r')(
+                joblib.delayed(_fit_predict_fold)(X, y, train, test, params) for train, test in folds
+            )
+        
+        daily_returns = self.data['Close'].pct_change()
+        index = self.data.index
+        fold_rows = []
+        fold_results = []
+        for fold, ((train, test), (predictions, probabilities)) in enumerate(zip(folds, outputs), 1):
+            backtest_df = self.backtest_analyzer.calculate_returns(
+                self.data.iloc[test][['Close']], predictions, daily_returns.iloc[test]
+            )
+            backtest_df['Predicted_Proba'] = probabilities
+            backtest_df['Fold'] = fold
+            metrics = self.backtest_analyzer.calculate_metrics(
+                backtest_df['Strategy_Return'].fillna(0), backtest_df['Daily_Return']
+            )
+            
+            fold_rows.append({
+                'fold': fold,
+                'train_start': index[train.start],
+                'train_end': index[train.stop - 1],
+                'test_start': index[test.start],
+                'test_end': index[test.stop - 1],
+                'train_rows': train.stop - train.start,
+                'test_rows': test.stop - test.start,
+                'accuracy': accuracy_score(y[test], predictions),
+                **metrics
+            })
+            fold_results.append(backtest_df)
+            self.logger.info(
+                f"第 {fold} 折 {index[test.start]:%Y-%m-%d}~{index[test.stop - 1]:%Y-%m-%d}: "
+                f"準確率 {fold_rows[-1]['accuracy']:.4f}，夏普比率 {metrics['sharpe_ratio']:.4f}"
+            )
+        
+        fold_metrics = pd.DataFrame(fold_rows)
+        oos_results = pd.concat(fold_results)
+        overall_metrics = self.backtest_analyzer.calculate_metrics(
+            oos_results['Strategy_Return'].fillna(0), oos_results['Daily_Return']
+        )
+        self.logger.info(f"滾動前進整體策略總收益: {overall_metrics['total_strategy_return']:.4f}")
+        self.logger.info(f"滾動前進整體夏普比率: {overall_metrics['sharpe_ratio']:.4f}")
+        
+        if save_results:
+            oos_results.to_csv(FILE_PATHS['walk_forward_results'])
+            fold_metrics.to_csv(FILE_PATHS['walk_forward_metrics'], index=False)
+        
+        return fold_metrics, overall_metrics, oos_results
+    
+    def _walk_forward_warm_start(self, X, y, folds, params, extra_estimators):
+        """依序訓練各折：第一折完整訓練，之後以前一折的模型為起點只用新增的行追加樹"""
+        outputs = []
+        model = None
+        trained_until = None
+        
+        for train, test in folds:
+            new_rows = slice(trained_until, train.stop) if model is not None else None
+            
+            # 新增的行只有單一類別時無法追加訓練，改為在整個訓練區間重新訓練
+            if new_rows is None or len(np.unique(y[new_rows])) < 2:
+                model = lgb.LGBMClassifier(**params)
+                model.fit(X[train], y[train])
+            else:
+                booster = model.booster_
+                model = lgb.LGBMClassifier(**dict(params, n_estimators=extra_estimators))
+                model.fit(X[new_rows], y[new_rows], init_model=booster)
+            trained_until = train.stop
+            
+            outputs.append((model.predict(X[test]), model.predict_proba(X[test])[:, 1]))
+        
+        return outputs
+    
     def predict_future(self, periods=1):
         """預測未來趨勢"""
         if self.model is None:
@@ -361,18 +476,21 @@ class StockPredictor:
         
         return results
     
-    def save_model(self):
+    def save_model(self, model_path=None, features_path=None):
         """保存模型"""
         if self.model is None:
             raise ValueError("沒有訓練好的模型可保存")
         
+        model_path = model_path or FILE_PATHS['model']
+        features_path = features_path or FILE_PATHS['features']
+        
         # 保存模型
-        joblib.dump(self.model, FILE_PATHS['model'])
+        joblib.dump(self.model, model_path)
         
         # 保存特徵名稱
-        joblib.dump(self.features.columns.tolist(), FILE_PATHS['features'])
+        joblib.dump(self.features.columns.tolist(), features_path)
         
-        self.logger.info(f"模型已保存至 {FILE_PATHS['model']}")
+        self.logger.info(f"模型已保存至 {model_path}")
         
     def load_model(self):
         """加載模型"""
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+批次執行與 OHLCV 快取測試
+
+以合成數據與模擬下載函數測試增量下載、離線模式與批次彙整
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import importlib.util
+import pandas as pd
+
+# 添加項目路徑
+sys.path.append(os.path.dirname(__file__))
+
+from data_cache import OHLCVCache, generate_synthetic_ohlcv
+from batch_runner import BatchRunner, METRIC_COLUMNS
+
+
+class FakeDownloader:
+    """模擬下載函數，記錄每次請求的日期區間"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbol, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        return generate_synthetic_ohlcv(symbol, start_date, end_date)
+
+
+class TestOHLCVCache(unittest.TestCase):
+    """測試 OHLCV Parquet 快取"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.downloader = FakeDownloader()
+        self.cache = OHLCVCache(self.tmp_dir.name, downloader=self.downloader)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_incremental_fetch(self):
+        """測試重跑時只下載缺少的區間"""
+        first = self.cache.get('AAPL', '2020-01-01', '2021-01-01')
+        self.assertEqual(self.downloader.calls, [('2020-01-01', '2021-01-01')])
+
+        second = self.cache.get('AAPL', '2019-07-01', '2021-07-01')
+        self.assertEqual(self.downloader.calls[1:], [
+            ('2019-07-01', '2020-01-01'),
+            ('2021-01-01', '2021-07-01')
+        ])
+        self.assertTrue(second.index.is_monotonic_increasing)
+        self.assertFalse(second.index.duplicated().any())
+        self.assertGreater(len(second), len(first))
+
+        self.cache.get('AAPL', '2020-03-01', '2021-03-01')
+        self.assertEqual(len(self.downloader.calls), 3)
+
+    def test_offline_uses_cache_only(self):
+        """測試離線模式不下載，缺少快取時改用合成數據"""
+        self.cache.get('MSFT', '2020-01-01', '2021-01-01')
+        offline = OHLCVCache(self.tmp_dir.name, offline=True, downloader=self.downloader)
+
+        data = offline.get('MSFT', '2019-01-01', '2022-01-01')
+        self.assertEqual(len(self.downloader.calls), 1)
+        self.assertEqual(data.index.min(), pd.Timestamp('2020-01-01'))
+
+        with self.assertRaises(ValueError):
+            offline.get('NVDA', '2020-01-01', '2021-01-01')
+
+        offline.synthetic_fallback = True
+        synthetic = offline.get('NVDA', '2020-01-01', '2021-01-01')
+        self.assertEqual(len(synthetic), len(pd.bdate_range('2020-01-01', '2020-12-31')))
+
+
+class TestBatchRunner(unittest.TestCase):
+    """測試多股票批次執行"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {
+            'max_workers': 2,
+            'cache_dir': os.path.join(self.tmp_dir.name, 'cache'),
+            'metrics_file': os.path.join(self.tmp_dir.name, 'metrics.csv'),
+            'start_date': '2020-01-01',
+            'end_date': '2024-01-01',
+            'split_date': '2023-01-01'
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_failures_are_isolated(self):
+        """測試單一股票失敗只記錄在該列，彙整表仍完整寫出"""
+        config = dict(self.config, offline=True, synthetic_fallback=False)
+        table = BatchRunner(['aapl', 'MSFT', 'AAPL'], config=config).run()
+
+        self.assertEqual(list(table['symbol']), ['AAPL', 'MSFT'])
+        self.assertEqual(list(table.columns), METRIC_COLUMNS)
+        self.assertTrue((table['status'] == 'error').all())
+        self.assertTrue(os.path.exists(self.config['metrics_file']))
+
+    @unittest.skipUnless(importlib.util.find_spec('lightgbm'), "需要 LightGBM")
+    def test_synthetic_batch(self):
+        """測試以合成數據離線執行完整流程"""
+        config = dict(self.config, synthetic=True)
+        table = BatchRunner(['AAPL', 'MSFT', 'TSLA'], config=config).run()
+
+        self.assertTrue((table['status'] == 'ok').all(), table['error'].tolist())
+        self.assertTrue(table['accuracy'].between(0, 1).all())
+        saved = pd.read_csv(self.config['metrics_file'])
+        self.assertEqual(len(saved), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,7 +18,7 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.dirname(__file__))
 
 from stock_predictor import StockPredictor
-from utils import FeatureEngineer, SentimentSimulator, ModelEvaluator, BacktestAnalyzer
+from utils import FeatureEngineer, IncrementalFeatureEngine, SentimentSimulator, ModelEvaluator, BacktestAnalyzer
 from config import STOCK_CONFIG, MODEL_CONFIG, TECHNICAL_INDICATORS
 
 
@@ -105,6 +105,42 @@ class TestFeatureEngineer(unittest.TestCase):
         self.assertTrue((result['DayOfWeek'] >= 0).all() and (result['DayOfWeek'] <= 6).all())
         self.assertTrue((result['Month'] >= 1).all() and (result['Month'] <= 12).all())
         self.assertTrue((result['Quarter'] >= 1).all() and (result['Quarter'] <= 4).all())
+    
+    def test_vectorized_matches_pandas(self):
+        """測試向量化特徵與逐欄 pandas 計算結果一致（含缺失值）"""
+        df = self.test_data.copy()
+        df.iloc[50, df.columns.get_loc('Close')] = np.nan
+        
+        expected = df.copy()
+        for col in ['Close', 'Volume']:
+            for lag in [1, 5]:
+                expected[f'{col}_Lag{lag}'] = expected[col].shift(lag)
+        for col in ['Close', 'Volume']:
+            for window in [5, 20]:
+                expected[f'{col}_MA{window}'] = expected[col].rolling(window).mean()
+                expected[f'{col}_STD{window}'] = expected[col].rolling(window).std()
+                expected[f'{col}_MIN{window}'] = expected[col].rolling(window).min()
+                expected[f'{col}_MAX{window}'] = expected[col].rolling(window).max()
+        
+        result = self.feature_engineer.create_lag_features(df, ['Close', 'Volume'], [1, 5])
+        result = self.feature_engineer.create_rolling_features(result, ['Close', 'Volume'], [5, 20])
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_incremental_update(self):
+        """測試增量更新只計算新行，且與一次性計算結果一致"""
+        columns = ['Close', 'Volume']
+        engine = IncrementalFeatureEngine(columns, [1, 2, 3], columns, [5, 10])
+        
+        engine.fit(self.test_data.iloc[:-10])
+        new_features = engine.update(self.test_data.iloc[-10:-3])
+        engine.update(self.test_data.iloc[-3:])
+        
+        expected = self.feature_engineer.create_lag_features(self.test_data.copy(), columns, [1, 2, 3])
+        expected = self.feature_engineer.create_rolling_features(expected, columns, [5, 10])
+        
+        self.assertEqual(len(new_features), 7)
+        pd.testing.assert_frame_equal(engine.data, expected)
 
 
 class TestSentimentSimulator(unittest.TestCase):
@@ -258,6 +294,35 @@ class TestStockPredictor(unittest.TestCase):
         self.assertIn('Feature1', features.columns)
         self.assertIn('Feature2', features.columns)
         self.assertEqual(len(target), len(test_data))
+    
+    def test_walk_forward(self):
+        """測試滾動前進回測的分折與各折指標"""
+        np.random.seed(42)
+        dates = pd.bdate_range('2020-01-01', periods=600)
+        close = 100 * np.exp(np.random.normal(0, 0.01, len(dates)).cumsum())
+        test_data = pd.DataFrame({
+            'Close': close,
+            'Feature1': np.random.randn(len(dates)),
+            'Feature2': np.random.randn(len(dates)),
+        }, index=dates)
+        test_data['Target'] = (test_data['Close'].shift(-1) > test_data['Close']).astype(int)
+        
+        self.predictor.data = test_data
+        self.predictor.prepare_features()
+        
+        for warm_start in (False, True):
+            fold_metrics, overall, results = self.predictor.run_walk_forward(
+                save_results=False, n_splits=3, test_size=100, n_jobs=2, warm_start=warm_start
+            )
+            
+            self.assertEqual(list(fold_metrics['fold']), [1, 2, 3])
+            self.assertEqual(list(fold_metrics['train_rows']), [300, 400, 500])
+            self.assertTrue((fold_metrics['train_end'] < fold_metrics['test_start']).all())
+            self.assertTrue(fold_metrics['accuracy'].between(0, 1).all())
+            self.assertIn('sharpe_ratio', fold_metrics.columns)
+            self.assertIn('total_strategy_return', overall)
+            self.assertEqual(len(results), 300)
+            self.assertTrue(results.index.is_monotonic_increasing)
 
 
 class TestIntegration(unittest.TestCase):
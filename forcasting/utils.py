@@ -7,6 +7,7 @@
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score, roc_curve
@@ -16,6 +17,59 @@ import warnings
 warnings.filterwarnings('ignore')
 
 
+def _shift(values, periods):
+    """與 Series.shift 相同的 NumPy 位移，空出的位置補 NaN"""
+    result = np.full(len(values), np.nan)
+    if periods == 0:
+        result[:] = values
+    elif periods > 0:
+        result[periods:] = values[:-periods]
+    else:
+        result[:periods] = values[-periods:]
+    return result
+
+
+def lag_feature_block(df, columns, lag_periods):
+    """一次計算所有滯後特徵，返回 {欄位名: ndarray}，欄位順序與逐欄建立時相同"""
+    block = {}
+    for col in columns:
+        values = df[col].to_numpy(dtype='float64')
+        for lag in lag_periods:
+            block[f'{col}_Lag{lag}'] = _shift(values, lag)
+    return block
+
+
+def rolling_feature_block(df, columns, windows):
+    """以 NumPy 跨步視窗一次計算所有滾動均值、標準差、最小值與最大值"""
+    block = {}
+    n = len(df)
+    for col in columns:
+        values = df[col].to_numpy(dtype='float64')
+        for window in windows:
+            stats = {name: np.full(n, np.nan) for name in ('MA', 'STD', 'MIN', 'MAX')}
+            if 0 < window <= n:
+                # (n - window + 1, window) 的唯讀視圖，不複製數據
+                view = sliding_window_view(values, window)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    stats['MA'][window - 1:] = view.mean(axis=1)
+                    stats['STD'][window - 1:] = view.std(axis=1, ddof=1)
+                stats['MIN'][window - 1:] = view.min(axis=1)
+                stats['MAX'][window - 1:] = view.max(axis=1)
+            for name in ('MA', 'STD', 'MIN', 'MAX'):
+                block[f'{col}_{name}{window}'] = stats[name]
+    return block
+
+
+def append_feature_block(df, block):
+    """將特徵一次合併到 DataFrame，避免逐欄插入造成碎片化"""
+    if not block:
+        return df
+    existing = [col for col in block if col in df.columns]
+    if existing:
+        df = df.drop(columns=existing)
+    return pd.concat([df, pd.DataFrame(block, index=df.index)], axis=1)
+
+
 class FeatureEngineer:
     """特徵工程類"""
     
@@ -24,20 +78,11 @@ class FeatureEngineer:
         
     def create_lag_features(self, df, columns, lag_periods):
         """創建滯後特徵"""
-        for col in columns:
-            for lag in lag_periods:
-                df[f'{col}_Lag{lag}'] = df[col].shift(lag)
-        return df
+        return append_feature_block(df, lag_feature_block(df, columns, lag_periods))
     
     def create_rolling_features(self, df, columns, windows):
         """創建滾動統計特徵"""
-        for col in columns:
-            for window in windows:
-                df[f'{col}_MA{window}'] = df[col].rolling(window=window).mean()
-                df[f'{col}_STD{window}'] = df[col].rolling(window=window).std()
-                df[f'{col}_MIN{window}'] = df[col].rolling(window=window).min()
-                df[f'{col}_MAX{window}'] = df[col].rolling(window=window).max()
-        return df
+        return append_feature_block(df, rolling_feature_block(df, columns, windows))
     
     def create_technical_indicators(self, df):
         """創建技術指標"""
@@ -104,6 +149,60 @@ class FeatureEngineer:
         return df
 
 
+class IncrementalFeatureEngine:
+    """增量特徵引擎
+    
+    fit 時以向量化方式計算全部滯後與滾動特徵；之後每次 update 只保留
+    計算所需的最近歷史，為新到達的行計算特徵並附加到結果中。
+    """
+    
+    def __init__(self, lag_columns, lag_periods, rolling_columns, rolling_windows):
+        self.lag_columns = list(lag_columns)
+        self.lag_periods = list(lag_periods)
+        self.rolling_columns = list(rolling_columns)
+        self.rolling_windows = list(rolling_windows)
+        
+        # 計算新行特徵需要的歷史行數
+        self.history_size = max(
+            max((abs(lag) for lag in self.lag_periods), default=0),
+            max((window - 1 for window in self.rolling_windows), default=0)
+        )
+        self.source_columns = list(dict.fromkeys(self.lag_columns + self.rolling_columns))
+        self.history = None
+        self.data = None
+        
+    def _features(self, df):
+        """計算 df 所有行的特徵區塊"""
+        block = lag_feature_block(df, self.lag_columns, self.lag_periods)
+        block.update(rolling_feature_block(df, self.rolling_columns, self.rolling_windows))
+        return block
+    
+    def fit(self, df):
+        """以完整歷史數據計算特徵並建立滾動狀態"""
+        self.data = append_feature_block(df, self._features(df))
+        self.history = df[self.source_columns].iloc[max(0, len(df) - self.history_size):]
+        return self.data
+    
+    def update(self, new_rows):
+        """只為新行計算特徵，附加到累積結果並返回新行的特徵"""
+        if self.history is None:
+            raise ValueError("請先呼叫 fit 建立歷史數據")
+        if any(lag < 0 for lag in self.lag_periods):
+            raise ValueError("增量模式不支援負的滯後期（需要未來數據）")
+        if new_rows.empty:
+            return append_feature_block(new_rows, self._features(new_rows))
+        
+        window = pd.concat([self.history, new_rows[self.source_columns]])
+        block = self._features(window)
+        # 只取新行對應的部分
+        block = {name: values[-len(new_rows):] for name, values in block.items()}
+        result = append_feature_block(new_rows, block)
+        
+        self.history = window.iloc[max(0, len(window) - self.history_size):]
+        self.data = pd.concat([self.data, result])
+        return result
+
+
 class SentimentSimulator:
     """情緒模擬器"""
     
@@ -10,11 +10,16 @@
 import os
 import time
 import json
+import atexit
+import weakref
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Union, List
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Union, List, Deque, Tuple
 from datetime import datetime
 from .config import StorageConfig
+from .serializers import Serializer, detect_format, get_serializer, split_extension
 from .exceptions import (
     PersistenceError,
     StorageError,
@@ -23,9 +28,23 @@ from .exceptions import (
     NotFoundError
 )
 
+
+def _close_at_exit(handler_ref: "weakref.ReferenceType[StorageHandler]") -> None:
+    """程式結束時寫出尚未落盤的延遲寫入"""
+    handler = handler_ref()
+    if handler is not None:
+        try:
+            handler.close()
+        except Exception:
+            pass
+
+
 class StorageHandler(ABC):
     """存儲處理器基類"""
     
+    # 是否支援 write_behind；支援的處理器需實作 _write_record 供背景執行緒呼叫
+    supports_write_behind: bool = False
+    
     def __init__(self, config: Union[Dict[str, Any], StorageConfig]):
         """
         初始化存儲處理器
@@ -42,8 +61,33 @@ class StorageHandler(ABC):
         # 設置日誌
         self._setup_logging()
         
+        if getattr(self.config, 'write_behind', False) and not self.supports_write_behind:
+            raise ConfigError(f"{self.__class__.__name__} 不支援延遲寫入 (write_behind)")
+        
+        # 備份索引：(備份目錄, 文件名) -> 依建立順序排列的備份文件
+        self._backup_index: Dict[Tuple[str, str], Deque[str]] = {}
+        self._backup_lock = threading.Lock()
+        
+        # 延遲寫入狀態
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, Any] = {}
+        self._flush_waiters = 0
+        self._write_cond = threading.Condition()
+        self._write_errors: List[Tuple[str, str]] = []
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        
         # 初始化存儲
         self._initialize()
+        
+        if getattr(self.config, 'write_behind', False):
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                name=f'{self.__class__.__name__}-writer',
+                daemon=True
+            )
+            self._writer.start()
+            atexit.register(_close_at_exit, weakref.ref(self))
     
     def _setup_logging(self) -> None:
         """設置日誌"""
@@ -125,26 +169,101 @@ class StorageHandler(ABC):
             )
             os.makedirs(backup_dir, exist_ok=True)
             
-            # 生成備份文件名
+            # 生成備份文件名：時間戳置於副檔名之前，保留格式與壓縮副檔名
+            stem, ext = split_extension(os.path.basename(path))
             backup_file = os.path.join(
                 backup_dir,
-                f"{os.path.basename(path)}.{int(time.time())}"
+                f"{stem}.{int(time.time())}{ext}"
             )
             
-            # 保存備份
-            self._save_to_file(data, backup_file)
+            # 保存備份（格式依原路徑判斷）
+            self._save_to_file(data, backup_file, format_path=path)
             
-            # 清理舊備份
+            # 記錄備份並清理舊備份
+            self._register_backup(backup_dir, path, backup_file)
             self._cleanup_backups(path)
             
             self.logger.info(f"數據已備份到: {backup_file}")
         except Exception as e:
             self.logger.error(f"備份數據失敗: {str(e)}")
     
+    def _backup_entries(self, backup_dir: str, path: str) -> Deque[str]:
+        """
+        取得路徑的備份索引
+        
+        每個備份目錄與文件名只在第一次使用時掃描一次目錄，
+        以納入先前執行留下的備份，之後完全由記憶體索引維護。
+        須在持有 _backup_lock 時呼叫。
+        
+        Args:
+            backup_dir: 備份目錄
+            path: 數據路徑
+            
+        Returns:
+            Deque[str]: 依建立順序排列的備份文件
+        """
+        name = os.path.basename(path)
+        key = (backup_dir, name)
+        entries = self._backup_index.get(key)
+        if entries is None:
+            existing = []
+            stem, ext = split_extension(name)
+            if os.path.isdir(backup_dir):
+                for file in os.listdir(backup_dir):
+                    if self._is_backup_of(file, name, stem, ext):
+                        existing.append(os.path.join(backup_dir, file))
+            existing.sort(key=lambda x: os.path.getmtime(x))
+            entries = deque(existing)
+            self._backup_index = {
+                k: v for k, v in self._backup_index.items() if k[0] == backup_dir
+            }
+            self._backup_index[key] = entries
+        return entries
+    
+    @staticmethod
+    def _is_backup_of(file: str, name: str, stem: str, ext: str) -> bool:
+        """
+        判斷文件是否為指定文件名的備份
+        
+        備份命名為 {主檔名}.{時間戳}{副檔名}，同時相容舊版的 {文件名}.{時間戳}。
+        
+        Args:
+            file: 備份目錄中的文件名
+            name: 數據文件名
+            stem: 數據文件主檔名
+            ext: 數據文件副檔名
+            
+        Returns:
+            bool: 是否為備份文件
+        """
+        if file.startswith(f"{stem}.") and file.endswith(ext):
+            timestamp = file[len(stem) + 1:len(file) - len(ext)]
+            if timestamp.isdigit():
+                return True
+        legacy = f"{name}."
+        return file.startswith(legacy) and file[len(legacy):].isdigit()
+    
+    def _register_backup(self, backup_dir: str, path: str, backup_file: str) -> None:
+        """
+        將新備份加入索引
+        
+        Args:
+            backup_dir: 備份目錄
+            path: 數據路徑
+            backup_file: 備份文件路徑
+        """
+        with self._backup_lock:
+            entries = self._backup_entries(backup_dir, path)
+            # 同一秒內的備份會覆寫同名文件，不重複記錄
+            if not entries or entries[-1] != backup_file:
+                entries.append(backup_file)
+    
     def _cleanup_backups(self, path: str) -> None:
         """
         清理舊備份
         
+        依記憶體索引輪替，不需在每次保存時重新列出並排序備份目錄。
+        
         Args:
             path: 數據路徑
         """
@@ -158,42 +277,102 @@ class StorageHandler(ABC):
                 datetime.now().strftime('%Y%m%d')
             )
             
-            # 獲取所有備份文件
-            backup_files = []
-            for file in os.listdir(backup_dir):
-                if file.startswith(os.path.basename(path)):
-                    backup_files.append(os.path.join(backup_dir, file))
-            
-            # 按修改時間排序
-            backup_files.sort(key=lambda x: os.path.getmtime(x))
-            
             # 刪除多餘的備份
-            while len(backup_files) > self.config.max_backups:
-                os.remove(backup_files.pop(0))
+            with self._backup_lock:
+                entries = self._backup_entries(backup_dir, path)
+                while len(entries) > self.config.max_backups:
+                    stale = entries.popleft()
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
         except Exception as e:
             self.logger.error(f"清理舊備份失敗: {str(e)}")
     
-    def _save_to_file(self, data: Any, path: str) -> None:
+    def _serializer_for(self, path: str) -> Serializer:
+        """
+        依配置與副檔名選擇序列化器
+        
+        啟用 auto_format 時依副檔名判斷格式（例如 .parquet、.msgpack.zst），
+        無法判斷時使用配置的 format 與 compression。
+        
+        Args:
+            path: 文件路徑
+            
+        Returns:
+            Serializer: 序列化器
+        """
+        name = getattr(self.config, 'format', 'json')
+        compression = None
+        if getattr(self.config, 'auto_format', True):
+            name, compression = detect_format(path, name)
+        
+        return get_serializer(
+            name,
+            compression=compression or getattr(self.config, 'compression', None),
+            compression_level=getattr(self.config, 'compression_level', None),
+            memory_map=getattr(self.config, 'memory_map', True),
+            encoding=self.config.encoding,
+            indent=getattr(self.config, 'json_indent', 2)
+        )
+    
+    def _save_to_file(self, data: Any, path: str, format_path: Optional[str] = None) -> None:
         """
         保存數據到文件
         
         Args:
             data: 要保存的數據
             path: 文件路徑
+            format_path: 用於判斷格式的路徑，None 表示使用 path
         """
         try:
             # 確保目錄存在
             os.makedirs(os.path.dirname(path), exist_ok=True)
             
             # 根據格式保存數據
-            if self.config.format == 'json':
-                with open(path, 'w', encoding=self.config.encoding) as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            else:
-                raise StorageError(f"不支援的數據格式: {self.config.format}")
+            serializer = self._serializer_for(format_path or path)
+            self._write_file(path, lambda f: serializer.dump(data, f))
         except Exception as e:
             raise StorageError(f"保存數據失敗: {str(e)}")
     
+    def _write_file(self, path: str, writer) -> None:
+        """
+        依持久性設定寫入文件
+        
+        - none: 直接覆寫，由作業系統決定何時落盤
+        - atomic: 寫入暫存文件後原子替換，不會留下寫到一半的文件
+        - fsync: 同 atomic，並在替換前後同步文件與目錄到磁碟
+        
+        Args:
+            path: 文件路徑
+            writer: 接收已開啟二進位文件對象並寫入內容的函數
+        """
+        durability = getattr(self.config, 'durability', 'none')
+        if durability == 'none':
+            with open(path, 'wb') as f:
+                writer(f)
+            return
+        
+        tmp_path = f"{path}.tmp{threading.get_ident()}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                writer(f)
+                if durability == 'fsync':
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        if durability == 'fsync' and hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    
     def _load_from_file(self, path: str) -> Any:
         """
         從文件加載數據
@@ -213,11 +392,7 @@ class StorageHandler(ABC):
         
         try:
             # 根據格式加載數據
-            if self.config.format == 'json':
-                with open(path, 'r', encoding=self.config.encoding) as f:
-                    return json.load(f)
-            else:
-                raise StorageError(f"不支援的數據格式: {self.config.format}")
+            return self._serializer_for(path).load(path)
         except Exception as e:
             raise StorageError(f"加載數據失敗: {str(e)}")
     
@@ -279,4 +454,195 @@ class StorageHandler(ABC):
         Returns:
             List[str]: 數據路徑列表
         """
-        pass 
\ No newline at end of file
+        pass
+    
+    @property
+    def write_behind(self) -> bool:
+        """是否啟用延遲寫入"""
+        return self._writer is not None
+    
+    def _enqueue_write(self, data: Any, path: str) -> None:
+        """
+        將寫入加入延遲佇列
+        
+        同一路徑尚未寫出前的多次保存會合併為最後一次；
+        佇列達到 write_queue_size 時阻塞呼叫者直到背景執行緒消化。
+        
+        Args:
+            data: 要保存的數據
+            path: 數據路徑
+            
+        Raises:
+            StorageError: 處理器已關閉
+        """
+        with self._write_cond:
+            if self._closed:
+                raise StorageError("存儲處理器已關閉")
+            if path not in self._pending:
+                self._write_cond.wait_for(
+                    lambda: len(self._pending) < self.config.write_queue_size or self._closed
+                )
+                if self._closed:
+                    raise StorageError("存儲處理器已關閉")
+            self._pending[path] = data
+            self._write_cond.notify_all()
+    
+    def _pending_lookup(self, path: str) -> Tuple[bool, Any]:
+        """
+        查詢尚未寫出的數據，提供讀取自己寫入的一致性
+        
+        Args:
+            path: 數據路徑
+            
+        Returns:
+            Tuple[bool, Any]: (是否存在, 數據)
+        """
+        if self._writer is None:
+            return False, None
+        with self._write_cond:
+            if path in self._pending:
+                return True, self._pending[path]
+            if path in self._inflight:
+                return True, self._inflight[path]
+        return False, None
+    
+    def _pending_paths(self) -> List[str]:
+        """
+        取得尚未寫出的數據路徑
+        
+        Returns:
+            List[str]: 數據路徑列表
+        """
+        if self._writer is None:
+            return []
+        with self._write_cond:
+            return list(self._pending) + [p for p in self._inflight if p not in self._pending]
+    
+    def _discard_pending(self, path: str) -> bool:
+        """
+        取消尚未寫出的數據，並等待正在寫入的同路徑數據完成
+        
+        Args:
+            path: 數據路徑
+            
+        Returns:
+            bool: 是否有被取消或正在寫入的數據
+        """
+        if self._writer is None:
+            return False
+        with self._write_cond:
+            found = path in self._pending or path in self._inflight
+            self._pending.pop(path, None)
+            self._write_cond.wait_for(lambda: path not in self._inflight)
+            self._write_cond.notify_all()
+        return found
+    
+    def _wait_written(self, path: str) -> None:
+        """
+        等待指定路徑的延遲寫入落盤
+        
+        Args:
+            path: 數據路徑
+        """
+        if self._writer is None:
+            return
+        with self._write_cond:
+            if path not in self._pending and path not in self._inflight:
+                return
+            self._flush_waiters += 1
+            self._write_cond.notify_all()
+            try:
+                self._write_cond.wait_for(
+                    lambda: path not in self._pending and path not in self._inflight
+                )
+            finally:
+                self._flush_waiters -= 1
+    
+    def _write_loop(self) -> None:
+        """背景寫入執行緒：累積到批次大小或 flush_interval 後批次寫出"""
+        batch_size = max(1, self.config.write_batch_size)
+        interval = self.config.flush_interval
+        
+        while True:
+            with self._write_cond:
+                self._write_cond.wait_for(lambda: self._pending or self._closed)
+                deadline = time.monotonic() + interval
+                while (len(self._pending) < batch_size
+                       and not self._flush_waiters
+                       and not self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._write_cond.wait(remaining)
+                
+                if not self._pending:
+                    if self._closed:
+                        return
+                    continue
+                
+                batch = []
+                while self._pending and len(batch) < batch_size:
+                    path, data = self._pending.popitem(last=False)
+                    self._inflight[path] = data
+                    batch.append((path, data))
+                # 喚醒等待佇列空間的呼叫者
+                self._write_cond.notify_all()
+            
+            for path, data in batch:
+                try:
+                    self._write_record(data, path)
+                except Exception as e:
+                    self.logger.error(f"延遲寫入失敗 {path}: {str(e)}")
+                    with self._write_cond:
+                        self._write_errors.append((path, str(e)))
+            
+            with self._write_cond:
+                for path, _ in batch:
+                    self._inflight.pop(path, None)
+                self._write_cond.notify_all()
+            
+            self.logger.debug(f"已批次寫入 {len(batch)} 筆數據")
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        等待所有延遲寫入落盤
+        
+        Args:
+            timeout: 最長等待秒數，None 表示一直等待
+            
+        Raises:
+            StorageError: 等待逾時或有寫入失敗
+        """
+        if self._writer is None:
+            return
+        
+        with self._write_cond:
+            self._flush_waiters += 1
+            self._write_cond.notify_all()
+            try:
+                done = self._write_cond.wait_for(
+                    lambda: not self._pending and not self._inflight,
+                    timeout
+                )
+            finally:
+                self._flush_waiters -= 1
+            errors, self._write_errors = self._write_errors, []
+        
+        if not done:
+            raise StorageError("等待延遲寫入完成逾時")
+        if errors:
+            path, message = errors[0]
+            raise StorageError(f"{len(errors)} 筆延遲寫入失敗，首筆 {path}: {message}")
+    
+    def close(self) -> None:
+        """寫出所有延遲寫入並停止背景執行緒"""
+        if self._writer is None or self._closed:
+            return
+        
+        try:
+            self.flush()
+        finally:
+            with self._write_cond:
+                self._closed = True
+                self._write_cond.notify_all()
+            self._writer.join()
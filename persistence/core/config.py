@@ -11,6 +11,7 @@ import os
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional, List
 from .exceptions import ConfigError
+from .serializers import available_formats
 
 @dataclass
 class BaseConfig:
@@ -135,6 +136,24 @@ class LocalStorageConfig(StorageConfig):
     file_extension: str = '.json'  # 文件擴展名
     encoding: str = 'utf-8'  # 文件編碼
     create_dir: bool = True  # 是否自動創建目錄
+    format: str = 'json'  # 數據格式：json / orjson / msgpack / parquet / arrow
+    auto_format: bool = True  # 是否依副檔名選擇格式
+    compression: Optional[str] = None  # 壓縮格式：gzip / zstd
+    compression_level: Optional[int] = None  # 壓縮等級
+    memory_map: bool = True  # 載入時是否使用記憶體映射
+    json_indent: Optional[int] = 2  # JSON 縮排，None 表示緊湊輸出
+    
+    # 處理器配置
+    enable_logging: bool = True  # 是否啟用日誌
+    validate_data: bool = True  # 是否驗證數據
+    schema: Optional[Dict[str, Any]] = None  # 數據結構定義
+    
+    # 延遲寫入配置
+    write_behind: bool = False  # 是否啟用延遲批次寫入
+    write_queue_size: int = 1000  # 待寫入數據上限，超過時 save 會阻塞
+    write_batch_size: int = 100  # 每批寫入數量
+    flush_interval: float = 1.0  # 未滿一批時的最長等待秒數
+    durability: str = 'none'  # 持久性：none / atomic / fsync
     
     def __post_init__(self):
         """初始化後的驗證"""
@@ -158,6 +177,18 @@ class LocalStorageConfig(StorageConfig):
             raise ConfigError("備份間隔不能為負數")
         if self.max_backups < 0:
             raise ConfigError("最大備份數量不能為負數")
+        if self.write_queue_size <= 0:
+            raise ConfigError("待寫入數據上限必須大於0")
+        if self.write_batch_size <= 0:
+            raise ConfigError("每批寫入數量必須大於0")
+        if self.flush_interval < 0:
+            raise ConfigError("最長等待秒數不能為負數")
+        if self.durability not in ['none', 'atomic', 'fsync']:
+            raise ConfigError(f"不支援的持久性設定: {self.durability}")
+        if self.format not in available_formats():
+            raise ConfigError(f"不支援的數據格式: {self.format}")
+        if self.compression not in [None, 'gzip', 'zstd']:
+            raise ConfigError(f"不支援的壓縮格式: {self.compression}")
 
 @dataclass
 class FileConfig(StorageConfig):
@@ -254,6 +285,10 @@ class RedisConfig(StorageConfig):
     key_prefix: str = ''  # 鍵前綴
     key_separator: str = ':'  # 鍵分隔符
     
+    # 批量操作配置
+    scan_count: int = 1000  # SCAN 每次迭代的 COUNT 提示
+    batch_chunk_size: int = 500  # 批量操作每次往返的鍵數
+    
     def __post_init__(self):
         """初始化後的驗證"""
         super().__post_init__()
@@ -278,6 +313,10 @@ class RedisConfig(StorageConfig):
             raise ConfigError("Redis序列化器不能為空")
         if not self.encoding:
             raise ConfigError("Redis編碼不能為空")
+        if self.scan_count < 1:
+            raise ConfigError("Redis SCAN COUNT必須大於0")
+        if self.batch_chunk_size < 1:
+            raise ConfigError("Redis批量操作分塊大小必須大於0")
 
 @dataclass
 class MySQLConfig(StorageConfig):
@@ -611,6 +650,11 @@ class PostgreSQLConfig(StorageConfig):
     # 索引配置
     index_fields: List[str] = field(default_factory=list)
     
+    # 批量寫入配置
+    batch_method: str = field(default="auto")  # auto, executemany, values, copy
+    values_page_size: int = field(default=1000)  # execute_values 每條語句的行數
+    copy_threshold: int = field(default=10000)  # auto 模式下改用 COPY 的行數閾值
+    
     def __post_init__(self):
         """初始化後驗證"""
         self.validate_postgresql_config()
@@ -643,6 +687,15 @@ class PostgreSQLConfig(StorageConfig):
         
         if self.ssl_mode not in ["disable", "allow", "prefer", "require", "verify-ca", "verify-full"]:
             raise ConfigError("PostgreSQL ssl_mode must be one of: disable, allow, prefer, require, verify-ca, verify-full")
+        
+        if self.batch_method not in ["auto", "executemany", "values", "copy"]:
+            raise ConfigError("PostgreSQL batch_method must be one of: auto, executemany, values, copy")
+        
+        if not isinstance(self.values_page_size, int) or self.values_page_size <= 0:
+            raise ConfigError("PostgreSQL values_page_size must be a positive integer")
+        
+        if not isinstance(self.copy_threshold, int) or self.copy_threshold <= 0:
+            raise ConfigError("PostgreSQL copy_threshold must be a positive integer")
 
 @dataclass
 class KafkaConfig(StorageConfig):
@@ -683,6 +736,12 @@ class KafkaConfig(StorageConfig):
     key_serializer: str = field(default="json")
     value_serializer: str = field(default="json")
     
+    # 索引配置
+    index_enabled: bool = field(default=True)  # 以物化的鍵索引取代全主題重放
+    index_snapshot_path: Optional[str] = field(default=None)  # 索引快照文件
+    index_poll_timeout_ms: int = field(default=1000)
+    compact_topic: bool = field(default=False)  # 創建主題時啟用 log compaction
+    
     def __post_init__(self):
         """初始化後驗證"""
         self.validate_kafka_config()
@@ -730,6 +789,9 @@ class KafkaConfig(StorageConfig):
         
         if not isinstance(self.max_poll_records, int) or self.max_poll_records <= 0:
             raise ConfigError("Kafka max_poll_records must be a positive integer")
+        
+        if not isinstance(self.index_poll_timeout_ms, int) or self.index_poll_timeout_ms <= 0:
+            raise ConfigError("Kafka index_poll_timeout_ms must be a positive integer")
 
 @dataclass
 class RabbitMQConfig(StorageConfig):
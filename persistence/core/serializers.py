@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+序列化器模組
+
+提供本地存儲可插拔的數據格式：
+- json: 標準庫 JSON（預設，與舊版輸出相同）
+- orjson: 高速 JSON
+- msgpack: 緊湊的二進位記錄格式
+- parquet: 欄式表格格式
+- arrow: Arrow IPC（Feather V2）表格格式，可零拷貝記憶體映射載入
+
+記錄格式可外加 gzip / zstd 壓縮；表格格式使用格式內建的欄位壓縮，
+因此壓縮後仍可記憶體映射。
+"""
+
+import os
+import gzip
+import json
+import mmap
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Type
+from .exceptions import ConfigError, StorageError
+
+# 壓縮格式與對應副檔名
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.zst': 'zstd'
+}
+
+# 表格數據的原始型態，載入時據此還原
+_KIND_KEY = b'datascout.kind'
+
+
+def _require(module: str):
+    """
+    載入選用依賴
+
+    Args:
+        module: 模組名稱
+
+    Returns:
+        module: 已載入的模組
+
+    Raises:
+        StorageError: 模組未安裝
+    """
+    try:
+        return __import__(module, fromlist=['_'])
+    except ImportError:
+        package = module.split('.')[0]
+        raise StorageError(f"此數據格式需要安裝 {package}: pip install {package}")
+
+
+def _read_buffer(path: str, memory_map: bool):
+    """
+    讀取文件內容，可選擇以記憶體映射方式讀取
+
+    Args:
+        path: 文件路徑
+        memory_map: 是否使用記憶體映射
+
+    Returns:
+        bytes 或 mmap: 文件內容
+    """
+    with open(path, 'rb') as f:
+        if memory_map and os.fstat(f.fileno()).st_size > 0:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+
+def compress(payload: bytes, compression: Optional[str], level: Optional[int] = None) -> bytes:
+    """
+    壓縮數據
+
+    Args:
+        payload: 原始數據
+        compression: 壓縮格式（gzip / zstd），None 表示不壓縮
+        level: 壓縮等級
+
+    Returns:
+        bytes: 壓縮後數據
+    """
+    if not compression:
+        return payload
+    if compression == 'gzip':
+        return gzip.compress(payload, compresslevel=9 if level is None else level)
+    if compression == 'zstd':
+        zstd = _require('zstandard')
+        return zstd.ZstdCompressor(level=3 if level is None else level).compress(payload)
+    raise ConfigError(f"不支援的壓縮格式: {compression}")
+
+
+def decompress(payload, compression: Optional[str]):
+    """
+    解壓縮數據
+
+    Args:
+        payload: 壓縮數據（bytes 或 mmap）
+        compression: 壓縮格式（gzip / zstd），None 表示不壓縮
+
+    Returns:
+        bytes 或 mmap: 解壓縮後數據
+    """
+    if not compression:
+        return payload
+    if compression == 'gzip':
+        return gzip.decompress(payload)
+    if compression == 'zstd':
+        zstd = _require('zstandard')
+        return zstd.ZstdDecompressor().stream_reader(payload).read()
+    raise ConfigError(f"不支援的壓縮格式: {compression}")
+
+
+class Serializer:
+    """序列化器基類"""
+
+    # 格式名稱
+    name: str = ''
+    # 對應的副檔名，第一個為預設副檔名
+    extensions: Tuple[str, ...] = ()
+
+    def __init__(self, compression: Optional[str] = None, compression_level: Optional[int] = None,
+                 memory_map: bool = True, encoding: str = 'utf-8', indent: Optional[int] = 2):
+        """
+        初始化序列化器
+
+        Args:
+            compression: 壓縮格式（gzip / zstd）
+            compression_level: 壓縮等級
+            memory_map: 載入時是否使用記憶體映射
+            encoding: 文字格式的編碼
+            indent: JSON 縮排，None 表示緊湊輸出
+        """
+        self.compression = compression
+        self.compression_level = compression_level
+        self.memory_map = memory_map
+        self.encoding = encoding
+        self.indent = indent
+
+    def dumps(self, data: Any) -> bytes:
+        """
+        序列化數據
+
+        Args:
+            data: 要序列化的數據
+
+        Returns:
+            bytes: 序列化結果
+        """
+        raise NotImplementedError
+
+    def loads(self, payload) -> Any:
+        """
+        反序列化數據
+
+        Args:
+            payload: 序列化數據（bytes 或 mmap）
+
+        Returns:
+            Any: 數據
+        """
+        raise NotImplementedError
+
+    def dump(self, data: Any, f: BinaryIO) -> None:
+        """
+        寫入數據到二進位文件對象
+
+        Args:
+            data: 要保存的數據
+            f: 已開啟的二進位文件對象
+        """
+        f.write(compress(self.dumps(data), self.compression, self.compression_level))
+
+    def load(self, path: str) -> Any:
+        """
+        從文件載入數據
+
+        Args:
+            path: 文件路徑
+
+        Returns:
+            Any: 數據
+        """
+        buffer = _read_buffer(path, self.memory_map)
+        try:
+            return self.loads(decompress(buffer, self.compression))
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+
+class JSONSerializer(Serializer):
+    """標準庫 JSON 序列化器"""
+
+    name = 'json'
+    extensions = ('.json',)
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=self.indent).encode(self.encoding)
+
+    def loads(self, payload) -> Any:
+        return json.loads(bytes(payload).decode(self.encoding))
+
+
+class OrjsonSerializer(Serializer):
+    """orjson 序列化器，支援 numpy 與 datetime"""
+
+    name = 'orjson'
+    extensions = ('.json',)
+
+    def dumps(self, data: Any) -> bytes:
+        orjson = _require('orjson')
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if self.indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    def loads(self, payload) -> Any:
+        orjson = _require('orjson')
+        return orjson.loads(payload if isinstance(payload, bytes) else memoryview(payload))
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack 序列化器"""
+
+    name = 'msgpack'
+    extensions = ('.msgpack', '.mpk')
+
+    def dumps(self, data: Any) -> bytes:
+        msgpack = _require('msgpack')
+        return msgpack.packb(data, use_bin_type=True, datetime=True)
+
+    def loads(self, payload) -> Any:
+        msgpack = _require('msgpack')
+        return msgpack.unpackb(payload, raw=False, timestamp=3, strict_map_key=False)
+
+
+class TableSerializer(Serializer):
+    """表格序列化器基類，接受 DataFrame、pyarrow.Table、記錄列表或欄位字典"""
+
+    def to_table(self, data: Any):
+        """
+        將數據轉換為 pyarrow.Table，並在結構描述中記錄原始型態
+
+        Args:
+            data: 表格數據
+
+        Returns:
+            pyarrow.Table: 表格
+
+        Raises:
+            StorageError: 數據不是表格
+        """
+        pa = _require('pyarrow')
+        if isinstance(data, pa.Table):
+            table, kind = data, 'table'
+        elif type(data).__name__ == 'DataFrame':
+            table, kind = pa.Table.from_pandas(data), 'pandas'
+        elif isinstance(data, list) and all(isinstance(row, dict) for row in data):
+            table, kind = pa.Table.from_pylist(data), 'records'
+        elif isinstance(data, dict) and all(isinstance(col, (list, tuple)) for col in data.values()):
+            table, kind = pa.Table.from_pydict(data), 'columns'
+        else:
+            raise StorageError(f"{self.name} 格式只支援表格數據，收到: {type(data).__name__}")
+
+        metadata = dict(table.schema.metadata or {})
+        metadata[_KIND_KEY] = kind.encode()
+        return table.replace_schema_metadata(metadata)
+
+    def from_table(self, table) -> Any:
+        """
+        依原始型態還原表格數據
+
+        Args:
+            table: pyarrow.Table
+
+        Returns:
+            Any: 表格數據
+        """
+        kind = (table.schema.metadata or {}).get(_KIND_KEY, b'table').decode()
+        if kind == 'pandas':
+            return table.to_pandas()
+        if kind == 'records':
+            return table.to_pylist()
+        if kind == 'columns':
+            return table.to_pydict()
+        return table
+
+
+class ParquetSerializer(TableSerializer):
+    """Parquet 序列化器，壓縮使用 Parquet 內建的欄位編碼"""
+
+    name = 'parquet'
+    extensions = ('.parquet', '.pq')
+
+    def dump(self, data: Any, f: BinaryIO) -> None:
+        pq = _require('pyarrow.parquet')
+        pq.write_table(
+            self.to_table(data), f,
+            compression=self.compression or 'snappy',
+            compression_level=self.compression_level
+        )
+
+    def load(self, path: str) -> Any:
+        pq = _require('pyarrow.parquet')
+        return self.from_table(pq.read_table(path, memory_map=self.memory_map))
+
+
+class ArrowSerializer(TableSerializer):
+    """Arrow IPC 序列化器，未壓縮時載入為零拷貝記憶體映射"""
+
+    name = 'arrow'
+    extensions = ('.arrow', '.feather', '.ipc')
+
+    def dump(self, data: Any, f: BinaryIO) -> None:
+        pa = _require('pyarrow')
+        if self.compression not in (None, 'zstd'):
+            raise ConfigError(f"arrow 格式只支援 zstd 壓縮: {self.compression}")
+        table = self.to_table(data)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_file(f, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+    def load(self, path: str) -> Any:
+        pa = _require('pyarrow')
+        source = pa.memory_map(path, 'r') if self.memory_map else pa.OSFile(path, 'rb')
+        table = pa.ipc.open_file(source).read_all()
+        data = self.from_table(table)
+        # 直接返回的 Table 仍引用映射記憶體，交由垃圾回收關閉
+        if data is not table:
+            source.close()
+        return data
+
+
+# 已註冊的序列化器
+_SERIALIZERS: Dict[str, Type[Serializer]] = {}
+
+
+def register_serializer(serializer_cls: Type[Serializer]) -> Type[Serializer]:
+    """
+    註冊序列化器，可作為類別裝飾器使用
+
+    Args:
+        serializer_cls: 序列化器類別
+
+    Returns:
+        Type[Serializer]: 序列化器類別
+    """
+    _SERIALIZERS[serializer_cls.name] = serializer_cls
+    return serializer_cls
+
+
+for _cls in (JSONSerializer, OrjsonSerializer, MsgpackSerializer, ParquetSerializer, ArrowSerializer):
+    register_serializer(_cls)
+
+
+def available_formats() -> List[str]:
+    """
+    取得已註冊的格式名稱
+
+    Returns:
+        List[str]: 格式名稱列表
+    """
+    return list(_SERIALIZERS)
+
+
+def detect_format(path: str, default: str) -> Tuple[str, Optional[str]]:
+    """
+    依副檔名判斷數據格式與壓縮格式
+
+    預設格式宣告的副檔名優先，例如預設格式為 orjson 時 .json 仍使用 orjson。
+
+    Args:
+        path: 文件路徑
+        default: 無法判斷時使用的格式
+
+    Returns:
+        Tuple[str, Optional[str]]: (格式名稱, 由副檔名指定的壓縮格式)
+    """
+    root, ext = os.path.splitext(path.lower())
+    compression = COMPRESSION_EXTENSIONS.get(ext)
+    if compression:
+        ext = os.path.splitext(root)[1]
+
+    default_cls = _SERIALIZERS.get(default)
+    if default_cls and ext in default_cls.extensions:
+        return default, compression
+    for name, serializer_cls in _SERIALIZERS.items():
+        if ext in serializer_cls.extensions:
+            return name, compression
+    return default, compression
+
+
+def split_extension(name: str) -> Tuple[str, str]:
+    """
+    拆分文件名與副檔名，壓縮副檔名連同其前一層副檔名一起保留
+
+    例如 data.json.gz 拆為 ('data', '.json.gz')。
+
+    Args:
+        name: 文件名
+
+    Returns:
+        Tuple[str, str]: (主檔名, 副檔名)
+    """
+    root, ext = os.path.splitext(name)
+    if ext.lower() in COMPRESSION_EXTENSIONS:
+        root, inner = os.path.splitext(root)
+        ext = inner + ext
+    return root, ext
+
+
+def get_serializer(name: str, **options) -> Serializer:
+    """
+    建立序列化器
+
+    Args:
+        name: 格式名稱
+        **options: 傳給序列化器的選項
+
+    Returns:
+        Serializer: 序列化器
+
+    Raises:
+        StorageError: 不支援的數據格式
+    """
+    serializer_cls = _SERIALIZERS.get(name)
+    if serializer_cls is None:
+        raise StorageError(f"不支援的數據格式: {name}")
+    return serializer_cls(**options)
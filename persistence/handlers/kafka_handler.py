@@ -7,9 +7,11 @@ Kafka 存儲處理器
 """
 
 import json
+import os
+import threading
 import time
-from typing import Dict, Any, List, Optional, Union, Callable, Iterator
-from kafka import KafkaProducer, KafkaConsumer
+from typing import Dict, Any, List, Optional, Union, Callable, Iterator, Tuple
+from kafka import KafkaProducer, KafkaConsumer, TopicPartition
 from kafka.admin import KafkaAdminClient, NewTopic
 from kafka.errors import KafkaError, TopicAlreadyExistsError
 from persistence.core.config import KafkaConfig
@@ -20,6 +22,136 @@ from persistence.core.exceptions import (
     ConnectionError
 )
 
+class KafkaKeyIndex:
+    """Kafka 鍵索引
+    
+    由主題日誌增量物化的 path -> 最新值索引，相當於一份在本地壓縮過的主題：
+    每個鍵只保留最新偏移量的記錄，刪除標記會移除條目，並記錄每個分區已消費的位置，
+    刷新時只需消費新的偏移量。
+    """
+    
+    def __init__(self):
+        """初始化索引"""
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.tombstones: Dict[str, Tuple[int, int]] = {}  # path -> (分區, 偏移量)
+        self.positions: Dict[int, int] = {}  # 分區 -> 下一個待消費偏移量
+        self._lock = threading.RLock()
+    
+    def _is_stale(self, path: str, partition: int, offset: int) -> bool:
+        """檢查記錄是否比索引中已有的同鍵記錄更舊"""
+        current = self.entries.get(path)
+        if current is not None and current["partition"] == partition and current["offset"] >= offset:
+            return True
+        tombstone = self.tombstones.get(path)
+        return tombstone is not None and tombstone[0] == partition and tombstone[1] >= offset
+    
+    def apply(self, path: str, value: Dict[str, Any], partition: int, offset: int) -> None:
+        """應用一條日誌記錄
+        
+        Args:
+            path: 數據路徑（消息鍵）
+            value: 消息值
+            partition: 分區
+            offset: 偏移量
+        """
+        with self._lock:
+            if path is None or self._is_stale(path, partition, offset):
+                return
+            if value is None or value.get("deleted", False):
+                self.entries.pop(path, None)
+                self.tombstones[path] = (partition, offset)
+            else:
+                self.tombstones.pop(path, None)
+                self.entries[path] = {
+                    "data": value.get("data"),
+                    "timestamp": value.get("timestamp"),
+                    "partition": partition,
+                    "offset": offset
+                }
+    
+    def advance(self, partition: int, position: int) -> None:
+        """更新分區消費位置
+        
+        Args:
+            partition: 分區
+            position: 下一個待消費偏移量
+        """
+        with self._lock:
+            if position > self.positions.get(partition, 0):
+                self.positions[partition] = position
+    
+    def compact(self) -> int:
+        """清除已不可能被重放覆蓋的刪除標記
+        
+        Returns:
+            清除的刪除標記數量
+        """
+        with self._lock:
+            obsolete = [
+                path for path, (partition, offset) in self.tombstones.items()
+                if offset < self.positions.get(partition, 0)
+            ]
+            for path in obsolete:
+                del self.tombstones[path]
+            return len(obsolete)
+    
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """獲取條目
+        
+        Args:
+            path: 數據路徑
+            
+        Returns:
+            條目，不存在時為 None
+        """
+        with self._lock:
+            return self.entries.get(path)
+    
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """獲取所有條目的快照"""
+        with self._lock:
+            return list(self.entries.items())
+    
+    def save(self, path: str) -> None:
+        """保存索引快照
+        
+        Args:
+            path: 快照文件路徑
+        """
+        with self._lock:
+            self.compact()
+            snapshot = {
+                "entries": self.entries,
+                "tombstones": {k: list(v) for k, v in self.tombstones.items()},
+                "positions": {str(k): v for k, v in self.positions.items()}
+            }
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+    
+    def load(self, path: str) -> bool:
+        """加載索引快照
+        
+        Args:
+            path: 快照文件路徑
+            
+        Returns:
+            是否加載成功
+        """
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            self.entries = snapshot.get("entries", {})
+            self.tombstones = {k: tuple(v) for k, v in snapshot.get("tombstones", {}).items()}
+            self.positions = {int(k): v for k, v in snapshot.get("positions", {}).items()}
+        return True
+
 class KafkaHandler:
     """Kafka 存儲處理器類"""
     
@@ -37,6 +169,9 @@ class KafkaHandler:
         self.producer = None
         self.consumer = None
         self.admin_client = None
+        self.index_consumer = None
+        self.index = KafkaKeyIndex()
+        self._index_lock = threading.Lock()
         self._setup_storage()
     
     def _setup_storage(self):
@@ -76,7 +211,8 @@ class KafkaHandler:
                 topic = NewTopic(
                     name=self.config.topic_name,
                     num_partitions=self.config.partition_count,
-                    replication_factor=self.config.replication_factor
+                    replication_factor=self.config.replication_factor,
+                    topic_configs={"cleanup.policy": "compact"} if self.config.compact_topic else None
                 )
                 self.admin_client.create_topics([topic])
         except TopicAlreadyExistsError:
@@ -136,6 +272,123 @@ class KafkaHandler:
         except Exception as e:
             raise ConnectionError(f"Failed to create consumer: {str(e)}")
     
+    def _create_index_consumer(self):
+        """創建索引消費者
+        
+        索引消費者不加入消費組、不提交偏移量，手動分配全部分區，
+        以免干擾 subscribe/stream 使用的消費者。
+        """
+        try:
+            self.index_consumer = KafkaConsumer(
+                bootstrap_servers=self.config.bootstrap_servers,
+                client_id=f"{self.config.client_id}_index",
+                group_id=None,
+                security_protocol=self.config.security_protocol,
+                sasl_mechanism=self.config.sasl_mechanism,
+                sasl_plain_username=self.config.sasl_plain_username,
+                sasl_plain_password=self.config.sasl_plain_password,
+                ssl_cafile=self.config.ssl_cafile,
+                ssl_certfile=self.config.ssl_certfile,
+                ssl_keyfile=self.config.ssl_keyfile,
+                enable_auto_commit=False,
+                max_poll_records=self.config.max_poll_records,
+                key_deserializer=lambda k: json.loads(k.decode('utf-8')) if k else None,
+                value_deserializer=lambda v: json.loads(v.decode('utf-8')) if v else None
+            )
+            
+            # 從快照位置繼續消費，否則從頭開始
+            if self.config.index_snapshot_path:
+                self.index.load(self.config.index_snapshot_path)
+            self._assign_index_partitions()
+        except Exception as e:
+            raise ConnectionError(f"Failed to create index consumer: {str(e)}")
+    
+    def _assign_index_partitions(self) -> bool:
+        """分配索引消費者的分區
+        
+        主題剛建立時 partitions_for_topic() 可能尚無元數據而回傳 None，
+        此時不分配任何分區，由 refresh_index 在下次刷新時重試。
+        
+        Returns:
+            是否已分配分區
+        """
+        partitions = self.index_consumer.partitions_for_topic(self.config.topic_name)
+        if not partitions:
+            return False
+        
+        topic_partitions = [TopicPartition(self.config.topic_name, p) for p in sorted(partitions)]
+        self.index_consumer.assign(topic_partitions)
+        for tp in topic_partitions:
+            position = self.index.positions.get(tp.partition)
+            if position is None:
+                self.index_consumer.seek_to_beginning(tp)
+            else:
+                self.index_consumer.seek(tp, position)
+        return True
+    
+    def refresh_index(self) -> int:
+        """增量刷新鍵索引
+        
+        只消費上次刷新之後的新偏移量，直到追上各分區的末端偏移量。
+        
+        Returns:
+            本次應用的記錄數
+        """
+        with self._index_lock:
+            if self.index_consumer is None:
+                self._create_index_consumer()
+            
+            consumer = self.index_consumer
+            assignment = consumer.assignment()
+            if not assignment:
+                # 建立時尚未取得分區元數據，重新嘗試分配
+                if not self._assign_index_partitions():
+                    return 0
+                assignment = consumer.assignment()
+            
+            end_offsets = consumer.end_offsets(list(assignment))
+            applied = 0
+            while any(consumer.position(tp) < end for tp, end in end_offsets.items()):
+                batches = consumer.poll(timeout_ms=self.config.index_poll_timeout_ms)
+                if not batches:
+                    break
+                for tp, messages in batches.items():
+                    for message in messages:
+                        self.index.apply(message.key, message.value, tp.partition, message.offset)
+                        applied += 1
+                    if messages:
+                        self.index.advance(tp.partition, messages[-1].offset + 1)
+            
+            for tp in assignment:
+                self.index.advance(tp.partition, consumer.position(tp))
+            return applied
+    
+    def save_index_snapshot(self, path: Optional[str] = None) -> None:
+        """保存索引快照
+        
+        Args:
+            path: 快照文件路徑，默認使用配置中的 index_snapshot_path
+        """
+        path = path or self.config.index_snapshot_path
+        if not path:
+            raise StorageError("Index snapshot path is not configured")
+        try:
+            self.index.save(path)
+        except Exception as e:
+            raise StorageError(f"Failed to save index snapshot: {str(e)}")
+    
+    def _live_entries(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """刷新索引並返回所有未刪除的條目"""
+        self.refresh_index()
+        return self.index.items()
+    
+    @staticmethod
+    def _matches(data: Any, query: Dict[str, Any]) -> bool:
+        """檢查數據是否匹配查詢條件"""
+        if not isinstance(data, dict):
+            return not query
+        return all(key in data and data[key] == value for key, value in query.items())
+    
     def save(self, data: Dict[str, Any], path: str) -> None:
         """保存數據
         
@@ -158,8 +411,9 @@ class KafkaHandler:
                 value=data_with_timestamp
             )
             
-            # 等待發送完成
-            future.get(timeout=10)
+            # 等待發送完成，並直接寫入索引
+            metadata = future.get(timeout=10)
+            self.index.apply(path, data_with_timestamp, metadata.partition, metadata.offset)
         except Exception as e:
             raise StorageError(f"Failed to save data: {str(e)}")
     
@@ -173,6 +427,13 @@ class KafkaHandler:
             加載的數據
         """
         try:
+            if self.config.index_enabled:
+                self.refresh_index()
+                entry = self.index.get(path)
+                if entry is None:
+                    raise NotFoundError(f"Data not found: {path}")
+                return entry["data"]
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -209,8 +470,9 @@ class KafkaHandler:
                 value=delete_marker
             )
             
-            # 等待發送完成
-            future.get(timeout=10)
+            # 等待發送完成，並直接寫入索引
+            metadata = future.get(timeout=10)
+            self.index.apply(path, delete_marker, metadata.partition, metadata.offset)
         except Exception as e:
             raise StorageError(f"Failed to delete data: {str(e)}")
     
@@ -224,6 +486,10 @@ class KafkaHandler:
             數據是否存在
         """
         try:
+            if self.config.index_enabled:
+                self.refresh_index()
+                return self.index.get(path) is not None
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -246,6 +512,12 @@ class KafkaHandler:
             數據路徑列表
         """
         try:
+            if self.config.index_enabled:
+                return [
+                    path for path, _ in self._live_entries()
+                    if prefix is None or path.startswith(prefix)
+                ]
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -271,6 +543,12 @@ class KafkaHandler:
             查詢結果列表
         """
         try:
+            if self.config.index_enabled:
+                return [
+                    entry["data"] for _, entry in self._live_entries()
+                    if self._matches(entry["data"], query)
+                ]
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -302,6 +580,12 @@ class KafkaHandler:
             數據數量
         """
         try:
+            if self.config.index_enabled:
+                entries = self._live_entries()
+                if query is None:
+                    return len(entries)
+                return sum(1 for _, entry in entries if self._matches(entry["data"], query))
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -370,6 +654,14 @@ class KafkaHandler:
             數據列表，每個元素包含 path 和 data
         """
         try:
+            if self.config.index_enabled:
+                self.refresh_index()
+                results = []
+                for path in paths:
+                    entry = self.index.get(path)
+                    results.append({"path": path, "data": entry["data"] if entry else None})
+                return results
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -429,6 +721,10 @@ class KafkaHandler:
             數據存在狀態字典
         """
         try:
+            if self.config.index_enabled:
+                self.refresh_index()
+                return {path: self.index.get(path) is not None for path in paths}
+            
             # 重置消費者偏移量
             self.consumer.seek_to_beginning()
             
@@ -530,10 +826,14 @@ class KafkaHandler:
     def cleanup(self) -> None:
         """清理資源"""
         try:
+            if self.config.index_snapshot_path and self.index_consumer is not None:
+                self.index.save(self.config.index_snapshot_path)
             if self.producer:
                 self.producer.close()
             if self.consumer:
                 self.consumer.close()
+            if self.index_consumer:
+                self.index_consumer.close()
             if self.admin_client:
                 self.admin_client.close()
         except Exception as e:
@@ -21,6 +21,8 @@ from ..core.exceptions import (
 class LocalStorageHandler(StorageHandler):
     """本地存儲處理器"""
     
+    supports_write_behind = True
+    
     def __init__(self, config: Dict[str, Any]):
         """
         初始化本地存儲處理器
@@ -48,6 +50,9 @@ class LocalStorageHandler(StorageHandler):
         """
         保存數據到本地文件
         
+        啟用 write_behind 時只將數據放入延遲佇列即返回，
+        由背景執行緒批次寫出，需要確保落盤時呼叫 flush()。
+        
         Args:
             data: 要保存的數據
             path: 文件路徑
@@ -56,19 +61,33 @@ class LocalStorageHandler(StorageHandler):
             # 驗證數據
             self._validate_data(data)
             
-            # 構建完整路徑
-            full_path = os.path.join(self.config.base_path, path)
+            if self.write_behind:
+                self._enqueue_write(data, path)
+                return
             
-            # 保存數據
-            self._save_to_file(data, full_path)
-            
-            # 備份數據
-            self._backup_data(data, path)
-            
-            self.logger.info(f"數據已保存到: {full_path}")
+            self._write_record(data, path)
         except Exception as e:
             raise StorageError(f"保存數據失敗: {str(e)}")
     
+    def _write_record(self, data: Any, path: str) -> None:
+        """
+        寫入數據文件及其備份
+        
+        Args:
+            data: 要保存的數據
+            path: 文件路徑
+        """
+        # 構建完整路徑
+        full_path = os.path.join(self.config.base_path, path)
+        
+        # 保存數據
+        self._save_to_file(data, full_path)
+        
+        # 備份數據
+        self._backup_data(data, path)
+        
+        self.logger.info(f"數據已保存到: {full_path}")
+    
     def load(self, path: str) -> Any:
         """
         從本地文件加載數據
@@ -80,6 +99,11 @@ class LocalStorageHandler(StorageHandler):
             Any: 加載的數據
         """
         try:
+            # 優先返回尚未寫出的數據
+            found, data = self._pending_lookup(path)
+            if found:
+                return data
+            
             # 構建完整路徑
             full_path = os.path.join(self.config.base_path, path)
             
@@ -99,11 +123,16 @@ class LocalStorageHandler(StorageHandler):
             path: 文件路徑
         """
         try:
+            # 取消尚未寫出的數據
+            discarded = self._discard_pending(path)
+            
             # 構建完整路徑
             full_path = os.path.join(self.config.base_path, path)
             
             # 檢查文件是否存在
             if not os.path.exists(full_path):
+                if discarded:
+                    return
                 raise NotFoundError(f"文件不存在: {full_path}")
             
             # 刪除文件
@@ -124,6 +153,9 @@ class LocalStorageHandler(StorageHandler):
             bool: 是否存在
         """
         try:
+            if self._pending_lookup(path)[0]:
+                return True
+            
             # 構建完整路徑
             full_path = os.path.join(self.config.base_path, path)
             
@@ -149,8 +181,16 @@ class LocalStorageHandler(StorageHandler):
             else:
                 full_path = self.config.base_path
             
+            # 尚未寫出的數據
+            pending = [
+                p for p in self._pending_paths()
+                if not path or os.path.normpath(p).startswith(os.path.normpath(path) + os.sep)
+            ]
+            
             # 檢查目錄是否存在
             if not os.path.exists(full_path):
+                if pending:
+                    return pending
                 raise NotFoundError(f"目錄不存在: {full_path}")
             
             # 列出文件
@@ -164,6 +204,9 @@ class LocalStorageHandler(StorageHandler):
                     )
                     files.append(rel_path)
             
+            seen = set(files)
+            files.extend(os.path.normpath(p) for p in pending if os.path.normpath(p) not in seen)
+            
             return files
         except Exception as e:
             raise StorageError(f"列出文件失敗: {str(e)}")
@@ -177,6 +220,8 @@ class LocalStorageHandler(StorageHandler):
             dst_path: 目標文件路徑
         """
         try:
+            self._wait_written(src_path)
+            
             # 構建完整路徑
             src_full_path = os.path.join(self.config.base_path, src_path)
             dst_full_path = os.path.join(self.config.base_path, dst_path)
@@ -204,6 +249,8 @@ class LocalStorageHandler(StorageHandler):
             dst_path: 目標文件路徑
         """
         try:
+            self._wait_written(src_path)
+            
             # 構建完整路徑
             src_full_path = os.path.join(self.config.base_path, src_path)
             dst_full_path = os.path.join(self.config.base_path, dst_path)
@@ -233,6 +280,8 @@ class LocalStorageHandler(StorageHandler):
             int: 文件大小（字節）
         """
         try:
+            self._wait_written(path)
+            
             # 構建完整路徑
             full_path = os.path.join(self.config.base_path, path)
             
@@ -256,6 +305,8 @@ class LocalStorageHandler(StorageHandler):
             float: 修改時間（時間戳）
         """
         try:
+            self._wait_written(path)
+            
             # 構建完整路徑
             full_path = os.path.join(self.config.base_path, path)
             
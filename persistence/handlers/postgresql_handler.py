@@ -6,11 +6,14 @@ PostgreSQL 存儲處理器
 提供基於 PostgreSQL 的數據存儲功能，支持 CRUD 操作
 """
 
+import csv
+import io
 import time
 import json
+from datetime import datetime
 from typing import Dict, Any, List, Optional, Union, Tuple
 import psycopg2
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
 from psycopg2.pool import ThreadedConnectionPool
 from persistence.core.config import PostgreSQLConfig
 from persistence.core.exceptions import (
@@ -35,6 +38,7 @@ class PostgreSQLHandler:
             self.config = config
         
         self.pool = None
+        self.last_batch_stats: Optional[Dict[str, Any]] = None
         self._setup_storage()
     
     def _setup_storage(self):
@@ -130,9 +134,33 @@ class PostgreSQLHandler:
             if conn:
                 self._return_connection(conn)
     
+    @property
+    def _table(self) -> str:
+        """完整表名"""
+        return f"{self.config.schema}.{self.config.table_name}"
+    
+    @property
+    def _columns(self) -> str:
+        """寫入欄位列表"""
+        return (
+            f"{self.config.id_field}, {self.config.data_field}, "
+            f"{self.config.created_at_field}, {self.config.updated_at_field}"
+        )
+    
+    @property
+    def _upsert_clause(self) -> str:
+        """衝突時更新數據與更新時間，保留原創建時間"""
+        return (
+            f"ON CONFLICT ({self.config.id_field}) DO UPDATE SET "
+            f"{self.config.data_field} = EXCLUDED.{self.config.data_field}, "
+            f"{self.config.updated_at_field} = EXCLUDED.{self.config.updated_at_field}"
+        )
+    
     def save(self, data: Dict[str, Any], path: str) -> None:
         """保存數據
         
+        使用單條 INSERT ... ON CONFLICT 語句，一次往返且無競態。
+        
         Args:
             data: 要保存的數據
             path: 數據路徑
@@ -142,29 +170,12 @@ class PostgreSQLHandler:
             conn = self._get_connection()
             cursor = conn.cursor()
             
-            # 檢查數據是否存在
+            now = datetime.now()
             cursor.execute(f"""
-            SELECT {self.config.id_field}
-            FROM {self.config.schema}.{self.config.table_name}
-            WHERE {self.config.id_field} = %s
-            """, (path,))
-            
-            now = time.time()
-            
-            if cursor.fetchone():
-                # 更新數據
-                cursor.execute(f"""
-                UPDATE {self.config.schema}.{self.config.table_name}
-                SET {self.config.data_field} = %s, {self.config.updated_at_field} = %s
-                WHERE {self.config.id_field} = %s
-                """, (Json(data), now, path))
-            else:
-                # 插入數據
-                cursor.execute(f"""
-                INSERT INTO {self.config.schema}.{self.config.table_name}
-                ({self.config.id_field}, {self.config.data_field}, {self.config.created_at_field}, {self.config.updated_at_field})
-                VALUES (%s, %s, %s, %s)
-                """, (path, Json(data), now, now))
+            INSERT INTO {self._table} ({self._columns})
+            VALUES (%s, %s, %s, %s)
+            {self._upsert_clause}
+            """, (path, Json(data), now, now))
             
             conn.commit()
         except Exception as e:
@@ -384,34 +395,51 @@ class PostgreSQLHandler:
             if conn:
                 self._return_connection(conn)
     
-    def batch_save(self, data_list: List[Dict[str, Any]]) -> None:
+    def batch_save(self, data_list: List[Dict[str, Any]], method: Optional[str] = None) -> Dict[str, Any]:
         """批量保存數據
         
+        auto 模式下，行數未達 copy_threshold 時以 execute_values 多行 VALUES 寫入，
+        否則以 COPY FROM STDIN 載入臨時表後合併到目標表。
+        同一批次中重複的 path 只保留最後一筆。
+        
         Args:
             data_list: 數據列表，每個元素包含 path 和 data
+            method: 寫入方式，默認使用配置中的 batch_method
+            
+        Returns:
+            寫入統計，包含 rows、method、seconds 和 rows_per_sec
         """
+        method = method or self.config.batch_method
+        if method not in ["auto", "executemany", "values", "copy"]:
+            raise ValidationError(f"Unsupported batch method: {method}")
+        
+        # 同一語句內不能兩次更新同一行，先按 path 去重
+        rows = list({item["path"]: item["data"] for item in data_list}.items())
+        if method == "auto":
+            method = "copy" if len(rows) >= self.config.copy_threshold else "values"
+        
         conn = None
+        start = time.perf_counter()
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
             
-            now = time.time()
-            
-            # 準備數據
-            values = []
-            for item in data_list:
-                path = item["path"]
-                data = item["data"]
-                values.append((path, Json(data), now, now))
-            
-            # 批量插入
-            cursor.executemany(f"""
-            INSERT INTO {self.config.schema}.{self.config.table_name}
-            ({self.config.id_field}, {self.config.data_field}, {self.config.created_at_field}, {self.config.updated_at_field})
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT ({self.config.id_field})
-            DO UPDATE SET {self.config.data_field} = EXCLUDED.{self.config.data_field}, {self.config.updated_at_field} = EXCLUDED.{self.config.updated_at_field}
-            """, values)
+            now = datetime.now()
+            if rows:
+                if method == "copy":
+                    self._copy_upsert(cursor, rows, now)
+                elif method == "values":
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO {self._table} ({self._columns}) VALUES %s {self._upsert_clause}",
+                        [(path, Json(data), now, now) for path, data in rows],
+                        page_size=self.config.values_page_size
+                    )
+                else:
+                    cursor.executemany(
+                        f"INSERT INTO {self._table} ({self._columns}) VALUES (%s, %s, %s, %s) {self._upsert_clause}",
+                        [(path, Json(data), now, now) for path, data in rows]
+                    )
             
             conn.commit()
         except Exception as e:
@@ -421,6 +449,46 @@ class PostgreSQLHandler:
         finally:
             if conn:
                 self._return_connection(conn)
+        
+        elapsed = time.perf_counter() - start
+        self.last_batch_stats = {
+            "rows": len(rows),
+            "method": method,
+            "seconds": elapsed,
+            "rows_per_sec": len(rows) / elapsed if elapsed > 0 else float(len(rows))
+        }
+        return self.last_batch_stats
+    
+    def _copy_upsert(self, cursor, rows: List[Tuple[str, Any]], now: datetime) -> None:
+        """以 COPY 載入臨時表並合併
+        
+        Args:
+            cursor: 數據庫游標
+            rows: (path, data) 列表
+            now: 寫入時間
+        """
+        staging = f"{self.config.table_name}_staging"
+        cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {staging}
+        (LIKE {self._table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+        """)
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        timestamp = now.isoformat()
+        for path, data in rows:
+            writer.writerow([path, json.dumps(data, ensure_ascii=False), timestamp, timestamp])
+        buffer.seek(0)
+        
+        cursor.copy_expert(
+            f"COPY {staging} ({self._columns}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cursor.execute(f"""
+        INSERT INTO {self._table} ({self._columns})
+        SELECT {self._columns} FROM {staging}
+        {self._upsert_clause}
+        """)
     
     def batch_load(self, paths: List[str]) -> List[Dict[str, Any]]:
         """批量加載數據
@@ -11,7 +11,7 @@ import time
 import json
 import pickle
 import msgpack
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Union
 from redis import Redis, ConnectionPool
 from ..core.base import StorageHandler
 from ..core.config import RedisConfig
@@ -222,6 +222,54 @@ class RedisHandler(StorageHandler):
         except Exception as e:
             raise StorageError(f"檢查Redis數據是否存在失敗: {str(e)}")
     
+    def _strip_prefix(self, key: str) -> str:
+        """
+        移除鍵前綴
+        
+        Args:
+            key: Redis鍵
+            
+        Returns:
+            str: 原始路徑
+        """
+        if self.config.key_prefix:
+            return key[len(self.config.key_prefix) + len(self.config.key_separator):]
+        return key
+    
+    def _chunks(self, items: List[Any]) -> Iterator[List[Any]]:
+        """
+        按 batch_chunk_size 分塊
+        
+        Args:
+            items: 列表
+            
+        Returns:
+            Iterator[List[Any]]: 分塊迭代器
+        """
+        size = self.config.batch_chunk_size
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+    
+    def scan(self, path: str = None) -> Iterator[str]:
+        """
+        以 SCAN 流式遍歷Redis鍵
+        
+        不同於 KEYS，SCAN 分批迭代鍵空間，不會長時間阻塞服務器。
+        SCAN 可能重複返回同一個鍵，需要唯一結果時請使用 list。
+        
+        Args:
+            path: 鍵路徑模式，None表示所有鍵
+            
+        Returns:
+            Iterator[str]: 鍵迭代器
+        """
+        try:
+            pattern = self._build_key(path or '*')
+            for key in self.client.scan_iter(match=pattern, count=self.config.scan_count):
+                yield self._strip_prefix(key)
+        except Exception as e:
+            raise StorageError(f"掃描Redis鍵失敗: {str(e)}")
+    
     def list(self, path: str = None) -> List[str]:
         """
         列出Redis鍵
@@ -233,20 +281,93 @@ class RedisHandler(StorageHandler):
             List[str]: 鍵列表
         """
         try:
-            # 構建模式
-            pattern = self._build_key(path or '*')
+            # 基於 SCAN 收集並去重，保持首次出現的順序
+            return list(dict.fromkeys(self.scan(path)))
+        except Exception as e:
+            raise StorageError(f"列出Redis鍵失敗: {str(e)}")
+    
+    def batch_save(self, data_list: List[Dict[str, Any]]) -> None:
+        """
+        批量保存數據，每個分塊一次 MSET 往返
+        
+        Args:
+            data_list: 數據列表，每個元素包含 path 和 data
+        """
+        try:
+            for chunk in self._chunks(data_list):
+                mapping = {}
+                for item in chunk:
+                    self._validate_data(item["data"])
+                    mapping[self._build_key(item["path"])] = self._serialize(item["data"])
+                self.client.mset(mapping)
             
-            # 獲取鍵列表
-            keys = self.client.keys(pattern)
+            for item in data_list:
+                self._backup_data(item["data"], item["path"])
             
-            # 移除前綴
-            if self.config.key_prefix:
-                prefix = f"{self.config.key_prefix}{self.config.key_separator}"
-                keys = [k[len(prefix):] for k in keys]
+            self.logger.info(f"已批量保存 {len(data_list)} 條數據到Redis")
+        except Exception as e:
+            raise StorageError(f"批量保存數據到Redis失敗: {str(e)}")
+    
+    def batch_load(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        批量加載數據，每個分塊一次 MGET 往返
+        
+        Args:
+            paths: 數據路徑列表
             
-            return keys
+        Returns:
+            List[Dict[str, Any]]: 數據列表，每個元素包含 path 和 data，不存在時 data 為 None
+        """
+        try:
+            results = []
+            for chunk in self._chunks(paths):
+                values = self.client.mget([self._build_key(path) for path in chunk])
+                for path, value in zip(chunk, values):
+                    results.append({
+                        "path": path,
+                        "data": self._deserialize(value) if value is not None else None
+                    })
+            return results
         except Exception as e:
-            raise StorageError(f"列出Redis鍵失敗: {str(e)}")
+            raise StorageError(f"從Redis批量加載數據失敗: {str(e)}")
+    
+    def batch_delete(self, paths: List[str]) -> None:
+        """
+        批量刪除數據，每個分塊一次 DEL 往返
+        
+        Args:
+            paths: 數據路徑列表
+        """
+        try:
+            deleted = 0
+            for chunk in self._chunks(paths):
+                deleted += self.client.delete(*[self._build_key(path) for path in chunk])
+            
+            self.logger.info(f"已從Redis批量刪除 {deleted} 條數據")
+        except Exception as e:
+            raise StorageError(f"從Redis批量刪除數據失敗: {str(e)}")
+    
+    def batch_exists(self, paths: List[str]) -> Dict[str, bool]:
+        """
+        批量檢查數據是否存在，每個分塊一次管道往返
+        
+        Args:
+            paths: 數據路徑列表
+            
+        Returns:
+            Dict[str, bool]: 數據存在狀態字典
+        """
+        try:
+            exists_dict = {}
+            for chunk in self._chunks(paths):
+                pipe = self.client.pipeline(transaction=False)
+                for path in chunk:
+                    pipe.exists(self._build_key(path))
+                for path, result in zip(chunk, pipe.execute()):
+                    exists_dict[path] = bool(result)
+            return exists_dict
+        except Exception as e:
+            raise StorageError(f"批量檢查Redis數據是否存在失敗: {str(e)}")
     
     def set_expire(self, path: str, seconds: int) -> None:
         """
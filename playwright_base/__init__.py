@@ -8,6 +8,7 @@ __version__ = '0.1.0'
 
 # 導入核心類別和函數以便使用者可直接從 playwright_base 導入
 from playwright_base.core.base import PlaywrightBase
+from playwright_base.core.async_engine import AsyncCrawlEngine, CrawlTask, CrawlResult
 from playwright_base.utils.logger import setup_logger
 
 # 添加反檢測和彈窗處理模組導入
@@ -47,6 +48,9 @@ except ImportError:
 # 定義對外公開的模組
 __all__ = [
     'PlaywrightBase',
+    'AsyncCrawlEngine',
+    'CrawlTask',
+    'CrawlResult',
     'setup_logger',
     'inject_stealth_js',
     'check_and_handle_popup',
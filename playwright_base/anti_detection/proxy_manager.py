@@ -2,6 +2,9 @@
 代理管理模組
 
 提供代理服務器的管理、輪換和測試功能。
+
+健康檢查以有上限的執行緒池並行測試，每個代理維護延遲與成功率的指數加權移動平均（EWMA），
+選擇代理時依分數加權，連續失敗的代理自動隔離並由背景執行緒定期重新探測。
 """
 
 import os
@@ -9,6 +12,9 @@ import json
 import random
 import requests
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Union, Any
 from urllib.parse import urlparse
 
@@ -18,6 +24,36 @@ from playwright_base.utils.exceptions import ProxyException
 # 設置日誌
 logger = setup_logger(name=__name__)
 
+
+@dataclass
+class ProxyHealth:
+    """
+    代理健康狀態
+    """
+    latency_ewma: Optional[float] = None  # 延遲的 EWMA（毫秒）
+    success_ewma: float = 1.0  # 成功率的 EWMA（0–1），未測試時視為可用
+    checks: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    quarantine_count: int = 0
+    quarantined_until: float = 0.0
+    last_checked: float = 0.0
+    last_error: Optional[str] = None
+    ip: Optional[str] = None
+
+    def is_quarantined(self, now: float = None) -> bool:
+        """
+        是否處於隔離期。
+
+        參數:
+            now (float): 目前時間戳。
+
+        返回:
+            bool: 是否隔離中。
+        """
+        return self.quarantined_until > (time.time() if now is None else now)
+
+
 class ProxyManager:
     """
     代理服務器管理類。
@@ -25,19 +61,46 @@ class ProxyManager:
     提供代理的獲取、輪換、測試和管理功能。
     """
     
-    def __init__(self, proxies_file: str = None, test_url: str = "https://httpbin.org/ip", timeout: int = 10):
+    def __init__(
+        self,
+        proxies_file: str = None,
+        test_url: str = "https://httpbin.org/ip",
+        timeout: int = 10,
+        max_workers: int = 32,
+        ewma_alpha: float = 0.3,
+        quarantine_after: int = 3,
+        quarantine_seconds: float = 300.0,
+        probe_interval: float = 60.0
+    ):
         """
         初始化 ProxyManager 實例。
         
         參數:
             proxies_file (str): 包含代理列表的 JSON 檔案路徑。
-            test_url (str): 用於測試代理連通性的 URL。
+            test_url (str): 用於測試代理連通性的 URL，可指向本地測試伺服器。
             timeout (int): 代理測試超時時間（秒）。
+            max_workers (int): 並行健康檢查的最大執行緒數。
+            ewma_alpha (float): EWMA 平滑係數，越大越重視最近的結果。
+            quarantine_after (int): 連續失敗幾次後隔離。
+            quarantine_seconds (float): 首次隔離秒數，之後每次隔離加倍（最多 8 倍）。
+            probe_interval (float): 背景重新探測的間隔秒數。
         """
         self.proxies = []
         self.current_index = 0
         self.test_url = test_url
         self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.ewma_alpha = ewma_alpha
+        self.quarantine_after = max(1, quarantine_after)
+        self.quarantine_seconds = quarantine_seconds
+        self.probe_interval = probe_interval
+        
+        # 健康狀態以代理伺服器地址為鍵
+        self._health: Dict[str, ProxyHealth] = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._monitor_thread = None
+        self._monitor_stop = threading.Event()
         
         # 如果提供了代理檔案，則從檔案載入
         if proxies_file and os.path.exists(proxies_file):
@@ -147,7 +210,7 @@ class ProxyManager:
     
     def get_random_proxy(self) -> Optional[Dict[str, Any]]:
         """
-        隨機獲取一個代理。
+        依健康分數加權隨機獲取一個代理，隔離中的代理不會被選中。
         
         返回:
             Optional[Dict[str, Any]]: 隨機代理配置字典，若無代理則返回 None。
@@ -155,14 +218,27 @@ class ProxyManager:
         if not self.proxies:
             logger.warning("代理列表為空")
             return None
-            
-        proxy = random.choice(self.proxies)
+        
+        now = time.time()
+        candidates = []
+        weights = []
+        for proxy in self.proxies:
+            weight = self.get_score(proxy, now)
+            if weight > 0:
+                candidates.append(proxy)
+                weights.append(weight)
+        
+        if not candidates:
+            logger.warning("所有代理都處於隔離期，改為隨機選擇")
+            proxy = random.choice(self.proxies)
+        else:
+            proxy = random.choices(candidates, weights=weights, k=1)[0]
         logger.debug(f"隨機選擇代理: {proxy['server']}")
         return proxy
     
     def next_proxy(self) -> Optional[Dict[str, Any]]:
         """
-        順序獲取下一個代理。
+        順序獲取下一個代理，跳過隔離中的代理。
         
         返回:
             Optional[Dict[str, Any]]: 下一個代理配置字典，若無代理則返回 None。
@@ -170,12 +246,126 @@ class ProxyManager:
         if not self.proxies:
             logger.warning("代理列表為空")
             return None
-            
-        proxy = self.proxies[self.current_index]
-        self.current_index = (self.current_index + 1) % len(self.proxies)
-        logger.debug(f"選擇下一個代理: {proxy['server']}")
+        
+        now = time.time()
+        count = len(self.proxies)
+        for _ in range(count):
+            proxy = self.proxies[self.current_index % count]
+            self.current_index = (self.current_index + 1) % count
+            if not self._get_health(proxy).is_quarantined(now):
+                logger.debug(f"選擇下一個代理: {proxy['server']}")
+                return proxy
+        
+        logger.warning("所有代理都處於隔離期，返回下一個代理")
+        proxy = self.proxies[self.current_index % count]
+        self.current_index = (self.current_index + 1) % count
         return proxy
     
+    def _get_health(self, proxy: Dict[str, Any]) -> ProxyHealth:
+        """
+        獲取代理的健康狀態，不存在時建立。
+        
+        參數:
+            proxy (Dict[str, Any]): 代理配置字典。
+            
+        返回:
+            ProxyHealth: 健康狀態。
+        """
+        with self._lock:
+            health = self._health.get(proxy["server"])
+            if health is None:
+                health = self._health[proxy["server"]] = ProxyHealth()
+            return health
+    
+    def get_score(self, proxy: Dict[str, Any], now: float = None) -> float:
+        """
+        計算代理的健康分數：成功率 EWMA 除以以超時時間正規化的延遲。
+        
+        未測試的代理延遲視為超時時間的一半；隔離中的代理分數為 0。
+        
+        參數:
+            proxy (Dict[str, Any]): 代理配置字典。
+            now (float): 目前時間戳。
+            
+        返回:
+            float: 分數，越高越好。
+        """
+        health = self._get_health(proxy)
+        if health.is_quarantined(now):
+            return 0.0
+        reference = self.timeout * 1000.0
+        latency = health.latency_ewma if health.latency_ewma is not None else reference / 2
+        return max(health.success_ewma, 0.01) / (1.0 + latency / reference)
+    
+    def report_result(
+        self,
+        proxy: Dict[str, Any],
+        success: bool,
+        response_time: Optional[float] = None,
+        error: Optional[str] = None
+    ) -> ProxyHealth:
+        """
+        記錄一次代理使用結果，更新 EWMA 並處理隔離。
+        
+        可由健康檢查或實際爬取結果呼叫。
+        
+        參數:
+            proxy (Dict[str, Any]): 代理配置字典。
+            success (bool): 是否成功。
+            response_time (Optional[float]): 響應時間（毫秒）。
+            error (Optional[str]): 錯誤訊息。
+            
+        返回:
+            ProxyHealth: 更新後的健康狀態。
+        """
+        alpha = self.ewma_alpha
+        now = time.time()
+        with self._lock:
+            health = self._get_health(proxy)
+            health.checks += 1
+            health.last_checked = now
+            health.success_ewma = (1 - alpha) * health.success_ewma + alpha * (1.0 if success else 0.0)
+            if success:
+                if response_time is not None:
+                    health.latency_ewma = response_time if health.latency_ewma is None else (
+                        (1 - alpha) * health.latency_ewma + alpha * response_time
+                    )
+                health.consecutive_failures = 0
+                health.quarantined_until = 0.0
+                health.last_error = None
+            else:
+                health.failures += 1
+                health.consecutive_failures += 1
+                health.last_error = error
+                # 剛結束隔離的代理再次失敗時立即重新隔離
+                if health.consecutive_failures >= self.quarantine_after or health.quarantined_until:
+                    health.quarantine_count += 1
+                    backoff = min(2 ** (health.quarantine_count - 1), 8)
+                    health.quarantined_until = now + self.quarantine_seconds * backoff
+                    health.consecutive_failures = 0
+                    logger.warning(
+                        f"代理 {proxy['server']} 連續失敗，隔離 {self.quarantine_seconds * backoff:.0f} 秒"
+                    )
+            return health
+    
+    def get_proxy_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        獲取所有代理的健康狀態與分數。
+        
+        返回:
+            Dict[str, Dict[str, Any]]: 以代理地址為鍵的健康狀態字典。
+        """
+        now = time.time()
+        stats = {}
+        for proxy in self.proxies:
+            health = self._get_health(proxy)
+            with self._lock:
+                entry = asdict(health)
+            entry["score"] = self.get_score(proxy, now)
+            entry["quarantined"] = health.is_quarantined(now)
+            stats[proxy["server"]] = entry
+        return stats
+    
     def test_proxy(self, proxy: Dict[str, Any]) -> Dict[str, Any]:
         """
         測試代理的連通性。
@@ -207,9 +397,9 @@ class ProxyManager:
             req_proxy[protocol] = server
             
         try:
-            start_time = time.time()
-            response = requests.get(self.test_url, proxies=req_proxy, timeout=self.timeout)
-            end_time = time.time()
+            start_time = time.perf_counter()
+            response = self._session().get(self.test_url, proxies=req_proxy, timeout=self.timeout)
+            end_time = time.perf_counter()
             
             if response.status_code == 200:
                 result["success"] = True
@@ -237,29 +427,59 @@ class ProxyManager:
         except Exception as e:
             result["error"] = str(e)
             logger.warning(f"測試代理 {proxy['server']} 時發生錯誤: {str(e)}")
-            
+        
+        self.report_result(proxy, result["success"], result["response_time"], result["error"])
+        if result["ip"]:
+            self._get_health(proxy).ip = result["ip"]
         return result
     
-    def test_all_proxies(self) -> List[Dict[str, Any]]:
+    def _session(self) -> requests.Session:
         """
-        測試所有代理的連通性。
+        獲取目前執行緒的 requests Session，重用連線。
         
         返回:
-            List[Dict[str, Any]]: 所有代理的測試結果列表。
+            requests.Session: Session 實例。
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            # 只使用指定的代理，不讀取環境變數中的代理設定
+            session.trust_env = False
+        return session
+    
+    def test_proxies(self, proxies: List[Dict[str, Any]], max_workers: int = None) -> List[Dict[str, Any]]:
         """
-        results = []
+        以有上限的執行緒池並行測試代理。
         
+        參數:
+            proxies (List[Dict[str, Any]]): 要測試的代理列表。
+            max_workers (int): 最大並行數，預設使用 self.max_workers。
+            
+        返回:
+            List[Dict[str, Any]]: 與輸入順序相同的測試結果列表。
+        """
+        if not proxies:
+            return []
+        workers = min(max_workers or self.max_workers, len(proxies))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proxy-check") as executor:
+            return list(executor.map(self.test_proxy, proxies))
+    
+    def test_all_proxies(self, max_workers: int = None) -> List[Dict[str, Any]]:
+        """
+        並行測試所有代理的連通性。
+        
+        參數:
+            max_workers (int): 最大並行數，預設使用 self.max_workers。
+            
+        返回:
+            List[Dict[str, Any]]: 所有代理的測試結果列表。
+        """
         if not self.proxies:
             logger.warning("代理列表為空，無法測試")
-            return results
+            return []
             
         logger.info(f"開始測試 {len(self.proxies)} 個代理...")
-        
-        for proxy in self.proxies:
-            result = self.test_proxy(proxy)
-            results.append(result)
-            # 避免過快測試
-            time.sleep(1)
+        results = self.test_proxies(list(self.proxies), max_workers)
             
         # 統計結果
         success_count = sum(1 for r in results if r["success"])
@@ -288,6 +508,61 @@ class ProxyManager:
         logger.info(f"找到 {len(working_proxies)} 個可用代理")
         return working_proxies
     
+    def probe_due_proxies(self) -> List[Dict[str, Any]]:
+        """
+        重新探測隔離期已結束或超過探測間隔未檢查的代理。
+        
+        返回:
+            List[Dict[str, Any]]: 本次探測的測試結果列表。
+        """
+        now = time.time()
+        due = []
+        for proxy in list(self.proxies):
+            health = self._get_health(proxy)
+            if health.is_quarantined(now):
+                continue
+            if health.quarantined_until or now - health.last_checked >= self.probe_interval:
+                due.append(proxy)
+        return self.test_proxies(due)
+    
+    def start_health_monitor(self, interval: float = None) -> None:
+        """
+        啟動背景健康檢查執行緒，定期重新探測代理。
+        
+        參數:
+            interval (float): 檢查間隔秒數，預設使用 probe_interval。
+        """
+        if self._monitor_thread and self._monitor_thread.is_alive():
+            return
+        interval = interval or self.probe_interval
+        self._monitor_stop.clear()
+        
+        def monitor():
+            while not self._monitor_stop.wait(interval):
+                try:
+                    results = self.probe_due_proxies()
+                    if results:
+                        ok = sum(1 for r in results if r["success"])
+                        logger.info(f"背景探測 {len(results)} 個代理，{ok} 個可用")
+                except Exception as e:
+                    logger.error(f"背景探測代理時發生錯誤: {str(e)}")
+        
+        self._monitor_thread = threading.Thread(target=monitor, name="proxy-health-monitor", daemon=True)
+        self._monitor_thread.start()
+        logger.info(f"已啟動代理背景健康檢查，間隔 {interval} 秒")
+    
+    def stop_health_monitor(self, timeout: float = None) -> None:
+        """
+        停止背景健康檢查執行緒。
+        
+        參數:
+            timeout (float): 等待執行緒結束的秒數。
+        """
+        self._monitor_stop.set()
+        if self._monitor_thread:
+            self._monitor_thread.join(timeout)
+            self._monitor_thread = None
+    
     def save_proxies_to_file(self, file_path: str) -> bool:
         """
         將目前的代理列表保存到檔案。
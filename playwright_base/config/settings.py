@@ -96,6 +96,17 @@ DEFAULT_CONFIG = {
             }
         }
     },
+    "interception": {
+        "enabled": False,
+        "block_resource_types": ["image", "media", "font"],  # 封鎖的資源類型
+        "use_default_block_domains": True,  # 是否封鎖內建的廣告／分析網域清單
+        "block_domains": [],  # 額外封鎖的網域（含子網域）
+        "allow_domains": [],  # 白名單網域，優先於封鎖清單
+        "cache_dir": None,  # 靜態資源本地快取目錄，None 表示不快取
+        "cache_resource_types": ["stylesheet", "script"],
+        "cache_ttl": 86400,  # 快取有效秒數，過期後重新抓取；None 表示永不過期
+        "estimated_sizes": {}  # 各資源類型的回應大小估計（位元組），用於估算封鎖節省量
+    },
     "page_management": {
         "max_pages": 3,  # 最大允許的頁面數量
         "auto_close_popups": True
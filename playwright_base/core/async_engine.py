@@ -0,0 +1,536 @@
+"""
+非同步爬取引擎
+
+以 async_playwright 啟動單一瀏覽器，建立多個彼此隔離的上下文與有上限的頁面池，
+從佇列取出 URL 工作項目並行爬取：
+
+- 每個上下文可各自設定 storage_state、proxy 與 user_agent
+- 每個網域有並行上限，超過上限的工作暫緩，不阻塞其他網域
+- 結果以回調函數或非同步迭代器串流輸出
+- 以 context 的 page 事件即時關閉彈出視窗，取代定時輪詢
+"""
+
+import os
+import json
+import time
+import asyncio
+import inspect
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator, Deque, Iterable, Union
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, Page, Response, BrowserContext
+
+from playwright_base.core.base import STEALTH_INIT_SCRIPT
+from playwright_base.utils.logger import setup_logger
+from playwright_base.utils.exceptions import BrowserException
+
+# 設置日誌
+logger = setup_logger(name=__name__)
+
+# 頁面處理函數：接收 (page, response, task)，回傳爬取結果
+PageHandler = Callable[[Page, Optional[Response], 'CrawlTask'], Any]
+
+
+@dataclass
+class CrawlTask:
+    """
+    爬取工作項目
+    """
+    url: str
+    handler: Optional[PageHandler] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+    attempt: int = 0
+
+    @property
+    def domain(self) -> str:
+        """URL 的網域"""
+        return (urlparse(self.url).hostname or "").lower()
+
+
+@dataclass
+class CrawlResult:
+    """
+    爬取結果
+    """
+    url: str
+    status: Optional[int] = None
+    data: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    context_index: int = 0
+    attempts: int = 1
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """是否成功"""
+        return self.error is None
+
+
+async def default_handler(page: Page, response: Optional[Response], task: CrawlTask) -> str:
+    """
+    預設頁面處理函數，回傳頁面 HTML。
+
+    參數:
+        page (Page): 頁面對象。
+        response (Optional[Response]): 導航響應。
+        task (CrawlTask): 工作項目。
+
+    返回:
+        str: 頁面 HTML。
+    """
+    return await page.content()
+
+
+class AsyncCrawlEngine:
+    """
+    非同步多上下文爬取引擎。
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        browser_type: str = "chromium",
+        contexts: int = 4,
+        pages_per_context: int = 4,
+        per_domain_limit: int = 4,
+        storage_state: Union[str, Dict[str, Any]] = None,
+        user_agent: str = None,
+        proxy: Dict[str, str] = None,
+        context_profiles: List[Dict[str, Any]] = None,
+        viewport: Dict[str, int] = None,
+        args: List[str] = None,
+        ignore_https_errors: bool = True,
+        slow_mo: int = 0,
+        stealth: bool = True,
+        close_popups: bool = True,
+        timeout: int = 30000,
+        wait_until: str = "domcontentloaded",
+        max_retries: int = 2,
+        retry_delay: float = 1.0,
+        handler: PageHandler = None,
+        on_result: Callable[[CrawlResult], Any] = None
+    ):
+        """
+        初始化 AsyncCrawlEngine 實例。
+
+        參數:
+            headless (bool): 是否以無頭模式運行瀏覽器。
+            browser_type (str): 瀏覽器類型，可選值: 'chromium', 'firefox', 'webkit'。
+            contexts (int): 上下文數量；提供 context_profiles 時以其長度為準。
+            pages_per_context (int): 每個上下文的頁面數，總並行頁面數為兩者乘積。
+            per_domain_limit (int): 每個網域的最大並行數。
+            storage_state (Union[str, Dict[str, Any]]): 預設存儲狀態檔案路徑或狀態對象。
+            user_agent (str): 預設 User-Agent。
+            proxy (Dict[str, str]): 預設代理設置。
+            context_profiles (List[Dict[str, Any]]): 各上下文的設定，
+                可覆蓋 storage_state、user_agent、proxy 與其他 new_context 參數。
+            viewport (Dict[str, int]): 視窗大小。
+            args (List[str]): 瀏覽器啟動參數。
+            ignore_https_errors (bool): 是否忽略 HTTPS 錯誤。
+            slow_mo (int): 減慢操作的毫秒數。
+            stealth (bool): 是否在每個上下文注入隱身模式腳本。
+            close_popups (bool): 是否自動關閉非引擎建立的頁面。
+            timeout (int): 導航超時時間（毫秒）。
+            wait_until (str): 導航完成的條件。
+            max_retries (int): 失敗時的最大重試次數。
+            retry_delay (float): 重試的基礎延遲（秒），依嘗試次數遞增。
+            handler (PageHandler): 預設頁面處理函數，可為同步或非同步函數。
+            on_result (Callable[[CrawlResult], Any]): 每筆結果的回調函數，可為同步或非同步函數。
+        """
+        if pages_per_context <= 0 or per_domain_limit <= 0:
+            raise ValueError("pages_per_context 與 per_domain_limit 必須大於 0")
+
+        self.headless = headless
+        self.browser_type = browser_type
+        self.pages_per_context = pages_per_context
+        self.per_domain_limit = per_domain_limit
+        self.viewport = viewport or {'width': 1920, 'height': 1080}
+        self.args = args or []
+        self.ignore_https_errors = ignore_https_errors
+        self.slow_mo = slow_mo
+        self.stealth = stealth
+        self.close_popups = close_popups
+        self.timeout = timeout
+        self.wait_until = wait_until
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.handler = handler or default_handler
+        self.on_result = on_result
+
+        defaults = {'storage_state': storage_state, 'user_agent': user_agent, 'proxy': proxy}
+        profiles = context_profiles or [{} for _ in range(max(1, contexts))]
+        self.context_profiles = [{**defaults, **profile} for profile in profiles]
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: List[BrowserContext] = []
+        self._own_pages = set()
+        self._queue: Optional[asyncio.Queue] = None
+        # 由 crawl() 提交的工作對應到該次呼叫的結果佇列，以工作的 id 為鍵
+        self._sinks: Dict[int, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._domain_active: Dict[str, int] = defaultdict(int)
+        self._deferred: Dict[str, Deque[CrawlTask]] = defaultdict(deque)
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0, "retried": 0, "deferred": 0}
+
+    @property
+    def concurrency(self) -> int:
+        """總並行頁面數"""
+        return len(self.context_profiles) * self.pages_per_context
+
+    @property
+    def contexts(self) -> List[BrowserContext]:
+        """獲取所有瀏覽器上下文"""
+        return self._contexts
+
+    def _context_options(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        依上下文設定組合 new_context 參數。
+
+        參數:
+            profile (Dict[str, Any]): 上下文設定。
+
+        返回:
+            Dict[str, Any]: new_context 參數。
+        """
+        options = {
+            'viewport': self.viewport,
+            'ignore_https_errors': self.ignore_https_errors
+        }
+        for key, value in profile.items():
+            if value is None:
+                continue
+            if key == 'storage_state' and isinstance(value, str):
+                if not os.path.exists(value):
+                    logger.warning(f"存儲狀態檔案 {value} 不存在")
+                    continue
+                try:
+                    with open(value, 'r', encoding='utf-8') as f:
+                        content = f.read().strip()
+                    if not content:
+                        logger.warning(f"儲存狀態檔案 {value} 是空的")
+                        continue
+                    json.loads(content)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"儲存狀態檔案 {value} 無法使用: {str(e)}")
+                    continue
+            options[key] = value
+        return options
+
+    async def start(self) -> 'AsyncCrawlEngine':
+        """
+        啟動瀏覽器、建立所有上下文與工作協程。
+
+        返回:
+            AsyncCrawlEngine: 返回自身實例。
+
+        異常:
+            BrowserException: 瀏覽器啟動失敗時拋出。
+        """
+        try:
+            logger.info(
+                f"啟動 {self.browser_type} 瀏覽器：{len(self.context_profiles)} 個上下文，"
+                f"並行頁面 {self.concurrency} 個"
+            )
+            self._playwright = await async_playwright().start()
+            browser_class = getattr(self._playwright, self.browser_type, None)
+            if browser_class is None:
+                logger.warning(f"未知瀏覽器類型: {self.browser_type}，使用默認 chromium")
+                browser_class = self._playwright.chromium
+            self._browser = await browser_class.launch(
+                headless=self.headless,
+                args=self.args,
+                slow_mo=self.slow_mo
+            )
+
+            for profile in self.context_profiles:
+                context = await self._browser.new_context(**self._context_options(profile))
+                if self.stealth:
+                    await context.add_init_script(STEALTH_INIT_SCRIPT)
+                if self.close_popups:
+                    context.on("page", self._on_page_created)
+                self._contexts.append(context)
+
+            self._queue = asyncio.Queue()
+            self._workers = [
+                asyncio.create_task(self._worker(index // self.pages_per_context))
+                for index in range(self.concurrency)
+            ]
+            return self
+        except Exception as e:
+            logger.error(f"啟動非同步爬取引擎時發生錯誤: {str(e)}")
+            await self.close()
+            raise BrowserException(f"啟動瀏覽器失敗: {str(e)}")
+
+    async def close(self) -> None:
+        """
+        停止工作協程並關閉所有上下文與瀏覽器。
+        """
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.error(f"關閉上下文時發生錯誤: {str(e)}")
+        self._contexts = []
+        self._own_pages.clear()
+
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.error(f"關閉瀏覽器時發生錯誤: {str(e)}")
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.error(f"關閉 Playwright 時發生錯誤: {str(e)}")
+        self._browser = None
+        self._playwright = None
+
+    async def __aenter__(self) -> 'AsyncCrawlEngine':
+        """
+        支持非同步上下文管理器協議，進入時啟動引擎。
+        """
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        支持非同步上下文管理器協議，退出時關閉引擎。
+        """
+        await self.close()
+
+    async def _on_page_created(self, page: Page) -> None:
+        """
+        關閉非引擎建立的頁面（彈出視窗、target=_blank 等）。
+
+        參數:
+            page (Page): 新建立的頁面。
+        """
+        # 讓 _new_page 有機會先登記自己建立的頁面
+        await asyncio.sleep(0)
+        if page in self._own_pages:
+            return
+        try:
+            logger.info(f"關閉彈出頁面: {page.url}")
+            await page.close()
+        except Exception as e:
+            logger.debug(f"關閉彈出頁面時發生錯誤: {str(e)}")
+
+    async def _new_page(self, context_index: int) -> Page:
+        """
+        在指定上下文中建立引擎管理的頁面。
+
+        參數:
+            context_index (int): 上下文索引。
+
+        返回:
+            Page: 頁面對象。
+        """
+        page = await self._contexts[context_index].new_page()
+        self._own_pages.add(page)
+        return page
+
+    def submit(self, items: Iterable[Union[str, CrawlTask]]) -> int:
+        """
+        提交工作項目到佇列。
+
+        結果只傳給 on_result 回調，不會保留；需要逐筆取得結果時使用 crawl() 或 run()。
+
+        參數:
+            items (Iterable[Union[str, CrawlTask]]): URL 或 CrawlTask。
+
+        返回:
+            int: 提交的數量。
+
+        異常:
+            BrowserException: 引擎尚未啟動時拋出。
+        """
+        if self._queue is None:
+            raise BrowserException("引擎尚未啟動，請先調用 start() 方法")
+        count = 0
+        for item in items:
+            task = item if isinstance(item, CrawlTask) else CrawlTask(url=item)
+            self._queue.put_nowait(task)
+            count += 1
+        self._stats["submitted"] += count
+        return count
+
+    async def join(self) -> None:
+        """
+        等待所有已提交的工作完成。
+        """
+        await self._queue.join()
+
+    async def crawl(self, items: Iterable[Union[str, CrawlTask]]) -> AsyncIterator[CrawlResult]:
+        """
+        提交工作並依完成順序串流輸出結果。
+
+        每次呼叫有自己的結果佇列，只接收本次提交的工作結果；
+        提前停止迭代後，剩餘工作的結果不再保留。
+
+        參數:
+            items (Iterable[Union[str, CrawlTask]]): URL 或 CrawlTask。
+
+        返回:
+            AsyncIterator[CrawlResult]: 爬取結果。
+        """
+        tasks = [item if isinstance(item, CrawlTask) else CrawlTask(url=item) for item in items]
+        self.submit(tasks)
+        # 工作協程在下一次 await 前不會執行，提交後再登記不會遺漏結果
+        results: asyncio.Queue = asyncio.Queue()
+        for task in tasks:
+            self._sinks[id(task)] = results
+        try:
+            for _ in tasks:
+                yield await results.get()
+        finally:
+            for task in tasks:
+                self._sinks.pop(id(task), None)
+
+    async def run(self, items: Iterable[Union[str, CrawlTask]]) -> List[CrawlResult]:
+        """
+        提交工作並等待全部完成。
+
+        參數:
+            items (Iterable[Union[str, CrawlTask]]): URL 或 CrawlTask。
+
+        返回:
+            List[CrawlResult]: 依完成順序排列的爬取結果。
+        """
+        return [result async for result in self.crawl(items)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取引擎統計。
+
+        返回:
+            Dict[str, Any]: 提交、成功、失敗、重試與暫緩次數，以及目前的佇列長度。
+        """
+        stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize() if self._queue else 0
+        stats["deferred_waiting"] = sum(len(d) for d in self._deferred.values())
+        stats["active_domains"] = {d: n for d, n in self._domain_active.items() if n}
+        return stats
+
+    async def _worker(self, context_index: int) -> None:
+        """
+        工作協程：持有一個頁面，反覆從佇列取出工作並執行。
+
+        參數:
+            context_index (int): 所屬上下文索引。
+        """
+        page = None
+        while True:
+            task = await self._queue.get()
+            domain = task.domain
+            if self._domain_active[domain] >= self.per_domain_limit:
+                # 網域已滿，暫緩到該網域有空位時再放回佇列
+                self._deferred[domain].append(task)
+                self._stats["deferred"] += 1
+                self._queue.task_done()
+                continue
+
+            self._domain_active[domain] += 1
+            start = time.monotonic()
+            try:
+                while True:
+                    try:
+                        if page is None or page.is_closed():
+                            page = await self._new_page(context_index)
+                        result = await self._execute(page, task, context_index)
+                    except Exception as e:
+                        result = CrawlResult(url=task.url, error=str(e), context_index=context_index,
+                                             attempts=task.attempt + 1, meta=task.meta)
+                        # 失敗後換新頁面，避免殘留狀態影響下一次嘗試
+                        await self._discard_page(page)
+                        page = None
+                    if result.ok or task.attempt >= self.max_retries:
+                        break
+                    task.attempt += 1
+                    self._stats["retried"] += 1
+                    logger.warning(f"爬取 {task.url} 失敗（第 {task.attempt} 次）: {result.error}，稍後重試")
+                    # 重試期間保留網域名額，避免對失敗中的網站加壓
+                    await asyncio.sleep(self.retry_delay * task.attempt)
+            finally:
+                self._domain_active[domain] -= 1
+                if self._deferred[domain]:
+                    self._queue.put_nowait(self._deferred[domain].popleft())
+
+            result.elapsed = time.monotonic() - start
+            if result.ok:
+                self._stats["succeeded"] += 1
+            else:
+                self._stats["failed"] += 1
+                logger.error(f"爬取 {task.url} 失敗: {result.error}")
+            await self._emit(task, result)
+            self._queue.task_done()
+
+    async def _discard_page(self, page: Optional[Page]) -> None:
+        """
+        關閉並移除引擎管理的頁面。
+
+        參數:
+            page (Optional[Page]): 頁面對象。
+        """
+        if page is None:
+            return
+        self._own_pages.discard(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            logger.debug(f"關閉頁面時發生錯誤: {str(e)}")
+
+    async def _execute(self, page: Page, task: CrawlTask, context_index: int) -> CrawlResult:
+        """
+        導航並執行頁面處理函數。
+
+        參數:
+            page (Page): 頁面對象。
+            task (CrawlTask): 工作項目。
+            context_index (int): 所屬上下文索引。
+
+        返回:
+            CrawlResult: 爬取結果。
+        """
+        response = await page.goto(task.url, timeout=self.timeout, wait_until=self.wait_until)
+        handler = task.handler or self.handler
+        data = handler(page, response, task)
+        if inspect.isawaitable(data):
+            data = await data
+        return CrawlResult(
+            url=task.url,
+            status=response.status if response else None,
+            data=data,
+            context_index=context_index,
+            attempts=task.attempt + 1,
+            meta=task.meta
+        )
+
+    async def _emit(self, task: CrawlTask, result: CrawlResult) -> None:
+        """
+        輸出結果到回調函數，以及提交該工作的 crawl() 呼叫的結果佇列。
+
+        參數:
+            task (CrawlTask): 工作項目。
+            result (CrawlResult): 爬取結果。
+        """
+        if self.on_result is not None:
+            try:
+                value = self.on_result(result)
+                if inspect.isawaitable(value):
+                    await value
+            except Exception as e:
+                logger.error(f"結果回調函數發生錯誤: {str(e)}")
+        sink = self._sinks.pop(id(task), None)
+        if sink is not None:
+            sink.put_nowait(result)
@@ -15,10 +15,55 @@ from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page,
 
 from playwright_base.utils.logger import setup_logger
 from playwright_base.utils.exceptions import BrowserException, NavigationException, TimeoutException
+from playwright_base.core.interceptor import RequestInterceptor
 
 # 設置日誌
 logger = setup_logger(name=__name__)
 
+# 隱身模式注入腳本（同步與非同步引擎共用）
+STEALTH_INIT_SCRIPT = """
+    // 修補 navigator
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => false,
+    });
+
+    // 修補 plugins
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => {
+            return [
+                {
+                    0: {
+                        type: "application/pdf",
+                        suffixes: "pdf",
+                        description: "Portable Document Format"
+                    },
+                    name: "PDF Viewer",
+                    filename: "internal-pdf-viewer",
+                    description: "Portable Document Format"
+                }
+            ];
+        }
+    });
+
+    // 修補 languages
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['zh-TW', 'zh', 'en-US', 'en'],
+    });
+
+    // 隱藏自動化特徵
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+        Promise.resolve({ state: Notification.permission }) :
+        originalQuery(parameters)
+    );
+
+    // 模擬正常的歷史記錄長度
+    Object.defineProperty(history, 'length', {
+        get: () => 2 + Math.floor(Math.random() * 3)
+    });
+"""
+
 class PlaywrightBase:
     """
     Playwright Base 核心基礎類，提供瀏覽器自動化的基礎功能。
@@ -34,7 +79,8 @@ class PlaywrightBase:
         viewport: Dict[str, int] = None,
         args: List[str] = None,
         ignore_https_errors: bool = True,
-        slow_mo: int = 0
+        slow_mo: int = 0,
+        interception: Union[bool, Dict[str, Any], RequestInterceptor] = None
     ):
         """
         初始化 PlaywrightBase 實例。
@@ -49,6 +95,8 @@ class PlaywrightBase:
             args (List[str]): 瀏覽器啟動參數。
             ignore_https_errors (bool): 是否忽略 HTTPS 錯誤。
             slow_mo (int): 減慢操作的毫秒數，用於調試。
+            interception (Union[bool, Dict[str, Any], RequestInterceptor]): 請求攔截設定，
+                True 使用預設規則，字典對應 settings 的 interception 區段，None 表示不攔截。
         """
         # 初始化參數
         self.headless = headless
@@ -61,6 +109,9 @@ class PlaywrightBase:
         self.ignore_https_errors = ignore_https_errors
         self.slow_mo = slow_mo
         
+        # 請求攔截器
+        self._interceptor = self._build_interceptor(interception)
+        
         # 初始化 Playwright 相關屬性
         self._playwright = None
         self._browser = None
@@ -97,6 +148,65 @@ class PlaywrightBase:
         """獲取所有頁面實例"""
         return self._pages
     
+    @property
+    def interceptor(self) -> Optional[RequestInterceptor]:
+        """獲取請求攔截器"""
+        return self._interceptor
+    
+    @staticmethod
+    def _build_interceptor(
+        interception: Union[bool, Dict[str, Any], RequestInterceptor, None]
+    ) -> Optional[RequestInterceptor]:
+        """
+        依設定建立請求攔截器。
+
+        參數:
+            interception: True、配置字典或 RequestInterceptor 實例。
+        
+        返回:
+            Optional[RequestInterceptor]: 攔截器，未啟用時為 None。
+        """
+        if isinstance(interception, RequestInterceptor):
+            return interception
+        if isinstance(interception, dict):
+            if not interception.get("enabled", True):
+                return None
+            return RequestInterceptor.from_config(interception)
+        if interception:
+            return RequestInterceptor()
+        return None
+    
+    def enable_interception(
+        self,
+        interception: Union[bool, Dict[str, Any], RequestInterceptor] = True
+    ) -> RequestInterceptor:
+        """
+        啟用請求攔截；瀏覽器已啟動時立即掛載到目前的上下文。
+
+        參數:
+            interception: True、配置字典或 RequestInterceptor 實例。
+        
+        返回:
+            RequestInterceptor: 使用中的攔截器。
+        """
+        if self._interceptor:
+            self._interceptor.detach()
+        self._interceptor = self._build_interceptor(interception) or RequestInterceptor()
+        if self._context:
+            self._interceptor.attach(self._context)
+        return self._interceptor
+    
+    def get_interception_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        獲取請求攔截統計。
+
+        返回:
+            Dict[str, Dict[str, int]]: 各資源類型的允許、封鎖、快取命中數與節省位元組數。
+        """
+        if not self._interceptor:
+            return {}
+        return self._interceptor.get_stats()
+    
     def start(self) -> 'PlaywrightBase':
         """
         啟動瀏覽器和創建上下文。
@@ -170,6 +280,10 @@ class PlaywrightBase:
             # 創建瀏覽器上下文
             self._context = self._browser.new_context(**context_options)
             
+            # 在建立頁面前掛載請求攔截，確保第一次導航也經過攔截
+            if self._interceptor:
+                self._interceptor.attach(self._context)
+            
             # 創建頁面
             self._page = self._context.new_page()
             self._pages = [self._page]
@@ -198,6 +312,10 @@ class PlaywrightBase:
                 timer.cancel()
         self._timers = []
         
+        # 移除請求攔截
+        if self._interceptor:
+            self._interceptor.detach()
+        
         # 關閉上下文
         if self._context and not self._context.is_closed():
             logger.info("關閉瀏覽器上下文...")
@@ -325,48 +443,7 @@ class PlaywrightBase:
         logger.info("啟用隱身模式...")
         try:
             # 注入基礎反檢測腳本
-            self._page.add_init_script("""
-                // 修補 navigator
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => false,
-                });
-                
-                // 修補 plugins
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => {
-                        return [
-                            {
-                                0: {
-                                    type: "application/pdf",
-                                    suffixes: "pdf",
-                                    description: "Portable Document Format"
-                                },
-                                name: "PDF Viewer",
-                                filename: "internal-pdf-viewer",
-                                description: "Portable Document Format"
-                            }
-                        ];
-                    }
-                });
-                
-                // 修補 languages
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['zh-TW', 'zh', 'en-US', 'en'],
-                });
-                
-                // 隱藏自動化特徵
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                    Promise.resolve({ state: Notification.permission }) :
-                    originalQuery(parameters)
-                );
-                
-                // 模擬正常的歷史記錄長度
-                Object.defineProperty(history, 'length', {
-                    get: () => 2 + Math.floor(Math.random() * 3)
-                });
-            """)
+            self._page.add_init_script(STEALTH_INIT_SCRIPT)
             
             self._is_stealth_mode_enabled = True
             logger.info("隱身模式已啟用")
@@ -0,0 +1,408 @@
+"""
+請求攔截模組
+
+以 context.route 在網路層攔截請求：
+- 依資源類型（image、font、media 等）封鎖
+- 依網域清單封鎖廣告與分析服務
+- 依規則改寫回應，或從本地快取直接回應靜態資源
+
+每種資源類型分別統計允許、封鎖、快取命中的請求數與節省的位元組數。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Callable, Iterable, Pattern, Tuple
+from urllib.parse import urlparse
+
+from playwright_base.utils.logger import setup_logger
+
+# 設置日誌
+logger = setup_logger(name=__name__)
+
+# 預設封鎖的資源類型（提取器只讀取 DOM 文字）
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+# 常見廣告與分析網域
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "hotjar.com",
+    "chartbeat.com",
+    "amazon-adsystem.com",
+)
+
+# 各資源類型的預設回應大小估計（位元組，約為一般網頁單一請求的中位數）。
+# 被封鎖的類型永遠不會有放行回應可供觀察，因此以此作為節省量估算的起點。
+DEFAULT_RESOURCE_SIZES = {
+    "image": 20_000,
+    "media": 250_000,
+    "font": 25_000,
+    "script": 15_000,
+    "stylesheet": 8_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "other": 5_000,
+}
+
+# 快取回應時不保存的標頭：route.fetch() 已解壓回應內容，原本的編碼與長度不再適用
+UNCACHED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+# 預設快取有效秒數
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+# 永不封鎖的資源類型，避免破壞導航
+NEVER_BLOCKED_RESOURCE_TYPES = ("document",)
+
+# 改寫規則：回傳 route.fulfill 參數字典，或 None 表示不處理
+RewriteHandler = Callable[[Any], Optional[Dict[str, Any]]]
+
+
+class RequestInterceptor:
+    """
+    請求攔截器，掛載到 BrowserContext 後對所有頁面生效。
+    """
+
+    def __init__(
+        self,
+        block_resource_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        block_domains: Iterable[str] = DEFAULT_BLOCKED_DOMAINS,
+        allow_domains: Iterable[str] = (),
+        cache_dir: str = None,
+        cache_resource_types: Iterable[str] = ("stylesheet", "script"),
+        rewrites: List[Tuple[str, RewriteHandler]] = None,
+        estimated_sizes: Dict[str, int] = None,
+        cache_ttl: Optional[float] = DEFAULT_CACHE_TTL
+    ):
+        """
+        初始化 RequestInterceptor 實例。
+
+        參數:
+            block_resource_types (Iterable[str]): 要封鎖的資源類型。
+            block_domains (Iterable[str]): 要封鎖的網域，包含其所有子網域。
+            allow_domains (Iterable[str]): 白名單網域，優先於封鎖清單。
+            cache_dir (str): 本地回應快取目錄，None 表示不快取。
+            cache_resource_types (Iterable[str]): 從本地快取回應的資源類型。
+            rewrites (List[Tuple[str, RewriteHandler]]): (URL 正則, 處理函數) 改寫規則。
+            estimated_sizes (Dict[str, int]): 各資源類型的回應大小估計，覆寫 DEFAULT_RESOURCE_SIZES。
+            cache_ttl (Optional[float]): 快取有效秒數，過期後重新抓取；None 表示永不過期。
+        """
+        self.block_resource_types = set(block_resource_types) - set(NEVER_BLOCKED_RESOURCE_TYPES)
+        self.block_domains = {d.lower().lstrip(".") for d in block_domains}
+        self.allow_domains = {d.lower().lstrip(".") for d in allow_domains}
+        self.cache_dir = cache_dir
+        self.cache_resource_types = set(cache_resource_types)
+        self.cache_ttl = cache_ttl
+        self._rewrites: List[Tuple[Pattern, RewriteHandler]] = []
+        for pattern, handler in rewrites or []:
+            self.add_rewrite(pattern, handler)
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        # 各資源類型已觀察到的回應大小（總位元組, 次數），用於估算封鎖節省量
+        self._sizes: Dict[str, List[int]] = {}
+        self.estimated_sizes = dict(DEFAULT_RESOURCE_SIZES)
+        self.estimated_sizes.update(estimated_sizes or {})
+        self._contexts = []
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RequestInterceptor':
+        """
+        從配置字典建立攔截器，欄位對應 settings 中的 interception 區段。
+
+        參數:
+            config (Dict[str, Any]): 攔截配置。
+
+        返回:
+            RequestInterceptor: 攔截器實例。
+        """
+        block_domains = list(config.get("block_domains") or [])
+        if config.get("use_default_block_domains", True):
+            block_domains.extend(DEFAULT_BLOCKED_DOMAINS)
+        return cls(
+            block_resource_types=config.get("block_resource_types", DEFAULT_BLOCKED_RESOURCE_TYPES),
+            block_domains=block_domains,
+            allow_domains=config.get("allow_domains", ()),
+            cache_dir=config.get("cache_dir"),
+            cache_resource_types=config.get("cache_resource_types", ("stylesheet", "script")),
+            estimated_sizes=config.get("estimated_sizes"),
+            cache_ttl=config.get("cache_ttl", DEFAULT_CACHE_TTL)
+        )
+
+    def add_rewrite(self, pattern: str, handler: RewriteHandler) -> None:
+        """
+        新增回應改寫規則。
+
+        參數:
+            pattern (str): URL 正則表達式。
+            handler (RewriteHandler): 接收 Request，回傳 route.fulfill 參數字典或 None。
+        """
+        self._rewrites.append((re.compile(pattern), handler))
+
+    def attach(self, context) -> None:
+        """
+        掛載到瀏覽器上下文，之後建立的與現有的頁面都會經過攔截。
+
+        參數:
+            context (BrowserContext): Playwright 瀏覽器上下文。
+        """
+        context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+        self._contexts.append(context)
+        logger.info(
+            f"已啟用請求攔截：封鎖類型 {sorted(self.block_resource_types)}，"
+            f"封鎖網域 {len(self.block_domains)} 個，快取 {'開啟' if self.cache_dir else '關閉'}"
+        )
+
+    def detach(self) -> None:
+        """
+        從所有已掛載的瀏覽器上下文移除攔截。
+        """
+        for context in self._contexts:
+            try:
+                context.unroute("**/*", self._handle_route)
+                context.remove_listener("response", self._on_response)
+            except Exception as e:
+                logger.debug(f"移除請求攔截時發生錯誤: {str(e)}")
+        self._contexts = []
+
+    def is_blocked_domain(self, url: str) -> bool:
+        """
+        判斷 URL 的網域是否在封鎖清單中（含子網域）。
+
+        參數:
+            url (str): 請求 URL。
+
+        返回:
+            bool: 是否封鎖。
+        """
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return False
+        labels = host.split(".")
+        suffixes = [".".join(labels[i:]) for i in range(len(labels))]
+        if self.allow_domains and any(s in self.allow_domains for s in suffixes):
+            return False
+        return any(s in self.block_domains for s in suffixes)
+
+    def _handle_route(self, route, request) -> None:
+        """
+        route 處理函數：依序套用改寫、類型封鎖、網域封鎖與本地快取。
+
+        參數:
+            route (Route): Playwright 路由對象。
+            request (Request): Playwright 請求對象。
+        """
+        resource_type = request.resource_type
+        url = request.url
+        try:
+            for pattern, handler in self._rewrites:
+                if pattern.search(url):
+                    fulfill = handler(request)
+                    if fulfill is not None:
+                        self._count(resource_type, "rewritten")
+                        route.fulfill(**fulfill)
+                        return
+
+            if resource_type in self.block_resource_types or (
+                resource_type not in NEVER_BLOCKED_RESOURCE_TYPES and self.is_blocked_domain(url)
+            ):
+                self._count(resource_type, "blocked", self._estimated_size(resource_type))
+                route.abort("blockedbyclient")
+                return
+
+            if self.cache_dir and request.method == "GET" and resource_type in self.cache_resource_types:
+                self._serve_from_cache(route, request)
+                return
+
+            self._count(resource_type, "allowed")
+            route.continue_()
+        except Exception as e:
+            logger.debug(f"攔截請求 {url} 時發生錯誤: {str(e)}")
+            try:
+                route.continue_()
+            except Exception:
+                pass
+
+    def _cache_paths(self, url: str) -> Tuple[str, str]:
+        """
+        取得 URL 對應的快取檔案路徑。
+
+        參數:
+            url (str): 請求 URL。
+
+        返回:
+            Tuple[str, str]: (內容檔案, 中繼資料檔案) 路徑。
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    @staticmethod
+    def _cacheable_headers(headers: Dict[str, str]) -> Dict[str, str]:
+        """
+        移除不適用於已解壓快取內容的標頭。
+
+        參數:
+            headers (Dict[str, str]): 原始回應標頭。
+
+        返回:
+            Dict[str, str]: 可隨快取內容回應的標頭。
+        """
+        return {k: v for k, v in (headers or {}).items() if k.lower() not in UNCACHED_HEADERS}
+
+    def _is_fresh(self, meta: Dict[str, Any]) -> bool:
+        """
+        檢查快取項目是否仍在有效期內。
+
+        參數:
+            meta (Dict[str, Any]): 快取中繼資料。
+
+        返回:
+            bool: 未設定 TTL 或尚未過期時為 True。
+        """
+        if self.cache_ttl is None:
+            return True
+        return time.time() - meta.get("saved_at", 0) < self.cache_ttl
+
+    def _serve_from_cache(self, route, request) -> None:
+        """
+        從本地快取回應；未命中或已過期時實際抓取並寫入快取。
+
+        參數:
+            route (Route): Playwright 路由對象。
+            request (Request): Playwright 請求對象。
+        """
+        resource_type = request.resource_type
+        body_path, meta_path = self._cache_paths(request.url)
+        if os.path.exists(body_path) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if self._is_fresh(meta):
+                with open(body_path, "rb") as f:
+                    body = f.read()
+                self._count(resource_type, "cached", len(body))
+                route.fulfill(
+                    status=meta.get("status", 200),
+                    headers=self._cacheable_headers(meta.get("headers")),
+                    body=body
+                )
+                return
+
+        response = route.fetch()
+        if response.status == 200:
+            body = response.body()
+            tmp_path = body_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+            meta = {
+                "url": request.url,
+                "status": response.status,
+                "headers": self._cacheable_headers(response.headers),
+                "saved_at": time.time()
+            }
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        self._count(resource_type, "allowed")
+        route.fulfill(response=response)
+
+    def _on_response(self, response) -> None:
+        """
+        記錄已放行回應的大小，作為估算封鎖節省量的依據。
+
+        參數:
+            response (Response): Playwright 響應對象。
+        """
+        try:
+            length = int(response.headers.get("content-length", 0))
+        except (TypeError, ValueError):
+            return
+        if length <= 0:
+            return
+        resource_type = response.request.resource_type
+        with self._lock:
+            size = self._sizes.setdefault(resource_type, [0, 0])
+            size[0] += length
+            size[1] += 1
+
+    def _estimated_size(self, resource_type: str) -> int:
+        """
+        估算某資源類型的平均回應大小。
+
+        有放行回應時使用觀察到的平均大小；否則使用 estimated_sizes 中的估計，
+        未列出的類型以 "other" 的估計計算。
+
+        參數:
+            resource_type (str): 資源類型。
+
+        返回:
+            int: 估計位元組數。
+        """
+        with self._lock:
+            total, count = self._sizes.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return self.estimated_sizes.get(resource_type, self.estimated_sizes.get("other", 0))
+
+    def _count(self, resource_type: str, outcome: str, saved: int = 0) -> None:
+        """
+        更新統計計數。
+
+        參數:
+            resource_type (str): 資源類型。
+            outcome (str): 'allowed'、'blocked'、'cached' 或 'rewritten'。
+            saved (int): 節省的位元組數。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(
+                resource_type,
+                {"allowed": 0, "blocked": 0, "cached": 0, "rewritten": 0, "bytes_saved": 0}
+            )
+            stats[outcome] += 1
+            stats["bytes_saved"] += saved
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        取得各資源類型的攔截統計，另含 'total' 彙總。
+
+        封鎖請求的節省量以同類型已放行回應的平均大小估算，尚無觀察資料時使用
+        estimated_sizes 的估計；快取命中為實際大小。
+
+        返回:
+            Dict[str, Dict[str, int]]: 統計資訊。
+        """
+        with self._lock:
+            stats = {k: dict(v) for k, v in self._stats.items()}
+        total = {"allowed": 0, "blocked": 0, "cached": 0, "rewritten": 0, "bytes_saved": 0}
+        for values in stats.values():
+            for key in total:
+                total[key] += values[key]
+        stats["total"] = total
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        清除統計計數。
+        """
+        with self._lock:
+            self._stats.clear()
@@ -13,30 +13,40 @@ Selenium 基礎工具包
 - 日誌記錄
 """
 
-from selenium_base.core.browser import Browser
-from selenium_base.core.config import BrowserConfig
+from selenium_base.core.config import BaseConfig
 from selenium_base.core.exceptions import (
     BrowserError,
     ValidationError,
-    ConfigurationError
+    ConfigError
 )
-from selenium_base.utils.logger import setup_logger
-from selenium_base.utils.config import load_config
+from selenium_base.core.logger import setup_logger
 
 __version__ = "0.1.0"
 __author__ = "DataScout Team"
 
 __all__ = [
     # 核心類
-    "Browser",
-    "BrowserConfig",
+    "BaseConfig",
     
     # 異常類
     "BrowserError",
     "ValidationError",
-    "ConfigurationError",
+    "ConfigError",
     
     # 工具函數
-    "setup_logger",
-    "load_config"
-] 
\ No newline at end of file
+    "setup_logger"
+]
+
+# 瀏覽器與配置載入模組依賴的部分工具模組尚未提供，無法導入時略過，
+# 不影響 selenium_base.core 下其他模組的使用
+try:
+    from selenium_base.core.browser import Browser
+    __all__.append("Browser")
+except ImportError:
+    pass
+
+try:
+    from selenium_base.config import load_config
+    __all__.append("load_config")
+except ImportError:
+    pass
@@ -17,7 +17,7 @@
 
 from typing import Dict, Any, Optional
 
-from .base_error import AntiDetectionError, handle_error
+from ..base.base_error import AntiDetectionError, handle_error
 
 class EvasionScripts:
     """規避腳本類"""
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+核心管理器基礎模組
+
+提供核心管理器（如速率限制管理器）共用的日誌設置
+"""
+
+import logging
+from typing import Optional
+
+from .logger import setup_logger
+
+
+class BaseManager:
+    """核心管理器基類"""
+    
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        """
+        初始化管理器
+        
+        Args:
+            logger: 日誌記錄器，None 時以類名建立
+        """
+        self.logger = logger or setup_logger(self.__class__.__name__)
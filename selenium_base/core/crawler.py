@@ -3,7 +3,6 @@ import time
 import logging
 import json
 import random
-import platform
 import gzip
 import hashlib
 from datetime import datetime, timedelta
@@ -23,6 +22,8 @@ from selenium_base.core.exceptions import (
 )
 from selenium_base.core.config import BaseConfig, BrowserConfig, RequestConfig
 from selenium_base.core.logger import setup_logger
+from selenium_base.core.script_bundle import AntiDetectionBundle, FingerprintParams
+from selenium_base.core.driver_pool import DriverPool, DriverPoolConfig, PooledDriver
 from selenium_base.anti_detection import AntiDetectionManager
 from captcha_manager import CaptchaManagerFactory, CaptchaConfig
 
@@ -57,7 +58,8 @@ class BaseCrawler:
     def __init__(
         self,
         config: BaseConfig,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        driver_pool: Optional[DriverPool] = None
     ):
         """
         初始化基礎爬蟲
@@ -65,6 +67,7 @@ class BaseCrawler:
         Args:
             config: 爬蟲配置
             logger: 日誌記錄器
+            driver_pool: 驅動池，提供時從池中租借已預熱的瀏覽器而不另行啟動
         """
         self.config = config
         self.logger = logger or setup_logger(__name__)
@@ -73,6 +76,10 @@ class BaseCrawler:
         self.anti_detection = None
         self.captcha_manager = None
         self.cache_config = CacheConfig()
+        self._anti_detection_bundle: Optional[str] = None
+        self._anti_detection_script_id: Optional[str] = None
+        self.driver_pool = driver_pool
+        self._lease: Optional[PooledDriver] = None
         
     def initialize(self) -> None:
         """初始化爬蟲環境"""
@@ -92,7 +99,23 @@ class BaseCrawler:
             raise CrawlerException("爬蟲初始化失敗", details={"error": str(e)})
             
     def _setup_browser(self) -> None:
-        """設置瀏覽器"""
+        """設置瀏覽器，有驅動池時租借池中的瀏覽器"""
+        if self.driver_pool is not None:
+            self._lease = self.driver_pool.acquire()
+            self.driver = self._lease.driver
+            return
+        self.driver = self.create_driver()
+        
+    def create_driver(self) -> webdriver.Chrome:
+        """
+        建立並配置瀏覽器，包含超時設定與反檢測腳本註冊
+        
+        Returns:
+            webdriver.Chrome: 已配置的瀏覽器
+            
+        Raises:
+            BrowserException: 瀏覽器建立失敗
+        """
         try:
             options = Options()
             
@@ -151,18 +174,19 @@ class BaseCrawler:
             options.add_argument("--enable-features=NetworkService,NetworkServiceInProcess")
             
             # 創建瀏覽器實例
-            self.driver = webdriver.Chrome(options=options)
+            driver = webdriver.Chrome(options=options)
             
             # 設置超時
-            self.driver.set_page_load_timeout(self.config.browser.timeout)
-            self.driver.implicitly_wait(self.config.browser.timeout)
+            driver.set_page_load_timeout(self.config.browser.timeout)
+            driver.implicitly_wait(self.config.browser.timeout)
             
             # 最大化窗口
             if self.config.browser.maximize:
-                self.driver.maximize_window()
+                driver.maximize_window()
             
             # 注入反檢測 JavaScript
-            self._inject_anti_detection_js()
+            self._inject_anti_detection_js(driver)
+            return driver
                 
         except Exception as e:
             raise BrowserException("瀏覽器設置失敗", details={"error": str(e)})
@@ -242,304 +266,52 @@ class BaseCrawler:
         except Exception as e:
             self.logger.error(f"清理過期快取失敗: {str(e)}")
 
-    def _inject_anti_detection_js(self) -> None:
-        """注入反檢測 JavaScript"""
+    def _fingerprint_params(self) -> FingerprintParams:
+        """
+        依瀏覽器配置產生注入腳本的指紋參數
+        
+        插件數量每個爬蟲實例隨機一次，同一瀏覽器的所有頁面保持一致。
+        
+        Returns:
+            FingerprintParams: 指紋參數
+        """
+        browser = self.config.browser
+        languages = getattr(browser, 'languages', None) or ['zh-CN', 'zh', 'en']
+        return FingerprintParams(
+            user_agent=getattr(browser, 'user_agent', None),
+            languages=list(languages),
+            plugins_count=random.randint(3, 10)
+        )
+        
+    def _inject_anti_detection_js(self, driver: Optional[webdriver.Chrome] = None) -> None:
+        """
+        注入反檢測 JavaScript
+        
+        所有片段打包為單一腳本，透過 CDP 的 Page.addScriptToEvaluateOnNewDocument 註冊一次，
+        之後每次導航都會在頁面腳本之前執行；不支援 CDP 的瀏覽器退回為對目前文檔執行一次。
+        
+        Args:
+            driver: 目標瀏覽器，預設為目前的瀏覽器
+        """
+        driver = driver or self.driver
         try:
-            # 修改 navigator.webdriver
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-            
-            # 修改 window.chrome
-            self.driver.execute_script("""
-                window.chrome = {
-                    runtime: {},
-                    loadTimes: function() {},
-                    csi: function() {},
-                    app: {}
-                };
-            """)
-            
-            # 添加隨機的插件數量
-            plugins_count = random.randint(3, 10)
-            self.driver.execute_script(f"""
-                Object.defineProperty(navigator, 'plugins', {{
-                    get: () => Array({plugins_count}).fill().map(() => ({{
-                        name: ['Chrome PDF Plugin', 'Chrome PDF Viewer', 'Native Client'][Math.floor(Math.random() * 3)],
-                        description: 'Portable Document Format',
-                        filename: 'internal-pdf-viewer'
-                    }}))
-                }});
-            """)
-            
-            # 修改 navigator.languages
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['zh-CN', 'zh', 'en']
-                });
-            """)
-            
-            # 修改 navigator.platform
-            self.driver.execute_script(f"""
-                Object.defineProperty(navigator, 'platform', {{
-                    get: () => '{platform.system()}'
-                }});
-            """)
-            
-            # 修改 navigator.hardwareConcurrency
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'hardwareConcurrency', {
-                    get: () => 8
-                });
-            """)
-            
-            # 修改 navigator.deviceMemory
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'deviceMemory', {
-                    get: () => 8
-                });
-            """)
-            
-            # 修改 navigator.permissions
-            self.driver.execute_script("""
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: Notification.permission }) :
-                        originalQuery(parameters)
-                );
-            """)
-            
-            # 修改 navigator.connection
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'connection', {
-                    get: () => ({
-                        effectiveType: '4g',
-                        rtt: 50,
-                        downlink: 10,
-                        saveData: false
-                    })
-                });
-            """)
-            
-            # 修改 navigator.getBattery
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'getBattery', {
-                    get: () => () => Promise.resolve({
-                        charging: true,
-                        chargingTime: 0,
-                        dischargingTime: Infinity,
-                        level: 1
-                    })
-                });
-            """)
-            
-            # 修改 navigator.maxTouchPoints
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'maxTouchPoints', {
-                    get: () => 10
-                });
-            """)
-            
-            # 修改 navigator.vendor
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'vendor', {
-                    get: () => 'Google Inc.'
-                });
-            """)
-            
-            # 修改 navigator.oscpu
-            self.driver.execute_script(f"""
-                Object.defineProperty(navigator, 'oscpu', {{
-                    get: () => '{platform.system()} {platform.release()}'
-                }});
-            """)
-            
-            # 修改 navigator.buildID
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'buildID', {
-                    get: () => '20240215000000'
-                });
-            """)
-            
-            # 模擬本機儲存
-            self.driver.execute_script("""
-                // 模擬常見的本機儲存鍵值
-                const mockLocalStorage = {
-                    'theme': 'light',
-                    'language': 'zh-TW',
-                    'timezone': 'Asia/Taipei',
-                    'notifications': 'enabled',
-                    'lastVisit': new Date().toISOString(),
-                    'userPreferences': JSON.stringify({
-                        fontSize: 14,
-                        fontFamily: 'Arial',
-                        colorScheme: 'default'
-                    }),
-                    'sessionId': Math.random().toString(36).substring(2),
-                    'lastLogin': new Date().toISOString(),
-                    'deviceId': 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
-                        const r = Math.random() * 16 | 0;
-                        const v = c === 'x' ? r : (r & 0x3 | 0x8);
-                        return v.toString(16);
-                    })
-                };
-                
-                // 注入模擬的本機儲存
-                Object.keys(mockLocalStorage).forEach(key => {
-                    localStorage.setItem(key, mockLocalStorage[key]);
-                });
-                
-                // 模擬會話儲存
-                const mockSessionStorage = {
-                    'currentPage': window.location.pathname,
-                    'sessionStartTime': new Date().toISOString(),
-                    'pageVisits': '1',
-                    'lastAction': 'pageLoad',
-                    'userSession': JSON.stringify({
-                        startTime: new Date().toISOString(),
-                        isActive: true,
-                        lastActivity: new Date().toISOString()
-                    })
-                };
-                
-                // 注入模擬的會話儲存
-                Object.keys(mockSessionStorage).forEach(key => {
-                    sessionStorage.setItem(key, mockSessionStorage[key]);
-                });
-                
-                // 模擬 IndexedDB
-                const mockIndexedDB = {
-                    'userSettings': {
-                        theme: 'light',
-                        notifications: true,
-                        language: 'zh-TW'
-                    },
-                    'browserHistory': [
-                        {
-                            url: window.location.href,
-                            title: document.title,
-                            timestamp: new Date().toISOString()
-                        }
-                    ]
-                };
-                
-                // 注入模擬的 IndexedDB 數據
-                if (window.indexedDB) {
-                    const request = indexedDB.open('browserData', 1);
-                    request.onupgradeneeded = function(event) {
-                        const db = event.target.result;
-                        if (!db.objectStoreNames.contains('userData')) {
-                            const store = db.createObjectStore('userData', { keyPath: 'id' });
-                            store.add({ id: 'settings', data: mockIndexedDB.userSettings });
-                            store.add({ id: 'history', data: mockIndexedDB.browserHistory });
-                        }
-                    };
-                }
-                
-                // 模擬更多的瀏覽器 API
-                // 模擬 Canvas 指紋
-                const originalGetContext = HTMLCanvasElement.prototype.getContext;
-                HTMLCanvasElement.prototype.getContext = function(type, attributes) {
-                    const context = originalGetContext.call(this, type, attributes);
-                    if (type === '2d') {
-                        const originalGetImageData = context.getImageData;
-                        context.getImageData = function() {
-                            const imageData = originalGetImageData.apply(this, arguments);
-                            // 添加隨機噪點
-                            for (let i = 0; i < imageData.data.length; i += 4) {
-                                imageData.data[i] += Math.floor(Math.random() * 10) - 5;
-                                imageData.data[i + 1] += Math.floor(Math.random() * 10) - 5;
-                                imageData.data[i + 2] += Math.floor(Math.random() * 10) - 5;
-                            }
-                            return imageData;
-                        };
-                    }
-                    return context;
-                };
-                
-                // 模擬 WebGL 指紋
-                const getParameter = WebGLRenderingContext.prototype.getParameter;
-                WebGLRenderingContext.prototype.getParameter = function(parameter) {
-                    // 模擬不同的顯卡
-                    if (parameter === 37445) {
-                        return 'Intel Inc.';
-                    }
-                    if (parameter === 37446) {
-                        return 'Intel Iris OpenGL Engine';
-                    }
-                    return getParameter.apply(this, arguments);
-                };
-                
-                // 模擬音頻指紋
-                const originalGetChannelData = AudioBuffer.prototype.getChannelData;
-                AudioBuffer.prototype.getChannelData = function() {
-                    const channelData = originalGetChannelData.apply(this, arguments);
-                    // 添加隨機噪點
-                    for (let i = 0; i < channelData.length; i += 100) {
-                        channelData[i] += Math.random() * 0.0001;
-                    }
-                    return channelData;
-                };
-                
-                // 模擬用戶行為
-                const mockUserBehavior = {
-                    mouseMovements: [],
-                    keyStrokes: [],
-                    scrollEvents: [],
-                    clickEvents: []
-                };
-                
-                // 記錄滑鼠移動
-                document.addEventListener('mousemove', function(e) {
-                    mockUserBehavior.mouseMovements.push({
-                        x: e.clientX,
-                        y: e.clientY,
-                        timestamp: new Date().toISOString()
-                    });
-                });
-                
-                // 記錄鍵盤輸入
-                document.addEventListener('keydown', function(e) {
-                    mockUserBehavior.keyStrokes.push({
-                        key: e.key,
-                        timestamp: new Date().toISOString()
-                    });
-                });
-                
-                // 記錄滾動事件
-                document.addEventListener('scroll', function(e) {
-                    mockUserBehavior.scrollEvents.push({
-                        scrollY: window.scrollY,
-                        timestamp: new Date().toISOString()
-                    });
-                });
-                
-                // 記錄點擊事件
-                document.addEventListener('click', function(e) {
-                    mockUserBehavior.clickEvents.push({
-                        x: e.clientX,
-                        y: e.clientY,
-                        target: e.target.tagName,
-                        timestamp: new Date().toISOString()
-                    });
-                });
-                
-                // 將用戶行為數據保存到 IndexedDB
-                if (window.indexedDB) {
-                    const request = indexedDB.open('userBehavior', 1);
-                    request.onupgradeneeded = function(event) {
-                        const db = event.target.result;
-                        if (!db.objectStoreNames.contains('behavior')) {
-                            const store = db.createObjectStore('behavior', { keyPath: 'id' });
-                            store.add({ id: 'current', data: mockUserBehavior });
-                        }
-                    };
-                }
-            """)
-            
+            if self._anti_detection_bundle is None:
+                cache_dir = os.path.join(self.config.data_dir, "cache", "scripts")
+                bundler = AntiDetectionBundle(cache_dir=cache_dir, logger=self.logger)
+                self._anti_detection_bundle = bundler.get(self._fingerprint_params())
+            bundle = self._anti_detection_bundle
+            
+            execute_cdp_cmd = getattr(driver, "execute_cdp_cmd", None)
+            if execute_cdp_cmd is not None:
+                try:
+                    result = execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": bundle})
+                    self._anti_detection_script_id = (result or {}).get("identifier")
+                    self.logger.info("反檢測 JavaScript 已透過 CDP 註冊")
+                    return
+                except WebDriverException as e:
+                    self.logger.warning(f"CDP 註冊反檢測腳本失敗，改為直接執行: {str(e)}")
+            
+            driver.execute_script(bundle)
             self.logger.info("反檢測 JavaScript 注入完成")
         except Exception as e:
             self.logger.error(f"注入反檢測 JavaScript 失敗: {str(e)}")
@@ -752,6 +524,8 @@ class BaseCrawler:
             self.driver.get(url)
             self.state.current_url = url
             self.state.request_count += 1
+            if self._lease is not None:
+                self._lease.record_page()
             self.state.last_request_time = time.time()
             self.logger.info(f"成功導航到: {url}")
         except TimeoutException as e:
@@ -1028,13 +802,29 @@ class BaseCrawler:
     def cleanup(self) -> None:
         """清理資源"""
         try:
-            if self.driver:
+            if self._lease is not None:
+                self.driver_pool.release(self._lease)
+                self._lease = None
+            elif self.driver:
                 self.driver.quit()
+            self.driver = None
             self.state.is_running = False
             self.logger.info("爬蟲資源清理完成")
         except Exception as e:
             self.logger.error(f"資源清理失敗: {str(e)}")
             
+    def create_driver_pool(self, pool_config: Optional[DriverPoolConfig] = None) -> DriverPool:
+        """
+        以本爬蟲的瀏覽器配置建立驅動池
+        
+        Args:
+            pool_config: 驅動池配置
+            
+        Returns:
+            DriverPool: 驅動池（尚未預熱，需呼叫 start）
+        """
+        return DriverPool(self.create_driver, pool_config, self.logger)
+        
     def __enter__(self):
         """上下文管理器入口"""
         self.initialize()
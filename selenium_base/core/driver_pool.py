@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+WebDriver 池模組
+
+預先啟動並配置 N 個瀏覽器，以租借／歸還的方式提供給爬蟲使用，
+避免每個短任務都支付 1–3 秒的 Chrome 冷啟動成本。
+
+- 歸還時重置 Cookie、本機儲存與多餘分頁
+- 頁數、存活時間或記憶體增長超過上限時回收並於背景補充新的瀏覽器
+- 統計等待時間與使用率
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+from selenium_base.core.exceptions import BrowserException, CrawlerTimeoutError, StateError
+
+try:
+    import psutil
+except ImportError:  # 選用依賴，未安裝時不檢查記憶體增長
+    psutil = None
+
+# 重置時清除的儲存類型
+CLEAR_STORAGE_TYPES = "local_storage,session_storage,indexeddb,websql,cache_storage,service_workers"
+
+
+@dataclass
+class DriverPoolConfig:
+    """驅動池配置"""
+    size: int = 2  # 池中瀏覽器數量
+    max_pages: int = 200  # 每個瀏覽器最多導航頁數，0 表示不限制
+    max_age: float = 0.0  # 每個瀏覽器最長存活秒數，0 表示不限制
+    max_memory_growth_mb: float = 512.0  # 相對啟動時的記憶體增長上限（MB），0 表示不檢查
+    acquire_timeout: Optional[float] = 60.0  # 租借等待上限（秒），None 表示無限等待
+    prewarm: bool = True  # 啟動時與回收後是否在背景預先啟動瀏覽器
+    reset_url: str = "about:blank"  # 歸還時導航到的頁面
+
+    def __post_init__(self):
+        """驗證配置"""
+        if self.size <= 0:
+            raise ValueError("size 必須大於 0")
+        if self.max_pages < 0 or self.max_age < 0 or self.max_memory_growth_mb < 0:
+            raise ValueError("max_pages、max_age 與 max_memory_growth_mb 不能為負數")
+
+
+@dataclass
+class PooledDriver:
+    """池中的瀏覽器"""
+    driver: Any
+    created_at: float = field(default_factory=time.monotonic)
+    baseline_memory: Optional[int] = None
+    pages: int = 0
+    leases: int = 0
+    leased_at: Optional[float] = None
+
+    def record_page(self, count: int = 1) -> None:
+        """
+        記錄導航頁數
+
+        Args:
+            count: 頁數
+        """
+        self.pages += count
+
+
+def driver_memory(driver: Any) -> Optional[int]:
+    """
+    取得瀏覽器（驅動程式及其所有子進程）的常駐記憶體
+
+    Args:
+        driver: WebDriver 實例
+
+    Returns:
+        Optional[int]: 位元組數，無法取得時返回 None
+    """
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    except (AttributeError, TypeError, ValueError, psutil.Error):
+        return None
+
+
+class DriverPool:
+    """WebDriver 池"""
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        config: Optional[DriverPoolConfig] = None,
+        logger: Optional[logging.Logger] = None
+    ):
+        """
+        初始化驅動池
+
+        Args:
+            factory: 建立已配置瀏覽器的函數，例如 BaseCrawler.create_driver
+            config: 驅動池配置
+            logger: 日誌記錄器
+        """
+        self.factory = factory
+        self.config = config or DriverPoolConfig()
+        self.logger = logger or logging.getLogger(__name__)
+        self._idle: Deque[PooledDriver] = deque()
+        self._cond = threading.Condition()
+        # 已存在與建立中的瀏覽器數量
+        self._total = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.size,
+            thread_name_prefix="driver-pool"
+        )
+        self._started_at = time.monotonic()
+        self._stats: Dict[str, float] = {
+            "leases": 0,
+            "wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "busy_time": 0.0,
+            "created": 0,
+            "recycled": 0,
+            "failed": 0
+        }
+
+    def start(self, wait: bool = True) -> "DriverPool":
+        """
+        預先啟動瀏覽器直到池滿
+
+        Args:
+            wait: 是否等待所有瀏覽器啟動完成
+
+        Returns:
+            DriverPool: 驅動池本身
+        """
+        futures = [self._executor.submit(self._refill) for _ in range(self.config.size)]
+        if wait:
+            for future in futures:
+                future.result()
+        return self
+
+    def _spawn(self) -> PooledDriver:
+        """
+        建立新的池中瀏覽器
+
+        Returns:
+            PooledDriver: 池中瀏覽器
+        """
+        driver = self.factory()
+        item = PooledDriver(driver=driver, baseline_memory=driver_memory(driver))
+        with self._cond:
+            self._stats["created"] += 1
+        return item
+
+    def _refill(self) -> None:
+        """在背景補充一個瀏覽器"""
+        with self._cond:
+            if self._closed or self._total >= self.config.size:
+                return
+            self._total += 1
+        try:
+            item = self._spawn()
+        except Exception as e:
+            with self._cond:
+                self._total -= 1
+                self._stats["failed"] += 1
+                self._cond.notify()
+            self.logger.error(f"預先啟動瀏覽器失敗: {str(e)}")
+            return
+        with self._cond:
+            if self._closed:
+                self._total -= 1
+                closing = True
+            else:
+                self._idle.append(item)
+                self._cond.notify()
+                closing = False
+        if closing:
+            self._quit(item)
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """
+        租借瀏覽器，必須以 release 歸還
+
+        Args:
+            timeout: 等待上限（秒），預設使用配置值
+
+        Returns:
+            PooledDriver: 池中瀏覽器
+
+        Raises:
+            StateError: 驅動池已關閉
+            CrawlerTimeoutError: 等待逾時
+        """
+        timeout = self.config.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        item = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise StateError("驅動池已關閉")
+                if self._idle:
+                    item = self._idle.popleft()
+                    break
+                if self._total < self.config.size:
+                    self._total += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise CrawlerTimeoutError(
+                        "等待瀏覽器逾時",
+                        details={"timeout": timeout, "size": self.config.size}
+                    )
+                self._cond.wait(remaining)
+
+        if item is None:
+            try:
+                item = self._spawn()
+            except Exception as e:
+                with self._cond:
+                    self._total -= 1
+                    self._stats["failed"] += 1
+                    self._cond.notify()
+                raise BrowserException("建立瀏覽器失敗", details={"error": str(e)})
+
+        now = time.monotonic()
+        waited = now - start
+        item.leased_at = now
+        item.leases += 1
+        with self._cond:
+            self._stats["leases"] += 1
+            self._stats["wait_time"] += waited
+            self._stats["max_wait_time"] = max(self._stats["max_wait_time"], waited)
+        return item
+
+    def release(self, item: PooledDriver, discard: bool = False) -> None:
+        """
+        歸還瀏覽器
+
+        Args:
+            item: 池中瀏覽器
+            discard: 是否直接丟棄（例如瀏覽器已失去回應）
+        """
+        if item.leased_at is not None:
+            busy = time.monotonic() - item.leased_at
+            item.leased_at = None
+            with self._cond:
+                self._stats["busy_time"] += busy
+
+        reason = "discard" if discard else self._recycle_reason(item)
+        if reason is None and not self._closed:
+            try:
+                self._reset(item.driver)
+            except Exception as e:
+                reason = f"reset failed: {str(e)}"
+
+        with self._cond:
+            if reason is None and not self._closed:
+                self._idle.append(item)
+                self._cond.notify()
+                return
+            self._total -= 1
+            self._stats["recycled"] += 1
+            self._cond.notify()
+            refill = self.config.prewarm and not self._closed
+
+        self.logger.info(f"回收瀏覽器: {reason or 'pool closed'}")
+        self._quit(item)
+        if refill:
+            try:
+                self._executor.submit(self._refill)
+            except RuntimeError:
+                # 釋放鎖後 close() 已關閉執行緒池，不再補充
+                self.logger.debug("驅動池已關閉，略過補充瀏覽器")
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[PooledDriver]:
+        """
+        以上下文管理器租借瀏覽器，離開時自動歸還
+
+        瀏覽器拋出 WebDriverException 時視為已損壞並丟棄。
+
+        Args:
+            timeout: 等待上限（秒）
+
+        Yields:
+            PooledDriver: 池中瀏覽器
+        """
+        item = self.acquire(timeout)
+        discard = False
+        try:
+            yield item
+        except WebDriverException:
+            discard = True
+            raise
+        finally:
+            self.release(item, discard=discard)
+
+    def _recycle_reason(self, item: PooledDriver) -> Optional[str]:
+        """
+        判斷瀏覽器是否需要回收
+
+        Args:
+            item: 池中瀏覽器
+
+        Returns:
+            Optional[str]: 回收原因，None 表示可繼續使用
+        """
+        config = self.config
+        if config.max_pages and item.pages >= config.max_pages:
+            return f"pages {item.pages} >= {config.max_pages}"
+        if config.max_age and time.monotonic() - item.created_at >= config.max_age:
+            return "max age reached"
+        if config.max_memory_growth_mb and item.baseline_memory is not None:
+            current = driver_memory(item.driver)
+            if current is not None:
+                growth = (current - item.baseline_memory) / (1024 * 1024)
+                if growth >= config.max_memory_growth_mb:
+                    return f"memory grew {growth:.0f} MB"
+        return None
+
+    def _reset(self, driver: Any) -> None:
+        """
+        重置瀏覽器狀態：關閉多餘分頁、清除 Cookie 與目前來源的儲存
+
+        Args:
+            driver: WebDriver 實例
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        origin = None
+        try:
+            parsed = urlparse(driver.current_url)
+            if parsed.scheme in ("http", "https"):
+                origin = f"{parsed.scheme}://{parsed.netloc}"
+        except WebDriverException:
+            pass
+
+        driver.delete_all_cookies()
+        execute_cdp_cmd = getattr(driver, "execute_cdp_cmd", None)
+        if execute_cdp_cmd is not None:
+            execute_cdp_cmd("Network.clearBrowserCookies", {})
+            if origin:
+                execute_cdp_cmd(
+                    "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": CLEAR_STORAGE_TYPES}
+                )
+        elif origin:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get(self.config.reset_url)
+
+    def _quit(self, item: PooledDriver) -> None:
+        """
+        關閉瀏覽器
+
+        Args:
+            item: 池中瀏覽器
+        """
+        try:
+            item.driver.quit()
+        except Exception as e:
+            self.logger.warning(f"關閉瀏覽器失敗: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        取得驅動池統計
+
+        utilization 為所有瀏覽器被租借時間佔池容量總時間的比例。
+
+        Returns:
+            Dict[str, Any]: 統計資訊
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            idle = len(self._idle)
+            total = self._total
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        leases = stats["leases"]
+        stats.update({
+            "size": self.config.size,
+            "idle": idle,
+            "in_use": total - idle,
+            "avg_wait_time": stats["wait_time"] / leases if leases else 0.0,
+            "utilization": min(1.0, stats["busy_time"] / (elapsed * self.config.size))
+        })
+        return stats
+
+    def close(self) -> None:
+        """關閉驅動池與所有閒置瀏覽器，租借中的瀏覽器於歸還時關閉"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for item in idle:
+            self._quit(item)
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
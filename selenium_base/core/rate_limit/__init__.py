@@ -21,11 +21,16 @@ from .exceptions import (
     RateLimitStateError
 )
 from .manager import RateLimitManager
+from .limiters import SlidingWindowCounter, TokenBucket, RollingWindow, create_limiter
 
 __all__ = [
     'RateLimitError',
     'RateLimitExceededError',
     'RateLimitConfigError',
     'RateLimitStateError',
-    'RateLimitManager'
+    'RateLimitManager',
+    'SlidingWindowCounter',
+    'TokenBucket',
+    'RollingWindow',
+    'create_limiter'
 ] 
\ No newline at end of file
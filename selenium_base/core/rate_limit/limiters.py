@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+限流演算法模組
+
+提供以下限流器，每個鍵只保存固定數量的欄位（O(1) 記憶體與時間）：
+1. SlidingWindowCounter: 滑動窗口計數器，以前後兩個固定窗口的加權計數近似滑動窗口
+2. TokenBucket: 令牌桶，允許短時間突發並以固定速率補充
+
+另提供 RollingWindow：精確的滑動窗口，以 deque 保存時間戳或分桶計數，
+過期項目只從左端彈出，適合需要嚴格上限的分鐘／小時／日限制。
+
+限流器本身不加鎖，由持有者（RateLimitManager）負責同步。
+"""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class SlidingWindowCounter:
+    """滑動窗口計數器"""
+
+    __slots__ = ("window", "max_requests", "window_start", "current", "previous")
+
+    def __init__(self, window: float, max_requests: int):
+        """
+        初始化滑動窗口計數器
+
+        Args:
+            window: 窗口長度（秒）
+            max_requests: 窗口內最大請求數
+        """
+        self.window = float(window)
+        self.max_requests = int(max_requests)
+        self.window_start = 0.0
+        self.current = 0
+        self.previous = 0
+
+    def _advance(self, now: float) -> None:
+        """
+        將固定窗口推進到目前時間
+
+        Args:
+            now: 目前時間戳
+        """
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return
+        if elapsed < 2 * self.window:
+            self.previous = self.current
+            self.window_start += self.window
+        else:
+            self.previous = 0
+            self.window_start = now - (elapsed % self.window) if self.window_start else now
+        self.current = 0
+
+    def count(self, now: float) -> float:
+        """
+        估算滑動窗口內的請求數
+
+        Args:
+            now: 目前時間戳
+
+        Returns:
+            float: 估算的請求數
+        """
+        self._advance(now)
+        weight = min(1.0, max(0.0, 1.0 - (now - self.window_start) / self.window))
+        return self.previous * weight + self.current
+
+    def try_acquire(self, now: float, cost: int = 1) -> bool:
+        """
+        嘗試通過限流
+
+        Args:
+            now: 目前時間戳
+            cost: 本次請求消耗的配額
+
+        Returns:
+            bool: 是否允許請求
+        """
+        if self.count(now) + cost > self.max_requests:
+            return False
+        self.current += cost
+        return True
+
+    def retry_after(self, now: float, cost: int = 1) -> float:
+        """
+        估算需要等待多久才能通過
+
+        Args:
+            now: 目前時間戳
+            cost: 本次請求消耗的配額
+
+        Returns:
+            float: 等待秒數，0 表示可以立即通過
+        """
+        excess = self.count(now) + cost - self.max_requests
+        if excess <= 0:
+            return 0.0
+        if self.previous <= 0:
+            return self.window_start + self.window - now
+        # 前一窗口的權重每秒下降 previous / window
+        wait = excess * self.window / self.previous
+        return min(wait, self.window_start + self.window - now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        匯出狀態
+
+        Returns:
+            Dict[str, Any]: 狀態字典
+        """
+        return {
+            "type": "sliding_window",
+            "window_start": self.window_start,
+            "current": self.current,
+            "previous": self.previous
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        從狀態字典還原
+
+        Args:
+            state: 狀態字典
+        """
+        self.window_start = float(state.get("window_start", 0.0))
+        self.current = int(state.get("current", 0))
+        self.previous = int(state.get("previous", 0))
+
+
+class TokenBucket:
+    """令牌桶"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float):
+        """
+        初始化令牌桶
+
+        Args:
+            capacity: 桶容量（最大突發請求數）
+            rate: 每秒補充的令牌數
+        """
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        """
+        依經過時間補充令牌
+
+        Args:
+            now: 目前時間戳
+        """
+        if self.updated is not None and now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        if self.updated is None or now > self.updated:
+            self.updated = now
+
+    def count(self, now: float) -> float:
+        """
+        目前已使用的配額
+
+        Args:
+            now: 目前時間戳
+
+        Returns:
+            float: 已使用的令牌數
+        """
+        self._refill(now)
+        return self.capacity - self.tokens
+
+    def try_acquire(self, now: float, cost: int = 1) -> bool:
+        """
+        嘗試取得令牌
+
+        Args:
+            now: 目前時間戳
+            cost: 本次請求消耗的令牌數
+
+        Returns:
+            bool: 是否允許請求
+        """
+        self._refill(now)
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def retry_after(self, now: float, cost: int = 1) -> float:
+        """
+        估算需要等待多久才有足夠令牌
+
+        Args:
+            now: 目前時間戳
+            cost: 本次請求消耗的令牌數
+
+        Returns:
+            float: 等待秒數，0 表示可以立即通過
+        """
+        self._refill(now)
+        missing = cost - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.rate <= 0 or cost > self.capacity:
+            return math.inf
+        return missing / self.rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        匯出狀態
+
+        Returns:
+            Dict[str, Any]: 狀態字典
+        """
+        return {
+            "type": "token_bucket",
+            "tokens": self.tokens,
+            "updated": self.updated
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        從狀態字典還原
+
+        Args:
+            state: 狀態字典
+        """
+        self.tokens = min(self.capacity, float(state.get("tokens", self.capacity)))
+        self.updated = state.get("updated")
+
+
+class RollingWindow:
+    """精確滑動窗口"""
+
+    __slots__ = ("span", "limit", "resolution", "entries", "total")
+
+    def __init__(self, span: float, limit: int, resolution: float = 0.0):
+        """
+        初始化滑動窗口
+
+        Args:
+            span: 窗口長度（秒）
+            limit: 窗口內最大請求數
+            resolution: 分桶長度（秒），0 表示逐筆保存時間戳；
+                分桶時同一桶內的請求一起過期，記憶體上限為 span / resolution 個桶
+        """
+        self.span = float(span)
+        self.limit = int(limit)
+        self.resolution = float(resolution)
+        # 每個項目為 [時間戳或桶起點, 次數]
+        self.entries: Deque[List[float]] = deque()
+        self.total = 0
+
+    def _prune(self, now: float) -> None:
+        """
+        從左端移除過期項目
+
+        Args:
+            now: 目前單調時鐘時間
+        """
+        # 分桶時以桶結束時間判斷，確保不會提早釋放配額
+        horizon = now - self.span - self.resolution
+        entries = self.entries
+        while entries and entries[0][0] <= horizon:
+            self.total -= int(entries.popleft()[1])
+
+    def count(self, now: float) -> int:
+        """
+        目前窗口內的請求數
+
+        Args:
+            now: 目前單調時鐘時間
+
+        Returns:
+            int: 請求數
+        """
+        self._prune(now)
+        return self.total
+
+    def add(self, now: float) -> None:
+        """
+        記錄一次請求
+
+        Args:
+            now: 目前單調時鐘時間
+        """
+        self._prune(now)
+        if self.resolution > 0:
+            start = now - (now % self.resolution)
+            if self.entries and self.entries[-1][0] == start:
+                self.entries[-1][1] += 1
+            else:
+                self.entries.append([start, 1])
+        else:
+            self.entries.append([now, 1])
+        self.total += 1
+
+    def wait_time(self, now: float) -> float:
+        """
+        計算距離下一個可用配額的秒數
+
+        Args:
+            now: 目前單調時鐘時間
+
+        Returns:
+            float: 等待秒數，0 表示可以立即通過
+        """
+        self._prune(now)
+        excess = self.total - self.limit + 1
+        if excess <= 0:
+            return 0.0
+        freed = 0
+        for start, hits in self.entries:
+            freed += hits
+            if freed >= excess:
+                return max(0.0, start + self.resolution + self.span - now)
+        return self.span
+
+
+def create_limiter(config: Dict[str, Any]):
+    """
+    依配置建立限流器
+
+    配置格式：
+        {"window": 3600, "max_requests": 100}  # 預設為滑動窗口計數器
+        {"algorithm": "token_bucket", "window": 60, "max_requests": 100, "burst": 20}
+
+    令牌桶的補充速率為 max_requests / window，容量為 burst（預設 max_requests）。
+
+    Args:
+        config: 限流配置
+
+    Returns:
+        SlidingWindowCounter 或 TokenBucket: 限流器
+
+    Raises:
+        ValueError: 配置無效
+    """
+    window = float(config["window"])
+    max_requests = int(config["max_requests"])
+    if window <= 0 or max_requests < 0:
+        raise ValueError(f"無效的限流配置: {config}")
+
+    algorithm = config.get("algorithm", "sliding_window")
+    if algorithm == "sliding_window":
+        return SlidingWindowCounter(window, max_requests)
+    if algorithm == "token_bucket":
+        return TokenBucket(config.get("burst", max_requests), max_requests / window)
+    raise ValueError(f"不支援的限流演算法: {algorithm}")
@@ -23,6 +23,8 @@ import json
 import os
 import time
 import random
+import tempfile
+import threading
 from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 
@@ -33,6 +35,11 @@ from .rate_limit_exceptions import (
     RateLimitConfigError,
     RateLimitStateError
 )
+from .limiters import create_limiter
+
+# 需要限流的範圍；global 只有一個鍵
+LIMIT_SCOPES = ("global", "domain", "ip", "session")
+GLOBAL_KEY = "*"
 
 class RateLimitManager(BaseManager):
     """速率限制管理器"""
@@ -41,6 +48,10 @@ class RateLimitManager(BaseManager):
         """
         初始化速率限制管理器
         
+        每個鍵使用 O(1) 記憶體的滑動窗口計數器或令牌桶（見 limiters 模組），
+        所有檢查以鎖保護可供多執行緒共用；狀態由背景執行緒定期快照，
+        而非每次請求都重寫狀態文件。
+        
         Args:
             config_path: 配置文件路徑
         """
@@ -51,19 +62,50 @@ class RateLimitManager(BaseManager):
             "rate_limits.json"
         )
         self.config = self._load_config()
-        self.state = {
-            "global": {},
-            "domain": {},
-            "ip": {},
-            "session": {},
-            "circuit_breaker": {}
-        }
+        self.state_path = os.path.join(
+            os.path.dirname(self.config_path),
+            "rate_limit_state.json"
+        )
+        self._lock = threading.RLock()
+        # 序列化狀態文件寫入，避免 close() 與快照執行緒交錯
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self.state = self._empty_state()
         self.metrics = {
             "requests": 0,
             "blocks": 0,
             "errors": 0,
             "last_reset": time.time()
         }
+        
+        persistence = self.config.get("persistence", {})
+        self.snapshot_interval = float(persistence.get("snapshot_interval", 5.0))
+        self._stop_event = threading.Event()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        if persistence.get("enabled", True):
+            self._load_state()
+            if self.snapshot_interval > 0:
+                self._snapshot_thread = threading.Thread(
+                    target=self._snapshot_loop,
+                    name="rate-limit-snapshot",
+                    daemon=True
+                )
+                self._snapshot_thread.start()
+    
+    def _empty_state(self) -> Dict:
+        """
+        建立空狀態
+        
+        Returns:
+            Dict: 各範圍的限流器與熔斷器狀態
+        """
+        return {
+            "global": {},
+            "domain": {},
+            "ip": {},
+            "session": {},
+            "circuit_breaker": {}
+        }
     
     def _load_config(self) -> Dict:
         """
@@ -74,60 +116,164 @@ class RateLimitManager(BaseManager):
         """
         try:
             with open(self.config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+                config = json.load(f)
         except Exception as e:
             raise RateLimitConfigError(f"加載配置文件失敗: {str(e)}")
+        
+        for scope in LIMIT_SCOPES:
+            try:
+                create_limiter(config[scope])
+            except (KeyError, TypeError, ValueError) as e:
+                raise RateLimitConfigError(f"{scope} 限流配置無效: {str(e)}")
+        return config
     
     def _save_state(self) -> None:
-        """保存狀態"""
-        try:
-            state_path = os.path.join(
-                os.path.dirname(self.config_path),
-                "rate_limit_state.json"
-            )
-            with open(state_path, "w", encoding="utf-8") as f:
-                json.dump(self.state, f, indent=4)
-        except Exception as e:
-            self.logger.error(f"保存狀態失敗: {str(e)}")
+        """標記狀態已變更，由背景執行緒在下次快照時寫入"""
+        self._dirty = True
+    
+    def _snapshot_loop(self) -> None:
+        """背景快照執行緒"""
+        while not self._stop_event.wait(self.snapshot_interval):
+            if self._dirty:
+                self.save_state()
+    
+    def _snapshot(self) -> Dict:
+        """
+        在鎖內擷取可序列化的狀態並清除閒置鍵
+        
+        Returns:
+            Dict: 狀態快照
+        """
+        now = time.time()
+        snapshot = {"saved_at": now, "circuit_breaker": {}}
+        with self._lock:
+            for scope in LIMIT_SCOPES:
+                limiters = self.state[scope]
+                idle = [key for key, limiter in limiters.items() if limiter.count(now) <= 0]
+                for key in idle:
+                    del limiters[key]
+                snapshot[scope] = {key: limiter.to_dict() for key, limiter in limiters.items()}
+            snapshot["circuit_breaker"] = {
+                key: dict(cb) for key, cb in self.state["circuit_breaker"].items()
+            }
+            self._dirty = False
+        return snapshot
+    
+    def save_state(self) -> None:
+        """立即將狀態快照原子寫入文件"""
+        with self._save_lock:
+            tmp_path = None
+            try:
+                snapshot = self._snapshot()
+                with tempfile.NamedTemporaryFile(
+                    "w",
+                    encoding="utf-8",
+                    dir=os.path.dirname(self.state_path),
+                    prefix=f"{os.path.basename(self.state_path)}.",
+                    suffix=".tmp",
+                    delete=False
+                ) as f:
+                    tmp_path = f.name
+                    json.dump(snapshot, f, separators=(",", ":"))
+                os.replace(tmp_path, self.state_path)
+            except Exception as e:
+                self._dirty = True
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                self.logger.error(f"保存狀態失敗: {str(e)}")
     
     def _load_state(self) -> None:
         """加載狀態"""
         try:
-            state_path = os.path.join(
-                os.path.dirname(self.config_path),
-                "rate_limit_state.json"
-            )
-            if os.path.exists(state_path):
-                with open(state_path, "r", encoding="utf-8") as f:
-                    self.state = json.load(f)
+            if not os.path.exists(self.state_path):
+                return
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            
+            with self._lock:
+                for scope in LIMIT_SCOPES:
+                    entries = saved.get(scope, {})
+                    if not isinstance(entries, dict):
+                        continue
+                    for key, data in entries.items():
+                        # 舊版狀態以時間戳為鍵，無法還原為計數器
+                        if not isinstance(data, dict) or "type" not in data:
+                            continue
+                        self._limiter(scope, key).restore(data)
+                circuit_breaker = saved.get("circuit_breaker", {})
+                if isinstance(circuit_breaker, dict):
+                    self.state["circuit_breaker"].update(circuit_breaker)
         except Exception as e:
             self.logger.error(f"加載狀態失敗: {str(e)}")
     
-    def check_global_limit(self) -> bool:
+    def close(self) -> None:
+        """停止背景快照並寫入最後狀態"""
+        if self._snapshot_thread is None:
+            return
+        self._stop_event.set()
+        self._snapshot_thread.join()
+        self._snapshot_thread = None
+        self.save_state()
+    
+    def _limiter(self, scope: str, key: str):
         """
-        檢查全局限制
+        取得或建立限流器，須在持有鎖時呼叫
+        
+        Args:
+            scope: 限流範圍
+            key: 鍵值
+            
+        Returns:
+            SlidingWindowCounter 或 TokenBucket: 限流器
+        """
+        limiters = self.state[scope]
+        limiter = limiters.get(key)
+        if limiter is None:
+            limiter = limiters[key] = create_limiter(self.config[scope])
+        return limiter
+    
+    def _check(self, scope: str, key: str) -> bool:
+        """
+        檢查並記錄一次請求
         
+        Args:
+            scope: 限流範圍
+            key: 鍵值
+            
         Returns:
             bool: 是否允許請求
         """
         now = time.time()
-        window = self.config["global"]["window"]
-        max_requests = self.config["global"]["max_requests"]
-        
-        # 清理過期數據
-        self.state["global"] = {
-            k: v for k, v in self.state["global"].items()
-            if now - k < window
-        }
+        with self._lock:
+            allowed = self._limiter(scope, key).try_acquire(now)
+            if allowed:
+                self._dirty = True
+        return allowed
+    
+    def get_retry_after(self, scope: str, key: str = GLOBAL_KEY) -> float:
+        """
+        估算指定鍵需要等待多久才能再次通過
         
-        # 檢查限制
-        if len(self.state["global"]) >= max_requests:
-            return False
+        Args:
+            scope: 限流範圍（global / domain / ip / session）
+            key: 鍵值
+            
+        Returns:
+            float: 等待秒數，0 表示可以立即通過
+        """
+        if scope not in LIMIT_SCOPES:
+            raise RateLimitError(f"未知的限流範圍: {scope}")
+        with self._lock:
+            return self._limiter(scope, key).retry_after(time.time())
+    
+    def check_global_limit(self) -> bool:
+        """
+        檢查全局限制
         
-        # 更新狀態
-        self.state["global"][now] = True
-        self._save_state()
-        return True
+        Returns:
+            bool: 是否允許請求
+        """
+        return self._check("global", GLOBAL_KEY)
     
     def check_domain_limit(self, domain: str) -> bool:
         """
@@ -139,27 +285,7 @@ class RateLimitManager(BaseManager):
         Returns:
             bool: 是否允許請求
         """
-        now = time.time()
-        window = self.config["domain"]["window"]
-        max_requests = self.config["domain"]["max_requests"]
-        
-        if domain not in self.state["domain"]:
-            self.state["domain"][domain] = {}
-        
-        # 清理過期數據
-        self.state["domain"][domain] = {
-            k: v for k, v in self.state["domain"][domain].items()
-            if now - k < window
-        }
-        
-        # 檢查限制
-        if len(self.state["domain"][domain]) >= max_requests:
-            return False
-        
-        # 更新狀態
-        self.state["domain"][domain][now] = True
-        self._save_state()
-        return True
+        return self._check("domain", domain)
     
     def check_ip_limit(self, ip: str) -> bool:
         """
@@ -171,27 +297,7 @@ class RateLimitManager(BaseManager):
         Returns:
             bool: 是否允許請求
         """
-        now = time.time()
-        window = self.config["ip"]["window"]
-        max_requests = self.config["ip"]["max_requests"]
-        
-        if ip not in self.state["ip"]:
-            self.state["ip"][ip] = {}
-        
-        # 清理過期數據
-        self.state["ip"][ip] = {
-            k: v for k, v in self.state["ip"][ip].items()
-            if now - k < window
-        }
-        
-        # 檢查限制
-        if len(self.state["ip"][ip]) >= max_requests:
-            return False
-        
-        # 更新狀態
-        self.state["ip"][ip][now] = True
-        self._save_state()
-        return True
+        return self._check("ip", ip)
     
     def check_session_limit(self, session_id: str) -> bool:
         """
@@ -203,27 +309,7 @@ class RateLimitManager(BaseManager):
         Returns:
             bool: 是否允許請求
         """
-        now = time.time()
-        window = self.config["session"]["window"]
-        max_requests = self.config["session"]["max_requests"]
-        
-        if session_id not in self.state["session"]:
-            self.state["session"][session_id] = {}
-        
-        # 清理過期數據
-        self.state["session"][session_id] = {
-            k: v for k, v in self.state["session"][session_id].items()
-            if now - k < window
-        }
-        
-        # 檢查限制
-        if len(self.state["session"][session_id]) >= max_requests:
-            return False
-        
-        # 更新狀態
-        self.state["session"][session_id][now] = True
-        self._save_state()
-        return True
+        return self._check("session", session_id)
     
     def get_delay(self) -> float:
         """
@@ -242,31 +328,32 @@ class RateLimitManager(BaseManager):
         
         Args:
             key: 熔斷器鍵值
-            
+        
         Returns:
             bool: 是否允許請求
         """
-        if key not in self.state["circuit_breaker"]:
-            self.state["circuit_breaker"][key] = {
-                "failures": 0,
-                "last_failure": 0,
-                "state": "closed"
-            }
-        
-        cb = self.state["circuit_breaker"][key]
-        now = time.time()
-        
-        # 檢查是否需要重置
-        if cb["state"] == "open":
-            if now - cb["last_failure"] > self.config["circuit_breaker"]["reset_timeout"]:
-                cb["state"] = "half-open"
-                cb["failures"] = 0
-        
-        # 檢查是否熔斷
-        if cb["state"] == "open":
-            return False
-        
-        return True
+        with self._lock:
+            if key not in self.state["circuit_breaker"]:
+                self.state["circuit_breaker"][key] = {
+                    "failures": 0,
+                    "last_failure": 0,
+                    "state": "closed"
+                }
+            
+            cb = self.state["circuit_breaker"][key]
+            now = time.time()
+            
+            # 檢查是否需要重置
+            if cb["state"] == "open":
+                if now - cb["last_failure"] > self.config["circuit_breaker"]["reset_timeout"]:
+                    cb["state"] = "half-open"
+                    cb["failures"] = 0
+            
+            # 檢查是否熔斷
+            if cb["state"] == "open":
+                return False
+            
+            return True
     
     def record_failure(self, key: str) -> None:
         """
@@ -275,22 +362,23 @@ class RateLimitManager(BaseManager):
         Args:
             key: 熔斷器鍵值
         """
-        if key not in self.state["circuit_breaker"]:
-            self.state["circuit_breaker"][key] = {
-                "failures": 0,
-                "last_failure": 0,
-                "state": "closed"
-            }
-        
-        cb = self.state["circuit_breaker"][key]
-        cb["failures"] += 1
-        cb["last_failure"] = time.time()
-        
-        # 檢查是否需要熔斷
-        if cb["failures"] >= self.config["circuit_breaker"]["threshold"]:
-            cb["state"] = "open"
-        
-        self._save_state()
+        with self._lock:
+            if key not in self.state["circuit_breaker"]:
+                self.state["circuit_breaker"][key] = {
+                    "failures": 0,
+                    "last_failure": 0,
+                    "state": "closed"
+                }
+            
+            cb = self.state["circuit_breaker"][key]
+            cb["failures"] += 1
+            cb["last_failure"] = time.time()
+            
+            # 檢查是否需要熔斷
+            if cb["failures"] >= self.config["circuit_breaker"]["threshold"]:
+                cb["state"] = "open"
+            
+            self._save_state()
     
     def record_success(self, key: str) -> None:
         """
@@ -299,12 +387,13 @@ class RateLimitManager(BaseManager):
         Args:
             key: 熔斷器鍵值
         """
-        if key in self.state["circuit_breaker"]:
-            cb = self.state["circuit_breaker"][key]
-            if cb["state"] == "half-open":
-                cb["state"] = "closed"
-                cb["failures"] = 0
-                self._save_state()
+        with self._lock:
+            if key in self.state["circuit_breaker"]:
+                cb = self.state["circuit_breaker"][key]
+                if cb["state"] == "half-open":
+                    cb["state"] = "closed"
+                    cb["failures"] = 0
+                    self._save_state()
     
     def update_metrics(self, success: bool = True) -> None:
         """
@@ -313,19 +402,20 @@ class RateLimitManager(BaseManager):
         Args:
             success: 是否成功
         """
-        self.metrics["requests"] += 1
-        if not success:
-            self.metrics["blocks"] += 1
-        
-        # 檢查是否需要重置
-        now = time.time()
-        if now - self.metrics["last_reset"] > self.config["monitoring"]["reset_interval"]:
-            self.metrics = {
-                "requests": 0,
-                "blocks": 0,
-                "errors": 0,
-                "last_reset": now
-            }
+        with self._lock:
+            self.metrics["requests"] += 1
+            if not success:
+                self.metrics["blocks"] += 1
+            
+            # 檢查是否需要重置
+            now = time.time()
+            if now - self.metrics["last_reset"] > self.config["monitoring"]["reset_interval"]:
+                self.metrics = {
+                    "requests": 0,
+                    "blocks": 0,
+                    "errors": 0,
+                    "last_reset": now
+                }
     
     def get_metrics(self) -> Dict:
         """
@@ -334,21 +424,17 @@ class RateLimitManager(BaseManager):
         Returns:
             Dict: 指標數據
         """
-        return self.metrics.copy()
+        with self._lock:
+            return self.metrics.copy()
     
     def reset(self) -> None:
         """重置所有狀態"""
-        self.state = {
-            "global": {},
-            "domain": {},
-            "ip": {},
-            "session": {},
-            "circuit_breaker": {}
-        }
-        self.metrics = {
-            "requests": 0,
-            "blocks": 0,
-            "errors": 0,
-            "last_reset": time.time()
-        }
-        self._save_state() 
\ No newline at end of file
+        with self._lock:
+            self.state = self._empty_state()
+            self.metrics = {
+                "requests": 0,
+                "blocks": 0,
+                "errors": 0,
+                "last_reset": time.time()
+            }
+            self._save_state()
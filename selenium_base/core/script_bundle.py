@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+反檢測腳本打包模組
+
+將 BaseCrawler 的反檢測片段與 EvasionScripts 的規避腳本合併為單一壓縮腳本，
+供瀏覽器以 CDP 的 Page.addScriptToEvaluateOnNewDocument 註冊一次，
+之後每個新文檔（包含每次導航與 iframe）在頁面腳本執行前自動套用。
+
+打包結果依指紋參數與腳本內容的雜湊值快取在磁碟上，相同指紋的瀏覽器不需重新壓縮。
+"""
+
+import os
+import json
+import hashlib
+import logging
+import platform
+import tempfile
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+# 打包格式版本，變更包裝方式時遞增以使舊快取失效
+BUNDLE_VERSION = 1
+
+
+@dataclass
+class FingerprintParams:
+    """注入腳本使用的指紋參數"""
+    user_agent: Optional[str] = None
+    platform: str = field(default_factory=platform.system)
+    oscpu: str = field(default_factory=lambda: f"{platform.system()} {platform.release()}")
+    languages: List[str] = field(default_factory=lambda: ['zh-CN', 'zh', 'en'])
+    hardware_concurrency: int = 8
+    device_memory: int = 8
+    max_touch_points: int = 10
+    plugins_count: int = 5
+    vendor: str = 'Google Inc.'
+    build_id: str = '20240215000000'
+    webgl_vendor: str = 'Intel Inc.'
+    webgl_renderer: str = 'Intel Iris OpenGL Engine'
+
+    def cache_key(self) -> str:
+        """
+        計算指紋參數的雜湊值
+
+        Returns:
+            str: 十六進位雜湊值
+        """
+        payload = json.dumps(asdict(self), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def crawler_snippets(fp: FingerprintParams) -> Dict[str, str]:
+    """
+    產生 BaseCrawler 的反檢測片段
+
+    Args:
+        fp: 指紋參數
+
+    Returns:
+        Dict[str, str]: 片段名稱到腳本的映射
+    """
+    return {
+        'webdriver': """
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+        """,
+        'chrome': """
+            window.chrome = {
+                runtime: {},
+                loadTimes: function() {},
+                csi: function() {},
+                app: {}
+            };
+        """,
+        'plugin': f"""
+            Object.defineProperty(navigator, 'plugins', {{
+                get: () => Array({int(fp.plugins_count)}).fill().map(() => ({{
+                    name: ['Chrome PDF Plugin', 'Chrome PDF Viewer', 'Native Client'][Math.floor(Math.random() * 3)],
+                    description: 'Portable Document Format',
+                    filename: 'internal-pdf-viewer'
+                }}))
+            }});
+        """,
+        'language': f"""
+            Object.defineProperty(navigator, 'languages', {{
+                get: () => {json.dumps(list(fp.languages))}
+            }});
+            Object.defineProperty(navigator, 'language', {{
+                get: () => {json.dumps(fp.languages[0] if fp.languages else 'en')}
+            }});
+        """,
+        'platform': f"""
+            Object.defineProperty(navigator, 'platform', {{
+                get: () => {json.dumps(fp.platform)}
+            }});
+        """,
+        'hardware': f"""
+            Object.defineProperty(navigator, 'hardwareConcurrency', {{
+                get: () => {int(fp.hardware_concurrency)}
+            }});
+            Object.defineProperty(navigator, 'deviceMemory', {{
+                get: () => {int(fp.device_memory)}
+            }});
+            Object.defineProperty(navigator, 'maxTouchPoints', {{
+                get: () => {int(fp.max_touch_points)}
+            }});
+        """,
+        'permissions': """
+            const originalQuery = window.navigator.permissions.query;
+            window.navigator.permissions.query = (parameters) => (
+                parameters.name === 'notifications' ?
+                    Promise.resolve({ state: Notification.permission }) :
+                    originalQuery(parameters)
+            );
+        """,
+        'connection': """
+            Object.defineProperty(navigator, 'connection', {
+                get: () => ({
+                    effectiveType: '4g',
+                    rtt: 50,
+                    downlink: 10,
+                    saveData: false
+                })
+            });
+        """,
+        'battery': """
+            Object.defineProperty(navigator, 'getBattery', {
+                get: () => () => Promise.resolve({
+                    charging: true,
+                    chargingTime: 0,
+                    dischargingTime: Infinity,
+                    level: 1
+                })
+            });
+        """,
+        'vendor': f"""
+            Object.defineProperty(navigator, 'vendor', {{
+                get: () => {json.dumps(fp.vendor)}
+            }});
+            Object.defineProperty(navigator, 'oscpu', {{
+                get: () => {json.dumps(fp.oscpu)}
+            }});
+            Object.defineProperty(navigator, 'buildID', {{
+                get: () => {json.dumps(fp.build_id)}
+            }});
+        """,
+        'storage': """
+            // 模擬常見的本機儲存鍵值
+            const mockLocalStorage = {
+                'theme': 'light',
+                'language': 'zh-TW',
+                'timezone': 'Asia/Taipei',
+                'notifications': 'enabled',
+                'lastVisit': new Date().toISOString(),
+                'userPreferences': JSON.stringify({
+                    fontSize: 14,
+                    fontFamily: 'Arial',
+                    colorScheme: 'default'
+                }),
+                'sessionId': Math.random().toString(36).substring(2),
+                'lastLogin': new Date().toISOString(),
+                'deviceId': 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
+                    const r = Math.random() * 16 | 0;
+                    const v = c === 'x' ? r : (r & 0x3 | 0x8);
+                    return v.toString(16);
+                })
+            };
+            // 只補上頁面尚未設定的鍵值，避免每次導航覆蓋網站數據
+            Object.keys(mockLocalStorage).forEach(key => {
+                if (localStorage.getItem(key) === null) {
+                    localStorage.setItem(key, mockLocalStorage[key]);
+                }
+            });
+            const mockSessionStorage = {
+                'currentPage': window.location.pathname,
+                'sessionStartTime': new Date().toISOString(),
+                'pageVisits': '1',
+                'lastAction': 'pageLoad',
+                'userSession': JSON.stringify({
+                    startTime: new Date().toISOString(),
+                    isActive: true,
+                    lastActivity: new Date().toISOString()
+                })
+            };
+            Object.keys(mockSessionStorage).forEach(key => {
+                if (sessionStorage.getItem(key) === null) {
+                    sessionStorage.setItem(key, mockSessionStorage[key]);
+                }
+            });
+            if (window.indexedDB) {
+                const request = indexedDB.open('browserData', 1);
+                request.onupgradeneeded = function(event) {
+                    const db = event.target.result;
+                    if (!db.objectStoreNames.contains('userData')) {
+                        const store = db.createObjectStore('userData', { keyPath: 'id' });
+                        store.add({ id: 'settings', data: { theme: 'light', notifications: true, language: 'zh-TW' } });
+                        store.add({ id: 'history', data: [{ url: window.location.href, timestamp: new Date().toISOString() }] });
+                    }
+                };
+            }
+        """,
+        'canvas': """
+            const originalGetContext = HTMLCanvasElement.prototype.getContext;
+            HTMLCanvasElement.prototype.getContext = function(type, attributes) {
+                const context = originalGetContext.call(this, type, attributes);
+                if (type === '2d' && context) {
+                    const originalGetImageData = context.getImageData;
+                    context.getImageData = function() {
+                        const imageData = originalGetImageData.apply(this, arguments);
+                        // 添加隨機噪點
+                        for (let i = 0; i < imageData.data.length; i += 4) {
+                            imageData.data[i] += Math.floor(Math.random() * 10) - 5;
+                            imageData.data[i + 1] += Math.floor(Math.random() * 10) - 5;
+                            imageData.data[i + 2] += Math.floor(Math.random() * 10) - 5;
+                        }
+                        return imageData;
+                    };
+                }
+                return context;
+            };
+        """,
+        'webgl': f"""
+            const getParameter = WebGLRenderingContext.prototype.getParameter;
+            WebGLRenderingContext.prototype.getParameter = function(parameter) {{
+                if (parameter === 37445) {{
+                    return {json.dumps(fp.webgl_vendor)};
+                }}
+                if (parameter === 37446) {{
+                    return {json.dumps(fp.webgl_renderer)};
+                }}
+                return getParameter.apply(this, arguments);
+            }};
+        """,
+        'audio': """
+            const originalGetChannelData = AudioBuffer.prototype.getChannelData;
+            AudioBuffer.prototype.getChannelData = function() {
+                const channelData = originalGetChannelData.apply(this, arguments);
+                // 添加隨機噪點
+                for (let i = 0; i < channelData.length; i += 100) {
+                    channelData[i] += Math.random() * 0.0001;
+                }
+                return channelData;
+            };
+        """,
+        'behavior': """
+            const mockUserBehavior = {
+                mouseMovements: [],
+                keyStrokes: [],
+                scrollEvents: [],
+                clickEvents: []
+            };
+            document.addEventListener('mousemove', function(e) {
+                mockUserBehavior.mouseMovements.push({ x: e.clientX, y: e.clientY, timestamp: new Date().toISOString() });
+            });
+            document.addEventListener('keydown', function(e) {
+                mockUserBehavior.keyStrokes.push({ key: e.key, timestamp: new Date().toISOString() });
+            });
+            document.addEventListener('scroll', function(e) {
+                mockUserBehavior.scrollEvents.push({ scrollY: window.scrollY, timestamp: new Date().toISOString() });
+            });
+            document.addEventListener('click', function(e) {
+                mockUserBehavior.clickEvents.push({
+                    x: e.clientX,
+                    y: e.clientY,
+                    target: e.target.tagName,
+                    timestamp: new Date().toISOString()
+                });
+            });
+        """
+    }
+
+
+def evasion_snippets() -> Dict[str, str]:
+    """
+    取得 EvasionScripts 的規避腳本
+
+    Returns:
+        Dict[str, str]: 片段名稱到腳本的映射，模組無法載入時返回空字典
+    """
+    try:
+        from selenium_base.anti_detection.evasion.evasion_scripts import EvasionScripts
+    except ImportError as e:
+        logging.getLogger(__name__).warning(f"無法載入規避腳本，僅打包爬蟲片段: {str(e)}")
+        return {}
+    return {name: script for name, script in (EvasionScripts.get_all_evasions() or {}).items() if script}
+
+
+def minify_js(source: str) -> str:
+    """
+    壓縮 JavaScript：移除註解、每行前後空白與空行，並合併行內連續空白
+
+    字串與樣板字串內容保持不變；保留換行以維持自動分號插入的語意。
+
+    Args:
+        source: 原始腳本
+
+    Returns:
+        str: 壓縮後的腳本
+    """
+    out: List[str] = []
+    i, n = 0, len(source)
+    quote = None
+    while i < n:
+        ch = source[i]
+        if quote:
+            out.append(ch)
+            if ch == '\\' and i + 1 < n:
+                out.append(source[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if ch in '\'"`':
+            quote = ch
+            out.append(ch)
+        elif source.startswith('//', i):
+            while i < n and source[i] != '\n':
+                i += 1
+            continue
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            out.append(' ')
+            continue
+        elif ch in ' \t\r':
+            if out and out[-1] not in ' \n':
+                out.append(' ')
+        elif ch == '\n':
+            while out and out[-1] == ' ':
+                out.pop()
+            if out and out[-1] != '\n':
+                out.append('\n')
+        else:
+            out.append(ch)
+        i += 1
+
+    lines = (line.strip() for line in ''.join(out).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def build_bundle(snippets: Dict[str, str]) -> str:
+    """
+    將片段包裝並合併為單一腳本
+
+    每個片段包在獨立的函數作用域與 try/catch 中，
+    避免變數名稱衝突，也避免單一片段失敗中斷其他片段。
+
+    Args:
+        snippets: 片段名稱到腳本的映射
+
+    Returns:
+        str: 打包後的腳本
+    """
+    parts = [
+        f"(function(){{try{{\n{minify_js(script)}\n}}catch(e){{}}}})();"
+        for script in snippets.values() if script and script.strip()
+    ]
+    return '\n'.join(parts)
+
+
+class AntiDetectionBundle:
+    """反檢測腳本打包器"""
+
+    def __init__(self, cache_dir: Optional[str] = None, logger: Optional[logging.Logger] = None):
+        """
+        初始化打包器
+
+        Args:
+            cache_dir: 快取目錄，None 表示不使用磁碟快取
+            logger: 日誌記錄器
+        """
+        self.cache_dir = cache_dir
+        self.logger = logger or logging.getLogger(__name__)
+
+    def collect(self, fp: FingerprintParams) -> Dict[str, str]:
+        """
+        收集所有片段，同名片段以爬蟲的參數化版本為準
+
+        Args:
+            fp: 指紋參數
+
+        Returns:
+            Dict[str, str]: 片段名稱到腳本的映射
+        """
+        snippets = evasion_snippets()
+        snippets.update(crawler_snippets(fp))
+        return snippets
+
+    def cache_path(self, fp: FingerprintParams, snippets: Dict[str, str]) -> Optional[str]:
+        """
+        計算快取文件路徑，鍵值包含指紋參數與腳本內容
+
+        Args:
+            fp: 指紋參數
+            snippets: 片段
+
+        Returns:
+            Optional[str]: 快取文件路徑
+        """
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256()
+        digest.update(f"{BUNDLE_VERSION}:{fp.cache_key()}".encode('utf-8'))
+        for name, script in snippets.items():
+            digest.update(name.encode('utf-8'))
+            digest.update(script.encode('utf-8'))
+        return os.path.join(self.cache_dir, f"anti_detection_{digest.hexdigest()[:32]}.js")
+
+    def get(self, fp: FingerprintParams) -> str:
+        """
+        取得打包腳本，優先使用磁碟快取
+
+        Args:
+            fp: 指紋參數
+
+        Returns:
+            str: 打包後的腳本
+        """
+        snippets = self.collect(fp)
+        path = self.cache_path(fp, snippets)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except OSError as e:
+                self.logger.warning(f"讀取腳本快取失敗，重新打包: {str(e)}")
+
+        bundle = build_bundle(snippets)
+        if path:
+            self._write_cache(path, bundle)
+        return bundle
+
+    def _write_cache(self, path: str, bundle: str) -> None:
+        """
+        以原子方式寫入快取文件
+
+        Args:
+            path: 快取文件路徑
+            bundle: 打包後的腳本
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(bundle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"寫入腳本快取失敗: {str(e)}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+速率限制微基準測試
+
+比較每次檢查的開銷：
+1. legacy: 舊版以時間戳字典記錄每次請求，每次檢查以推導式重建字典
+2. sliding_window: 滑動窗口計數器
+3. token_bucket: 令牌桶
+
+用法：
+    python selenium_base/scripts/benchmark_rate_limit.py --history 1000 5000 20000
+"""
+
+import sys
+import time
+import argparse
+import threading
+import importlib.util
+from pathlib import Path
+from typing import Callable, Dict
+
+# 直接載入限流演算法模組，避免初始化整個套件
+_LIMITERS_PATH = Path(__file__).parent.parent / "core" / "rate_limit" / "limiters.py"
+_spec = importlib.util.spec_from_file_location("rate_limit_limiters", _LIMITERS_PATH)
+limiters = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(limiters)
+
+
+class LegacyWindow:
+    """舊版演算法：每個請求一個字典項，每次檢查重建字典"""
+
+    def __init__(self, window: float, max_requests: int):
+        self.window = window
+        self.max_requests = max_requests
+        self.requests: Dict[float, bool] = {}
+
+    def try_acquire(self, now: float) -> bool:
+        self.requests = {k: v for k, v in self.requests.items() if now - k < self.window}
+        if len(self.requests) >= self.max_requests:
+            return False
+        self.requests[now] = True
+        return True
+
+
+def _locked(limiter) -> Callable[[float], bool]:
+    """包裝為與 RateLimitManager 相同的加鎖檢查"""
+    lock = threading.RLock()
+
+    def check(now: float) -> bool:
+        with lock:
+            return limiter.try_acquire(now)
+
+    return check
+
+
+def bench(check: Callable[[float], bool], history: int, iterations: int) -> float:
+    """
+    量測每次檢查的平均耗時
+
+    Args:
+        check: 檢查函數
+        history: 預先寫入窗口內的請求數
+        iterations: 量測次數
+
+    Returns:
+        float: 每次檢查的平均微秒數
+    """
+    start = 1_000_000.0
+    for i in range(history):
+        check(start + i * 1e-6)
+
+    now = start + history * 1e-6
+    begin = time.perf_counter()
+    for i in range(iterations):
+        check(now + i * 1e-6)
+    return (time.perf_counter() - begin) / iterations * 1e6
+
+
+def main() -> None:
+    """主函數"""
+    parser = argparse.ArgumentParser(description="速率限制每次檢查開銷的微基準測試")
+    parser.add_argument("--history", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="窗口內已有的請求數")
+    parser.add_argument("--iterations", type=int, default=2000, help="每組量測次數")
+    args = parser.parse_args()
+
+    window = 3600.0
+    print(f"{'history':>8} {'legacy (us)':>12} {'sliding (us)':>13} {'bucket (us)':>12}")
+    for history in args.history:
+        capacity = history + args.iterations + 1
+        legacy = bench(_locked(LegacyWindow(window, capacity)), history, args.iterations)
+        sliding = bench(_locked(limiters.SlidingWindowCounter(window, capacity)), history, args.iterations)
+        bucket = bench(_locked(limiters.TokenBucket(capacity, capacity / window)), history, args.iterations)
+        print(f"{history:>8} {legacy:>12.2f} {sliding:>13.3f} {bucket:>12.3f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
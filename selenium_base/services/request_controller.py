@@ -4,39 +4,75 @@
 此模組提供了 HTTP 請求相關的服務，包含以下功能：
 - 請求控制
 - 請求重試
-- 請求速率限制
+- 請求速率限制（同步等待與 asyncio 等待）
 - 請求記錄
+- 共用連線池
 """
 
 import time
 import random
+import asyncio
 import logging
-from typing import Dict, List, Optional, Union, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
+import threading
+from typing import Dict, List, Optional, Union, Any, Tuple
 import requests
 from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 
 from ..core.config import BaseConfig
 from ..core.exceptions import RequestError
-from ..utils.request import RequestController as RequestUtils
+from ..core.rate_limit.limiters import RollingWindow
+
+# 速率限制區間：(配置屬性, 窗口秒數, 分桶秒數)
+# 分鐘限制逐筆保存時間戳；小時與日限制使用分桶計數，記憶體上限為 60 與 1440 個桶
+RATE_LIMIT_INTERVALS = {
+    "minute": ("rate_limit_minute", 60.0, 0.0),
+    "hour": ("rate_limit_hour", 3600.0, 60.0),
+    "day": ("rate_limit_day", 86400.0, 60.0)
+}
 
 class RequestController:
     """請求控制服務類別"""
     
-    def __init__(self, config: BaseConfig):
+    def __init__(self, config: BaseConfig, session: Optional[requests.Session] = None):
         """
         初始化請求控制服務
         
         Args:
             config: 配置物件
+            session: 共用的請求會話，未提供時建立具連線池的會話；
+                多個控制器可共用同一會話以重用 keep-alive 連線
         """
         self.config = config
         self.logger = config.logger
-        self.utils = RequestUtils(config)
-        self.session = self.utils.create_session()
-        self.request_records = defaultdict(list)
+        self._owns_session = session is None
+        self.session = session or self.create_session(config)
+        self.request_records: Dict[str, RollingWindow] = {}
+        self._rate_lock = threading.Lock()
+        
+    @staticmethod
+    def create_session(config: BaseConfig) -> requests.Session:
+        """
+        建立具連線池的請求會話
+        
+        適配器本身不重試，重試一律由 _retry_request 處理，
+        避免兩層重試使實際嘗試次數放大為 retry_count 的平方。
+        
+        Args:
+            config: 配置物件
+            
+        Returns:
+            請求會話
+        """
+        request_config = config.request
+        adapter = HTTPAdapter(
+            pool_connections=getattr(request_config, "pool_connections", 10),
+            pool_maxsize=getattr(request_config, "pool_maxsize", 10),
+            max_retries=0
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
         
     def get(
         self,
@@ -638,117 +674,143 @@ class RequestController:
                 
             raise RequestError(f"PATCH 請求失敗: {str(e)}")
             
+    def _window(self, interval: str) -> Optional[RollingWindow]:
+        """
+        取得指定區間的滑動窗口，須在持有 _rate_lock 時呼叫
+        
+        Args:
+            interval: 時間區間（minute / hour / day）
+            
+        Returns:
+            滑動窗口，未設定限制時為 None
+        """
+        attr, span, resolution = RATE_LIMIT_INTERVALS[interval]
+        limit = getattr(self.config.request, attr, None)
+        if not limit:
+            self.request_records.pop(interval, None)
+            return None
+        
+        window = self.request_records.get(interval)
+        if window is None or window.limit != limit:
+            window = RollingWindow(span, limit, resolution)
+            self.request_records[interval] = window
+        return window
+        
+    def _reserve_slot(self) -> Tuple[float, Optional[str]]:
+        """
+        嘗試佔用一個請求配額
+        
+        所有區間都有配額時一次記錄並返回 0；否則不記錄，返回需等待的秒數
+        
+        Returns:
+            (等待秒數, 達到限制的區間)
+        """
+        now = time.monotonic()
+        with self._rate_lock:
+            windows = []
+            wait_time, blocked = 0.0, None
+            for interval in RATE_LIMIT_INTERVALS:
+                window = self._window(interval)
+                if window is None:
+                    continue
+                windows.append(window)
+                interval_wait = window.wait_time(now)
+                if interval_wait > wait_time:
+                    wait_time, blocked = interval_wait, interval
+                    
+            if wait_time <= 0:
+                for window in windows:
+                    window.add(now)
+            return wait_time, blocked
+            
     def _check_rate_limit(self):
-        """檢查請求速率限制"""
+        """檢查請求速率限制，達到限制時阻塞目前執行緒直到有可用配額"""
         try:
-            # 檢查分鐘限制
-            if this.config.request.rate_limit_minute:
-                this._check_rate_limit_by_interval(
-                    "minute",
-                    this.config.request.rate_limit_minute,
-                    timedelta(minutes=1)
-                )
-                
-            # 檢查小時限制
-            if this.config.request.rate_limit_hour:
-                this._check_rate_limit_by_interval(
-                    "hour",
-                    this.config.request.rate_limit_hour,
-                    timedelta(hours=1)
-                )
-                
-            # 檢查日限制
-            if this.config.request.rate_limit_day:
-                this._check_rate_limit_by_interval(
-                    "day",
-                    this.config.request.rate_limit_day,
-                    timedelta(days=1)
-                )
+            while True:
+                wait_time, interval = self._reserve_slot()
+                if wait_time <= 0:
+                    return
+                self.logger.warning(f"達到{interval}請求限制，等待 {wait_time:.2f} 秒")
+                time.sleep(wait_time)
                 
         except Exception as e:
-            this.logger.error(f"檢查請求速率限制失敗: {str(e)}")
+            self.logger.error(f"檢查請求速率限制失敗: {str(e)}")
             raise RequestError(f"檢查請求速率限制失敗: {str(e)}")
             
-    def _check_rate_limit_by_interval(
-        this,
-        interval: str,
-        limit: int,
-        delta: timedelta
-    ):
+    async def wait_for_slot(self) -> None:
         """
-        檢查指定時間區間的請求速率限制
+        以 asyncio 等待下一個可用的請求配額
         
-        Args:
-            interval: 時間區間
-            limit: 限制次數
-            delta: 時間差
+        與 _check_rate_limit 共用同一組窗口，但以 asyncio.sleep 讓出事件迴圈，
+        不會佔用工作執行緒。
         """
         try:
-            # 清理過期記錄
-            this._clean_expired_records(interval, delta)
-            
-            # 檢查限制
-            if len(this.request_records[interval]) >= limit:
-                # 計算等待時間
-                wait_time = (
-                    this.request_records[interval][0] + delta - datetime.now()
-                ).total_seconds()
+            while True:
+                wait_time, interval = self._reserve_slot()
+                if wait_time <= 0:
+                    return
+                self.logger.warning(f"達到{interval}請求限制，等待 {wait_time:.2f} 秒")
+                await asyncio.sleep(wait_time)
                 
-                if wait_time > 0:
-                    this.logger.warning(
-                        f"達到{interval}請求限制，等待 {wait_time:.2f} 秒"
-                    )
-                    time.sleep(wait_time)
-                    
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            this.logger.error(f"檢查{interval}請求速率限制失敗: {str(e)}")
-            raise RequestError(f"檢查{interval}請求速率限制失敗: {str(e)}")
+            self.logger.error(f"檢查請求速率限制失敗: {str(e)}")
+            raise RequestError(f"檢查請求速率限制失敗: {str(e)}")
             
-    def _clean_expired_records(this, interval: str, delta: timedelta):
+    async def request_async(self, method: str, url: str, **kwargs) -> requests.Response:
         """
-        清理過期請求記錄
+        在 asyncio 中發送請求
+        
+        先以非阻塞方式等待速率限制，再於執行緒池中透過共用會話發送請求
         
         Args:
-            interval: 時間區間
-            delta: 時間差
+            method: 請求方法
+            url: 請求網址
+            **kwargs: 傳給 requests 的其他參數
+            
+        Returns:
+            回應物件
         """
+        await self.wait_for_slot()
+        kwargs.setdefault("timeout", self.config.request.timeout)
+        
         try:
-            # 計算過期時間
-            expire_time = datetime.now() - delta
-            
-            # 清理過期記錄
-            this.request_records[interval] = [
-                record for record in this.request_records[interval]
-                if record > expire_time
-            ]
-            
-        except Exception as e:
-            this.logger.error(f"清理過期請求記錄失敗: {str(e)}")
-            raise RequestError(f"清理過期請求記錄失敗: {str(e)}")
+            response = await asyncio.to_thread(
+                self.session.request, method.upper(), url, **kwargs
+            )
+            self._record_request(method.upper(), url)
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"{method.upper()} 請求失敗: {str(e)}")
+            raise RequestError(f"{method.upper()} 請求失敗: {str(e)}")
             
-    def _record_request(this, method: str, url: str):
+    def get_request_counts(self) -> Dict[str, int]:
+        """
+        取得各區間目前的請求數
+        
+        Returns:
+            各區間的請求數
+        """
+        now = time.monotonic()
+        with self._rate_lock:
+            return {
+                interval: window.count(now)
+                for interval, window in self.request_records.items()
+            }
+            
+    def _record_request(self, method: str, url: str):
         """
         記錄請求
         
+        配額已在 _check_rate_limit 時佔用，此處只寫入日誌
+        
         Args:
             method: 請求方法
             url: 請求網址
         """
-        try:
-            # 記錄請求時間
-            now = datetime.now()
-            
-            # 更新記錄
-            this.request_records["minute"].append(now)
-            this.request_records["hour"].append(now)
-            this.request_records["day"].append(now)
-            
-            # 記錄請求
-            this.logger.info(f"{method} 請求: {url}")
-            
-        except Exception as e:
-            this.logger.error(f"記錄請求失敗: {str(e)}")
-            raise RequestError(f"記錄請求失敗: {str(e)}")
+        self.logger.info(f"{method} 請求: {url}")
             
     def _retry_request(
         this,
@@ -785,25 +847,16 @@ class RequestController:
                 this.config.request.retry_status_forcelist
             )
             
-            # 建立重試策略
-            retry_strategy = Retry(
-                total=retry_count,
-                backoff_factor=retry_backoff,
-                status_forcelist=retry_status_forcelist
-            )
-            
-            # 設定重試策略
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            this.session.mount("http://", adapter)
-            this.session.mount("https://", adapter)
-            
-            # 重試請求
+            # 重試請求（沿用共用會話的連線池，不重新掛載適配器）
             for i in range(retry_count):
                 try:
                     # 等待延遲
                     if i > 0:
                         time.sleep(retry_delay * (retry_backoff ** i))
                         
+                    # 檢查速率限制
+                    this._check_rate_limit()
+                    
                     # 發送請求
                     response = getattr(this.session, method.lower())(
                         url=url,
@@ -820,6 +873,11 @@ class RequestController:
                         f"第 {i+1} 次重試失敗: {str(e)}"
                     )
                     
+                    # 不在重試狀態碼列表中的錯誤回應不再重試
+                    status = getattr(e.response, "status_code", None)
+                    if status is not None and retry_status_forcelist and status not in retry_status_forcelist:
+                        raise
+                    
                     if i == retry_count - 1:
                         raise
                         
@@ -830,11 +888,12 @@ class RequestController:
             raise RequestError(f"重試請求失敗: {str(e)}")
             
     def close(self):
-        """關閉請求控制服務"""
+        """關閉請求控制服務，共用的外部會話由其擁有者關閉"""
         try:
-            this.session.close()
+            if self._owns_session:
+                self.session.close()
         except Exception as e:
-            this.logger.error(f"關閉請求控制服務失敗: {str(e)}")
+            self.logger.error(f"關閉請求控制服務失敗: {str(e)}")
             raise RequestError(f"關閉請求控制服務失敗: {str(e)}")
             
     def __enter__(this):
@@ -41,9 +41,8 @@ async def crawl(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # 建立任務
     try:
-        # 檢查用戶任務數量上限
-        user_tasks = task_manager.get_user_tasks(user.id)
-        if len(user_tasks) >= task_manager.max_tasks_per_user:
+        # 檢查用戶未完成任務數量上限
+        if task_manager.count_active_tasks(user.id) >= task_manager.max_tasks_per_user:
             await update.message.reply_text(
                 f"⚠️ 您已達到最大任務數量限制 ({task_manager.max_tasks_per_user})。\n"
                 "請等待現有任務完成或使用 /cancel 取消任務。"
@@ -62,6 +62,12 @@ ADMIN_USER_IDS = [int(id) for id in os.environ.get("ADMIN_USER_IDS", "").split("
 # API 金鑰
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 
+# Gemini 圖像分析設定
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_MAX_WORKERS = int(os.environ.get("GEMINI_MAX_WORKERS", "4"))  # 分析用執行緒數
+GEMINI_CACHE_TTL = int(os.environ.get("GEMINI_CACHE_TTL", "3600"))  # 結果快取秒數
+GEMINI_CACHE_SIZE = int(os.environ.get("GEMINI_CACHE_SIZE", "256"))  # 結果快取筆數
+
 # 授權控制
 AUTHORIZED_USERS = [int(id) for id in os.environ.get("AUTHORIZED_USERS", "").split(",") if id.strip()]
 REQUIRE_AUTH = os.environ.get("REQUIRE_AUTH", "True").lower() in ("true", "1", "yes")
@@ -75,7 +81,10 @@ RATE_LIMIT = {
 # 任務設定
 MAX_TASKS_PER_USER = 5
 MAX_CONCURRENT_TASKS = 10
+MAX_RUNNING_TASKS_PER_USER = 2  # 每個用戶同時執行的任務數
 TASK_TIMEOUT_SECONDS = 300  # 5分鐘
+TASK_DB_PATH = os.environ.get("TASK_DB_PATH", os.path.join("data", "telegram_bot", "tasks.db"))
+TASK_EXPORT_DIR = os.environ.get("TASK_EXPORT_DIR", os.path.join("data", "telegram_bot", "exports"))
 
 # 結果格式設定
 DEFAULT_EXPORT_FORMAT = "json"
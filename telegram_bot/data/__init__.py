@@ -0,0 +1,7 @@
+"""
+任務數據與持久化
+"""
+
+from telegram_bot.data.task_manager import TaskManager, TaskContext, TaskStore
+
+__all__ = ['TaskManager', 'TaskContext', 'TaskStore']
@@ -0,0 +1,740 @@
+"""
+爬蟲任務管理
+
+以 SQLite 持久化任務佇列，並在 Bot 事件循環之外執行爬蟲：
+- 任務與結果寫入 SQLite，重新啟動後恢復未完成與已排程的任務
+- 固定大小的執行緒池執行爬蟲，另有每個用戶的同時執行上限
+- 排程器依 /schedule 指定的時間將任務放入佇列
+- 任務狀態以任務 ID 與用戶 ID 建立記憶體索引，查詢不需掃描全部任務
+"""
+
+import os
+import json
+import time
+import heapq
+import uuid
+import sqlite3
+import logging
+import threading
+import urllib.request
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Optional
+
+from telegram_bot.config import (
+    ADMIN_USER_IDS,
+    MAX_TASKS_PER_USER,
+    MAX_CONCURRENT_TASKS,
+    MAX_RUNNING_TASKS_PER_USER,
+    TASK_TIMEOUT_SECONDS,
+    TASK_DB_PATH,
+    TASK_EXPORT_DIR,
+)
+from telegram_bot.exceptions import TaskError, TaskLimitError
+from telegram_bot.utils.formatters import format_duration
+
+logger = logging.getLogger(__name__)
+
+# 任務狀態
+ACTIVE_STATUSES = ("pending", "scheduled", "running")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; DataScoutBot/1.0)"
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+TASK_COLUMNS = (
+    "id", "user_id", "target_url", "options", "status", "progress", "created_at",
+    "scheduled_time", "start_time", "end_time", "error", "has_result",
+)
+
+
+class TaskContext:
+    """傳給爬蟲函數的任務上下文，用於回報進度與檢查取消"""
+
+    def __init__(self, task_id: str, timeout: float, on_progress: Callable[[str, int], None]):
+        self.task_id = task_id
+        self.deadline = time.monotonic() + timeout
+        self.cancel_event = threading.Event()
+        self._on_progress = on_progress
+
+    @property
+    def cancelled(self) -> bool:
+        """任務是否已被取消、終止或逾時"""
+        return self.cancel_event.is_set()
+
+    def set_progress(self, progress: int) -> None:
+        """回報進度 (0-100)"""
+        self._on_progress(self.task_id, max(0, min(100, int(progress))))
+
+    def raise_if_cancelled(self) -> None:
+        """任務已取消時中止爬蟲"""
+        if self.cancelled:
+            raise TaskError(f"任務 {self.task_id} 已取消")
+
+
+class _PageParser(HTMLParser):
+    """擷取標題、描述、連結與可見文字"""
+
+    def __init__(self):
+        super().__init__()
+        self.title = ""
+        self.description = ""
+        self.links: List[str] = []
+        self.text: List[str] = []
+        self._in_title = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "title":
+            self._in_title = True
+        elif tag in ("script", "style", "noscript"):
+            self._skip_depth += 1
+        elif tag == "meta" and (attrs.get("name") or "").lower() == "description":
+            self.description = attrs.get("content") or ""
+        elif tag == "a" and attrs.get("href"):
+            self.links.append(attrs["href"])
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in ("script", "style", "noscript") and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth and data.strip():
+            self.text.append(data.strip())
+
+
+def fetch_page(url: str, options: Dict[str, Any], context: TaskContext) -> Dict[str, Any]:
+    """預設爬蟲：下載頁面並擷取標題、描述、連結與文字
+
+    Args:
+        url: 目標網址
+        options: 任務選項，支援 timeout、user_agent、max_links
+        context: 任務上下文
+
+    Returns:
+        爬取結果
+    """
+    timeout = float(options.get("timeout", 30))
+    max_links = int(options.get("max_links", 100))
+    request = urllib.request.Request(url, headers={"User-Agent": options.get("user_agent", DEFAULT_USER_AGENT)})
+
+    context.set_progress(10)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        body = response.read(MAX_PAGE_BYTES)
+        status = response.status
+        final_url = response.geturl()
+    context.raise_if_cancelled()
+
+    context.set_progress(60)
+    parser = _PageParser()
+    parser.feed(body.decode(charset, errors="replace"))
+    text = " ".join(parser.text)
+
+    return {
+        "url": final_url,
+        "status": status,
+        "title": parser.title.strip(),
+        "description": parser.description.strip(),
+        "links": parser.links[:max_links],
+        "link_count": len(parser.links),
+        "text": text[:5000],
+        "text_length": len(text),
+    }
+
+
+class TaskStore:
+    """任務的 SQLite 持久化"""
+
+    def __init__(self, db_path: str):
+        """初始化資料庫
+
+        Args:
+            db_path: SQLite 檔案路徑
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    target_url TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    scheduled_time TEXT,
+                    start_time TEXT,
+                    end_time TEXT,
+                    error TEXT,
+                    has_result INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_user_idx ON tasks(user_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status_idx ON tasks(status)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_results (task_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def save_task(self, task: Dict[str, Any]) -> None:
+        """新增或更新任務"""
+        row = dict(task, options=json.dumps(task["options"], ensure_ascii=False), has_result=int(task["has_result"]))
+        placeholders = ", ".join("?" for _ in TASK_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({placeholders})",
+                [row[column] for column in TASK_COLUMNS]
+            )
+
+    def load_tasks(self) -> List[Dict[str, Any]]:
+        """按建立時間載入所有任務"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM tasks ORDER BY created_at").fetchall()
+        tasks = []
+        for row in rows:
+            task = dict(row)
+            task["options"] = json.loads(task["options"])
+            task["has_result"] = bool(task["has_result"])
+            tasks.append(task)
+        return tasks
+
+    def save_result(self, task_id: str, data: Any) -> None:
+        """保存任務結果"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_results (task_id, data) VALUES (?, ?)",
+                (task_id, json.dumps(data, ensure_ascii=False, default=str))
+            )
+
+    def load_result(self, task_id: str) -> Optional[Any]:
+        """讀取任務結果"""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM task_results WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
+
+class TaskManager:
+    """爬蟲任務管理器
+
+    同一資料庫路徑只會建立一個實例，各指令模組的 TaskManager() 共用同一個佇列與執行緒池。
+    """
+
+    _instances: Dict[str, "TaskManager"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, db_path: Optional[str] = None, *args, **kwargs):
+        path = os.path.abspath(db_path or TASK_DB_PATH)
+        with cls._instances_lock:
+            instance = cls._instances.get(path)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._initialized = False
+                cls._instances[path] = instance
+        return instance
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        crawler: Optional[Callable[[str, Dict[str, Any], TaskContext], Any]] = None,
+        max_workers: int = MAX_CONCURRENT_TASKS,
+        max_tasks_per_user: int = MAX_TASKS_PER_USER,
+        max_running_per_user: int = MAX_RUNNING_TASKS_PER_USER,
+        task_timeout: float = TASK_TIMEOUT_SECONDS,
+        export_dir: str = TASK_EXPORT_DIR,
+        admin_ids: Optional[List[int]] = None,
+    ):
+        """初始化任務管理器並恢復資料庫中的未完成任務
+
+        Args:
+            db_path: SQLite 檔案路徑
+            crawler: 爬蟲函數 (url, options, context) -> 結果，預設為 fetch_page
+            max_workers: 全域同時執行的任務數
+            max_tasks_per_user: 每個用戶未完成任務（含排程）的上限
+            max_running_per_user: 每個用戶同時執行的任務上限
+            task_timeout: 單一任務的逾時秒數
+            export_dir: 匯出檔案目錄
+            admin_ids: 管理員用戶 ID 列表
+        """
+        if self._initialized:
+            return
+        self._initialized = True
+
+        self.db_path = os.path.abspath(db_path or TASK_DB_PATH)
+        self.crawler = crawler or fetch_page
+        self.max_workers = max_workers
+        self.max_tasks_per_user = max_tasks_per_user
+        self.max_running_per_user = max_running_per_user
+        self.task_timeout = task_timeout
+        self.export_dir = export_dir
+        self.admin_ids = set(ADMIN_USER_IDS if admin_ids is None else admin_ids)
+        self.started_at = time.time()
+
+        self._store = TaskStore(self.db_path)
+        self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
+
+        # 記憶體索引：任務 ID -> 任務，用戶 ID -> 任務 ID（保留建立順序）
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._user_tasks: Dict[int, Dict[str, None]] = {}
+        self._user_active: Counter = Counter()
+        self._status_counts: Counter = Counter()
+
+        self._pending: deque = deque()
+        self._schedule: List = []
+        self._running: Dict[str, TaskContext] = {}
+        self._running_per_user: Counter = Counter()
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl-task")
+        self._stop_event = threading.Event()
+        self._recover()
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="task-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # ------------------------------------------------------------------
+    # 任務建立與取消
+    # ------------------------------------------------------------------
+
+    def create_task(self, user_id: int, target_url: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """建立並排入佇列的爬蟲任務
+
+        Args:
+            user_id: 用戶 ID
+            target_url: 目標網址
+            options: 任務選項
+
+        Returns:
+            任務 ID
+        """
+        return self._add_task(user_id, target_url, options or {})
+
+    def schedule_task(self, user_id: int, target_url: str, options: Optional[Dict[str, Any]] = None,
+                      schedule_time: str = "") -> str:
+        """建立排程任務
+
+        Args:
+            user_id: 用戶 ID
+            target_url: 目標網址
+            options: 任務選項
+            schedule_time: 執行時間，格式為 ISO 日期時間 (2023-01-01T12:00) 或 HH:MM（今日或明日）
+
+        Returns:
+            任務 ID
+        """
+        run_at = self.parse_schedule_time(schedule_time)
+        return self._add_task(user_id, target_url, options or {}, run_at)
+
+    @staticmethod
+    def parse_schedule_time(value: str, now: Optional[datetime] = None) -> datetime:
+        """解析排程時間
+
+        Args:
+            value: ISO 日期時間或 HH:MM
+            now: 目前時間，預設為 datetime.now()
+
+        Returns:
+            排程時間
+        """
+        now = now or datetime.now()
+        try:
+            if len(value) <= 5 and ":" in value:
+                clock = datetime.strptime(value, "%H:%M")
+                run_at = now.replace(hour=clock.hour, minute=clock.minute, second=0, microsecond=0)
+                if run_at <= now:
+                    run_at += timedelta(days=1)
+            else:
+                run_at = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"無法解析排程時間 '{value}'，請使用 2023-01-01T12:00 或 12:00 格式")
+
+        if run_at.tzinfo is not None:
+            run_at = run_at.astimezone().replace(tzinfo=None)
+        if run_at <= now:
+            raise ValueError("排程時間必須晚於目前時間")
+        return run_at
+
+    def _add_task(self, user_id: int, target_url: str, options: Dict[str, Any],
+                  run_at: Optional[datetime] = None) -> str:
+        """建立任務並寫入資料庫"""
+        if not target_url.startswith(("http://", "https://")):
+            raise ValueError(f"不支援的網址: {target_url}")
+
+        with self._cond:
+            if self._user_active[user_id] >= self.max_tasks_per_user:
+                raise TaskLimitError(f"已達到最大任務數量限制 ({self.max_tasks_per_user})")
+
+            task_id = uuid.uuid4().hex[:8]
+            while task_id in self._tasks:
+                task_id = uuid.uuid4().hex[:8]
+
+            task = {column: None for column in TASK_COLUMNS}
+            task.update({
+                "id": task_id,
+                "user_id": user_id,
+                "target_url": target_url,
+                "options": dict(options),
+                "status": "scheduled" if run_at else "pending",
+                "progress": 0,
+                "created_at": datetime.now().strftime(TIME_FORMAT),
+                "scheduled_time": run_at.strftime(TIME_FORMAT) if run_at else None,
+                "has_result": False,
+            })
+            self._index(task)
+            self._store.save_task(task)
+
+            if run_at:
+                heapq.heappush(self._schedule, (run_at.timestamp(), task_id))
+                logger.info(f"User {user_id} scheduled task {task_id} at {task['scheduled_time']}")
+            else:
+                self._pending.append(task_id)
+                logger.info(f"User {user_id} created task {task_id}")
+            self._cond.notify_all()
+        return task_id
+
+    def cancel_task(self, task_id: str, user_id: int) -> bool:
+        """取消任務，僅限任務擁有者或管理員
+
+        Returns:
+            是否已取消
+        """
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if not task or (task["user_id"] != user_id and not self.is_admin(user_id)):
+                return False
+            return self._stop_task(task, "cancelled", "任務已被用戶取消")
+
+    def kill_task(self, task_id: str) -> bool:
+        """強制終止任務（管理員）
+
+        Returns:
+            是否已終止
+        """
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if not task:
+                return False
+            return self._stop_task(task, "cancelled", "任務已被管理員終止")
+
+    def _stop_task(self, task: Dict[str, Any], status: str, error: str) -> bool:
+        """停止未完成的任務；執行中的爬蟲會收到取消信號，其結果將被捨棄"""
+        if task["status"] not in ACTIVE_STATUSES:
+            return False
+        context = self._running.get(task["id"])
+        if context:
+            context.cancel_event.set()
+        # 佇列與排程中的項目在取出時依狀態略過
+        self._finish(task, status, error=error)
+        self._cond.notify_all()
+        return True
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """取得任務狀態"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return self._public(task) if task else None
+
+    def get_user_tasks(self, user_id: int) -> List[Dict[str, Any]]:
+        """取得用戶的所有任務（依建立順序）"""
+        with self._lock:
+            return [self._public(self._tasks[task_id]) for task_id in self._user_tasks.get(user_id, ())]
+
+    def count_active_tasks(self, user_id: int) -> int:
+        """取得用戶未完成（等待、排程、執行中）的任務數"""
+        with self._lock:
+            return self._user_active[user_id]
+
+    def get_all_tasks(self) -> List[Dict[str, Any]]:
+        """取得所有任務"""
+        with self._lock:
+            return [self._public(task) for task in self._tasks.values()]
+
+    def get_task_result(self, task_id: str, user_id: int) -> Optional[Any]:
+        """取得已完成任務的結果，僅限任務擁有者或管理員"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task or not task["has_result"]:
+                return None
+            if task["user_id"] != user_id and not self.is_admin(user_id):
+                return None
+        return self._store.load_result(task_id)
+
+    def export_task_result(self, task_id: str, user_id: int, export_format: str = "json") -> Optional[str]:
+        """匯出任務結果為檔案
+
+        Args:
+            task_id: 任務 ID
+            user_id: 用戶 ID
+            export_format: json、csv 或 excel
+
+        Returns:
+            匯出檔案路徑，無法匯出時為 None
+        """
+        data = self.get_task_result(task_id, user_id)
+        if data is None:
+            return None
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        extension = "xlsx" if export_format == "excel" else export_format
+        path = os.path.join(self.export_dir, f"task_{task_id}.{extension}")
+        try:
+            if export_format == "json":
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+            else:
+                import pandas as pd
+
+                rows = data.get("items") if isinstance(data, dict) and isinstance(data.get("items"), list) else data
+                frame = pd.json_normalize(rows if isinstance(rows, list) else [rows])
+                if export_format == "csv":
+                    frame.to_csv(path, index=False, encoding="utf-8-sig")
+                elif export_format == "excel":
+                    frame.to_excel(path, index=False)
+                else:
+                    raise ValueError(f"不支援的匯出格式: {export_format}")
+        except Exception as e:
+            logger.error(f"Error exporting task {task_id}: {str(e)}")
+            return None
+        return path
+
+    def is_admin(self, user_id: int) -> bool:
+        """檢查是否為管理員"""
+        return user_id in self.admin_ids
+
+    def get_system_status(self) -> Dict[str, Any]:
+        """取得系統狀態"""
+        with self._lock:
+            counts = dict(self._status_counts)
+
+        try:
+            import psutil
+            cpu_usage = psutil.cpu_percent(interval=None)
+            memory_usage = psutil.virtual_memory().percent
+        except ImportError:
+            cpu_usage = memory_usage = "N/A"
+
+        return {
+            "active_tasks": counts.get("pending", 0) + counts.get("running", 0),
+            "running_tasks": counts.get("running", 0),
+            "scheduled_tasks": counts.get("scheduled", 0),
+            "completed_tasks": counts.get("completed", 0),
+            "failed_tasks": counts.get("failed", 0),
+            "cancelled_tasks": counts.get("cancelled", 0),
+            "cpu_usage": cpu_usage,
+            "memory_usage": memory_usage,
+            "uptime": format_duration(time.time() - self.started_at),
+        }
+
+    # ------------------------------------------------------------------
+    # 索引與狀態
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _public(task: Dict[str, Any]) -> Dict[str, Any]:
+        """對外的任務字典，省略尚未設定的欄位"""
+        result = {key: value for key, value in task.items() if value is not None}
+        result["options"] = dict(task["options"])
+        return result
+
+    def _index(self, task: Dict[str, Any]) -> None:
+        """將任務加入記憶體索引"""
+        self._tasks[task["id"]] = task
+        self._user_tasks.setdefault(task["user_id"], {})[task["id"]] = None
+        self._status_counts[task["status"]] += 1
+        if task["status"] in ACTIVE_STATUSES:
+            self._user_active[task["user_id"]] += 1
+
+    def _set_status(self, task: Dict[str, Any], status: str) -> None:
+        """更新任務狀態與相關計數"""
+        previous = task["status"]
+        self._status_counts[previous] -= 1
+        self._status_counts[status] += 1
+        if previous in ACTIVE_STATUSES and status not in ACTIVE_STATUSES:
+            self._user_active[task["user_id"]] -= 1
+        task["status"] = status
+
+    def _finish(self, task: Dict[str, Any], status: str, error: Optional[str] = None) -> None:
+        """將任務標記為結束狀態並寫入資料庫"""
+        self._set_status(task, status)
+        task["end_time"] = datetime.now().strftime(TIME_FORMAT)
+        task["error"] = error
+        if status == "completed":
+            task["progress"] = 100
+        self._store.save_task(task)
+        logger.info(f"Task {task['id']} {status}" + (f": {error}" if error else ""))
+
+    def _recover(self) -> None:
+        """從資料庫恢復任務；中斷時執行中的任務重新排入佇列"""
+        now = time.time()
+        for task in self._store.load_tasks():
+            if task["status"] == "running":
+                task.update(status="pending", progress=0, start_time=None)
+                self._store.save_task(task)
+            self._index(task)
+            if task["status"] == "pending":
+                self._pending.append(task["id"])
+            elif task["status"] == "scheduled":
+                run_at = datetime.strptime(task["scheduled_time"], TIME_FORMAT).timestamp()
+                heapq.heappush(self._schedule, (max(run_at, now), task["id"]))
+
+        if self._pending or self._schedule:
+            logger.info(f"Recovered {len(self._pending)} pending and {len(self._schedule)} scheduled tasks")
+
+    # ------------------------------------------------------------------
+    # 排程與執行
+    # ------------------------------------------------------------------
+
+    def _dispatch_loop(self) -> None:
+        """排程執行緒：到期排程轉入佇列、檢查逾時並啟動可執行的任務"""
+        while not self._stop_event.is_set():
+            with self._cond:
+                now = time.time()
+                self._promote_due(now)
+                self._expire_running()
+                self._start_runnable()
+
+                timeout = 1.0
+                if self._schedule:
+                    timeout = min(timeout, max(0.0, self._schedule[0][0] - now))
+                self._cond.wait(timeout)
+
+    def _promote_due(self, now: float) -> None:
+        """將到期的排程任務轉為等待執行"""
+        while self._schedule and self._schedule[0][0] <= now:
+            _, task_id = heapq.heappop(self._schedule)
+            task = self._tasks.get(task_id)
+            if task and task["status"] == "scheduled":
+                self._set_status(task, "pending")
+                self._store.save_task(task)
+                self._pending.append(task_id)
+
+    def _expire_running(self) -> None:
+        """將超過逾時時間的執行中任務標記為失敗"""
+        now = time.monotonic()
+        for task_id, context in self._running.items():
+            task = self._tasks[task_id]
+            if task["status"] == "running" and now >= context.deadline:
+                context.cancel_event.set()
+                self._finish(task, "failed", error=f"任務執行逾時 ({self.task_timeout} 秒)")
+
+    def _start_runnable(self) -> None:
+        """依序啟動等待中的任務，遵守全域與每個用戶的同時執行上限"""
+        deferred = deque()
+        while self._pending and len(self._running) < self.max_workers:
+            task_id = self._pending.popleft()
+            task = self._tasks.get(task_id)
+            if not task or task["status"] != "pending":
+                continue
+            if self._running_per_user[task["user_id"]] >= self.max_running_per_user:
+                deferred.append(task_id)
+                continue
+            self._start(task)
+        # 被用戶上限擋下的任務保留原順序
+        deferred.extend(self._pending)
+        self._pending = deferred
+
+    def _start(self, task: Dict[str, Any]) -> None:
+        """啟動任務"""
+        context = TaskContext(task["id"], self.task_timeout, self._update_progress)
+        self._set_status(task, "running")
+        task["start_time"] = datetime.now().strftime(TIME_FORMAT)
+        task["progress"] = 0
+        self._store.save_task(task)
+
+        self._running[task["id"]] = context
+        self._running_per_user[task["user_id"]] += 1
+        self._executor.submit(self._run_task, task["id"], task["target_url"], dict(task["options"]), context)
+
+    def _run_task(self, task_id: str, target_url: str, options: Dict[str, Any], context: TaskContext) -> None:
+        """在工作執行緒中執行爬蟲"""
+        result, error = None, None
+        try:
+            result = self.crawler(target_url, options, context)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        with self._cond:
+            # 關閉中被中斷的任務保留為執行中，下次啟動時重新排入佇列
+            if self._stop_event.is_set():
+                return
+            task = self._tasks[task_id]
+            self._running.pop(task_id, None)
+            self._running_per_user[task["user_id"]] -= 1
+
+            # 已被取消、終止或逾時的任務捨棄結果
+            if task["status"] == "running":
+                if error:
+                    self._finish(task, "failed", error=error)
+                else:
+                    self._store.save_result(task_id, result)
+                    task["has_result"] = True
+                    self._finish(task, "completed")
+            self._cond.notify_all()
+
+    def _update_progress(self, task_id: str, progress: int) -> None:
+        """更新任務進度（僅記憶體，完成時一併寫入資料庫）"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task and task["status"] == "running":
+                task["progress"] = progress
+
+    def wait_for(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """等待任務結束並返回其狀態
+
+        Args:
+            task_id: 任務 ID
+            timeout: 最長等待秒數
+
+        Returns:
+            任務狀態，不存在時為 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while task_id in self._tasks and self._tasks[task_id]["status"] in ACTIVE_STATUSES:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            task = self._tasks.get(task_id)
+            return self._public(task) if task else None
+
+    def shutdown(self, wait: bool = False) -> None:
+        """停止排程執行緒與執行緒池；未完成的任務保留在資料庫中，下次啟動時恢復"""
+        self._stop_event.set()
+        with self._cond:
+            for context in self._running.values():
+                context.cancel_event.set()
+            self._cond.notify_all()
+        self._dispatcher.join(timeout=5)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._cond:
+            self._store.close()
+        with self._instances_lock:
+            if self._instances.get(self.db_path) is self:
+                del self._instances[self.db_path]
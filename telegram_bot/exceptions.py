@@ -24,4 +24,12 @@ class HandlerError(BotError):
 
 class MiddlewareError(BotError):
     """中間件錯誤"""
-    pass 
\ No newline at end of file
+    pass
+
+class TaskError(BotError):
+    """任務錯誤"""
+    pass
+
+class TaskLimitError(TaskError):
+    """任務數量超過限制"""
+    pass
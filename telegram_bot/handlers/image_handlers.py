@@ -4,11 +4,8 @@
 處理圖像上傳和分析請求
 """
 
-import os
 import logging
-import tempfile
 from typing import Optional, Union
-from pathlib import Path
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
@@ -35,6 +32,32 @@ def get_gemini_client() -> GeminiClient:
         
     return _gemini_client
 
+async def analyze_telegram_image(client: GeminiClient,
+                                 context: ContextTypes.DEFAULT_TYPE,
+                                 file_id: str,
+                                 image_key: str,
+                                 prompt: str) -> str:
+    """
+    分析 Telegram 上的圖片，已有快取結果時直接返回而不下載；
+    同一圖片與提示詞的並行請求共用一次下載與分析
+    
+    Args:
+        client: Gemini API 客戶端
+        context: 回調上下文
+        file_id: Telegram 文件 ID
+        image_key: Telegram 文件的 file_unique_id
+        prompt: 提示詞
+        
+    Returns:
+        str: 圖像分析結果
+    """
+    async def download(path: str) -> None:
+        # 獲取文件對象並下載到共用任務建立的臨時文件
+        file = await context.bot.get_file(file_id)
+        await file.download_to_drive(path)
+    
+    return await client.analyze_remote_image(image_key, prompt, download)
+
 async def handle_image(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     處理用戶上傳的圖片
@@ -77,77 +100,62 @@ async def handle_image(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         # 獲取文件 ID
         if is_photo:
             # 對於照片，選擇最高解析度的版本
-            file_id = update.message.photo[-1].file_id
+            image = update.message.photo[-1]
         else:
             # 對於文檔，直接獲取文件 ID
-            file_id = update.message.document.file_id
-            
-        # 獲取文件對象
-        file = await context.bot.get_file(file_id)
+            image = update.message.document
+        file_id = image.file_id
+        # file_unique_id 對同一張圖片（包括轉發）保持不變，用作分析結果的快取鍵
+        image_key = image.file_unique_id
         
-        # 創建臨時文件
-        suffix = Path(file.file_path).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp:
-            temp_path = temp.name
+        # 獲取用戶的自定義提示詞（如果有）
+        custom_prompt = update.message.caption if update.message.caption else None
         
-        # 下載文件到臨時路徑
-        await file.download_to_drive(temp_path)
+        # 預設提示詞
+        default_prompt = (
+            "請詳細描述這張圖片中的內容，"
+            "包括可見的物體、場景、文字和其他重要元素。"
+            "如果有文字內容，請完整提取出來。"
+            "如果是表格或結構化內容，請整理成易讀的格式。"
+        )
         
-        try:
-            # 獲取用戶的自定義提示詞（如果有）
-            custom_prompt = update.message.caption if update.message.caption else None
-            
-            # 預設提示詞
-            default_prompt = (
-                "請詳細描述這張圖片中的內容，"
-                "包括可見的物體、場景、文字和其他重要元素。"
-                "如果有文字內容，請完整提取出來。"
-                "如果是表格或結構化內容，請整理成易讀的格式。"
-            )
-            
-            prompt = custom_prompt if custom_prompt else default_prompt
-            
-            # 使用 Gemini API 分析圖片
-            client = get_gemini_client()
-            analysis_result = await client.analyze_image(temp_path, prompt)
-            
-            # 創建短 ID 用於按鈕回調
-            short_id = hash(file_id) % 10000000  # 建立一個較短的數字 ID
+        prompt = custom_prompt if custom_prompt else default_prompt
+        
+        # 使用 Gemini API 分析圖片，已有快取結果時不需下載
+        client = get_gemini_client()
+        analysis_result = await analyze_telegram_image(client, context, file_id, image_key, prompt)
+        
+        # 創建短 ID 用於按鈕回調
+        short_id = hash(file_id) % 10000000  # 建立一個較短的數字 ID
+        
+        # 存儲在 context.bot_data 中，以便後續使用
+        if "file_id_map" not in context.bot_data:
+            context.bot_data["file_id_map"] = {}
+        context.bot_data["file_id_map"][short_id] = (file_id, image_key)
             
-            # 存儲在 context.bot_data 中，以便後續使用
-            if "file_id_map" not in context.bot_data:
-                context.bot_data["file_id_map"] = {}
-            context.bot_data["file_id_map"][short_id] = file_id
-                
-            keyboard = [
-                [
-                    InlineKeyboardButton("詳細分析", callback_data=f"img_detail:{short_id}"),
-                    InlineKeyboardButton("提取文字", callback_data=f"img_text:{short_id}")
-                ]
+        keyboard = [
+            [
+                InlineKeyboardButton("詳細分析", callback_data=f"img_detail:{short_id}"),
+                InlineKeyboardButton("提取文字", callback_data=f"img_text:{short_id}")
             ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            # 處理分析結果，使用純文本格式避免解析問題
-            header = "🖼 圖像分析結果"
-            if custom_prompt:
-                header = f"📝 提示詞：「{custom_prompt}」\n\n{header}"
-            
-            # 使用純文本
-            text_response = f"{header}\n\n{analysis_result}"
-            
-            # 發送分析結果
-            await processing_message.edit_text(
-                text_response,
-                parse_mode=None,  # 不使用解析器
-                reply_markup=reply_markup
-            )
-            
-        finally:
-            # 清理臨時文件
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-                logger.debug(f"已刪除臨時文件: {temp_path}")
-                
+        ]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+        
+        # 處理分析結果，使用純文本格式避免解析問題
+        header = "🖼 圖像分析結果"
+        if custom_prompt:
+            header = f"📝 提示詞：「{custom_prompt}」\n\n{header}"
+        
+        # 使用純文本
+        text_response = f"{header}\n\n{analysis_result}"
+        
+        # 發送分析結果
+        await processing_message.edit_text(
+            text_response,
+            parse_mode=None,  # 不使用解析器
+            reply_markup=reply_markup
+        )
+
     except Exception as e:
         logger.error(f"處理圖片時發生錯誤: {str(e)}", exc_info=True)
         try:
@@ -237,7 +245,7 @@ async def handle_image_callback(update: Update, context: ContextTypes.DEFAULT_TY
         )
         return
     
-    file_id = context.bot_data["file_id_map"][short_id]
+    file_id, image_key = context.bot_data["file_id_map"][short_id]
     
     # 發送處理中的消息
     await query.edit_message_text(
@@ -246,64 +254,47 @@ async def handle_image_callback(update: Update, context: ContextTypes.DEFAULT_TY
     )
     
     try:
-        # 獲取文件
-        file = await context.bot.get_file(file_id)
-        
-        # 創建臨時文件
-        suffix = Path(file.file_path).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp:
-            temp_path = temp.name
-        
-        # 下載文件
-        await file.download_to_drive(temp_path)
+        client = get_gemini_client()
         
-        try:
-            client = get_gemini_client()
+        if action == "img_detail":
+            # 詳細分析
+            prompt = (
+                "請對這張圖片進行極其詳細的分析，包括：\n"
+                "1. 主要物體和人物\n"
+                "2. 場景和環境描述\n"
+                "3. 色彩和光線特點\n"
+                "4. 可能的拍攝意圖\n"
+                "5. 任何特殊或不尋常的元素"
+            )
             
-            if action == "img_detail":
-                # 詳細分析
-                prompt = (
-                    "請對這張圖片進行極其詳細的分析，包括：\n"
-                    "1. 主要物體和人物\n"
-                    "2. 場景和環境描述\n"
-                    "3. 色彩和光線特點\n"
-                    "4. 可能的拍攝意圖\n"
-                    "5. 任何特殊或不尋常的元素"
-                )
-                
-                result = await client.analyze_image(temp_path, prompt)
-                
-                # 構建純文本響應
-                original_text = query.message.text.split("\n\n")[0]
-                response_text = f"{original_text}\n\n📋 詳細分析結果\n\n{result}"
-                
-            elif action == "img_text":
-                # 提取文字
-                prompt = (
-                    "請提取並轉錄這張圖片中的所有文字內容。"
-                    "如果是表格，請保持其格式結構。"
-                    "如果沒有文字，請明確說明。"
-                )
-                
-                result = await client.analyze_image(temp_path, prompt)
-                
-                # 構建純文本響應
-                original_text = query.message.text.split("\n\n")[0]
-                response_text = f"{original_text}\n\n📝 文字提取結果\n\n{result}"
-                
-            else:
-                response_text = f"{query.message.text}\n\n❌ 未知操作"
-                
-            # 更新消息
-            await query.edit_message_text(
-                response_text,
-                parse_mode=None
+            result = await analyze_telegram_image(client, context, file_id, image_key, prompt)
+            
+            # 構建純文本響應
+            original_text = query.message.text.split("\n\n")[0]
+            response_text = f"{original_text}\n\n📋 詳細分析結果\n\n{result}"
+            
+        elif action == "img_text":
+            # 提取文字
+            prompt = (
+                "請提取並轉錄這張圖片中的所有文字內容。"
+                "如果是表格，請保持其格式結構。"
+                "如果沒有文字，請明確說明。"
             )
             
-        finally:
-            # 清理臨時文件
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+            result = await analyze_telegram_image(client, context, file_id, image_key, prompt)
+            
+            # 構建純文本響應
+            original_text = query.message.text.split("\n\n")[0]
+            response_text = f"{original_text}\n\n📝 文字提取結果\n\n{result}"
+            
+        else:
+            response_text = f"{query.message.text}\n\n❌ 未知操作"
+            
+        # 更新消息
+        await query.edit_message_text(
+            response_text,
+            parse_mode=None
+        )
                 
     except Exception as e:
         logger.error(f"處理圖片回調時發生錯誤: {str(e)}", exc_info=True)
@@ -5,88 +5,254 @@ Gemini API 客戶端模組
 """
 
 import os
+import time
+import hashlib
 import logging
 import asyncio
-from typing import Union, Optional, BinaryIO, Dict, Any
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Optional, BinaryIO, Dict, Any, Hashable, Tuple, Callable, Awaitable
 
 logger = logging.getLogger(__name__)
 
 class GeminiClient:
-    """Google Gemini API 客戶端，用於處理圖像分析請求"""
-    
-    def __init__(self):
-        """初始化 Gemini 客戶端，設置 API 金鑰並配置模型"""
-        from telegram_bot.config import GEMINI_API_KEY
+    """Google Gemini API 客戶端，用於處理圖像分析請求
+
+    分析結果以「圖像鍵 + 提示詞」為鍵快取，圖像鍵為 Telegram 的 file_unique_id
+    或圖像內容的雜湊值；同時送出的相同請求只會下載與呼叫 API 一次。
+    API 呼叫在專用的執行緒池中執行，不佔用事件循環的預設執行器。
+    """
+
+    def __init__(self,
+                 model: Optional[Any] = None,
+                 max_workers: Optional[int] = None,
+                 cache_ttl: Optional[float] = None,
+                 cache_size: Optional[int] = None):
+        """
+        初始化 Gemini 客戶端，設置 API 金鑰並配置模型
+
+        Args:
+            model: 提供 generate_content 方法的模型物件，未指定時使用 Gemini API
+            max_workers: 分析用執行緒數
+            cache_ttl: 結果快取秒數
+            cache_size: 結果快取筆數上限
+        """
+        from telegram_bot.config import (
+            GEMINI_API_KEY, GEMINI_MODEL, GEMINI_MAX_WORKERS, GEMINI_CACHE_TTL, GEMINI_CACHE_SIZE
+        )
         self.api_key = GEMINI_API_KEY
-        
-        if not self.api_key:
-            logger.error("Gemini API 金鑰未設置，請在 .env 文件中設置 GEMINI_API_KEY")
-            raise ValueError("Gemini API 金鑰未設置")
-            
-        # 延遲導入 google.generativeai，以避免在不需要時載入它
-        import google.generativeai as genai
-        
-        # 配置 API
-        genai.configure(api_key=self.api_key)
-        
-        # 初始化模型 - 支援圖像的模型
-        # 更新為最新的 Gemini 模型，取代已棄用的 gemini-pro-vision
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        
+        self.cache_ttl = GEMINI_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_size = GEMINI_CACHE_SIZE if cache_size is None else cache_size
+
+        if model is not None:
+            self.model = model
+        else:
+            if not self.api_key:
+                logger.error("Gemini API 金鑰未設置，請在 .env 文件中設置 GEMINI_API_KEY")
+                raise ValueError("Gemini API 金鑰未設置")
+
+            # 延遲導入 google.generativeai，以避免在不需要時載入它
+            import google.generativeai as genai
+
+            # 配置 API
+            genai.configure(api_key=self.api_key)
+
+            # 初始化模型 - 支援圖像的模型
+            self.model = genai.GenerativeModel(GEMINI_MODEL)
+
+        # 專用執行緒池，慢速的 API 呼叫不會耗盡事件循環的預設執行器
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or GEMINI_MAX_WORKERS,
+            thread_name_prefix="gemini"
+        )
+        self._cache: "OrderedDict[Tuple[Hashable, str], Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Tuple[Hashable, str], asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
         logger.info("Gemini 客戶端初始化完成")
-    
-    async def analyze_image(self, 
-                           image_path: str, 
-                           prompt: str = "描述這張圖片中的內容") -> str:
+
+    async def analyze_image(self,
+                           image_path: str,
+                           prompt: str = "描述這張圖片中的內容",
+                           image_key: Optional[Hashable] = None) -> str:
         """
         分析圖像並返回描述
-        
+
         Args:
             image_path: 圖像文件路徑
             prompt: 提示詞，告訴 Gemini 如何解讀圖像
-            
+            image_key: 圖像鍵（例如 Telegram 的 file_unique_id），未指定時使用圖像內容的雜湊值
+
         Returns:
             str: 圖像分析結果
         """
         try:
-            # 在非同步函數中執行同步操作
-            # 使用 run_in_executor 以避免阻塞事件循環
-            loop = asyncio.get_event_loop()
-            
-            # 在執行器中處理圖像和 API 請求
-            result = await loop.run_in_executor(None, self._process_image, image_path, prompt)
-            
-            return result
-            
+            loop = asyncio.get_running_loop()
+            if image_key is None:
+                image_key = await loop.run_in_executor(self._executor, self._hash_file, image_path)
+            key = self._cache_key(image_key, prompt)
+
+            return await self._run_shared(key, lambda: self._analyze_file(image_path, prompt))
+
+        except Exception as e:
+            logger.error(f"圖像分析失敗: {str(e)}", exc_info=True)
+            return f"圖像分析時發生錯誤: {str(e)}"
+
+    async def analyze_remote_image(self,
+                                   image_key: Hashable,
+                                   prompt: str,
+                                   download: Callable[[str], Awaitable[Any]]) -> str:
+        """
+        下載並分析遠端圖像，已有快取結果時不下載
+
+        相同圖像鍵與提示詞的並行請求共用同一個下載與分析任務；臨時文件由該任務
+        建立並在完成後刪除，等待者被取消不會影響其他等待者。
+
+        Args:
+            image_key: 圖像鍵（例如 Telegram 的 file_unique_id）
+            prompt: 提示詞
+            download: 將圖像下載到指定路徑的非同步函數
+
+        Returns:
+            str: 圖像分析結果
+        """
+        try:
+            key = self._cache_key(image_key, prompt)
+            return await self._run_shared(key, lambda: self._download_and_analyze(download, prompt))
+
         except Exception as e:
             logger.error(f"圖像分析失敗: {str(e)}", exc_info=True)
             return f"圖像分析時發生錯誤: {str(e)}"
-    
+
+    def get_cached_result(self, image_key: Hashable, prompt: str) -> Optional[str]:
+        """
+        取得已快取的分析結果，可在下載圖像前先行檢查
+
+        Args:
+            image_key: 圖像鍵
+            prompt: 提示詞
+
+        Returns:
+            Optional[str]: 快取的分析結果，不存在或已過期時為 None
+        """
+        result = self._get_cached(self._cache_key(image_key, prompt))
+        if result is not None:
+            self._stats["hits"] += 1
+        return result
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """取得快取命中、未命中與合併請求的次數"""
+        return dict(self._stats, size=len(self._cache), inflight=len(self._inflight))
+
+    def close(self) -> None:
+        """關閉分析用執行緒池"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_shared(self,
+                          key: Tuple[Hashable, str],
+                          factory: Callable[[], Awaitable[str]]) -> str:
+        """返回快取結果，或加入相同鍵進行中的任務，沒有時以 factory 建立新任務"""
+        result = self._get_cached(key)
+        if result is not None:
+            self._stats["hits"] += 1
+            return result
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            # 分析在獨立任務中執行，任一等待者被取消都不會中斷共用的請求
+            task = asyncio.ensure_future(self._shared(key, factory()))
+            self._inflight[key] = task
+
+        return await asyncio.shield(task)
+
+    async def _shared(self, key: Tuple[Hashable, str], work: Awaitable[str]) -> str:
+        """執行共用任務，成功時寫入快取"""
+        try:
+            result = await work
+            self._set_cached(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _analyze_file(self, image_path: str, prompt: str) -> str:
+        """在專用執行緒池中分析圖像"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._process_image, image_path, prompt)
+
+    async def _download_and_analyze(self, download: Callable[[str], Awaitable[Any]], prompt: str) -> str:
+        """下載圖像到臨時文件並分析，完成後刪除臨時文件"""
+        with tempfile.NamedTemporaryFile(delete=False, prefix="gemini_") as temp:
+            temp_path = temp.name
+        try:
+            await download(temp_path)
+            return await self._analyze_file(temp_path, prompt)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+                logger.debug(f"已刪除臨時文件: {temp_path}")
+
+    @staticmethod
+    def _cache_key(image_key: Hashable, prompt: str) -> Tuple[Hashable, str]:
+        """組合圖像鍵與提示詞雜湊值"""
+        return image_key, hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _hash_file(image_path: str) -> str:
+        """計算圖像內容的 SHA-256 雜湊值"""
+        digest = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_cached(self, key: Tuple[Hashable, str]) -> Optional[str]:
+        """讀取未過期的快取項目"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _set_cached(self, key: Tuple[Hashable, str], result: str) -> None:
+        """寫入快取，超過上限時淘汰最久未使用的項目"""
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
     def _process_image(self, image_path: str, prompt: str) -> str:
         """
         處理圖像的同步方法，供 run_in_executor 使用
-        
+
         Args:
             image_path: 圖像文件路徑
             prompt: 提示詞
-            
+
         Returns:
             str: 圖像分析結果
         """
         try:
             # 導入必要的庫
             from PIL import Image
-            
+
             # 讀取圖像
-            img = Image.open(image_path)
-            
-            # 確保圖像處於 RGB 模式 (Gemini 需要)
-            if img.mode != "RGB":
-                img = img.convert("RGB")
-                
+            with Image.open(image_path) as img:
+                # 確保圖像處於 RGB 模式 (Gemini 需要)
+                img = img.convert("RGB") if img.mode != "RGB" else img.copy()
+
             # 調用 Gemini API
             response = self.model.generate_content([prompt, img])
-            
+
             # 提取並返回結果文本
             if response.text:
                 logger.info("圖像分析成功")
@@ -94,7 +260,7 @@ class GeminiClient:
             else:
                 logger.warning("圖像分析返回空結果")
                 return "無法解讀圖像內容"
-                
+
         except Exception as e:
             logger.error(f"處理圖像時發生錯誤: {str(e)}")
             raise e
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+測試非同步驗證碼客戶端的集中輪詢
+
+以本地假驗證碼服務測試批次查詢、共用連線、錯誤與逾時處理
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+web = pytest.importorskip("aiohttp.web")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "captcha_manager"))
+
+from captcha_solver.services.async_client import AsyncAntiCaptchaClient, AsyncTwoCaptchaClient
+
+FAST = dict(initial_delay=0.05, min_interval=0.02, max_interval=0.1, timeout=2.0)
+
+
+class FakeSolver:
+    """假驗證碼服務：答案為題目內容反轉，題目為 slow 時較晚完成，unsolvable 無法解決，never 永不完成"""
+
+    def __init__(self, solve_delay=0.1):
+        self.solve_delay = solve_delay
+        self.tasks = {}
+        self.poll_batches = []
+        self.peers = set()
+
+    def create(self, body):
+        task_id = str(len(self.tasks) + 1)
+        delay = self.solve_delay * (3 if body == "slow" else 1)
+        self.tasks[task_id] = (body, time.monotonic() + delay)
+        return task_id
+
+    def result(self, task_id):
+        body, ready_at = self.tasks[task_id]
+        if body == "unsolvable":
+            return "ERROR_CAPTCHA_UNSOLVABLE"
+        if body == "never" or time.monotonic() < ready_at:
+            return None
+        return body[::-1]
+
+    def app(self):
+        app = web.Application(middlewares=[self.track_peer])
+        app.router.add_post("/in.php", self.two_submit)
+        app.router.add_get("/res.php", self.two_result)
+        app.router.add_post("/createTask", self.anti_submit)
+        app.router.add_post("/getTaskResult", self.anti_result)
+        return app
+
+    @web.middleware
+    async def track_peer(self, request, handler):
+        self.peers.add(request.transport.get_extra_info("peername"))
+        return await handler(request)
+
+    async def two_submit(self, request):
+        data = await request.post()
+        if data["key"] != "secret":
+            return web.json_response({"status": 0, "request": "ERROR_WRONG_USER_KEY"})
+        return web.json_response({"status": 1, "request": self.create(data["body"])})
+
+    async def two_result(self, request):
+        ids = request.query["ids"].split(",")
+        self.poll_batches.append(len(ids))
+        answers = [self.result(task_id) or "CAPCHA_NOT_READY" for task_id in ids]
+        return web.Response(text="|".join(answers))
+
+    async def anti_submit(self, request):
+        data = await request.json()
+        return web.json_response({"errorId": 0, "taskId": int(self.create(data["task"]["body"]))})
+
+    async def anti_result(self, request):
+        data = await request.json()
+        self.poll_batches.append(1)
+        answer = self.result(str(data["taskId"]))
+        if answer and answer.startswith("ERROR"):
+            return web.json_response({"errorId": 12, "errorCode": answer})
+        if answer is None:
+            return web.json_response({"errorId": 0, "status": "processing"})
+        return web.json_response({"errorId": 0, "status": "ready", "solution": {"text": answer}})
+
+
+async def serve(solver):
+    runner = web.AppRunner(solver.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_two_captcha_batches_polls():
+    """測試 2captcha 多個驗證碼以批次查詢完成，錯誤只影響對應的驗證碼"""
+    solver = FakeSolver()
+    bodies = [f"captcha{i}" for i in range(10)] + ["slow", "unsolvable"]
+
+    async def main():
+        runner, url = await serve(solver)
+        try:
+            async with AsyncTwoCaptchaClient("secret", base_url=url, max_connections=2, **FAST) as client:
+                results = await client.solve_many(({"method": "base64", "body": b}, "image") for b in bodies)
+                stats = client.get_stats()
+            async with AsyncTwoCaptchaClient("wrong", base_url=url, **FAST) as client:
+                rejected = await client.solve({"method": "base64", "body": "x"})
+        finally:
+            await runner.cleanup()
+        return results, stats, rejected
+
+    results, stats, rejected = asyncio.run(main())
+
+    assert [r["result"] for r in results[:11]] == [b[::-1] for b in bodies[:11]]
+    assert results[-1] == {"success": False, "error": "ERROR_CAPTCHA_UNSOLVABLE"}
+    assert rejected == {"success": False, "error": "ERROR_WRONG_USER_KEY"}
+    assert max(solver.poll_batches) == len(bodies)
+    assert stats["poll_requests"] == len(solver.poll_batches) < len(bodies)
+    assert stats["solved"] == 11 and stats["pending"] == 0
+    # 第一個客戶端最多 2 條連線，金鑰錯誤的客戶端 1 條
+    assert len(solver.peers) <= 3
+
+
+def test_anti_captcha_shared_session_and_timeout():
+    """測試 Anti-Captcha 在共用連線上並行查詢，逾時的驗證碼以失敗結束"""
+    solver = FakeSolver()
+    bodies = [f"captcha{i}" for i in range(8)] + ["never"]
+
+    async def main():
+        runner, url = await serve(solver)
+        try:
+            client = AsyncAntiCaptchaClient("secret", base_url=url, max_connections=4, **dict(FAST, timeout=0.5))
+            results = await client.solve_many(({"type": "ImageToTextTask", "body": b}, "image") for b in bodies)
+            # 已有解題時間統計後，第一次查詢延後到接近平均解題時間
+            first_delay = client._first_poll_delay("image")
+            await client.close()
+        finally:
+            await runner.cleanup()
+        return results, first_delay
+
+    results, first_delay = asyncio.run(main())
+
+    assert [r["result"] for r in results[:-1]] == [b[::-1] for b in bodies[:-1]]
+    assert results[-1] == {"success": False, "error": "Timeout waiting for result"}
+    assert len(solver.peers) <= 4
+    assert first_delay > FAST["initial_delay"]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+測試本地驗證碼服務的微批次推論
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+cv2 = pytest.importorskip("cv2")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "captcha_manager"))
+
+from captcha_solver.services.batching import MicroBatcher
+from captcha_solver.services.local import LocalCaptchaService
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    """建立小型圖片識別模型"""
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(
+        torch.nn.Conv2d(3, 4, 3, stride=4),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(4, 1)
+    )
+    torch.save(model, tmp_path / "image_recognizer.pth")
+    return tmp_path
+
+
+@pytest.fixture
+def captcha_images(tmp_path):
+    """建立不同內容的驗證碼圖片"""
+    rng = np.random.default_rng(0)
+    paths = []
+    for index in range(6):
+        path = str(tmp_path / f"captcha_{index}.png")
+        cv2.imwrite(path, rng.integers(0, 255, (60, 160, 3), dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+def test_concurrent_requests_are_batched(models_dir, captcha_images):
+    """測試並行請求合併為批次，結果與逐張推論一致"""
+    unbatched = LocalCaptchaService(models_dir=str(models_dir), enable_batching=False)
+    expected = [unbatched.solve_image_captcha(path)["result"] for path in captcha_images]
+
+    service = LocalCaptchaService(models_dir=str(models_dir), batch_size=8, batch_timeout_ms=50)
+    results = {}
+    barrier = threading.Barrier(len(captcha_images))
+
+    def worker(path):
+        barrier.wait()
+        results[path] = service.solve_image_captcha(path)["result"]
+
+    threads = [threading.Thread(target=worker, args=(path,)) for path in captcha_images]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = service.get_inference_stats()["image_model"]
+    service.close()
+
+    assert [results[path] for path in captcha_images] == pytest.approx(expected, abs=1e-5)
+    assert stats["requests"] == len(captcha_images)
+    assert stats["batches"] < len(captcha_images)
+    assert stats["p50_ms"] <= stats["p99_ms"]
+
+
+def test_batcher_propagates_model_errors():
+    """測試模型錯誤傳遞給該批次的所有請求，伺服器仍可繼續使用"""
+    calls = []
+
+    def model(inputs):
+        calls.append(len(inputs))
+        if len(calls) == 1:
+            raise RuntimeError("out of memory")
+        return inputs.sum(dim=(1, 2, 3))
+
+    batcher = MicroBatcher(model, torch.device("cpu"), input_shape=(1, 2, 2))
+    with pytest.raises(RuntimeError):
+        batcher.infer(torch.ones(1, 2, 2))
+    assert batcher.infer(torch.ones(1, 2, 2)).item() == 4.0
+    with pytest.raises(ValueError):
+        batcher.submit(torch.ones(3, 2, 2))
+    batcher.close()
+
+
+def test_zero_wait_batches_queued_requests():
+    """測試不等待湊批時，推論執行緒忙碌期間排隊的請求仍合併為一批"""
+    started = threading.Event()
+    release = threading.Event()
+    sizes = []
+
+    def model(inputs):
+        sizes.append(len(inputs))
+        started.set()
+        release.wait(5)
+        return inputs.sum(dim=(1, 2, 3))
+
+    batcher = MicroBatcher(model, torch.device("cpu"), input_shape=(1, 2, 2), max_batch_size=8, max_wait_ms=0)
+    first = batcher.submit(torch.ones(1, 2, 2))
+    started.wait(5)
+    queued = [batcher.submit(torch.ones(1, 2, 2)) for _ in range(5)]
+    release.set()
+
+    assert [f.result(5).item() for f in [first] + queued] == [4.0] * 6
+    assert sizes == [1, 5]
+    batcher.close()
+
+
+def test_cpu_defaults_do_not_wait(tmp_path):
+    """測試 CPU 上預設不等待湊批"""
+    service = LocalCaptchaService(models_dir=str(tmp_path))
+    if service.device.type == "cpu":
+        assert service.batch_timeout_ms == 0.0
+        assert service.batch_size == 8
+    service.close()
+
+
+def test_slider_without_model(tmp_path):
+    """測試未載入滑塊模型時以邊緣偵測定位"""
+    image = np.zeros((100, 300, 3), dtype=np.uint8)
+    cv2.rectangle(image, (120, 30), (170, 80), (255, 255, 255), -1)
+    path = str(tmp_path / "slider.png")
+    cv2.imwrite(path, image)
+
+    service = LocalCaptchaService(models_dir=str(tmp_path))
+    result = service.solve_slider_captcha(path)
+
+    assert result["success"]
+    assert abs(result["result"] - 120) <= 1
@@ -0,0 +1,102 @@
+"""
+驅動池測試
+
+測試瀏覽器租借、歸還重置、回收與統計
+"""
+
+import threading
+import pytest
+from unittest.mock import MagicMock
+from selenium.common.exceptions import WebDriverException
+
+from selenium_base.core.driver_pool import CLEAR_STORAGE_TYPES, DriverPool, DriverPoolConfig
+from selenium_base.core.exceptions import CrawlerTimeoutError
+
+def make_driver():
+    """建立模擬瀏覽器"""
+    driver = MagicMock()
+    driver.window_handles = ["main", "popup"]
+    driver.current_url = "https://example.com/page"
+    return driver
+
+@pytest.fixture
+def pool():
+    """建立測試用的驅動池"""
+    factory = MagicMock(side_effect=make_driver)
+    pool = DriverPool(factory, DriverPoolConfig(size=2, max_pages=3, max_memory_growth_mb=0))
+    pool.start()
+    yield pool
+    pool.close()
+
+def test_start_prewarms(pool):
+    """測試啟動時預先建立瀏覽器"""
+    assert pool.factory.call_count == 2
+    assert pool.get_stats()["idle"] == 2
+
+def test_lease_resets_on_return(pool):
+    """測試歸還時重置分頁、Cookie 與儲存"""
+    with pool.lease() as item:
+        driver = item.driver
+        item.record_page()
+
+    driver.close.assert_called_once()
+    driver.delete_all_cookies.assert_called_once()
+    driver.execute_cdp_cmd.assert_any_call(
+        "Storage.clearDataForOrigin",
+        {"origin": "https://example.com", "storageTypes": CLEAR_STORAGE_TYPES}
+    )
+    driver.get.assert_called_with("about:blank")
+    assert pool.get_stats()["idle"] == 2
+
+def test_recycle_after_max_pages(pool):
+    """測試超過頁數上限時回收並補充"""
+    with pool.lease() as item:
+        driver = item.driver
+        item.record_page(3)
+
+    driver.quit.assert_called_once()
+    pool.start()
+    stats = pool.get_stats()
+    assert stats["recycled"] == 1
+    assert stats["created"] == 3
+
+def test_broken_driver_discarded(pool):
+    """測試瀏覽器拋出 WebDriverException 時丟棄"""
+    with pytest.raises(WebDriverException):
+        with pool.lease() as item:
+            driver = item.driver
+            raise WebDriverException("crashed")
+
+    driver.quit.assert_called_once()
+    driver.delete_all_cookies.assert_not_called()
+
+def test_acquire_timeout_and_wait_stats(pool):
+    """測試池滿時逾時，歸還後等待者取得瀏覽器"""
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(CrawlerTimeoutError):
+        pool.acquire(timeout=0.05)
+
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    third = pool.acquire(timeout=2)
+    pool.release(second)
+    pool.release(third)
+
+    stats = pool.get_stats()
+    assert stats["leases"] == 3
+    assert stats["max_wait_time"] >= 0.04
+    assert 0 < stats["utilization"] <= 1
+
+def test_release_after_concurrent_close(pool):
+    """測試歸還時驅動池在補充前被關閉，不拋出例外"""
+    item = pool.acquire()
+    # 模擬 close() 在 release 釋放鎖之後、提交補充之前執行
+    item.driver.quit.side_effect = lambda: pool.close()
+
+    pool.release(item, discard=True)
+
+    item.driver.quit.assert_called_once()
+    stats = pool.get_stats()
+    assert stats["recycled"] == 1
+    assert stats["idle"] == 0
+
@@ -0,0 +1,87 @@
+"""
+限流演算法測試
+
+測試滑動窗口計數器與令牌桶
+"""
+
+import pytest
+from selenium_base.core.rate_limit.limiters import (
+    SlidingWindowCounter,
+    TokenBucket,
+    RollingWindow,
+    create_limiter
+)
+
+def test_sliding_window_limit():
+    """測試滑動窗口在窗口內限制請求數"""
+    limiter = SlidingWindowCounter(window=10, max_requests=3)
+    
+    assert all(limiter.try_acquire(100.0 + i) for i in range(3))
+    assert not limiter.try_acquire(103.0)
+    assert limiter.retry_after(103.0) > 0
+
+def test_sliding_window_weighted_previous():
+    """測試前一窗口的請求依經過比例遞減"""
+    limiter = SlidingWindowCounter(window=10, max_requests=4)
+    for _ in range(4):
+        assert limiter.try_acquire(100.0)
+    
+    # 進入下一窗口一半時，前一窗口計為 2 個請求
+    assert limiter.count(115.0) == pytest.approx(2.0)
+    assert limiter.try_acquire(115.0)
+    assert limiter.try_acquire(115.0)
+    assert not limiter.try_acquire(115.0)
+    
+    # 超過兩個窗口後完全重置
+    assert limiter.count(200.0) == 0
+
+def test_token_bucket_burst_and_refill():
+    """測試令牌桶突發與補充"""
+    limiter = TokenBucket(capacity=2, rate=1.0)
+    
+    assert limiter.try_acquire(0.0)
+    assert limiter.try_acquire(0.0)
+    assert not limiter.try_acquire(0.0)
+    assert limiter.retry_after(0.0) == pytest.approx(1.0)
+    assert limiter.try_acquire(1.0)
+
+def test_state_round_trip():
+    """測試狀態匯出與還原"""
+    for config in ({"window": 60, "max_requests": 5},
+                   {"window": 60, "max_requests": 5, "algorithm": "token_bucket"}):
+        limiter = create_limiter(config)
+        limiter.try_acquire(10.0)
+        restored = create_limiter(config)
+        restored.restore(limiter.to_dict())
+        assert restored.count(10.0) == pytest.approx(limiter.count(10.0))
+
+def test_rolling_window_exact():
+    """測試逐筆時間戳的精確滑動窗口"""
+    window = RollingWindow(span=60, limit=2)
+    window.add(0.0)
+    window.add(30.0)
+    
+    assert window.count(59.0) == 2
+    assert window.wait_time(59.0) == pytest.approx(1.0)
+    assert window.count(60.0) == 1
+    assert window.wait_time(60.0) == 0.0
+    assert len(window.entries) == 1
+
+def test_rolling_window_buckets():
+    """測試分桶窗口的記憶體上限與保守釋放"""
+    window = RollingWindow(span=3600, limit=1000, resolution=60)
+    for i in range(600):
+        window.add(i * 0.1)
+    
+    assert window.count(60.0) == 600
+    assert len(window.entries) == 1
+    # 整個桶結束後才釋放
+    assert window.count(3659.0) == 600
+    assert window.count(3660.0) == 0
+
+def test_invalid_config():
+    """測試無效配置"""
+    with pytest.raises(ValueError):
+        create_limiter({"window": 0, "max_requests": 5})
+    with pytest.raises(ValueError):
+        create_limiter({"window": 60, "max_requests": 5, "algorithm": "leaky"})
@@ -0,0 +1,134 @@
+"""
+速率限制管理器測試
+
+測試多執行緒檢查與狀態快照寫入次數
+"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from selenium_base.core.rate_limit import rate_limit_manager
+from selenium_base.core.rate_limit.rate_limit_manager import RateLimitManager
+
+@pytest.fixture
+def config_path(tmp_path):
+    """建立測試用的限流配置"""
+    def write(snapshot_interval):
+        config = {
+            "global": {"window": 3600, "max_requests": 10000},
+            "domain": {"window": 3600, "max_requests": 30},
+            "ip": {"window": 3600, "max_requests": 10000},
+            "session": {"window": 3600, "max_requests": 10000, "algorithm": "token_bucket"},
+            "delay": {"min": 0, "max": 0},
+            "circuit_breaker": {"threshold": 5, "reset_timeout": 300},
+            "persistence": {"enabled": True, "snapshot_interval": snapshot_interval}
+        }
+        path = tmp_path / "rate_limits.json"
+        path.write_text(json.dumps(config), encoding="utf-8")
+        return str(path)
+    return write
+
+def count_state_writes(manager):
+    """記錄寫入狀態文件的次數"""
+    writes = []
+    replace = os.replace
+
+    def recording_replace(src, dst):
+        if dst == manager.state_path:
+            writes.append(time.monotonic())
+        return replace(src, dst)
+
+    return writes, patch.object(rate_limit_manager.os, "replace", side_effect=recording_replace)
+
+def run_checks(manager, threads=8, calls=100):
+    """從多個執行緒呼叫各個 check_* 方法，返回 domain 檢查通過的次數"""
+    barrier = threading.Barrier(threads)
+    allowed = []
+    lock = threading.Lock()
+
+    def worker(index):
+        barrier.wait()
+        for i in range(calls):
+            manager.check_global_limit()
+            manager.check_ip_limit(f"10.0.0.{index}")
+            manager.check_session_limit(f"session-{i % 3}")
+            ok = manager.check_domain_limit("example.com")
+            with lock:
+                allowed.append(ok)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return sum(allowed)
+
+def test_concurrent_checks_write_one_snapshot(config_path):
+    """測試多執行緒檢查期間不寫入狀態，關閉時只寫入一次快照"""
+    manager = RateLimitManager(config_path(snapshot_interval=60))
+    writes, recorder = count_state_writes(manager)
+    with recorder:
+        allowed = run_checks(manager)
+        assert writes == []
+        manager.close()
+    assert len(writes) == 1
+
+    # 鎖保護下 domain 通過數恰為上限，快照內容與記憶體狀態一致
+    assert allowed == 30
+    with open(manager.state_path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["global"]["*"]["current"] + saved["global"]["*"]["previous"] == 8 * 100
+    assert set(saved["ip"]) == {f"10.0.0.{i}" for i in range(8)}
+
+    restored = RateLimitManager(config_path(snapshot_interval=60))
+    try:
+        assert not restored.check_domain_limit("example.com")
+    finally:
+        restored.close()
+
+def test_background_snapshot_only_when_dirty(config_path):
+    """測試背景快照依間隔寫入，狀態未變更時不寫入"""
+    manager = RateLimitManager(config_path(snapshot_interval=0.05))
+    writes, recorder = count_state_writes(manager)
+    with recorder:
+        run_checks(manager, threads=4, calls=200)
+        time.sleep(0.2)
+        settled = len(writes)
+        time.sleep(0.2)
+        idle = len(writes) - settled
+        manager.close()
+
+    # 數千次檢查只產生少量快照，閒置期間不寫入
+    assert 1 <= settled <= 10
+    assert idle == 0
+
+def test_concurrent_saves_do_not_interleave(config_path):
+    """測試並行保存狀態不互相覆寫暫存文件，也不留下暫存文件"""
+    manager = RateLimitManager(config_path(snapshot_interval=60))
+    manager.check_domain_limit("example.com")
+    barrier = threading.Barrier(8)
+
+    def save():
+        barrier.wait()
+        for _ in range(20):
+            manager._dirty = True
+            manager.save_state()
+
+    with patch.object(manager.logger, "error") as error:
+        savers = [threading.Thread(target=save) for _ in range(8)]
+        for saver in savers:
+            saver.start()
+        for saver in savers:
+            saver.join()
+        manager.close()
+
+    error.assert_not_called()
+    state_dir = os.path.dirname(manager.state_path)
+    assert not [name for name in os.listdir(state_dir) if name.endswith(".tmp")]
+    with open(manager.state_path, "r", encoding="utf-8") as f:
+        assert "example.com" in json.load(f)["domain"]
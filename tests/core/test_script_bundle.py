@@ -0,0 +1,43 @@
+"""
+反檢測腳本打包測試
+
+測試腳本壓縮、打包與磁碟快取
+"""
+
+import os
+from selenium_base.core.script_bundle import (
+    AntiDetectionBundle,
+    FingerprintParams,
+    build_bundle,
+    minify_js
+)
+
+def test_minify_keeps_strings():
+    """測試壓縮移除註解但保留字串內容"""
+    source = """
+        // 註解
+        var url = 'http://example.com';  /* 區塊註解 */
+        var text = `a  b`;
+    """
+
+    assert minify_js(source) == "var url = 'http://example.com';\nvar text = `a  b`;"
+
+def test_bundle_isolates_snippets():
+    """測試每個片段包在獨立作用域中"""
+    bundle = build_bundle({'a': 'const x = 1;', 'b': 'const x = 2;', 'empty': ''})
+
+    assert bundle.count('(function(){try{') == 2
+    assert bundle.count('catch(e){}') == 2
+
+def test_bundle_cache_keyed_by_fingerprint(tmp_path):
+    """測試快取依指紋參數區分"""
+    bundler = AntiDetectionBundle(cache_dir=str(tmp_path))
+    fp = FingerprintParams(user_agent='ua', plugins_count=4)
+
+    first = bundler.get(fp)
+    assert 'Array(4)' in first
+    assert bundler.get(fp) == first
+    assert len(os.listdir(tmp_path)) == 1
+
+    bundler.get(FingerprintParams(user_agent='ua', plugins_count=6))
+    assert len(os.listdir(tmp_path)) == 2
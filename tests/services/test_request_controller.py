@@ -9,13 +9,21 @@
 """
 
 import time
+import asyncio
+import logging
+import threading
 import pytest
+from types import SimpleNamespace
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from unittest.mock import MagicMock, patch
 
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 from selenium_base.core.config import BaseConfig
+from selenium_base.core.exceptions import RequestError
+from selenium_base.services import request_controller
 from selenium_base.services.request_controller import RequestController
 
 @pytest.fixture
@@ -48,9 +56,9 @@ def test_create_session(controller):
     # 檢查會話類型
     assert isinstance(session, Session)
     
-    # 檢查重試設定
-    assert session.adapters["http://"].max_retries.total == 3
-    assert session.adapters["https://"].max_retries.total == 3
+    # 適配器不重試，重試由 _retry_request 處理
+    assert session.adapters["http://"].max_retries.total == 0
+    assert session.adapters["https://"].max_retries.total == 0
 
 def test_check_rate_limit_minute(controller):
     """測試檢查分鐘請求限制"""
@@ -358,4 +366,170 @@ def test_close(controller, session):
     controller.close(session)
     
     # 檢查會話是否已關閉
-    session.close.assert_called_once() 
\ No newline at end of file
+    session.close.assert_called_once()
+
+def limited_config(minute=None, hour=None, day=None):
+    """建立只含速率限制與重試設定的配置"""
+    return SimpleNamespace(
+        logger=logging.getLogger("test_request_controller"),
+        request=SimpleNamespace(
+            timeout=5,
+            retry_count=2,
+            retry_delay=0.01,
+            retry_backoff=1,
+            retry_status_forcelist=[503],
+            rate_limit_minute=minute,
+            rate_limit_hour=hour,
+            rate_limit_day=day
+        )
+    )
+
+def ok_response(url="http://example.com", status=200):
+    """建立真實的回應物件"""
+    response = Response()
+    response.status_code = status
+    response.url = url
+    response._content = b"ok"
+    return response
+
+def test_request_async_awaits_rate_limit():
+    """測試 request_async 達到限制時以 asyncio 等待，不阻塞事件迴圈"""
+    session = MagicMock(spec=Session)
+    session.request.side_effect = lambda method, url, **kwargs: ok_response(url)
+    controller = RequestController(limited_config(minute=2), session=session)
+    ticks = []
+
+    async def ticker(done):
+        while not done.is_set():
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        done = asyncio.Event()
+        tick_task = asyncio.create_task(ticker(done))
+        start = time.monotonic()
+        responses = await asyncio.gather(*(
+            controller.request_async("get", f"http://example.com/{i}") for i in range(5)
+        ))
+        elapsed = time.monotonic() - start
+        done.set()
+        await tick_task
+        return responses, elapsed
+
+    # 縮短分鐘窗口；若任何路徑呼叫 time.sleep 即失敗
+    with patch.dict(request_controller.RATE_LIMIT_INTERVALS, {"minute": ("rate_limit_minute", 0.2, 0.0)}), \
+            patch.object(request_controller.time, "sleep", side_effect=AssertionError("blocking sleep")):
+        responses, elapsed = asyncio.run(main())
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert session.request.call_count == 5
+    # 每 0.2 秒 2 個配額，第 5 個請求需等待兩個窗口
+    assert elapsed >= 0.35
+    # 等待期間事件迴圈持續運作
+    assert len(ticks) >= 20
+
+def test_reserve_slot_is_atomic_across_threads():
+    """測試多執行緒同時佔用配額時，成功數不超過上限"""
+    controller = RequestController(limited_config(minute=1000, hour=7), session=MagicMock(spec=Session))
+    barrier = threading.Barrier(20)
+    granted = []
+
+    def worker():
+        barrier.wait()
+        wait_time, interval = controller._reserve_slot()
+        granted.append((wait_time <= 0, interval))
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(ok for ok, _ in granted) == 7
+    assert {interval for ok, interval in granted if not ok} == {"hour"}
+    # 被拒絕的請求不佔用任何區間的配額
+    assert controller.get_request_counts() == {"minute": 7, "hour": 7}
+
+@pytest.mark.parametrize("limits, blocked, allowed", [
+    ({"minute": 3, "hour": 100, "day": 1000}, "minute", 3),
+    ({"minute": 100, "hour": 4, "day": 1000}, "hour", 4),
+    ({"minute": 100, "hour": 100, "day": 5}, "day", 5),
+])
+def test_wait_for_slot_respects_each_cap(limits, blocked, allowed):
+    """測試 wait_for_slot 遵守分鐘、小時與日限制中最嚴格者"""
+    controller = RequestController(limited_config(**limits), session=MagicMock(spec=Session))
+
+    async def main():
+        for _ in range(allowed):
+            await controller.wait_for_slot()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(controller.wait_for_slot(), timeout=0.05)
+
+    asyncio.run(main())
+
+    wait_time, interval = controller._reserve_slot()
+    assert interval == blocked and wait_time > 0
+    assert controller.get_request_counts()[blocked] == allowed
+
+def test_pooled_session_is_reused():
+    """測試同步、重試與非同步請求都透過同一個具連線池的會話發送"""
+    adapters = []
+
+    def send(adapter, request, **kwargs):
+        adapters.append(adapter)
+        status = 503 if request.url.endswith("/flaky") and len(adapters) == 1 else 200
+        response = ok_response(request.url, status)
+        response.request = request
+        return response
+
+    with patch.object(request_controller.requests, "Session", wraps=Session) as session_cls, \
+            patch.object(HTTPAdapter, "send", autospec=True, side_effect=send):
+        controller = RequestController(limited_config())
+        controller.get("http://example.com/flaky", retry_delay=0.01)
+        controller.post("http://example.com/post")
+        asyncio.run(controller.request_async("get", "https://example.com/async"))
+
+        other = RequestController(limited_config(), session=controller.session)
+        other.get("http://example.com/shared")
+
+    assert session_cls.call_count == 1
+    assert len(adapters) == 5
+    assert len({id(adapter) for adapter in adapters}) == 1
+    assert adapters[0].poolmanager is controller.session.get_adapter("https://example.com").poolmanager
+    # 共用會話由建立它的控制器關閉
+    with patch.object(controller.session, "close") as close:
+        other.close()
+        close.assert_not_called()
+        controller.close()
+        close.assert_called_once()
+
+class UnavailableHandler(BaseHTTPRequestHandler):
+    """對所有請求回應 503 並記錄次數"""
+
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        self.send_response(503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_retries_are_not_multiplied():
+    """測試只有一層重試：首次請求加上 retry_count 次重試，不會放大為平方"""
+    UnavailableHandler.hits = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UnavailableHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    controller = RequestController(limited_config())
+    try:
+        with pytest.raises(RequestError):
+            controller.get(f"http://127.0.0.1:{server.server_address[1]}/", retry_count=3, retry_delay=0.01)
+    finally:
+        controller.close()
+        server.shutdown()
+        server.server_close()
+
+    assert UnavailableHandler.hits == 1 + 3
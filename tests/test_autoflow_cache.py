@@ -0,0 +1,74 @@
+"""
+AutoFlow 非同步 TTL 快取測試
+
+測試並行請求合併、過期與載入失敗不寫入快取
+"""
+
+import asyncio
+import pytest
+
+from autoflow.core.cache import AsyncTTLCache
+
+def test_concurrent_requests_are_coalesced():
+    """測試同一鍵的並行請求只執行一次載入"""
+    cache = AsyncTTLCache(ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "AAPL data"
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_load(("AAPL", 7), loader) for _ in range(10)))
+        cached = await cache.get_or_load(("AAPL", 7), loader)
+        return results, cached
+
+    results, cached = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert results == ["AAPL data"] * 10
+    assert cached == "AAPL data"
+    assert cache.get_stats()["coalesced"] == 9
+    assert cache.get_stats()["hits"] == 1
+
+def test_expired_entry_is_reloaded():
+    """測試過期後重新載入"""
+    cache = AsyncTTLCache(ttl=0.01)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        first = await cache.get_or_load("MSFT", loader)
+        await asyncio.sleep(0.02)
+        return first, await cache.get_or_load("MSFT", loader)
+
+    assert asyncio.run(main()) == (1, 2)
+
+def test_failed_load_is_not_cached():
+    """測試載入失敗時所有等待者收到例外，且下次請求重新載入"""
+    cache = AsyncTTLCache(ttl=60)
+    attempts = []
+
+    async def loader():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise ValueError("download failed")
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(
+            cache.get_or_load("TSLA", loader), cache.get_or_load("TSLA", loader),
+            return_exceptions=True
+        )
+        return results, await cache.get_or_load("TSLA", loader)
+
+    results, retried = asyncio.run(main())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retried == "ok"
+    assert len(attempts) == 2
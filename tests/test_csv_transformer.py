@@ -0,0 +1,175 @@
+"""
+CSV 轉換器測試
+
+測試行程池批次轉換、向量化資料點建立與增量轉換的跳過與重新轉換
+"""
+
+import asyncio
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from adapter.transformers.csv_transformer import CSVTransformer, MANIFEST_FILENAME
+from adapter.transformers.stock_data_transformer import StockDataTransformer
+
+
+class ScaleTransformer(CSVTransformer):
+    """測試用轉換器：將 value 欄位乘上配置的 scale 後輸出，並記錄轉換的行程"""
+
+    async def _transform_file(self, csv_path):
+        df = pd.read_csv(csv_path)
+        if "value" not in df.columns:
+            raise ValueError("缺少 value 欄位")
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        output_path = os.path.join(self.output_dir, f"{name}.json")
+        payload = {
+            "values": (df["value"] * self.config.get("scale", 1)).tolist(),
+            "pid": os.getpid()
+        }
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        return output_path
+
+
+def iterrows_points(df, labels, columns):
+    """原本以 iterrows 逐列轉型建立資料點的實作，作為向量化結果的對照"""
+    points = []
+    for i, row in df.iterrows():
+        try:
+            point = {"t": labels[i]}
+            for key, col in columns.items():
+                point[key] = float(row[col])
+            points.append(point)
+        except (ValueError, TypeError, IndexError):
+            continue
+    return points
+
+
+def write_csvs(directory, count):
+    directory.mkdir(exist_ok=True)
+    for index in range(count):
+        pd.DataFrame({"value": [index, index + 1]}).to_csv(directory / f"file{index}.csv", index=False)
+
+
+def run(transformer, data=None):
+    return asyncio.run(transformer.transform(data))
+
+
+def test_process_pool_matches_serial(tmp_path):
+    """測試行程池批次轉換的結果與循序轉換相同，保持輸入順序並回報失敗檔案"""
+    write_csvs(tmp_path / "in", 6)
+    (tmp_path / "in" / "broken.csv").write_text("other\n1\n")
+    config = {"input_dir": str(tmp_path / "in"), "incremental": False, "scale": 2}
+
+    serial = run(ScaleTransformer(dict(config, output_dir=str(tmp_path / "serial"), workers=1)))
+    serial_outputs = {
+        os.path.basename(f["output"]): json.load(open(f["output"]))
+        for f in serial["files"] if f["status"] == "success"
+    }
+
+    pooled = run(ScaleTransformer(dict(config, output_dir=str(tmp_path / "pooled"), workers=3)))
+    pooled_outputs = {
+        os.path.basename(f["output"]): json.load(open(f["output"]))
+        for f in pooled["files"] if f["status"] == "success"
+    }
+
+    assert serial["successful"] == pooled["successful"] == 6
+    assert serial["failed"] == pooled["failed"] == 1
+    failed = [f for f in pooled["files"] if f["status"] == "failed"]
+    assert failed[0]["input"].endswith("broken.csv") and "value" in failed[0]["error"]
+    assert {k: v["values"] for k, v in pooled_outputs.items()} == {k: v["values"] for k, v in serial_outputs.items()}
+    assert pooled_outputs["file0.json"]["values"] == [0, 2]
+    # 行程池模式在子行程中轉換
+    assert all(v["pid"] != os.getpid() for v in pooled_outputs.values())
+    assert all(v["pid"] == os.getpid() for v in serial_outputs.values())
+
+
+def test_vectorized_points_match_iterrows():
+    """測試向量化建立的 OHLC 與價格線資料點和原本逐列實作一致，無效資料列整列跳過"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=50).strftime("%Y-%m-%d"),
+        "Open": rng.random(50) * 100,
+        "High": rng.random(50) * 100,
+        "Low": rng.random(50) * 100,
+        "Close": rng.random(50) * 100,
+    })
+    labels = df["Date"].tolist()
+    ohlc = {"o": "Open", "h": "High", "l": "Low", "c": "Close"}
+
+    assert CSVTransformer.build_point_records(df, labels, ohlc) == iterrows_points(df, labels, ohlc)
+    assert CSVTransformer.build_point_records(df, labels, {"y": "Close"}) == iterrows_points(df, labels, {"y": "Close"})
+
+    dirty = df.astype({"High": object})
+    dirty.loc[3, "High"] = "n/a"
+    dirty.loc[7, "Close"] = np.nan
+    points = CSVTransformer.build_point_records(dirty, labels, ohlc)
+    expected = [p for i, p in enumerate(iterrows_points(df, labels, ohlc)) if i not in (3, 7)]
+    assert points == expected
+
+    series = pd.Series([1.5, np.nan, 3.0])
+    assert CSVTransformer.series_to_list(series) == [1.5, None, 3.0]
+    assert CSVTransformer.series_to_list(series.dropna()) == [1.5, 3.0]
+
+
+def test_stock_transformer_candlestick(tmp_path):
+    """測試股票轉換器以向量化資料點輸出蠟燭圖與價格線"""
+    (tmp_path / "in").mkdir()
+    pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=6).strftime("%Y-%m-%d"),
+        "Open": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        "High": [2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+        "Low": [0.5, 1.5, 2.5, 3.5, 4.5, 5.5],
+        "Close": [1.5, "bad", 3.5, 4.5, 5.5, 6.5],
+    }).to_csv(tmp_path / "in" / "AAPL_price.csv", index=False)
+
+    transformer = StockDataTransformer({"input_dir": str(tmp_path / "in"), "output_dir": str(tmp_path / "out")})
+    results = run(transformer)
+
+    assert results["successful"] == 1
+    chart = json.load(open(tmp_path / "out" / "AAPL_price.json"))
+    line = json.load(open(tmp_path / "out" / "AAPL_price_line.json"))
+    candles = chart["data"]["datasets"][0]["data"]
+    assert chart["type"] == "candlestick"
+    assert [p["t"] for p in candles] == ["2024-01-01", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-06"]
+    assert candles[0] == {"t": "2024-01-01", "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5}
+    assert [p["y"] for p in line["data"]["datasets"][0]["data"]] == [1.5, 3.5, 4.5, 5.5, 6.5]
+
+
+def test_incremental_skip_and_rerun(tmp_path):
+    """測試增量轉換跳過未變更的檔案，內容、輸出或配置改變時重新轉換"""
+    write_csvs(tmp_path / "in", 3)
+    config = {"input_dir": str(tmp_path / "in"), "output_dir": str(tmp_path / "out"), "scale": 2}
+
+    first = run(ScaleTransformer(config))
+    assert (first["successful"], first["skipped"]) == (3, 0)
+    assert os.path.exists(tmp_path / "out" / MANIFEST_FILENAME)
+
+    second = run(ScaleTransformer(config))
+    assert (second["successful"], second["skipped"]) == (0, 3)
+    assert {f["status"] for f in second["files"]} == {"skipped"}
+
+    # 僅觸碰而內容不變：比對雜湊後仍跳過
+    touched = tmp_path / "in" / "file0.csv"
+    stat = os.stat(touched)
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert run(ScaleTransformer(config))["skipped"] == 3
+
+    # 內容改變或輸出被刪除時重新轉換
+    pd.DataFrame({"value": [9]}).to_csv(tmp_path / "in" / "file1.csv", index=False)
+    os.remove(tmp_path / "out" / "file2.json")
+    rerun = run(ScaleTransformer(config))
+    assert (rerun["successful"], rerun["skipped"]) == (2, 1)
+    assert json.load(open(tmp_path / "out" / "file1.json"))["values"] == [18]
+
+    # 只改變執行相關配置時仍跳過；影響輸出的配置改變時全部重新轉換
+    assert run(ScaleTransformer(dict(config, workers=2, limit=10)))["skipped"] == 3
+    rescaled = run(ScaleTransformer(dict(config, scale=3)))
+    assert (rescaled["successful"], rescaled["skipped"]) == (3, 0)
+    assert json.load(open(tmp_path / "out" / "file0.json"))["values"] == [0, 3]
+    assert run(ScaleTransformer(dict(config, scale=3)))["skipped"] == 3
+
+    # 關閉增量模式時一律轉換
+    assert run(ScaleTransformer(dict(config, scale=3, incremental=False)))["successful"] == 3
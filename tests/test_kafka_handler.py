@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Kafka 處理器單元測試
+"""
+
+import os
+import tempfile
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+from kafka import TopicPartition
+from persistence.handlers.kafka_handler import KafkaHandler, KafkaKeyIndex
+from persistence.core.config import KafkaConfig
+from persistence.core.exceptions import NotFoundError
+
+Message = namedtuple("Message", ["key", "value", "offset"])
+
+class FakeIndexConsumer:
+    """以列表模擬單分區主題的索引消費者"""
+    
+    def __init__(self, log, topic="data"):
+        self.log = log
+        self.tp = TopicPartition(topic, 0)
+        self.pos = 0
+        self.polled = 0
+    
+    def assignment(self):
+        return {self.tp}
+    
+    def end_offsets(self, partitions):
+        return {self.tp: len(self.log)}
+    
+    def position(self, tp):
+        return self.pos
+    
+    def poll(self, timeout_ms=None):
+        batch = self.log[self.pos:self.pos + 2]
+        self.pos += len(batch)
+        self.polled += len(batch)
+        return {self.tp: batch} if batch else {}
+
+class LateMetadataConsumer(FakeIndexConsumer):
+    """主題剛建立、前幾次查詢尚無分區元數據的索引消費者"""
+    
+    def __init__(self, log, missing_metadata=1, topic="data"):
+        super().__init__(log, topic)
+        self.missing_metadata = missing_metadata
+        self.assigned = set()
+    
+    def partitions_for_topic(self, topic):
+        if self.missing_metadata:
+            self.missing_metadata -= 1
+            return None
+        return {0}
+    
+    def assign(self, partitions):
+        self.assigned = set(partitions)
+    
+    def assignment(self):
+        return self.assigned
+    
+    def seek_to_beginning(self, tp):
+        self.pos = 0
+
+class TestKafkaKeyIndex(unittest.TestCase):
+    """Kafka 鍵索引測試類"""
+    
+    def test_latest_value_wins(self):
+        """測試同鍵保留最新記錄"""
+        index = KafkaKeyIndex()
+        index.apply("a", {"data": 1}, 0, 0)
+        index.apply("a", {"data": 2}, 0, 5)
+        index.apply("a", {"data": 3}, 0, 3)  # 重放的舊記錄
+        self.assertEqual(index.get("a")["data"], 2)
+    
+    def test_tombstone(self):
+        """測試刪除標記"""
+        index = KafkaKeyIndex()
+        index.apply("a", {"data": 1}, 0, 0)
+        index.apply("a", {"data": None, "deleted": True}, 0, 1)
+        self.assertIsNone(index.get("a"))
+        
+        # 刪除之前的記錄不會復活
+        index.apply("a", {"data": 1}, 0, 0)
+        self.assertIsNone(index.get("a"))
+        
+        # 消費位置越過刪除標記後即可壓縮
+        index.advance(0, 2)
+        self.assertEqual(index.compact(), 1)
+    
+    def test_snapshot_round_trip(self):
+        """測試快照保存與加載"""
+        index = KafkaKeyIndex()
+        index.apply("a", {"data": {"x": 1}, "timestamp": 1.0}, 0, 0)
+        index.advance(0, 1)
+        
+        path = os.path.join(tempfile.mkdtemp(), "index.json")
+        index.save(path)
+        
+        restored = KafkaKeyIndex()
+        self.assertTrue(restored.load(path))
+        self.assertEqual(restored.get("a")["data"], {"x": 1})
+        self.assertEqual(restored.positions, {0: 1})
+
+class TestKafkaHandlerIndex(unittest.TestCase):
+    """Kafka 處理器索引查詢測試類"""
+    
+    def setUp(self):
+        """測試前準備"""
+        with patch.object(KafkaHandler, "_setup_storage"):
+            self.handler = KafkaHandler(KafkaConfig())
+        self.log = [
+            Message("a", {"data": {"x": 1}}, 0),
+            Message("b", {"data": {"x": 2}}, 1),
+            Message("a", {"data": {"x": 3}}, 2),
+            Message("b", {"data": None, "deleted": True}, 3)
+        ]
+        self.consumer = FakeIndexConsumer(self.log)
+        self.handler.index_consumer = self.consumer
+    
+    def test_point_lookups(self):
+        """測試點查詢"""
+        self.assertEqual(self.handler.load("a"), {"x": 3})
+        self.assertFalse(self.handler.exists("b"))
+        with self.assertRaises(NotFoundError):
+            self.handler.load("b")
+        self.assertEqual(self.handler.batch_exists(["a", "b"]), {"a": True, "b": False})
+    
+    def test_queries(self):
+        """測試列表與查詢"""
+        self.assertEqual(self.handler.list(), ["a"])
+        self.assertEqual(self.handler.count(), 1)
+        self.assertEqual(self.handler.find({"x": 3}), [{"x": 3}])
+        self.assertEqual(self.handler.count({"x": 1}), 0)
+    
+    def test_incremental_refresh(self):
+        """測試刷新只消費新偏移量"""
+        self.handler.list()
+        self.assertEqual(self.consumer.polled, 4)
+        
+        self.log.append(Message("c", {"data": {"x": 4}}, 4))
+        self.assertEqual(sorted(self.handler.list()), ["a", "c"])
+        self.assertEqual(self.consumer.polled, 5)
+    
+    def test_assignment_retried_until_metadata_available(self):
+        """測試建立時尚無分區元數據，刷新時重試分配"""
+        consumer = LateMetadataConsumer(self.log, missing_metadata=2)
+        self.handler.index_consumer = consumer
+        
+        self.handler._assign_index_partitions()
+        self.assertEqual(consumer.assignment(), set())
+        self.assertEqual(self.handler.refresh_index(), 0)
+        
+        self.assertEqual(self.handler.list(), ["a"])
+        self.assertEqual(consumer.assignment(), {consumer.tp})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地存儲處理器單元測試
+"""
+
+import os
+import re
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from persistence.handlers.local_handler import LocalStorageHandler
+from persistence.core.exceptions import ConfigError, StorageError
+
+class TestLocalStorageHandler(unittest.TestCase):
+    """本地存儲處理器測試類"""
+    
+    def setUp(self):
+        """測試前準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_config = {
+            "data_dir": os.path.join(self.temp_dir, "data"),
+            "logs_dir": os.path.join(self.temp_dir, "logs"),
+            "log_file": os.path.join(self.temp_dir, "logs", "storage.log"),
+            "errors_dir": os.path.join(self.temp_dir, "errors"),
+            "temp_dir": os.path.join(self.temp_dir, "temp"),
+            "base_path": os.path.join(self.temp_dir, "local"),
+            "backup_path": os.path.join(self.temp_dir, "backup"),
+            "log_level": "ERROR",
+            "max_backups": 2
+        }
+        self.handlers = []
+    
+    def tearDown(self):
+        """測試後清理"""
+        for handler in self.handlers:
+            handler.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def _create_handler(self, **overrides):
+        """建立處理器"""
+        config = dict(self.base_config)
+        config.update(overrides)
+        handler = LocalStorageHandler(config)
+        self.handlers.append(handler)
+        return handler
+    
+    def _backup_files(self):
+        """列出所有備份文件"""
+        files = []
+        for root, _, filenames in os.walk(self.base_config["backup_path"]):
+            files.extend(os.path.join(root, f) for f in filenames)
+        return files
+    
+    def test_backup_rotation_uses_index(self):
+        """測試備份依記憶體索引輪替，不重複列出目錄"""
+        handler = self._create_handler()
+        
+        with patch("persistence.core.base.time.time", side_effect=[100, 101, 102, 103]):
+            with patch("persistence.core.base.os.listdir", wraps=os.listdir) as listdir:
+                for i in range(4):
+                    handler.save({"i": i}, "item.json")
+        
+        self.assertEqual(listdir.call_count, 1)
+        self.assertEqual(
+            sorted(os.path.basename(f) for f in self._backup_files()),
+            ["item.102.json", "item.103.json"]
+        )
+    
+    def test_backup_rotation_includes_legacy_names(self):
+        """測試輪替納入舊版 {文件名}.{時間戳} 命名的備份"""
+        handler = self._create_handler()
+        backup_dir = os.path.join(self.base_config["backup_path"], datetime.now().strftime("%Y%m%d"))
+        os.makedirs(backup_dir)
+        legacy = os.path.join(backup_dir, "item.json.50")
+        with open(legacy, "w") as f:
+            f.write("{}")
+        os.utime(legacy, (50, 50))
+        
+        with patch("persistence.core.base.time.time", side_effect=[100, 101]):
+            for i in range(2):
+                handler.save({"i": i}, "item.json")
+        
+        self.assertEqual(
+            sorted(os.path.basename(f) for f in self._backup_files()),
+            ["item.100.json", "item.101.json"]
+        )
+    
+    def test_write_behind_coalesces_and_flushes(self):
+        """測試延遲寫入合併同路徑保存並在 flush 後落盤"""
+        handler = self._create_handler(write_behind=True, enable_backup=False, flush_interval=60)
+        
+        with patch.object(handler, "_write_record", wraps=handler._write_record) as write_record:
+            for i in range(5):
+                handler.save({"i": i}, "item.json")
+            handler.save({"x": 1}, "dir/other.json")
+            
+            # 未落盤前也能讀到自己寫入的數據
+            self.assertEqual(handler.load("item.json"), {"i": 4})
+            self.assertTrue(handler.exists("dir/other.json"))
+            self.assertIn(os.path.join("dir", "other.json"), handler.list())
+            
+            handler.flush()
+        
+        self.assertEqual(write_record.call_count, 2)
+        full_path = os.path.join(self.base_config["base_path"], "item.json")
+        self.assertTrue(os.path.exists(full_path))
+        self.assertEqual(handler._load_from_file(full_path), {"i": 4})
+    
+    def test_write_behind_delete_discards_pending(self):
+        """測試刪除會取消尚未寫出的數據"""
+        handler = self._create_handler(write_behind=True, enable_backup=False, flush_interval=60)
+        
+        handler.save({"i": 1}, "item.json")
+        handler.delete("item.json")
+        handler.flush()
+        
+        self.assertFalse(handler.exists("item.json"))
+    
+    def test_write_behind_bounded_queue(self):
+        """測試佇列已滿時 save 會阻塞直到背景寫出"""
+        handler = self._create_handler(
+            write_behind=True, enable_backup=False,
+            write_queue_size=2, write_batch_size=2, flush_interval=60
+        )
+        release = threading.Event()
+        original = handler._write_record
+        
+        def slow_write(data, path):
+            release.wait(5)
+            original(data, path)
+        
+        handler._write_record = slow_write
+        for i in range(4):
+            handler.save({"i": i}, f"item{i}.json")
+        
+        # 第一批正在寫入，第二批佔滿佇列
+        blocked = threading.Thread(target=handler.save, args=({"i": 4}, "item4.json"))
+        blocked.start()
+        blocked.join(0.2)
+        self.assertTrue(blocked.is_alive())
+        
+        release.set()
+        blocked.join(5)
+        self.assertFalse(blocked.is_alive())
+        handler.flush()
+        self.assertEqual(len(handler.list()), 5)
+    
+    def test_write_behind_reports_errors_on_flush(self):
+        """測試背景寫入失敗會在 flush 時回報"""
+        handler = self._create_handler(write_behind=True, enable_backup=False)
+        handler._write_record = lambda data, path: (_ for _ in ()).throw(OSError("disk full"))
+        
+        handler.save({"i": 1}, "item.json")
+        with self.assertRaises(StorageError):
+            handler.flush()
+    
+    def test_write_behind_requires_support(self):
+        """測試不支援延遲寫入的處理器在建立時即拒絕 write_behind"""
+        class SyncOnlyHandler(LocalStorageHandler):
+            supports_write_behind = False
+        
+        config = dict(self.base_config, write_behind=True)
+        with self.assertRaises(ConfigError):
+            SyncOnlyHandler(config)
+        self.handlers.append(SyncOnlyHandler(self.base_config))
+    
+    def test_atomic_durability(self):
+        """測試原子寫入不留下暫存文件"""
+        handler = self._create_handler(durability="fsync", enable_backup=False)
+        
+        handler.save({"i": 1}, "item.json")
+        
+        self.assertEqual(handler.load("item.json"), {"i": 1})
+        self.assertEqual(os.listdir(self.base_config["base_path"]), ["item.json"])
+
+class TestLocalStorageFormats(unittest.TestCase):
+    """本地存儲數據格式往返測試類"""
+    
+    RECORDS = [
+        {"id": 1, "name": "台積電", "price": 580.5},
+        {"id": 2, "name": "鴻海", "price": 105.0}
+    ]
+    
+    def setUp(self):
+        """測試前準備"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_config = {
+            "data_dir": os.path.join(self.temp_dir, "data"),
+            "logs_dir": os.path.join(self.temp_dir, "logs"),
+            "log_file": os.path.join(self.temp_dir, "logs", "storage.log"),
+            "errors_dir": os.path.join(self.temp_dir, "errors"),
+            "temp_dir": os.path.join(self.temp_dir, "temp"),
+            "base_path": os.path.join(self.temp_dir, "local"),
+            "backup_path": os.path.join(self.temp_dir, "backup"),
+            "log_level": "ERROR",
+            "enable_backup": False
+        }
+    
+    def tearDown(self):
+        """測試後清理"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _create_handler(self, **overrides):
+        """建立處理器"""
+        config = dict(self.base_config)
+        config.update(overrides)
+        return LocalStorageHandler(config)
+    
+    def _round_trip(self, handler, data, path):
+        """保存後載入"""
+        handler.save(data, path)
+        return handler.load(path)
+    
+    def test_default_json_unchanged(self):
+        """測試預設 JSON 輸出與原本格式相同"""
+        handler = self._create_handler()
+        
+        self.assertEqual(self._round_trip(handler, self.RECORDS, "items.json"), self.RECORDS)
+        with open(os.path.join(self.base_config["base_path"], "items.json"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(self.RECORDS, ensure_ascii=False, indent=2))
+    
+    def test_record_formats(self):
+        """測試記錄格式與壓縮往返"""
+        cases = [
+            ({"format": "orjson"}, "items.json"),
+            ({"format": "orjson", "json_indent": None, "compression": "zstd"}, "items.json"),
+            ({}, "items.json.gz"),
+            ({}, "items.msgpack"),
+            ({}, "items.msgpack.zst"),
+            ({"format": "msgpack", "compression": "gzip"}, "items.bin"),
+            ({"memory_map": False}, "items.mpk")
+        ]
+        for overrides, path in cases:
+            with self.subTest(overrides=overrides, path=path):
+                handler = self._create_handler(**overrides)
+                self.assertEqual(self._round_trip(handler, self.RECORDS, path), self.RECORDS)
+    
+    def test_compression_by_extension(self):
+        """測試依副檔名壓縮"""
+        handler = self._create_handler()
+        handler.save(self.RECORDS, "items.msgpack.zst")
+        
+        with open(os.path.join(self.base_config["base_path"], "items.msgpack.zst"), "rb") as f:
+            self.assertEqual(f.read(4), b"\x28\xb5\x2f\xfd")
+    
+    def test_table_formats(self):
+        """測試表格格式往返"""
+        import pandas as pd
+        
+        frame = pd.DataFrame(self.RECORDS)
+        columns = {"id": [1, 2], "price": [580.5, 105.0]}
+        cases = [
+            ({}, "items.parquet"),
+            ({"compression": "zstd"}, "items.parquet"),
+            ({}, "items.arrow"),
+            ({"compression": "zstd"}, "items.feather"),
+            ({"memory_map": False}, "items.arrow")
+        ]
+        for overrides, path in cases:
+            with self.subTest(overrides=overrides, path=path):
+                handler = self._create_handler(**overrides)
+                self.assertEqual(self._round_trip(handler, self.RECORDS, path), self.RECORDS)
+                self.assertEqual(self._round_trip(handler, columns, path), columns)
+                pd.testing.assert_frame_equal(self._round_trip(handler, frame, path), frame)
+    
+    def test_backup_restore_keeps_format(self):
+        """測試備份保留原副檔名，依副檔名還原非預設格式"""
+        handler = self._create_handler(enable_backup=True)
+        
+        for path in ("items.parquet", "items.json.gz", "items.msgpack.zst"):
+            with self.subTest(path=path):
+                handler.save(self.RECORDS, path)
+                backups = [
+                    os.path.join(root, f)
+                    for root, _, files in os.walk(self.base_config["backup_path"])
+                    for f in files if f.startswith("items.") and f.endswith(path[len("items"):])
+                ]
+                self.assertEqual(len(backups), 1)
+                self.assertRegex(os.path.basename(backups[0]), r"^items\.\d+" + re.escape(path[len("items"):]) + "$")
+                self.assertEqual(handler._load_from_file(backups[0]), self.RECORDS)
+    
+    def test_format_from_config(self):
+        """測試關閉副檔名判斷時使用配置格式"""
+        handler = self._create_handler(format="parquet", auto_format=False)
+        
+        self.assertEqual(self._round_trip(handler, self.RECORDS, "items.json"), self.RECORDS)
+        with open(os.path.join(self.base_config["base_path"], "items.json"), "rb") as f:
+            self.assertEqual(f.read(4), b"PAR1")
+    
+    def test_table_format_rejects_non_tabular(self):
+        """測試表格格式拒絕非表格數據"""
+        handler = self._create_handler()
+        
+        with self.assertRaises(StorageError):
+            handler.save({"key": "value"}, "item.parquet")
+
+if __name__ == '__main__':
+    unittest.main()
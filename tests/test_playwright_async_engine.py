@@ -0,0 +1,176 @@
+"""
+Playwright 非同步爬取引擎測試
+
+以模擬的 Playwright 物件測試網域並行上限、重試與每個上下文的設定
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from playwright_base.core import async_engine
+from playwright_base.core.async_engine import AsyncCrawlEngine, CrawlTask
+
+class FakeResponse:
+    """模擬響應"""
+    status = 200
+
+class FakePage:
+    """模擬頁面，記錄每個網域的最大並行數"""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.closed = False
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        domain = url.split("/")[2]
+        active = self.tracker["active"]
+        active[domain] = active.get(domain, 0) + 1
+        self.tracker["peak"][domain] = max(self.tracker["peak"].get(domain, 0), active[domain])
+        try:
+            await asyncio.sleep(0.01)
+            if url in self.tracker["fail_once"]:
+                self.tracker["fail_once"].remove(url)
+                raise RuntimeError("temporary failure")
+            return FakeResponse()
+        finally:
+            active[domain] -= 1
+
+    async def content(self):
+        return "<html></html>"
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+class FakeContext:
+    """模擬瀏覽器上下文"""
+
+    def __init__(self, tracker, options):
+        self.tracker = tracker
+        self.options = options
+
+    async def new_page(self):
+        return FakePage(self.tracker)
+
+    async def add_init_script(self, script):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+    async def close(self):
+        pass
+
+class FakeBrowser:
+    """模擬瀏覽器"""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    async def new_context(self, **options):
+        context = FakeContext(self.tracker, options)
+        self.tracker["contexts"].append(context)
+        return context
+
+    async def close(self):
+        pass
+
+class FakePlaywright:
+    """模擬 async_playwright"""
+
+    def __init__(self, tracker):
+        self.chromium = self
+        self.tracker = tracker
+
+    async def start(self):
+        return self
+
+    async def launch(self, **kwargs):
+        return FakeBrowser(self.tracker)
+
+    async def stop(self):
+        pass
+
+@pytest.fixture
+def tracker():
+    """記錄模擬瀏覽器狀態"""
+    return {"active": {}, "peak": {}, "fail_once": set(), "contexts": []}
+
+def run_engine(tracker, urls, **kwargs):
+    """以模擬 Playwright 執行引擎"""
+    async def main():
+        async with AsyncCrawlEngine(**kwargs) as engine:
+            results = await engine.run(urls)
+            return results, engine.get_stats()
+
+    with patch.object(async_engine, "async_playwright", lambda: FakePlaywright(tracker)):
+        return asyncio.run(main())
+
+def test_per_domain_limit(tracker):
+    """測試網域並行上限，其他網域不受阻塞"""
+    urls = [f"https://a.com/{i}" for i in range(12)] + [f"https://b.com/{i}" for i in range(4)]
+    results, stats = run_engine(tracker, urls, contexts=2, pages_per_context=4, per_domain_limit=2)
+
+    assert len(results) == 16
+    assert all(r.ok for r in results)
+    assert tracker["peak"]["a.com"] <= 2
+    assert tracker["peak"]["b.com"] <= 2
+    assert stats["succeeded"] == 16
+
+def test_retry_and_callback(tracker):
+    """測試失敗重試與結果回調"""
+    tracker["fail_once"].add("https://a.com/1")
+    received = []
+    results, stats = run_engine(
+        tracker,
+        ["https://a.com/1", CrawlTask(url="https://a.com/2", meta={"id": 2})],
+        contexts=1, pages_per_context=2, retry_delay=0, on_result=received.append
+    )
+
+    assert len(received) == 2
+    by_url = {r.url: r for r in results}
+    assert by_url["https://a.com/1"].attempts == 2
+    assert by_url["https://a.com/2"].meta == {"id": 2}
+    assert stats["retried"] == 1
+
+def test_context_profiles(tracker):
+    """測試每個上下文套用各自的代理與 User-Agent"""
+    run_engine(
+        tracker, [],
+        user_agent="default-ua",
+        context_profiles=[{"proxy": {"server": "http://p1:8080"}}, {"user_agent": "custom-ua"}]
+    )
+
+    first, second = (c.options for c in tracker["contexts"])
+    assert first["proxy"] == {"server": "http://p1:8080"}
+    assert first["user_agent"] == "default-ua"
+    assert second["user_agent"] == "custom-ua"
+    assert "proxy" not in second
+
+def test_results_only_kept_for_crawl_consumers(tracker):
+    """測試只有 crawl() 呼叫會保留結果，各呼叫只取得自己的結果，提前停止後不再累積"""
+    received = []
+
+    async def main():
+        async with AsyncCrawlEngine(contexts=1, pages_per_context=4, on_result=received.append) as engine:
+            engine.submit(f"https://a.com/bg{i}" for i in range(20))
+            first, second = await asyncio.gather(
+                engine.run([f"https://b.com/{i}" for i in range(3)]),
+                engine.run([f"https://c.com/{i}" for i in range(3)])
+            )
+            async for _ in engine.crawl(f"https://d.com/{i}" for i in range(5)):
+                break
+            await engine.join()
+            return first, second, dict(engine._sinks)
+
+    with patch.object(async_engine, "async_playwright", lambda: FakePlaywright(tracker)):
+        first, second, sinks = asyncio.run(main())
+
+    assert sorted(r.url for r in first) == [f"https://b.com/{i}" for i in range(3)]
+    assert sorted(r.url for r in second) == [f"https://c.com/{i}" for i in range(3)]
+    # 所有結果仍傳給回調，但沒有消費者的結果不會留在引擎中
+    assert len(received) == 31
+    assert sinks == {}
@@ -0,0 +1,153 @@
+"""
+Playwright 請求攔截測試
+
+以模擬的 Route / Request 測試封鎖、快取與統計
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from playwright_base.core.interceptor import DEFAULT_RESOURCE_SIZES, RequestInterceptor
+
+def make_request(url, resource_type, method="GET"):
+    """建立模擬請求"""
+    request = MagicMock()
+    request.url = url
+    request.resource_type = resource_type
+    request.method = method
+    return request
+
+def test_block_resource_types():
+    """測試依資源類型封鎖，文檔永不封鎖"""
+    interceptor = RequestInterceptor(block_resource_types=["image", "document"], block_domains=[])
+    route = MagicMock()
+    interceptor._handle_route(route, make_request("https://example.com/a.png", "image"))
+    route.abort.assert_called_once_with("blockedbyclient")
+
+    route = MagicMock()
+    interceptor._handle_route(route, make_request("https://example.com/", "document"))
+    route.continue_.assert_called_once()
+
+def test_block_domains_with_allow_list():
+    """測試網域封鎖包含子網域，白名單優先"""
+    interceptor = RequestInterceptor(
+        block_domains=["doubleclick.net", "example.org"],
+        allow_domains=["cdn.example.org"]
+    )
+
+    assert interceptor.is_blocked_domain("https://ad.g.doubleclick.net/x.js")
+    assert interceptor.is_blocked_domain("https://www.example.org/")
+    assert not interceptor.is_blocked_domain("https://cdn.example.org/app.js")
+    assert not interceptor.is_blocked_domain("https://notdoubleclick.net/")
+
+def test_cache_serves_second_request(tmp_path):
+    """測試靜態資源第二次請求由本地快取回應"""
+    interceptor = RequestInterceptor(block_domains=[], cache_dir=str(tmp_path))
+    response = MagicMock(status=200, headers={"content-type": "text/css"})
+    response.body.return_value = b"body{}"
+
+    first = MagicMock()
+    first.fetch.return_value = response
+    interceptor._handle_route(first, make_request("https://example.com/a.css", "stylesheet"))
+    first.fulfill.assert_called_once_with(response=response)
+
+    second = MagicMock()
+    interceptor._handle_route(second, make_request("https://example.com/a.css", "stylesheet"))
+    second.fetch.assert_not_called()
+    second.fulfill.assert_called_once_with(status=200, headers={"content-type": "text/css"}, body=b"body{}")
+
+    stats = interceptor.get_stats()
+    assert stats["stylesheet"]["cached"] == 1
+    assert stats["stylesheet"]["bytes_saved"] == 6
+
+def test_rewrite_and_estimated_savings():
+    """測試改寫規則與封鎖節省量估算"""
+    interceptor = RequestInterceptor(block_domains=[])
+    interceptor.add_rewrite(r"/api/config$", lambda request: {"status": 200, "body": "{}"})
+
+    route = MagicMock()
+    interceptor._handle_route(route, make_request("https://example.com/api/config", "xhr"))
+    route.fulfill.assert_called_once_with(status=200, body="{}")
+
+    observed = MagicMock(headers={"content-length": "1000"})
+    observed.request.resource_type = "image"
+    interceptor._on_response(observed)
+    interceptor._handle_route(MagicMock(), make_request("https://example.com/b.png", "image"))
+
+    stats = interceptor.get_stats()
+    assert stats["xhr"]["rewritten"] == 1
+    assert stats["image"]["blocked"] == 1
+    assert stats["total"]["bytes_saved"] == 1000
+
+def test_blocked_savings_without_observed_responses():
+    """測試被封鎖的類型從未放行時，以預設或配置的大小估算節省量"""
+    interceptor = RequestInterceptor(block_domains=["ads.example.net"], estimated_sizes={"font": 30000})
+
+    # 只有文檔與腳本被放行並產生回應
+    for url, resource_type, length in [
+        ("https://example.com/", "document", "50000"),
+        ("https://example.com/app.js", "script", "12000"),
+    ]:
+        interceptor._handle_route(MagicMock(), make_request(url, resource_type))
+        response = MagicMock(headers={"content-length": length})
+        response.request.resource_type = resource_type
+        interceptor._on_response(response)
+
+    for index in range(3):
+        interceptor._handle_route(MagicMock(), make_request(f"https://example.com/{index}.png", "image"))
+    interceptor._handle_route(MagicMock(), make_request("https://example.com/a.woff2", "font"))
+    interceptor._handle_route(MagicMock(), make_request("https://ads.example.net/tag.js", "script"))
+    interceptor._handle_route(MagicMock(), make_request("https://ads.example.net/ping", "beacon"))
+
+    stats = interceptor.get_stats()
+    assert stats["image"]["blocked"] == 3
+    assert stats["image"]["bytes_saved"] == 3 * DEFAULT_RESOURCE_SIZES["image"]
+    assert stats["font"]["bytes_saved"] == 30000
+    # 已有放行回應的類型使用觀察到的平均大小，未列出的類型使用 other 的估計
+    assert stats["script"]["bytes_saved"] == 12000
+    assert stats["beacon"]["bytes_saved"] == DEFAULT_RESOURCE_SIZES["other"]
+    assert stats["total"]["bytes_saved"] == 3 * DEFAULT_RESOURCE_SIZES["image"] + 30000 + 12000 + DEFAULT_RESOURCE_SIZES["other"]
+
+def test_cache_drops_encoding_headers(tmp_path):
+    """測試快取不保存內容編碼與長度標頭，避免以已解壓內容回應壓縮標頭"""
+    interceptor = RequestInterceptor(block_domains=[], cache_dir=str(tmp_path))
+    response = MagicMock(status=200, headers={
+        "content-type": "application/javascript",
+        "content-encoding": "gzip",
+        "content-length": "42",
+        "transfer-encoding": "chunked"
+    })
+    response.body.return_value = b"var a = 1;"
+
+    first = MagicMock()
+    first.fetch.return_value = response
+    interceptor._handle_route(first, make_request("https://example.com/a.js", "script"))
+
+    second = MagicMock()
+    interceptor._handle_route(second, make_request("https://example.com/a.js", "script"))
+    second.fulfill.assert_called_once_with(
+        status=200, headers={"content-type": "application/javascript"}, body=b"var a = 1;"
+    )
+
+def test_cache_expires_after_ttl(tmp_path):
+    """測試快取過期後重新抓取並更新快取"""
+    interceptor = RequestInterceptor(block_domains=[], cache_dir=str(tmp_path), cache_ttl=60)
+    response = MagicMock(status=200, headers={"content-type": "text/css"})
+    response.body.return_value = b"body{}"
+
+    with patch("playwright_base.core.interceptor.time.time", return_value=1000.0):
+        first = MagicMock()
+        first.fetch.return_value = response
+        interceptor._handle_route(first, make_request("https://example.com/a.css", "stylesheet"))
+
+    with patch("playwright_base.core.interceptor.time.time", return_value=1030.0):
+        fresh = MagicMock()
+        interceptor._handle_route(fresh, make_request("https://example.com/a.css", "stylesheet"))
+        fresh.fetch.assert_not_called()
+
+    with patch("playwright_base.core.interceptor.time.time", return_value=1100.0):
+        stale = MagicMock()
+        stale.fetch.return_value = response
+        interceptor._handle_route(stale, make_request("https://example.com/a.css", "stylesheet"))
+        stale.fetch.assert_called_once()
+        stale.fulfill.assert_called_once_with(response=response)
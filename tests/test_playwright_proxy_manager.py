@@ -0,0 +1,81 @@
+"""
+Playwright 代理管理器測試
+
+以本地 HTTP 伺服器作為健康檢查目標，測試並行檢查、EWMA 評分與隔離
+"""
+
+import time
+import threading
+import pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from playwright_base.anti_detection.proxy_manager import ProxyManager
+
+class StubHandler(BaseHTTPRequestHandler):
+    """模擬代理：對所有請求延遲後回應 200"""
+
+    def do_GET(self):
+        time.sleep(0.2)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"origin": "127.0.0.1"}')
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_proxy():
+    """啟動本地模擬代理伺服器"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+@pytest.fixture
+def manager():
+    """建立測試用的代理管理器"""
+    return ProxyManager(test_url="http://stub.local/ip", timeout=2, max_workers=20, quarantine_seconds=60)
+
+def test_concurrent_health_check(manager, stub_proxy):
+    """測試並行檢查：20 個各需 0.2 秒的代理遠少於序列時間"""
+    manager.proxies = [{"server": f"{stub_proxy}/p{i}"} for i in range(20)]
+
+    start = time.time()
+    results = manager.test_all_proxies()
+
+    assert all(r["success"] for r in results)
+    assert time.time() - start < 20 * 0.2
+    stats = manager.get_proxy_stats()
+    assert all(s["latency_ewma"] >= 200 for s in stats.values())
+
+def test_ewma_and_weighted_selection(manager):
+    """測試 EWMA 更新與依分數加權選擇"""
+    fast, slow = {"server": "http://fast:1"}, {"server": "http://slow:1"}
+    manager.proxies = [fast, slow]
+    for _ in range(5):
+        manager.report_result(fast, True, 50)
+        manager.report_result(slow, True, 1900)
+
+    assert manager.get_score(fast) > manager.get_score(slow)
+    picks = [manager.get_random_proxy()["server"] for _ in range(500)]
+    assert picks.count("http://fast:1") > picks.count("http://slow:1")
+
+def test_quarantine_and_reprobe(manager, stub_proxy):
+    """測試連續失敗後隔離，隔離結束後重新探測恢復"""
+    proxy = {"server": f"{stub_proxy}/q"}
+    other = {"server": "http://other:1"}
+    manager.proxies = [proxy, other]
+    for _ in range(3):
+        manager.report_result(proxy, False, error="timeout")
+
+    assert manager.get_proxy_stats()[proxy["server"]]["quarantined"]
+    assert all(manager.next_proxy() is other for _ in range(3))
+
+    manager._get_health(proxy).quarantined_until = time.time() - 1
+    manager._get_health(other).last_checked = time.time()
+    results = manager.probe_due_proxies()
+
+    assert [r["proxy"] for r in results] == [proxy["server"]]
+    assert not manager.get_proxy_stats()[proxy["server"]]["quarantined"]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PostgreSQL 處理器單元測試
+"""
+
+import csv
+import io
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from persistence.handlers.postgresql_handler import PostgreSQLHandler
+from persistence.core.config import PostgreSQLConfig
+from persistence.core.exceptions import StorageError, ValidationError
+
+class TestPostgreSQLHandler(unittest.TestCase):
+    """PostgreSQL 處理器測試類"""
+    
+    def setUp(self):
+        """測試前準備"""
+        self.config = PostgreSQLConfig(table_name="items", copy_threshold=3)
+        
+        with patch.object(PostgreSQLHandler, "_setup_storage"):
+            self.handler = PostgreSQLHandler(self.config)
+        
+        # 模擬連接池
+        self.cursor_mock = MagicMock()
+        self.conn_mock = MagicMock()
+        self.conn_mock.cursor.return_value = self.cursor_mock
+        self.handler.pool = MagicMock()
+        self.handler.pool.getconn.return_value = self.conn_mock
+    
+    def test_save_single_statement(self):
+        """測試保存只發送一條 upsert 語句"""
+        self.handler.save({"name": "test"}, "a")
+        
+        self.assertEqual(self.cursor_mock.execute.call_count, 1)
+        sql = self.cursor_mock.execute.call_args[0][0]
+        self.assertIn("INSERT INTO public.items", sql)
+        self.assertIn("ON CONFLICT (id) DO UPDATE", sql)
+        self.conn_mock.commit.assert_called_once()
+    
+    def test_save_error(self):
+        """測試保存失敗時回滾"""
+        self.cursor_mock.execute.side_effect = Exception("boom")
+        with self.assertRaises(StorageError):
+            self.handler.save({"name": "test"}, "a")
+        self.conn_mock.rollback.assert_called_once()
+    
+    def test_batch_save_values(self):
+        """測試小批量使用 execute_values"""
+        with patch("persistence.handlers.postgresql_handler.execute_values") as mock_values:
+            stats = self.handler.batch_save([
+                {"path": "a", "data": {"v": 1}},
+                {"path": "a", "data": {"v": 2}}
+            ])
+        
+        self.assertEqual(stats["method"], "values")
+        self.assertEqual(stats["rows"], 1)
+        self.assertIn("rows_per_sec", stats)
+        rows = mock_values.call_args[0][2]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][1].adapted, {"v": 2})
+    
+    def test_batch_save_copy(self):
+        """測試大批量使用 COPY 與合併"""
+        data_list = [{"path": f"p{i}", "data": {"v": i, "text": "中文,\"引號\""}} for i in range(3)]
+        
+        copied = {}
+        def capture(sql, buffer):
+            copied["sql"] = sql
+            copied["rows"] = list(csv.reader(io.StringIO(buffer.read())))
+        self.cursor_mock.copy_expert.side_effect = capture
+        
+        stats = self.handler.batch_save(data_list)
+        
+        self.assertEqual(stats["method"], "copy")
+        self.assertIn("FROM STDIN", copied["sql"])
+        self.assertEqual(len(copied["rows"]), 3)
+        self.assertEqual(json.loads(copied["rows"][0][1]), data_list[0]["data"])
+        merge_sql = self.cursor_mock.execute.call_args_list[-1][0][0]
+        self.assertIn("ON CONFLICT (id) DO UPDATE", merge_sql)
+        self.conn_mock.commit.assert_called_once()
+    
+    def test_batch_save_invalid_method(self):
+        """測試不支持的寫入方式"""
+        with self.assertRaises(ValidationError):
+            self.handler.batch_save([], method="bulk")
+
+if __name__ == "__main__":
+    unittest.main()
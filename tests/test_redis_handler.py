@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Redis 處理器單元測試
+"""
+
+import json
+import logging
+import unittest
+from unittest.mock import MagicMock, patch
+from persistence.handlers.redis_handler import RedisHandler
+from persistence.core.config import RedisConfig
+from persistence.core.exceptions import StorageError
+
+class TestRedisHandler(unittest.TestCase):
+    """Redis 處理器測試類"""
+    
+    def setUp(self):
+        """測試前準備"""
+        self.config = RedisConfig(key_prefix="app", scan_count=50, batch_chunk_size=2)
+        self.config.enable_backup = False
+        self.config.validate_data = False
+        
+        with patch.object(RedisHandler, "_initialize"), patch.object(RedisHandler, "_setup_logging"):
+            self.handler = RedisHandler(self.config)
+        self.handler.logger = logging.getLogger("test_redis_handler")
+        
+        # 模擬 client
+        self.client_mock = MagicMock()
+        self.handler.client = self.client_mock
+    
+    def test_list_uses_scan(self):
+        """測試列出鍵使用 SCAN 而非 KEYS"""
+        self.client_mock.scan_iter.return_value = iter(["app:a", "app:b", "app:a"])
+        
+        self.assertEqual(self.handler.list(), ["a", "b"])
+        self.client_mock.scan_iter.assert_called_once_with(match="app:*", count=50)
+        self.client_mock.keys.assert_not_called()
+    
+    def test_scan_streams(self):
+        """測試流式遍歷"""
+        self.client_mock.scan_iter.return_value = iter(["app:a", "app:b"])
+        
+        keys = self.handler.scan("a*")
+        self.assertEqual(next(keys), "a")
+        self.client_mock.scan_iter.assert_called_once_with(match="app:a*", count=50)
+    
+    def test_batch_save_chunks(self):
+        """測試批量保存按分塊 MSET"""
+        data_list = [{"path": f"k{i}", "data": {"i": i}} for i in range(5)]
+        self.handler.batch_save(data_list)
+        
+        self.assertEqual(self.client_mock.mset.call_count, 3)
+        first_chunk = self.client_mock.mset.call_args_list[0][0][0]
+        self.assertEqual(first_chunk, {"app:k0": json.dumps({"i": 0}), "app:k1": json.dumps({"i": 1})})
+    
+    def test_batch_load(self):
+        """測試批量加載使用 MGET"""
+        self.client_mock.mget.side_effect = [[json.dumps({"i": 0}), None], [json.dumps({"i": 2})]]
+        
+        results = self.handler.batch_load(["k0", "missing", "k2"])
+        self.assertEqual(results, [
+            {"path": "k0", "data": {"i": 0}},
+            {"path": "missing", "data": None},
+            {"path": "k2", "data": {"i": 2}}
+        ])
+        self.assertEqual(self.client_mock.mget.call_count, 2)
+    
+    def test_batch_delete(self):
+        """測試批量刪除"""
+        self.client_mock.delete.return_value = 1
+        self.handler.batch_delete(["a", "b", "c"])
+        self.client_mock.delete.assert_any_call("app:a", "app:b")
+        self.client_mock.delete.assert_any_call("app:c")
+    
+    def test_batch_exists_pipeline(self):
+        """測試批量檢查使用管道"""
+        pipe = MagicMock()
+        pipe.execute.side_effect = [[1, 0], [1]]
+        self.client_mock.pipeline.return_value = pipe
+        
+        result = self.handler.batch_exists(["a", "b", "c"])
+        self.assertEqual(result, {"a": True, "b": False, "c": True})
+        self.assertEqual(pipe.execute.call_count, 2)
+    
+    def test_batch_error(self):
+        """測試批量操作錯誤"""
+        self.client_mock.mget.side_effect = Exception("boom")
+        with self.assertRaises(StorageError):
+            self.handler.batch_load(["a"])
+
+if __name__ == "__main__":
+    unittest.main()
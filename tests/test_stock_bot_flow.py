@@ -0,0 +1,69 @@
+"""
+股票行情機器人存儲測試
+
+測試 stock_data 表缺少唯一約束時改用一般插入，以及存儲失敗不中斷流程
+"""
+
+import asyncio
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("telegram")
+pytest.importorskip("supabase")
+pytest.importorskip("yfinance")
+
+from autoflow.flows.stock_bot_flow import StockBotFlow
+
+
+class MissingConstraintError(Exception):
+    """模擬 PostgREST 回傳的 ON CONFLICT 約束錯誤"""
+    code = "42P10"
+
+
+def make_flow(supabase):
+    """建立不連接外部服務的流程"""
+    flow = StockBotFlow.__new__(StockBotFlow)
+    flow.logger = logging.getLogger("test-stock-bot")
+    flow.supabase = supabase
+    flow._stock_upsert = True
+    return flow
+
+
+def make_history():
+    return pd.DataFrame(
+        {"Open": [1.0, 2.0], "High": [2.0, 3.0], "Low": [0.5, 1.5], "Close": [1.5, 2.5], "Volume": [10, 20]},
+        index=pd.to_datetime(["2024-01-01", "2024-01-02"])
+    )
+
+
+def test_store_falls_back_to_insert_without_constraint():
+    """測試缺少 (symbol, date) 唯一約束時改用一般插入，之後不再嘗試 upsert"""
+    supabase = MagicMock()
+    supabase.upsert = AsyncMock(side_effect=MissingConstraintError("there is no unique or exclusion constraint"))
+    supabase.create_many = AsyncMock(return_value=[])
+    flow = make_flow(supabase)
+
+    asyncio.run(flow._store_data("AAPL", make_history()))
+    asyncio.run(flow._store_data("AAPL", make_history()))
+
+    assert supabase.upsert.await_count == 1
+    assert supabase.create_many.await_count == 2
+    table, records = supabase.create_many.await_args.args
+    assert table == "stock_data"
+    assert [r["date"] for r in records] == ["2024-01-01", "2024-01-02"]
+
+
+def test_store_failure_does_not_raise():
+    """測試其他存儲錯誤只記錄，不中斷回覆用戶的流程"""
+    supabase = MagicMock()
+    supabase.upsert = AsyncMock(side_effect=RuntimeError("connection reset"))
+    supabase.create_many = AsyncMock()
+    flow = make_flow(supabase)
+
+    asyncio.run(flow._store_data("AAPL", make_history()))
+
+    supabase.create_many.assert_not_awaited()
+    assert flow._stock_upsert
@@ -0,0 +1,167 @@
+"""
+Telegram Bot Gemini 客戶端測試
+
+以本地模型替身測試結果快取、並行請求合併與失敗不寫入快取
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("telegram")
+Image = pytest.importorskip("PIL.Image")
+
+from telegram_bot.utils.gemini_client import GeminiClient
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """模型替身：記錄呼叫次數，可設定延遲與失敗"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, contents):
+        prompt, image = contents
+        with self.lock:
+            self.calls.append(prompt)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return FakeResponse(f"{prompt}: {image.size[0]}x{image.size[1]}")
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "photo.png"
+    Image.new("RGB", (32, 16), "red").save(path)
+    return str(path)
+
+
+def test_concurrent_requests_are_coalesced(image_path):
+    """測試相同圖片與提示詞的並行請求只呼叫一次模型"""
+    model = FakeModel(delay=0.1)
+    client = GeminiClient(model=model, max_workers=2)
+
+    async def main():
+        results = await asyncio.gather(*(
+            client.analyze_image(image_path, "描述", image_key="unique-1") for _ in range(5)
+        ))
+        other_prompt = await client.analyze_image(image_path, "提取文字", image_key="unique-1")
+        return results, other_prompt
+
+    try:
+        results, other_prompt = asyncio.run(main())
+    finally:
+        client.close()
+
+    assert results == ["描述: 32x16"] * 5
+    assert other_prompt == "提取文字: 32x16"
+    assert model.calls == ["描述", "提取文字"]
+    assert client.get_cached_result("unique-1", "描述") == "描述: 32x16"
+    assert client.get_cache_stats()["coalesced"] == 4
+
+
+def test_content_hash_key_and_bounds(image_path, tmp_path):
+    """測試未提供圖像鍵時以內容雜湊命中快取，並遵守筆數上限與過期時間"""
+    model = FakeModel()
+    client = GeminiClient(model=model, cache_size=1, cache_ttl=0.2)
+    copy_path = tmp_path / "forwarded.png"
+    copy_path.write_bytes(open(image_path, "rb").read())
+
+    async def main():
+        await client.analyze_image(image_path, "描述")
+        await client.analyze_image(str(copy_path), "描述")
+        await client.analyze_image(image_path, "其他")
+        await client.analyze_image(image_path, "描述")
+        await asyncio.sleep(0.25)
+        await client.analyze_image(image_path, "描述")
+
+    try:
+        asyncio.run(main())
+    finally:
+        client.close()
+
+    assert model.calls == ["描述", "其他", "描述", "描述"]
+    assert client.get_cache_stats()["size"] == 1
+
+
+def test_failures_are_not_cached(image_path):
+    """測試分析失敗時返回錯誤訊息且不寫入快取"""
+    model = FakeModel(fail=True)
+    client = GeminiClient(model=model)
+
+    async def main():
+        first = await client.analyze_image(image_path, "描述", image_key="unique-2")
+        second = await client.analyze_image(image_path, "描述", image_key="unique-2")
+        return first, second
+
+    try:
+        first, second = asyncio.run(main())
+    finally:
+        client.close()
+
+    assert first.startswith("圖像分析時發生錯誤")
+    assert second == first
+    assert len(model.calls) == 2
+    assert client.get_cached_result("unique-2", "描述") is None
+
+
+def test_telegram_download_is_coalesced_and_owned_by_shared_task(image_path):
+    """測試相同圖片的並行請求只下載一次，首個請求被取消時臨時文件仍保留到分析結束"""
+    from telegram_bot.handlers.image_handlers import analyze_telegram_image
+
+    model = FakeModel(delay=0.1)
+    client = GeminiClient(model=model, max_workers=2)
+    downloads = []
+
+    class FakeFile:
+        async def download_to_drive(self, path):
+            downloads.append(path)
+            await asyncio.sleep(0.05)
+            with open(path, "wb") as f:
+                f.write(open(image_path, "rb").read())
+
+    class FakeBot:
+        async def get_file(self, file_id):
+            return FakeFile()
+
+    class FakeContext:
+        bot = FakeBot()
+
+    async def main():
+        first = asyncio.ensure_future(
+            analyze_telegram_image(client, FakeContext(), "file-1", "unique-3", "描述")
+        )
+        await asyncio.sleep(0)
+        others = [
+            asyncio.ensure_future(analyze_telegram_image(client, FakeContext(), "file-1", "unique-3", "描述"))
+            for _ in range(4)
+        ]
+        # 下載進行中取消第一個請求
+        await asyncio.sleep(0.02)
+        first.cancel()
+        results = await asyncio.gather(*others)
+        cached = await analyze_telegram_image(client, FakeContext(), "file-1", "unique-3", "描述")
+        return first, results, cached
+
+    try:
+        first, results, cached = asyncio.run(main())
+    finally:
+        client.close()
+
+    assert first.cancelled()
+    assert results == ["描述: 32x16"] * 4
+    assert cached == "描述: 32x16"
+    assert len(downloads) == 1 and model.calls == ["描述"]
+    assert not os.path.exists(downloads[0])
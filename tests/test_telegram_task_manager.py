@@ -0,0 +1,131 @@
+"""
+Telegram Bot 任務管理器測試
+
+以假爬蟲測試每個用戶的同時執行上限、取消、逾時與重新啟動後的任務恢復
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("telegram")
+
+from telegram_bot.data.task_manager import TaskManager
+from telegram_bot.exceptions import TaskLimitError
+
+
+class FakeCrawler:
+    """假爬蟲：阻塞到測試放行，並記錄同時執行的任務數"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, url, options, context):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            while not self.release.wait(0.01):
+                context.raise_if_cancelled()
+            context.set_progress(50)
+            return {"url": url, "items": [{"title": "a"}, {"title": "b"}]}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "tasks.db")
+
+
+def make_manager(db_path, crawler, **kwargs):
+    options = dict(max_workers=4, max_tasks_per_user=5, max_running_per_user=2,
+                   task_timeout=30, admin_ids=[], export_dir=str(db_path) + "_exports")
+    options.update(kwargs)
+    return TaskManager(db_path, crawler=crawler, **options)
+
+
+def test_per_user_running_cap_and_results(db_path):
+    """測試每個用戶同時執行數受限，結果可依任務 ID 與用戶查詢"""
+    crawler = FakeCrawler()
+    manager = make_manager(db_path, crawler)
+    try:
+        assert TaskManager(db_path) is manager
+
+        task_ids = [manager.create_task(1, f"https://example.com/{i}") for i in range(5)]
+        time.sleep(0.2)
+        statuses = [manager.get_task_status(task_id)["status"] for task_id in task_ids]
+        assert statuses.count("running") == 2
+        assert manager.count_active_tasks(1) == 5
+
+        with pytest.raises(TaskLimitError):
+            manager.create_task(1, "https://example.com/5")
+
+        crawler.release.set()
+        for task_id in task_ids:
+            assert manager.wait_for(task_id, timeout=5)["status"] == "completed"
+
+        assert crawler.peak == 2
+        assert [task["id"] for task in manager.get_user_tasks(1)] == task_ids
+        assert manager.get_task_result(task_ids[0], 1)["url"] == "https://example.com/0"
+        assert manager.get_task_result(task_ids[0], 2) is None
+        assert manager.export_task_result(task_ids[0], 1, "csv").endswith(".csv")
+    finally:
+        manager.shutdown()
+
+
+def test_cancel_and_timeout(db_path):
+    """測試取消執行中的任務與逾時任務標記為失敗"""
+    crawler = FakeCrawler()
+    manager = make_manager(db_path, crawler, task_timeout=0.3)
+    try:
+        cancelled = manager.create_task(1, "https://example.com/a")
+        timed_out = manager.create_task(2, "https://example.com/b")
+        time.sleep(0.1)
+
+        assert not manager.cancel_task(cancelled, 2)
+        assert manager.cancel_task(cancelled, 1)
+        assert manager.get_task_status(cancelled)["status"] == "cancelled"
+
+        status = manager.wait_for(timed_out, timeout=5)
+        assert status["status"] == "failed"
+        assert "逾時" in status["error"]
+        assert manager.count_active_tasks(1) == manager.count_active_tasks(2) == 0
+    finally:
+        manager.shutdown()
+
+
+def test_recovery_after_restart(db_path):
+    """測試重新啟動後恢復排程與中斷的任務"""
+    crawler = FakeCrawler()
+    manager = make_manager(db_path, crawler)
+    interrupted = manager.create_task(1, "https://example.com/a")
+    scheduled = manager.schedule_task(1, "https://example.com/b", schedule_time="2999-01-01T12:00")
+    time.sleep(0.1)
+    manager.shutdown()
+
+    crawler.release.set()
+    manager = make_manager(db_path, crawler)
+    try:
+        assert manager.wait_for(interrupted, timeout=5)["status"] == "completed"
+        assert manager.get_task_status(scheduled)["status"] == "scheduled"
+        assert manager.get_system_status()["scheduled_tasks"] == 1
+    finally:
+        manager.shutdown()
+
+
+def test_parse_schedule_time():
+    """測試排程時間解析"""
+    now = datetime(2024, 1, 1, 13, 0)
+    assert TaskManager.parse_schedule_time("14:30", now) == datetime(2024, 1, 1, 14, 30)
+    assert TaskManager.parse_schedule_time("09:00", now) == datetime(2024, 1, 2, 9, 0)
+    with pytest.raises(ValueError):
+        TaskManager.parse_schedule_time("2023-01-01T12:00", now)
+    with pytest.raises(ValueError):
+        TaskManager.parse_schedule_time("tomorrow", now)